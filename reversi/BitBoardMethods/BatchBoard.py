@@ -0,0 +1,155 @@
+"""BatchBoard
+       NumPyのuint64配列で複数の盤面(8x8)をまとめて処理する
+"""
+
+import numpy as np
+
+from reversi.BitBoardMethods.CyBoard8_64bit import CythonBitBoard
+
+
+BATCH_BOARD_SIZE = 8  # 対応するボードサイズ
+
+_U = np.uint64
+_MASK_H = _U(0x7E7E7E7E7E7E7E7E)  # 水平方向のマスク値
+_MASK_V = _U(0x00FFFFFFFFFFFF00)  # 垂直方向のマスク値
+_MASK_D = _U(0x007E7E7E7E7E7E00)  # 斜め方向のマスク値
+_DIRECTIONS = ((_MASK_H, _U(1)), (_MASK_V, _U(8)), (_MASK_D, _U(7)), (_MASK_D, _U(9)))  # (マスク値, シフト量)
+_ZERO = _U(0)
+
+
+def to_arrays(boards):
+    """to_arrays
+           盤面のリストから黒,白,穴のuint64配列を作る
+    """
+    for board in boards:
+        if board.size != BATCH_BOARD_SIZE:
+            raise ValueError(str(board.size) + ' is not supported!')
+    infos = [board.get_bitboard_info() for board in boards]
+
+    return tuple(np.array([info[i] for info in infos], dtype=_U) for i in range(3))
+
+
+def to_boards(black, white, hole=None):
+    """to_boards
+           黒,白,穴のuint64配列からCythonBitBoardのリストを作る
+    """
+    black, white = np.asarray(black, dtype=_U), np.asarray(white, dtype=_U)
+    hole = np.zeros_like(black) if hole is None else np.asarray(hole, dtype=_U)
+
+    return [CythonBitBoard(BATCH_BOARD_SIZE, hole=int(h), ini_black=int(b), ini_white=int(w)) for b, w, h in zip(black, white, hole)]
+
+
+def get_board_array(board):
+    """get_board_array
+           盤面のint8のビューを(size, size)のNumPy配列として返す(コピーしない)
+    """
+    return np.asarray(board.get_board_view())
+
+
+def to_board_arrays(black, white, out=None):
+    """to_board_arrays
+           黒,白のuint64配列から(盤面数, 8, 8)のint8配列(黒:1、白:-1、空き:0)を作る(outを指定した場合はそこに書き込む)
+    """
+    black, white = np.asarray(black, dtype='>u8'), np.asarray(white, dtype='>u8')
+    shape = black.shape + (BATCH_BOARD_SIZE, BATCH_BOARD_SIZE)
+    black_bits = np.unpackbits(black.view(np.uint8)).view(np.int8).reshape(shape)
+    white_bits = np.unpackbits(white.view(np.uint8)).view(np.int8).reshape(shape)
+    if out is None:
+        out = np.empty(shape, dtype=np.int8)
+
+    return np.subtract(black_bits, white_bits, out=out)
+
+
+def get_legal_moves_bits(color, black, white, hole=None):
+    """get_legal_moves_bits
+           各盤面の合法手のビットを返す(colorは'black','white'または盤面毎の黒番フラグ配列)
+    """
+    player, opponent = _get_player_opponent(color, black, white)
+    blank = ~(player | opponent)
+    if hole is not None:
+        blank &= ~np.asarray(hole, dtype=_U)
+
+    legal_moves = np.zeros_like(player)
+    for mask, shift in _DIRECTIONS:
+        masked = opponent & mask
+        for step in (np.left_shift, np.right_shift):
+            tmp = masked & step(player, shift)
+            for _ in range(5):
+                tmp |= masked & step(tmp, shift)
+            legal_moves |= blank & step(tmp, shift)
+
+    return legal_moves
+
+
+def get_flippable_discs_bits(color, black, white, moves):
+    """get_flippable_discs_bits
+           各盤面でmovesのビットに打った場合にひっくり返せる石のビットを返す
+    """
+    player, opponent = _get_player_opponent(color, black, white)
+    moves = np.asarray(moves, dtype=_U)
+
+    flippable_discs = np.zeros_like(player)
+    for mask, shift in _DIRECTIONS:
+        masked = opponent & mask
+        for step in (np.left_shift, np.right_shift):
+            tmp = masked & step(moves, shift)
+            for _ in range(5):
+                tmp |= masked & step(tmp, shift)
+            flippable_discs |= np.where(step(tmp, shift) & player, tmp, _ZERO)
+
+    return flippable_discs
+
+
+def put_disc(color, black, white, moves):
+    """put_disc
+           各盤面でmovesのビットに石を置いた後の黒,白の配列を返す(movesが0の盤面はそのまま)
+    """
+    black, white = np.asarray(black, dtype=_U), np.asarray(white, dtype=_U)
+    moves = np.asarray(moves, dtype=_U)
+    flippable_discs = get_flippable_discs_bits(color, black, white, moves)
+    puts = np.where(flippable_discs, moves, _ZERO)
+    is_black = _get_is_black(color, black)
+
+    next_black = np.where(is_black, black ^ (puts | flippable_discs), black ^ flippable_discs)
+    next_white = np.where(is_black, white ^ flippable_discs, white ^ (puts | flippable_discs))
+
+    return next_black, next_white
+
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(bits):
+        """popcount
+               各要素の立っているビットの数を返す(NumPy2.0以降はbitwise_countを使用)
+        """
+        return np.bitwise_count(np.asarray(bits, dtype=_U)).astype(np.int64)
+else:
+    def popcount(bits):
+        """popcount
+               各要素の立っているビットの数を返す
+        """
+        bits = np.asarray(bits, dtype=_U)
+        bits = bits - ((bits >> _U(1)) & _U(0x5555555555555555))
+        bits = (bits & _U(0x3333333333333333)) + ((bits >> _U(2)) & _U(0x3333333333333333))
+        bits = (bits + (bits >> _U(4))) & _U(0x0F0F0F0F0F0F0F0F)
+        return ((bits * _U(0x0101010101010101)) >> _U(56)).astype(np.int64)
+
+
+def _get_is_black(color, black):
+    """_get_is_black
+    """
+    if isinstance(color, str):
+        return np.full(np.shape(black), color == 'black')
+
+    return np.asarray(color, dtype=bool)
+
+
+def _get_player_opponent(color, black, white):
+    """_get_player_opponent
+    """
+    black, white = np.asarray(black, dtype=_U), np.asarray(white, dtype=_U)
+    if isinstance(color, str):
+        return (black, white) if color == 'black' else (white, black)
+
+    is_black = np.asarray(color, dtype=bool)
+
+    return np.where(is_black, black, white), np.where(is_black, white, black)
@@ -0,0 +1,49 @@
+"""BitMask
+"""
+
+from collections import namedtuple
+
+
+BitMask = namedtuple('BitMask', 'h v d u ur r br b bl l ul fill')
+
+_bit_masks = {}  # ボードサイズ毎のマスク(プロセス内で1度だけ生成する)
+
+
+def get_bit_mask(size):
+    """get_bit_mask
+           ボードサイズに応じたマスクを返す
+    """
+    if size not in _bit_masks:
+        _bit_masks[size] = _create_bit_mask(size)
+
+    return _bit_masks[size]
+
+
+def _create_bit_mask(size):
+    """_create_bit_mask
+    """
+    h = int(''.join((['0'] + ['1'] * (size-2) + ['0']) * size), 2)                                      # 水平方向のマスク値
+    v = int(''.join(['0'] * size + ['1'] * size * (size-2) + ['0'] * size), 2)                          # 垂直方向のマスク値
+    d = int(''.join(['0'] * size + (['0'] + (['1'] * (size-2)) + ['0']) * (size-2) + ['0'] * size), 2)  # 斜め方向のマスク値
+
+    # Kogge-Stone法のフィル用テーブル(マスク値, シフト量(1,2,4...倍))
+    # 挟める相手の石は最大size-2個のため、シフトの回数は2**n-1 >= size-2 となるnとする
+    steps = (size-2).bit_length()
+    fill = tuple(
+        (mask, tuple(shift << i for i in range(steps))) for mask, shift in ((h, 1), (v, size), (d, size+1), (d, size-1))
+    )
+
+    return BitMask(
+        h,
+        v,
+        d,
+        int(''.join(['1'] * size * (size-1) + ['0'] * size), 2),                # 上方向のマスク値
+        int(''.join((['0'] + ['1'] * (size-1)) * (size-1) + ['0'] * size), 2),  # 右上方向のマスク値
+        int(''.join((['0'] + ['1'] * (size-1)) * size), 2),                     # 右方向のマスク値
+        int(''.join(['0'] * size + (['0'] + ['1'] * (size-1)) * (size-1)), 2),  # 右下方向のマスク値
+        int(''.join(['0'] * size + ['1'] * size * (size-1)), 2),                # 下方向のマスク値
+        int(''.join(['0'] * size + (['1'] * (size-1) + ['0']) * (size-1)), 2),  # 左下方向のマスク値
+        int(''.join((['1'] * (size-1) + ['0']) * size), 2),                     # 左方向のマスク値
+        int(''.join((['1'] * (size-1) + ['0']) * (size-1) + ['0'] * size), 2),  # 左上方向のマスク値
+        fill,
+    )
@@ -0,0 +1,59 @@
+"""Bits
+"""
+
+
+if hasattr(int, 'bit_count'):
+    def popcount(bits):
+        """popcount
+               立っているビットの数を返す(Python3.10以降はint.bit_countを使用)
+        """
+        return bits.bit_count()
+else:
+    def popcount(bits):
+        """popcount
+               立っているビットの数を返す
+        """
+        return bin(bits).count('1')
+
+
+def iter_bits(bits):
+    """iter_bits
+           下位ビットから順に、立っているビットを1つずつ返す
+    """
+    while bits:
+        lowest = bits & -bits
+        yield lowest
+        bits ^= lowest
+
+
+def iter_indices(size, bits):
+    """iter_indices
+           立っているビットのマス番号(y*size+x)を左上から順に返す
+    """
+    last = size * size - 1
+    while bits:
+        top = bits.bit_length() - 1
+        yield last - top
+        bits ^= 1 << top
+
+
+def iter_coords(size, bits):
+    """iter_coords
+           立っているビットの座標を左上から順に返す
+    """
+    for index in iter_indices(size, bits):
+        yield index % size, index // size
+
+
+def bits_to_coords(size, bits):
+    """bits_to_coords
+           立っているビットの座標を左上から順にリストで返す
+    """
+    return list(iter_coords(size, bits))
+
+
+def coord_to_bit(size, x, y):
+    """coord_to_bit
+           座標をビットに変換する
+    """
+    return 1 << (size * size - 1 - (y * size + x))
@@ -0,0 +1,58 @@
+"""BoardView
+       盤面をint8(黒:1、白:-1、空き:0)のバッファとして扱う
+"""
+
+_TO_BLACK = bytes.maketrans(b'01', b'\x00\x01')  # '0','1'の並びを黒(1)のバイト列にする
+_TO_WHITE = bytes.maketrans(b'01', b'\x00\xff')  # '0','1'の並びを白(-1)のバイト列にする
+
+
+def get_board_view(size, b, w):
+    """get_board_view
+           ボードの情報を(size, size)のint8のmemoryviewで返す(NumPyからはコピーせずに参照できる)
+    """
+    squares = size * size
+    black = format(b, '0' + str(squares) + 'b').encode().translate(_TO_BLACK)
+    white = format(w, '0' + str(squares) + 'b').encode().translate(_TO_WHITE)
+    buf = bytearray((int.from_bytes(black, 'big') | int.from_bytes(white, 'big')).to_bytes(squares, 'big'))
+
+    return memoryview(buf).cast('b', (size, size))
+
+
+def get_board_line_info(view, player, black='*', white='O', empty='-'):
+    """get_board_line_info
+           ボードの情報と手番を1行の文字列で返す
+    """
+    board_line_info = view.tobytes().decode('latin-1').translate({0: empty, 1: black, 0xFF: white})
+
+    if player == 'black':
+        return board_line_info + black
+    elif player == 'white':
+        return board_line_info + white
+
+    return board_line_info + empty
+
+
+def export_boards(boards, out=None):
+    """export_boards
+           複数の盤面を(盤面数, size, size)のint8のバッファにまとめて書き込む
+           (outには同じ大きさの書き込み可能なバッファ(bytearrayやNumPy配列など)を指定できる)
+    """
+    if not boards:
+        raise ValueError('boards is empty!')
+
+    size = boards[0].size
+    for board in boards:
+        if board.size != size:
+            raise ValueError('all boards must be the same size!')
+
+    squares = size * size
+    if out is None:
+        out = bytearray(len(boards) * squares)
+    buf = memoryview(out).cast('B')
+    if buf.nbytes != len(boards) * squares:
+        raise ValueError('out must be ' + str(len(boards) * squares) + ' bytes!')
+
+    for i, board in enumerate(boards):
+        buf[i*squares:(i+1)*squares] = board.get_board_view().cast('B')
+
+    return buf.cast('b', (len(boards), size, size))
@@ -0,0 +1,120 @@
+"""Codec
+       局面(黒, 白, 穴, 手番, サイズ)の固定長バイナリ形式への変換
+
+       1バイト目 : ボードサイズ(下位7bit)と手番(最上位bit、1なら白番)
+       2バイト目～: 1マス2bit(空き:00, 黒:01, 白:10, 穴:11)を左上から順に詰めたもの
+       (8x8の場合は1 + 16 = 17バイト)
+"""
+
+MIN_BOARD_SIZE = 4
+MAX_BOARD_SIZE = 26
+WHITE_TO_MOVE = 0x80  # 白番を表すフラグ
+SIZE_MASK = 0x7F      # ボードサイズのマスク
+
+_masks = {}  # マス数毎のビット拡張用マスク(プロセス内で1度だけ生成する)
+
+
+def get_record_size(size):
+    """get_record_size
+           1局面あたりのバイト数を返す
+    """
+    return 1 + size * size // 4
+
+
+def encode_position(size, color, black, white, hole=0):
+    """encode_position
+           局面をバイト列にする
+    """
+    if not (MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE and size % 2 == 0):
+        raise ValueError(str(size) + ' is invalid size!')
+
+    squares = size * size
+    low, high = black | hole, white | hole  # 各マスの下位bit, 上位bit
+    value = _spread(squares, low) | (_spread(squares, high) << 1)
+    header = size | (WHITE_TO_MOVE if color == 'white' else 0)
+
+    return bytes((header,)) + value.to_bytes(squares // 4, 'big')
+
+
+def decode_position(data):
+    """decode_position
+           バイト列から(サイズ, 手番, 黒, 白, 穴)を返す
+    """
+    data = memoryview(data).cast('B')
+    size = data[0] & SIZE_MASK
+    if not (MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE and size % 2 == 0):
+        raise ValueError(str(size) + ' is invalid size!')
+    if len(data) != get_record_size(size):
+        raise ValueError('position must be ' + str(get_record_size(size)) + ' bytes!')
+
+    squares = size * size
+    value = int.from_bytes(data[1:], 'big')
+    low, high = _compact(squares, value), _compact(squares, value >> 1)
+    hole = low & high
+    color = 'white' if data[0] & WHITE_TO_MOVE else 'black'
+
+    return size, color, low & ~hole, high & ~hole, hole
+
+
+def pack_positions(positions):
+    """pack_positions
+           (ボード, 手番)の並びを連結したバイト列にする
+    """
+    return b''.join([board.encode(color) for board, color in positions])
+
+
+def iter_positions(buf):
+    """iter_positions
+           連結したバイト列(bytesやmmapなど)から(サイズ, 手番, 黒, 白, 穴)を順に返す
+    """
+    buf = memoryview(buf).cast('B')
+    offset = 0
+    while offset < len(buf):
+        record_size = get_record_size(buf[offset] & SIZE_MASK)
+        yield decode_position(buf[offset:offset+record_size])
+        offset += record_size
+
+
+def unpack_positions(buf, board_class):
+    """unpack_positions
+           連結したバイト列から(ボード, 手番)のリストを作る
+    """
+    return [(board_class(size, hole=hole, ini_black=black, ini_white=white), color) for size, color, black, white, hole in iter_positions(buf)]
+
+
+def _spread(squares, bits):
+    """_spread
+           各ビットの間に0を1つずつ挟む(i番目のビットを2i番目に移す)
+    """
+    for shift, mask in reversed(_get_masks(squares)):
+        bits = (bits | (bits << shift)) & mask
+
+    return bits
+
+
+def _compact(squares, bits):
+    """_compact
+           偶数番目のビットを詰める(_spreadの逆変換)
+    """
+    masks = _get_masks(squares)
+    bits &= masks[0][1]
+    for (shift, _), (_, mask) in zip(masks, masks[1:]):
+        bits = (bits | (bits >> shift)) & mask
+
+    return bits & ((1 << squares) - 1)
+
+
+def _get_masks(squares):
+    """_get_masks
+           シフト量(1, 2, 4, ...)毎の、シフト量個の1と0を交互に並べたマスクを返す
+    """
+    if squares not in _masks:
+        width = 1 << (squares - 1).bit_length()
+        ones = (1 << (width * 2)) - 1
+        masks, shift = [], 1
+        while shift <= width:
+            masks.append((shift, ((1 << shift) - 1) * (ones // ((1 << (shift * 2)) - 1))))
+            shift <<= 1
+        _masks[squares] = tuple(masks)
+
+    return _masks[squares]
@@ -0,0 +1,518 @@
+#cython: language_level=3, profile=False, boundscheck=False, wraparound=False, initializedcheck=False, cdivision=True
+"""CyBoard16_256bit
+"""
+
+from reversi.BitBoardMethods.BitMask import get_bit_mask
+from reversi.BitBoardMethods.BoardView import get_board_line_info
+from reversi.BitBoardMethods.Codec import encode_position, decode_position
+from reversi.BitBoardMethods.Zobrist import ZOBRIST_BLACK, ZOBRIST_WHITE, get_hash
+
+MIN_BOARD_SIZE = 4
+MAX_BOARD_SIZE = 26
+SIZE_256BIT = (10, 12, 14, 16)  # 64bit×4に収まるボードサイズ
+
+
+DEF MAX_LIMBS = 4  # 64bit単位の最大数
+DEF MAX_SIZE = 16  # 最大ボードサイズ
+
+
+ctypedef struct Bits:
+    unsigned long long limb[MAX_LIMBS]  # limb[0]が下位64bit
+
+
+cdef:
+    unsigned long long[256] zobrist_black
+    unsigned long long[256] zobrist_white
+    Bits[MAX_SIZE+1] mask_full             # 盤面全体のマスク値(サイズ毎)
+    Bits[MAX_SIZE+1][4] mask_line          # 水平,垂直,斜め,斜めのマスク値(サイズ毎)
+    unsigned int[MAX_SIZE+1][4] shift_line  # 上記4方向のシフト量(サイズ毎)
+    Bits[MAX_SIZE+1][8] mask_dir           # 上,右上,左,左上(左シフト),右,右下,下,左下(右シフト)のマスク値(サイズ毎)
+    unsigned int[MAX_SIZE+1][8] shift_dir  # 上記8方向のシフト量(サイズ毎)
+
+
+cdef inline void _init_zobrist():
+    """_init_zobrist
+    """
+    global zobrist_black, zobrist_white
+    cdef:
+        unsigned int i
+    for i in range(256):
+        zobrist_black[i] = ZOBRIST_BLACK[i]
+        zobrist_white[i] = ZOBRIST_WHITE[i]
+
+
+_init_zobrist()
+
+
+cdef inline void _init_geometry():
+    """_init_geometry
+           サイズ10～16のマスク値とシフト量を設定する
+    """
+    global mask_full, mask_line, shift_line, mask_dir, shift_dir
+    cdef:
+        unsigned int size, i
+    for size in SIZE_256BIT:
+        mask = get_bit_mask(size)
+        mask_full[size] = _from_int((<object>1 << (size * size)) - 1)
+        for i, (line_mask, shift_size) in enumerate(((mask.h, 1), (mask.v, size), (mask.d, size+1), (mask.d, size-1))):
+            mask_line[size][i] = _from_int(line_mask)
+            shift_line[size][i] = shift_size
+        for i, (direction_mask, shift_size) in enumerate(((mask.u, size), (mask.ur, size-1), (mask.l, 1), (mask.ul, size+1), (mask.r, 1), (mask.br, size+1), (mask.b, size), (mask.bl, size-1))):
+            mask_dir[size][i] = _from_int(direction_mask)
+            shift_dir[size][i] = shift_size
+
+
+_init_geometry()
+
+
+cdef class CythonBitBoard256():
+    """Cython BitBoard(サイズ10～16、64bit×2～4で石の配置を保持する)
+    """
+    cdef readonly size
+    cdef unsigned int _size
+    cdef Bits _b, _w, _h
+    cdef public _black_score, _white_score, _hash, prev, _green_bitboard, _ini_green, _ini_black, _ini_white, _mask, _flippable_discs_num
+
+    def __init__(self, size=10, hole=0x0, ini_black=None, ini_white=None):
+        if size not in SIZE_256BIT:
+            raise ValueError(str(size) + ' is not supported!')
+
+        self.size = size
+        self._size = size
+        self.prev = []
+        self._green_bitboard = 0
+
+        # 初期配置
+        center = size // 2
+        self._ini_black = 1 << ((size*size-1)-(size*(center-1)+center))
+        self._ini_black |= 1 << ((size*size-1)-(size*center+(center-1)))
+        self._ini_white = 1 << ((size*size-1)-(size*(center-1)+(center-1)))
+        self._ini_white |= 1 << ((size*size-1)-(size*center+center))
+        if ini_black is not None:
+            self._ini_black = ini_black
+        if ini_white is not None:
+            self._ini_white = ini_white
+
+        self._ini_green = self._ini_black & self._ini_white
+        self._ini_black &= ~self._ini_green
+        self._ini_white &= ~self._ini_green
+        self._green_bitboard |= self._ini_green
+        self._black_bitboard = self._ini_black
+        self._white_bitboard = self._ini_white
+        self._hole_bitboard = hole
+
+        # 置ける場所の検出用マスク
+        self._mask = get_bit_mask(size)
+
+        self._flippable_discs_num = 0
+        self.update_score()
+        self._hash = get_hash(self._black_bitboard, self._white_bitboard, self._hole_bitboard)
+
+    @property
+    def _black_bitboard(self):
+        return _to_int(self._b)
+
+    @_black_bitboard.setter
+    def _black_bitboard(self, value):
+        self._b = _from_int(value)
+
+    @property
+    def _white_bitboard(self):
+        return _to_int(self._w)
+
+    @_white_bitboard.setter
+    def _white_bitboard(self, value):
+        self._w = _from_int(value)
+
+    @property
+    def _hole_bitboard(self):
+        return _to_int(self._h)
+
+    @_hole_bitboard.setter
+    def _hole_bitboard(self, value):
+        self._h = _from_int(value)
+
+    @property
+    def hash(self):
+        return self._hash
+
+    def _is_invalid_size(self, size):
+        return not(MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE and size % 2 == 0)
+
+    def __str__(self):
+        size = self.size
+        header = '   ' + ' '.join([chr(97 + i) for i in range(size)]) + '\n'
+        board = [['□' for _ in range(size)] for _ in range(size)]
+        black_bitboard, white_bitboard, hole_bitboard = self.get_bitboard_info()
+        mask = 1 << (size * size - 1)
+        for y in range(size):
+            for x in range(size):
+                if hole_bitboard & mask:
+                    board[y][x] = '　'
+                elif black_bitboard & mask:
+                    board[y][x] = '〇'
+                elif white_bitboard & mask:
+                    board[y][x] = '●'
+                elif self._green_bitboard & mask:
+                    board[y][x] = '◎'
+                mask >>= 1
+
+        body = ''
+        for num, row in enumerate(board, 1):
+            body += f'{num:2d}' + ''.join([value for value in row]) + '\n'
+
+        return header + body
+
+    def get_legal_moves(self, str color):
+        return _get_coords(self._size, self._get_legal_moves_bits(color))
+
+    def get_legal_moves_bits(self, str color):
+        return _to_int(self._get_legal_moves_bits(color))
+
+    cdef inline Bits _get_legal_moves_bits(self, str color):
+        if color == 'black':
+            return _get_legal_moves_bits_limb(self._size, self._b, self._w, self._h)
+        return _get_legal_moves_bits_limb(self._size, self._w, self._b, self._h)
+
+    def get_flippable_discs(self, str color, unsigned int x, unsigned int y):
+        cdef:
+            Bits move = _get_put(self._size, x, y)
+        if color == 'black':
+            return _get_coords(self._size, _get_flippable_discs_num_limb(self._size, self._b, self._w, move))
+        return _get_coords(self._size, _get_flippable_discs_num_limb(self._size, self._w, self._b, move))
+
+    def put_disc(self, str color, x, y):
+        cdef:
+            unsigned int size = self._size, flippable_discs_count
+            signed int shift_size
+            Bits put, flippable_discs_num
+        # 配置位置を整数に変換
+        shift_size = <signed int>(size*size-1) - <signed int>(y*size+x)
+        if shift_size < 0 or shift_size > <signed int>(size*size-1):
+            return 0
+
+        put = _get_put(size, x, y)
+
+        # ひっくり返せる石を取得
+        if color == 'black':
+            flippable_discs_num = _get_flippable_discs_num_limb(size, self._b, self._w, put)
+        else:
+            flippable_discs_num = _get_flippable_discs_num_limb(size, self._w, self._b, put)
+        flippable_discs_count = _popcount(flippable_discs_num)
+
+        # 打つ前の状態を格納
+        self.prev += [(self._black_bitboard, self._white_bitboard, self._black_score, self._white_score, self._hash)]
+        self._hash ^= _get_put_hash(color == 'black', shift_size, flippable_discs_num)
+
+        # 自分の石を置いて相手の石をひっくり返す
+        if color == 'black':
+            self._b = _xor(self._b, _or(put, flippable_discs_num))
+            self._w = _xor(self._w, flippable_discs_num)
+            self._black_score += 1 + flippable_discs_count
+            self._white_score -= flippable_discs_count
+        else:
+            self._w = _xor(self._w, _or(put, flippable_discs_num))
+            self._b = _xor(self._b, flippable_discs_num)
+            self._black_score -= flippable_discs_count
+            self._white_score += 1 + flippable_discs_count
+
+        self._flippable_discs_num = _to_int(flippable_discs_num)
+
+        return self._flippable_discs_num
+
+    def update_score(self):
+        self._black_score = _popcount(self._b)
+        self._white_score = _popcount(self._w)
+
+    def get_board_info(self):
+        return _get_board_view(self._size, self._b, self._w).tolist()
+
+    def get_board_view(self):
+        return _get_board_view(self._size, self._b, self._w)
+
+    def get_board_line_info(self, player, black='*', white='O', empty='-'):
+        return get_board_line_info(_get_board_view(self._size, self._b, self._w), player, black, white, empty)
+
+    def get_bit_count(self, bits):
+        return _popcount(_and(_from_int(bits), mask_full[self._size]))
+
+    def get_bitboard_info(self):
+        return _to_int(self._b), _to_int(self._w), _to_int(self._h)
+
+    def undo(self):
+        (self._black_bitboard, self._white_bitboard, self._black_score, self._white_score, self._hash) = self.prev.pop()
+
+    def encode(self, color='black'):
+        return encode_position(self.size, color, *self.get_bitboard_info())
+
+    @classmethod
+    def decode(cls, data):
+        size, color, black, white, hole = decode_position(data)
+        return cls(size, hole=hole, ini_black=black, ini_white=white), color
+
+    def clone(self, with_history=False):
+        cdef:
+            CythonBitBoard256 board = CythonBitBoard256.__new__(CythonBitBoard256)
+        board.size = self.size
+        board._size = self._size
+        board.prev = list(self.prev) if with_history else []
+        board._b = self._b
+        board._w = self._w
+        board._h = self._h
+        board._green_bitboard = self._green_bitboard
+        board._ini_green = self._ini_green
+        board._ini_black = self._ini_black
+        board._ini_white = self._ini_white
+        board._mask = self._mask
+        board._flippable_discs_num = self._flippable_discs_num
+        board._black_score = self._black_score
+        board._white_score = self._white_score
+        board._hash = self._hash
+        return board
+
+    def __deepcopy__(self, memo):
+        return self.clone(with_history=True)
+
+    def snapshot(self):
+        return self._black_bitboard, self._white_bitboard, self._black_score, self._white_score, self._hash, len(self.prev)
+
+    def restore(self, snap):
+        self._black_bitboard, self._white_bitboard, self._black_score, self._white_score, self._hash, prev_len = snap
+        del self.prev[prev_len:]
+
+
+cdef inline Bits _from_int(value):
+    """_from_int
+           整数を64bit単位に分割する
+    """
+    cdef:
+        unsigned int i
+        Bits ret
+    for i in range(MAX_LIMBS):
+        ret.limb[i] = value & 0xFFFFFFFFFFFFFFFF
+        value >>= 64
+    return ret
+
+
+cdef inline _to_int(Bits bits):
+    """_to_int
+           64bit単位の値を整数に戻す
+    """
+    return (<object>bits.limb[3] << 192) | (<object>bits.limb[2] << 128) | (<object>bits.limb[1] << 64) | <object>bits.limb[0]
+
+
+cdef inline Bits _get_put(unsigned int size, unsigned int x, unsigned int y):
+    """_get_put
+           指定座標のビットを返す
+    """
+    cdef:
+        unsigned int i, index = size*size-1-(y*size+x)
+        Bits ret
+    for i in range(MAX_LIMBS):
+        ret.limb[i] = 0
+    ret.limb[index >> 6] = <unsigned long long>1 << (index & 63)
+    return ret
+
+
+cdef inline unsigned int _is_zero(Bits bits):
+    """_is_zero
+    """
+    return not (bits.limb[0] | bits.limb[1] | bits.limb[2] | bits.limb[3])
+
+
+cdef inline unsigned int _is_equal(Bits a, Bits b):
+    """_is_equal
+    """
+    return a.limb[0] == b.limb[0] and a.limb[1] == b.limb[1] and a.limb[2] == b.limb[2] and a.limb[3] == b.limb[3]
+
+
+cdef inline Bits _and(Bits a, Bits b):
+    """_and
+    """
+    cdef:
+        unsigned int i
+    for i in range(MAX_LIMBS):
+        a.limb[i] &= b.limb[i]
+    return a
+
+
+cdef inline Bits _or(Bits a, Bits b):
+    """_or
+    """
+    cdef:
+        unsigned int i
+    for i in range(MAX_LIMBS):
+        a.limb[i] |= b.limb[i]
+    return a
+
+
+cdef inline Bits _xor(Bits a, Bits b):
+    """_xor
+    """
+    cdef:
+        unsigned int i
+    for i in range(MAX_LIMBS):
+        a.limb[i] ^= b.limb[i]
+    return a
+
+
+cdef inline Bits _andnot(Bits a, Bits b):
+    """_andnot
+           a & ~b
+    """
+    cdef:
+        unsigned int i
+    for i in range(MAX_LIMBS):
+        a.limb[i] &= ~b.limb[i]
+    return a
+
+
+cdef inline Bits _shl(Bits a, unsigned int n):
+    """_shl
+           左シフト(1 <= n < 64)
+    """
+    a.limb[3] = (a.limb[3] << n) | (a.limb[2] >> (64 - n))
+    a.limb[2] = (a.limb[2] << n) | (a.limb[1] >> (64 - n))
+    a.limb[1] = (a.limb[1] << n) | (a.limb[0] >> (64 - n))
+    a.limb[0] = a.limb[0] << n
+    return a
+
+
+cdef inline Bits _shr(Bits a, unsigned int n):
+    """_shr
+           右シフト(1 <= n < 64)
+    """
+    a.limb[0] = (a.limb[0] >> n) | (a.limb[1] << (64 - n))
+    a.limb[1] = (a.limb[1] >> n) | (a.limb[2] << (64 - n))
+    a.limb[2] = (a.limb[2] >> n) | (a.limb[3] << (64 - n))
+    a.limb[3] = a.limb[3] >> n
+    return a
+
+
+cdef inline unsigned int _popcount(Bits bits):
+    """_popcount
+    """
+    cdef:
+        unsigned int i, count = 0
+    for i in range(MAX_LIMBS):
+        count += _popcount_64bit(bits.limb[i])
+    return count
+
+
+cdef inline unsigned long long _popcount_64bit(unsigned long long bits):
+    """_popcount_64bit
+    """
+    bits = bits - ((bits >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
+    bits = (bits & <unsigned long long>0x3333333333333333) + ((bits >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
+    bits = (bits + (bits >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
+    bits = bits + (bits >> <unsigned int>8)
+    bits = bits + (bits >> <unsigned int>16)
+    return (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
+
+
+cdef inline _get_coords(unsigned int size, Bits bits):
+    """_get_coords
+           立っているビットの座標を左上から順に返す(立っているビットの数だけ処理する)
+    """
+    cdef:
+        unsigned long long limb, lowest
+        unsigned int i, index, count = _popcount(bits), last = size * size - 1
+    ret = [None] * count
+    for i in range(MAX_LIMBS):
+        limb = bits.limb[i]
+        while limb:
+            lowest = limb & (~limb + 1)  # 下位ビットから取り出し、後ろから格納する
+            index = last - (i * 64 + <unsigned int>_popcount_64bit(lowest - 1))
+            count -= 1
+            ret[count] = (index % size, index // size)
+            limb ^= lowest
+    return ret
+
+
+cdef inline _get_board_view(unsigned int size, Bits b, Bits w):
+    """_get_board_view
+           ボードの情報を(size, size)のint8のmemoryviewで返す(石の数だけ処理する)
+    """
+    cdef:
+        unsigned long long limb, lowest
+        unsigned int i, last = size * size - 1
+        unsigned char* p
+    buf = bytearray(size * size)
+    p = buf
+    for i in range(MAX_LIMBS):
+        limb = b.limb[i]
+        while limb:
+            lowest = limb & (~limb + 1)
+            p[last - (i * 64 + <unsigned int>_popcount_64bit(lowest - 1))] = 0x01
+            limb ^= lowest
+        limb = w.limb[i]
+        while limb:
+            lowest = limb & (~limb + 1)
+            p[last - (i * 64 + <unsigned int>_popcount_64bit(lowest - 1))] = 0xFF
+            limb ^= lowest
+    return memoryview(buf).cast('b', (size, size))
+
+
+cdef inline Bits _get_legal_moves_bits_limb(unsigned int size, Bits player, Bits opponent, Bits hole):
+    """_get_legal_moves_bits_limb
+    """
+    cdef:
+        unsigned int i, j, shift_size
+        Bits blank, masked, tmp, prev, legal_moves
+    blank = _andnot(mask_full[size], _or(_or(player, opponent), hole))
+    for i in range(MAX_LIMBS):
+        legal_moves.limb[i] = 0
+    for i in range(4):
+        masked = _and(opponent, mask_line[size][i])
+        shift_size = shift_line[size][i]
+        tmp = _and(masked, _or(_shl(player, shift_size), _shr(player, shift_size)))
+        for j in range(size-3):
+            prev = tmp
+            tmp = _or(tmp, _and(masked, _or(_shl(tmp, shift_size), _shr(tmp, shift_size))))
+            if _is_equal(tmp, prev):
+                break
+        legal_moves = _or(legal_moves, _or(_shl(tmp, shift_size), _shr(tmp, shift_size)))
+    return _and(blank, legal_moves)
+
+
+cdef inline Bits _get_flippable_discs_num_limb(unsigned int size, Bits player, Bits opponent, Bits move):
+    """_get_flippable_discs_num_limb
+    """
+    cdef:
+        unsigned int i, j
+        Bits tmp, check, flippable_discs_num
+    for j in range(MAX_LIMBS):
+        flippable_discs_num.limb[j] = 0
+    for i in range(8):
+        for j in range(MAX_LIMBS):
+            tmp.limb[j] = 0
+        if i < 4:
+            check = _and(_shl(move, shift_dir[size][i]), mask_dir[size][i])
+            while not _is_zero(_and(check, opponent)):
+                tmp = _or(tmp, check)
+                check = _and(_shl(check, shift_dir[size][i]), mask_dir[size][i])
+        else:
+            check = _and(_shr(move, shift_dir[size][i]), mask_dir[size][i])
+            while not _is_zero(_and(check, opponent)):
+                tmp = _or(tmp, check)
+                check = _and(_shr(check, shift_dir[size][i]), mask_dir[size][i])
+        if not _is_zero(_and(check, player)):
+            flippable_discs_num = _or(flippable_discs_num, tmp)
+    return flippable_discs_num
+
+
+cdef inline unsigned long long _get_put_hash(unsigned int color, unsigned int index, Bits flippable_discs_num):
+    """_get_put_hash
+    """
+    cdef:
+        unsigned long long key, bits, lowest
+        unsigned int i
+    key = zobrist_black[index] if color else zobrist_white[index]
+    for i in range(MAX_LIMBS):
+        bits = flippable_discs_num.limb[i]
+        while bits:
+            lowest = bits & (~bits + 1)
+            index = (i << 6) + <unsigned int>_popcount_64bit(lowest - 1)
+            key ^= zobrist_black[index] ^ zobrist_white[index]
+            bits ^= lowest
+    return key
@@ -2,21 +2,81 @@
 """CyBoard8_64bit
 """
 
-from collections import namedtuple
+from reversi.BitBoardMethods.BitMask import get_bit_mask
+from reversi.BitBoardMethods.BoardView import get_board_line_info
+from reversi.BitBoardMethods.Codec import encode_position, decode_position
+from reversi.BitBoardMethods.Zobrist import ZOBRIST_BLACK, ZOBRIST_WHITE, get_hash
 
 MIN_BOARD_SIZE = 4
 MAX_BOARD_SIZE = 26
+SIZE_64BIT = (4, 6, 8)  # 64bitに収まるボードサイズ
+
+
+cdef enum:
+    MAX_HISTORY = 128  # 履歴の最大数
+
+
+cdef:
+    unsigned long long[64] zobrist_black
+    unsigned long long[64] zobrist_white
+    unsigned long long[9] mask_h       # 水平方向のマスク値(サイズ毎)
+    unsigned long long[9] mask_v       # 垂直方向のマスク値(サイズ毎)
+    unsigned long long[9] mask_d       # 斜め方向のマスク値(サイズ毎)
+    unsigned long long[9][8] mask_dir  # 上,右上,左,左上(左シフト),右,右下,下,左下(右シフト)のマスク値(サイズ毎)
+    unsigned int[9][8] shift_dir       # 上記8方向のシフト量(サイズ毎)
+
+
+cdef inline void _init_zobrist():
+    """_init_zobrist
+    """
+    global zobrist_black, zobrist_white
+    cdef:
+        unsigned int i
+    for i in range(64):
+        zobrist_black[i] = ZOBRIST_BLACK[i]
+        zobrist_white[i] = ZOBRIST_WHITE[i]
+
+
+_init_zobrist()
+
+
+cdef inline void _init_geometry():
+    """_init_geometry
+           サイズ4,6のマスク値とシフト量を設定する(サイズ8は定数を使用)
+    """
+    global mask_h, mask_v, mask_d, mask_dir, shift_dir
+    cdef:
+        unsigned int size, i
+    for size in (4, 6):
+        mask = get_bit_mask(size)
+        mask_h[size] = mask.h
+        mask_v[size] = mask.v
+        mask_d[size] = mask.d
+        for i, (direction_mask, shift_size) in enumerate(((mask.u, size), (mask.ur, size-1), (mask.l, 1), (mask.ul, size+1), (mask.r, 1), (mask.br, size+1), (mask.b, size), (mask.bl, size-1))):
+            mask_dir[size][i] = direction_mask
+            shift_dir[size][i] = shift_size
+
+
+_init_geometry()
 
 
 cdef class CythonBitBoard():
     """Cython BitBoard
     """
     cdef readonly size
-    cdef public _black_score, _white_score, prev, _green_bitboard, _black_bitboard, _white_bitboard, _hole_bitboard, _ini_green, _ini_black, _ini_white, _mask, _flippable_discs_num
-
-    def __init__(self, hole=0x0, ini_black=None, ini_white=None):
-        self.size = 8
-        self.prev = []
+    cdef unsigned int _size
+    cdef unsigned long long[MAX_HISTORY] _prev_b, _prev_w, _prev_hash  # 打つ前の状態の履歴(固定長のC配列)
+    cdef unsigned int[MAX_HISTORY] _prev_bs, _prev_ws
+    cdef unsigned int _prev_len
+    cdef public _black_score, _white_score, _hash, _green_bitboard, _black_bitboard, _white_bitboard, _hole_bitboard, _ini_green, _ini_black, _ini_white, _mask, _flippable_discs_num
+
+    def __init__(self, size=8, hole=0x0, ini_black=None, ini_white=None):
+        if size not in SIZE_64BIT:
+            raise ValueError(str(size) + ' is not supported!')
+
+        self.size = size
+        self._size = size
+        self._prev_len = 0
         self._green_bitboard = 0
         self._black_bitboard = 0
         self._white_bitboard = 0
@@ -42,36 +102,39 @@ cdef class CythonBitBoard():
         self._hole_bitboard = hole
 
         # 置ける場所の検出用マスク
-        BitMask = namedtuple('BitMask', 'h v d u ur r br b bl l ul')
-        self._mask = BitMask(
-            int(''.join((['0'] + ['1'] * (size-2) + ['0']) * size), 2),                                      # 水平方向のマスク値
-            int(''.join(['0'] * size + ['1'] * size * (size-2) + ['0'] * size), 2),                          # 垂直方向のマスク値
-            int(''.join(['0'] * size + (['0'] + (['1'] * (size-2)) + ['0']) * (size-2) + ['0'] * size), 2),  # 斜め方向のマスク値
-            int(''.join(['1'] * size * (size-1) + ['0'] * size), 2),                                         # 上方向のマスク値
-            int(''.join((['0'] + ['1'] * (size-1)) * (size-1) + ['0'] * size), 2),                           # 右上方向のマスク値
-            int(''.join((['0'] + ['1'] * (size-1)) * size), 2),                                              # 右方向のマスク値
-            int(''.join(['0'] * size + (['0'] + ['1'] * (size-1)) * (size-1)), 2),                           # 右下方向のマスク値
-            int(''.join(['0'] * size + ['1'] * size * (size-1)), 2),                                         # 下方向のマスク値
-            int(''.join(['0'] * size + (['1'] * (size-1) + ['0']) * (size-1)), 2),                           # 左下方向のマスク値
-            int(''.join((['1'] * (size-1) + ['0']) * size), 2),                                              # 左方向のマスク値
-            int(''.join((['1'] * (size-1) + ['0']) * (size-1) + ['0'] * size), 2)                            # 左上方向のマスク値
-        )
-
-        # 穴をあける
-        self._green_bitboard &= ~self._hole_bitboard
-        self._black_bitboard &= ~self._hole_bitboard
-        self._white_bitboard &= ~self._hole_bitboard
+        self._mask = get_bit_mask(size)
+
+        # 穴をあける(サイズ8のみ)
+        if size == 8:
+            self._green_bitboard &= ~self._hole_bitboard
+            self._black_bitboard &= ~self._hole_bitboard
+            self._white_bitboard &= ~self._hole_bitboard
         self.update_score()
+        self._hash = get_hash(self._black_bitboard, self._white_bitboard, self._hole_bitboard)
+
+    @property
+    def hash(self):
+        return self._hash
+
+    @property
+    def prev(self):
+        """prev
+               履歴を(黒, 白, 黒の数, 白の数, ハッシュ値)のリストで返す(読み取り専用)
+        """
+        cdef:
+            unsigned int i
+        return [(self._prev_b[i], self._prev_w[i], self._prev_bs[i], self._prev_ws[i], self._prev_hash[i]) for i in range(self._prev_len)]
 
     def _is_invalid_size(self, size):
         return not(MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE and size % 2 == 0)
 
     def __str__(self):
-        header = '   ' + ' '.join([chr(97 + i) for i in range(8)]) + '\n'
-        board = [['□' for _ in range(8)] for _ in range(8)]
-        mask = 1 << 63
-        for y in range(8):
-            for x in range(8):
+        size = self.size
+        header = '   ' + ' '.join([chr(97 + i) for i in range(size)]) + '\n'
+        board = [['□' for _ in range(size)] for _ in range(size)]
+        mask = 1 << (size * size - 1)
+        for y in range(size):
+            for x in range(size):
                 if self._hole_bitboard & mask:
                     board[y][x] = '　'
                 elif self._black_bitboard & mask:
@@ -89,53 +152,39 @@ cdef class CythonBitBoard():
         return header + body
 
     def get_legal_moves(self, str color):
-        return _get_legal_moves_size8_64bit(color, self._black_bitboard, self._white_bitboard, self._hole_bitboard)
+        if self._size == 8:
+            return _get_legal_moves_size8_64bit(color, self._black_bitboard, self._white_bitboard, self._hole_bitboard)
+        return _get_legal_moves_n(self._size, color, self._black_bitboard, self._white_bitboard, self._hole_bitboard)
 
     def get_legal_moves_bits(self, str color):
-        return _get_legal_moves_bits_size8_64bit(color, self._black_bitboard, self._white_bitboard, self._hole_bitboard)
+        if self._size == 8:
+            return _get_legal_moves_bits_size8_64bit(color, self._black_bitboard, self._white_bitboard, self._hole_bitboard)
+        return _get_legal_moves_bits_n(self._size, color, self._black_bitboard, self._white_bitboard, self._hole_bitboard)
 
     def get_flippable_discs(self, str color, x, y):
-        return _get_flippable_discs_size8_64bit(color == 'black', self._black_bitboard, self._white_bitboard, x, y)
+        if self._size == 8:
+            return _get_flippable_discs_size8_64bit(color == 'black', self._black_bitboard, self._white_bitboard, x, y)
+        return _get_flippable_discs_n(self._size, color == 'black', self._black_bitboard, self._white_bitboard, x, y)
 
     def put_disc(self, str color, x, y):
-        return _put_disc_size8_64bit(self, color == 'black', x, y)
+        if self._prev_len >= MAX_HISTORY:
+            raise IndexError('history is full')
+        return _put_disc_size8_64bit(self, self._size, color == 'black', x, y)
 
     def update_score(self):
-        self._black_score, self._white_score = 0, 0
-        mask = 1 << 63
-        for y in range(8):
-            for x in range(8):
-                if self._black_bitboard & mask:
-                    self._black_score += 1
-                elif self._white_bitboard & mask:
-                    self._white_score += 1
-                mask >>= 1
+        self._black_score = _popcount_size8_64bit(self._black_bitboard)
+        self._white_score = _popcount_size8_64bit(self._white_bitboard)
 
     def get_board_info(self):
-        return _get_board_info_size8_64bit(self._black_bitboard, self._white_bitboard)
+        if self._size == 8:
+            return _get_board_info_size8_64bit(self._black_bitboard, self._white_bitboard)
+        return _get_board_view(self._size, self._black_bitboard, self._white_bitboard).tolist()
+
+    def get_board_view(self):
+        return _get_board_view(self._size, self._black_bitboard, self._white_bitboard)
 
     def get_board_line_info(self, player, black='*', white='O', empty='-'):
-        board_line_info = ''
-        # board
-        size = self.size
-        mask = 1 << (size * size - 1)
-        for y in range(size):
-            for x in range(size):
-                if self._black_bitboard & mask:
-                    board_line_info += black
-                elif self._white_bitboard & mask:
-                    board_line_info += white
-                else:
-                    board_line_info += empty
-                mask >>= 1
-        # player
-        if player == 'black':
-            board_line_info += black
-        elif player == 'white':
-            board_line_info += white
-        else:
-            board_line_info += empty
-        return board_line_info
+        return get_board_line_info(_get_board_view(self._size, self._black_bitboard, self._white_bitboard), player, black, white, empty)
 
     def get_bit_count(self, bits):
         return _popcount_size8_64bit(bits)
@@ -144,27 +193,67 @@ cdef class CythonBitBoard():
         return self._black_bitboard, self._white_bitboard, self._hole_bitboard
 
     def undo(self):
-        (self._black_bitboard, self._white_bitboard, self._black_score, self._white_score) = self.prev.pop()
+        cdef:
+            unsigned int i
+        if not self._prev_len:
+            raise IndexError('pop from empty history')
+        self._prev_len -= 1
+        i = self._prev_len
+        (self._black_bitboard, self._white_bitboard, self._black_score, self._white_score, self._hash) = (self._prev_b[i], self._prev_w[i], self._prev_bs[i], self._prev_ws[i], self._prev_hash[i])
+
+    def encode(self, color='black'):
+        return encode_position(self.size, color, *self.get_bitboard_info())
+
+    @classmethod
+    def decode(cls, data):
+        size, color, black, white, hole = decode_position(data)
+        return cls(size, hole=hole, ini_black=black, ini_white=white), color
+
+    def clone(self, with_history=False):
+        cdef:
+            CythonBitBoard board = CythonBitBoard.__new__(CythonBitBoard)
+            unsigned int i
+        board.size = self.size
+        board._size = self._size
+        board._prev_len = 0
+        if with_history:
+            for i in range(self._prev_len):
+                board._prev_b[i] = self._prev_b[i]
+                board._prev_w[i] = self._prev_w[i]
+                board._prev_bs[i] = self._prev_bs[i]
+                board._prev_ws[i] = self._prev_ws[i]
+                board._prev_hash[i] = self._prev_hash[i]
+            board._prev_len = self._prev_len
+        board._green_bitboard = self._green_bitboard
+        board._black_bitboard = self._black_bitboard
+        board._white_bitboard = self._white_bitboard
+        board._hole_bitboard = self._hole_bitboard
+        board._ini_green = self._ini_green
+        board._ini_black = self._ini_black
+        board._ini_white = self._ini_white
+        board._mask = self._mask
+        board._flippable_discs_num = self._flippable_discs_num
+        board._black_score = self._black_score
+        board._white_score = self._white_score
+        board._hash = self._hash
+        return board
+
+    def snapshot(self):
+        return self._black_bitboard, self._white_bitboard, self._black_score, self._white_score, self._hash, self._prev_len
+
+    def restore(self, snap):
+        self._black_bitboard, self._white_bitboard, self._black_score, self._white_score, self._hash, prev_len = snap
+        if prev_len < self._prev_len:
+            self._prev_len = prev_len
+
+    def __deepcopy__(self, memo):
+        return self.clone(with_history=True)
 
 
 cdef inline _get_legal_moves_size8_64bit(str color, unsigned long long b, unsigned long long w, unsigned long long h):
     """_get_legal_moves_size8_64bit
     """
-    cdef:
-        unsigned long long legal_moves
-    legal_moves = _get_legal_moves_bits_size8_64bit(color, b, w, h)
-
-    ret = []
-    cdef:
-        unsigned int x, y
-        unsigned long long mask = 0x8000000000000000
-    for y in range(8):
-        for x in range(8):
-            if legal_moves & mask:
-                ret += [(x, y)]
-            mask >>= 1
-
-    return ret
+    return _get_coords(8, _get_legal_moves_bits_size8_64bit(color, b, w, h))
 
 
 cdef inline unsigned long long _get_legal_moves_bits_size8_64bit(str color, unsigned long long b, unsigned long long w, unsigned long long h):
@@ -227,20 +316,12 @@ cdef inline _get_flippable_discs_size8_64bit(unsigned int color, unsigned long l
     """
     cdef:
         unsigned long long move = <unsigned long long>1 << (63-(y*8+x))
-        unsigned long long flippable_discs = 0
-        unsigned long long mask = 0x8000000000000000
-    ret = []
-    flippable_discs = _get_flippable_discs_num_size8_64bit(color, black_bitboard, white_bitboard, move)
-    for y in range(8):
-        for x in range(8):
-            if flippable_discs & mask:
-                ret += [(x, y)]
-            mask >>= 1
-    return ret
+    return _get_coords(8, _get_flippable_discs_num_size8_64bit(color, black_bitboard, white_bitboard, move))
 
 
-cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color, unsigned int x, unsigned int y):
+cdef inline unsigned long long _put_disc_size8_64bit(CythonBitBoard board, unsigned int size, unsigned int color, unsigned int x, unsigned int y):
     """_put_disc_size8_64bit
+           サイズ4,6も同じ処理で石を置く
     """
     cdef:
         unsigned long long put, black_bitboard, white_bitboard, flippable_discs_num, flippable_discs_count
@@ -248,8 +329,8 @@ cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color,
         signed int shift_size
 
     # 配置位置を整数に変換
-    shift_size = (63-(y*8+x))
-    if shift_size < 0 or shift_size > 63:
+    shift_size = <signed int>(size*size-1) - <signed int>(y*size+x)
+    if shift_size < 0 or shift_size > <signed int>(size*size-1):
         return <unsigned long long>0
 
     put = <unsigned long long>1 << shift_size
@@ -259,11 +340,20 @@ cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color,
     white_bitboard = board._white_bitboard
     black_score = board._black_score
     white_score = board._white_score
-    flippable_discs_num = _get_flippable_discs_num_size8_64bit(color, black_bitboard, white_bitboard, put)
+    if size == 8:
+        flippable_discs_num = _get_flippable_discs_num_size8_64bit(color, black_bitboard, white_bitboard, put)
+    else:
+        flippable_discs_num = _get_flippable_discs_num_n(size, color, black_bitboard, white_bitboard, put)
     flippable_discs_count = _popcount_size8_64bit(flippable_discs_num)
 
     # 打つ前の状態を格納
-    board.prev += [(black_bitboard, white_bitboard, black_score, white_score)]
+    board._prev_b[board._prev_len] = black_bitboard
+    board._prev_w[board._prev_len] = white_bitboard
+    board._prev_bs[board._prev_len] = black_score
+    board._prev_ws[board._prev_len] = white_score
+    board._prev_hash[board._prev_len] = board._hash
+    board._prev_len += 1
+    board._hash ^= _get_put_hash_size8_64bit(color, put, flippable_discs_num)
 
     # 自分の石を置いて相手の石をひっくり返す
     if color:
@@ -348,6 +438,142 @@ cdef inline unsigned long long _get_flippable_discs_num_size8_64bit(unsigned int
     return flippable_discs_num
 
 
+cdef inline _get_legal_moves_n(unsigned int size, str color, unsigned long long b, unsigned long long w, unsigned long long h):
+    """_get_legal_moves_n
+           サイズ4,6の合法手の座標
+    """
+    return _get_coords(size, _get_legal_moves_bits_n(size, color, b, w, h))
+
+
+cdef inline unsigned long long _get_legal_moves_bits_n(unsigned int size, str color, unsigned long long b, unsigned long long w, unsigned long long h):
+    """_get_legal_moves_bits_n
+           サイズ4,6の合法手
+    """
+    cdef:
+        unsigned long long player, opponent
+
+    if color == 'black':
+        player = b
+        opponent = w
+    else:
+        player = w
+        opponent = b
+
+    cdef:
+        unsigned int i
+        unsigned long long blank = ~(player | opponent | h)
+        unsigned long long horizontal = opponent & mask_h[size]  # horizontal mask value
+        unsigned long long vertical = opponent & mask_v[size]    # vertical mask value
+        unsigned long long diagonal = opponent & mask_d[size]    # diagonal mask value
+        unsigned long long tmp_h, tmp_v, tmp_d1, tmp_d2
+
+    tmp_h = horizontal & ((player << 1) | (player >> 1))
+    tmp_v = vertical & ((player << size) | (player >> size))
+    tmp_d1 = diagonal & ((player << (size+1)) | (player >> (size+1)))
+    tmp_d2 = diagonal & ((player << (size-1)) | (player >> (size-1)))
+    for i in range(size-3):
+        tmp_h |= horizontal & ((tmp_h << 1) | (tmp_h >> 1))
+        tmp_v |= vertical & ((tmp_v << size) | (tmp_v >> size))
+        tmp_d1 |= diagonal & ((tmp_d1 << (size+1)) | (tmp_d1 >> (size+1)))
+        tmp_d2 |= diagonal & ((tmp_d2 << (size-1)) | (tmp_d2 >> (size-1)))
+
+    return blank & ((tmp_h << 1) | (tmp_h >> 1) | (tmp_v << size) | (tmp_v >> size) | (tmp_d1 << (size+1)) | (tmp_d1 >> (size+1)) | (tmp_d2 << (size-1)) | (tmp_d2 >> (size-1)))
+
+
+cdef inline _get_flippable_discs_n(unsigned int size, unsigned int color, unsigned long long black_bitboard, unsigned long long white_bitboard, unsigned int x, unsigned int y):
+    """_get_flippable_discs_n
+           サイズ4,6のひっくり返せる石の座標
+    """
+    cdef:
+        unsigned long long move = <unsigned long long>1 << (size*size-1-(y*size+x))
+    return _get_coords(size, _get_flippable_discs_num_n(size, color, black_bitboard, white_bitboard, move))
+
+
+cdef inline unsigned long long _get_flippable_discs_num_n(unsigned int size, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long move):
+    """_get_flippable_discs_num_n
+           サイズ4,6のひっくり返せる石
+    """
+    cdef:
+        unsigned int i
+        unsigned long long tmp, check
+        unsigned long long player = w, opponent = b, flippable_discs_num = 0
+    if int_color:
+        player = b
+        opponent = w
+    for i in range(8):
+        tmp = 0
+        check = _get_next_put_n(size, move, i)
+        while check & opponent:
+            tmp |= check
+            check = _get_next_put_n(size, check, i)
+        if check & player:
+            flippable_discs_num |= tmp
+    return flippable_discs_num
+
+
+cdef inline unsigned long long _get_next_put_n(unsigned int size, unsigned long long put, unsigned int direction):
+    """_get_next_put_n
+           指定位置から指定方向に1マス分移動した場所を返す(サイズ4,6)
+    """
+    if direction < 4:
+        return (put << shift_dir[size][direction]) & mask_dir[size][direction]
+    return (put >> shift_dir[size][direction]) & mask_dir[size][direction]
+
+
+cdef inline _get_board_view(unsigned int size, unsigned long long b, unsigned long long w):
+    """_get_board_view
+           ボードの情報を(size, size)のint8のmemoryviewで返す(石の数だけ処理する)
+    """
+    cdef:
+        unsigned long long lowest
+        unsigned int last = size * size - 1
+        unsigned char* p
+    buf = bytearray(size * size)
+    p = buf
+    while b:
+        lowest = b & (~b + 1)
+        p[last - <unsigned int>_popcount_size8_64bit(lowest - 1)] = 0x01
+        b ^= lowest
+    while w:
+        lowest = w & (~w + 1)
+        p[last - <unsigned int>_popcount_size8_64bit(lowest - 1)] = 0xFF
+        w ^= lowest
+    return memoryview(buf).cast('b', (size, size))
+
+
+cdef inline unsigned long long _get_put_hash_size8_64bit(unsigned int color, unsigned long long put, unsigned long long flippable_discs_num):
+    """_get_put_hash_size8_64bit
+    """
+    cdef:
+        unsigned long long key, lowest
+        unsigned int index
+    index = <unsigned int>_popcount_size8_64bit(put - 1)
+    key = zobrist_black[index] if color else zobrist_white[index]
+    while flippable_discs_num:
+        lowest = flippable_discs_num & (~flippable_discs_num + 1)
+        index = <unsigned int>_popcount_size8_64bit(lowest - 1)
+        key ^= zobrist_black[index] ^ zobrist_white[index]
+        flippable_discs_num ^= lowest
+    return key
+
+
+cdef inline _get_coords(unsigned int size, unsigned long long bits):
+    """_get_coords
+           立っているビットの座標を左上から順に返す(立っているビットの数だけ処理する)
+    """
+    cdef:
+        unsigned long long lowest
+        unsigned int index, i = <unsigned int>_popcount_size8_64bit(bits), last = size * size - 1
+    ret = [None] * i
+    while bits:
+        lowest = bits & (~bits + 1)  # 下位ビットから取り出し、後ろから格納する
+        index = last - <unsigned int>_popcount_size8_64bit(lowest - 1)
+        i -= 1
+        ret[i] = (index % size, index // size)
+        bits ^= lowest
+    return ret
+
+
 cdef inline unsigned long long _popcount_size8_64bit(unsigned long long bits):
     """_popcount_size8_64bit
     """
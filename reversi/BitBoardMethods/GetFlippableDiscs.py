@@ -1,41 +1,48 @@
 """GetFlippableDiscs.py
 """
 
+from reversi.BitBoardMethods.Bits import bits_to_coords
+
 
 def get_flippable_discs(color, size, black_bitboard, white_bitboard, x, y, mask):
     """
     指定座標のひっくり返せる石の場所をすべて返す
     """
-    ret = []
+    return bits_to_coords(size, get_flippable_discs_num(color, size, black_bitboard, white_bitboard, x, y, mask))
+
+
+def get_flippable_discs_num(color, size, black_bitboard, white_bitboard, x, y, mask):
+    """
+    指定座標のひっくり返せる石の場所をビットで返す
+    """
     reversibles = 0
     player, opponent = (black_bitboard, white_bitboard) if color == 'black' else (white_bitboard, black_bitboard)
 
     # 石を置く場所
     put = 1 << ((size*size-1)-(y*size+x))
 
-    # 8方向を順番にチェック
-    for direction in ('U', 'UR', 'R', 'BR', 'B', 'BL', 'L', 'UL'):
-        tmp = 0
-        check = get_next_put(size, put, direction, mask)
+    # 水平,垂直,斜め2方向の左右両シフトをKogge-Stone法でチェック
+    for direction_mask, shifts in mask.fill:
+        propagator = opponent & direction_mask & ~put
 
-        # 相手の石が存在する限り位置を記憶
-        while check & opponent:
-            tmp |= check
-            check = get_next_put(size, check, direction, mask)
+        # 置いた場所から連続する相手の石
+        lshift_generator, rshift_generator = put, put
+        lshift_propagator, rshift_propagator = propagator, propagator
+        for shift_size in shifts:
+            lshift_generator |= lshift_propagator & (lshift_generator << shift_size)
+            rshift_generator |= rshift_propagator & (rshift_generator >> shift_size)
+            lshift_propagator &= lshift_propagator << shift_size
+            rshift_propagator &= rshift_propagator >> shift_size
+        lshift_generator &= propagator
+        rshift_generator &= propagator
 
         # 自分の石で囲まれている場合は結果を格納する
-        if check & player:
-            reversibles |= tmp
-
-    # 配列に変換
-    check = 1 << (size*size-1)
-    for y in range(size):
-        for x in range(size):
-            if reversibles & check:
-                ret += [(x, y)]
-            check >>= 1
-
-    return ret
+        if (lshift_generator << shifts[0]) & player:
+            reversibles |= lshift_generator
+        if (rshift_generator >> shifts[0]) & player:
+            reversibles |= rshift_generator
+
+    return reversibles
 
 
 def get_next_put(size, put, direction, mask):
@@ -4,6 +4,8 @@
 
 import sys
 
+from reversi.BitBoardMethods.Bits import bits_to_coords
+
 
 MAXSIZE64 = 2**63 - 1
 
@@ -20,6 +22,13 @@ def get_flippable_discs(color, size, black_bitboard, white_bitboard, x, y, mask)
     return _get_flippable_discs(color, size, black_bitboard, white_bitboard, x, y, mask)
 
 
+def get_flippable_discs_num(color, size, black_bitboard, white_bitboard, x, y, mask):
+    """get_flippable_discs_num
+           return flippable discs bits
+    """
+    return _get_flippable_discs_num(color, size, black_bitboard, white_bitboard, x, y, mask)
+
+
 cdef inline _get_flippable_discs_size8_64bit(color, unsigned long long black_bitboard, unsigned long long white_bitboard, unsigned int x, unsigned int y):
     """_get_flippable_discs_size8_64bit
     """
@@ -55,16 +64,7 @@ cdef inline _get_flippable_discs_size8_64bit(color, unsigned long long black_bit
             flippable_discs |= buff
 
     # prepare result
-    cdef:
-        unsigned long long mask = 0x8000000000000000
-    ret = []
-    for y in range(8):
-        for x in range(8):
-            if flippable_discs & mask:
-                ret += [(x, y)]
-            mask >>= 1
-
-    return ret
+    return bits_to_coords(8, flippable_discs)
 
 
 cdef inline unsigned long long _get_next_put_size8_64bit(unsigned long long put, unsigned int direction):
@@ -200,57 +200,37 @@ cdef _get_next_put_size8(unsigned int put0, unsigned int put1, unsigned int dire
 cdef _get_flippable_discs(color, size, black_bitboard, white_bitboard, x, y, mask):
     """_get_flippable_discs
     """
-    ret = []
+    return bits_to_coords(size, _get_flippable_discs_num(color, size, black_bitboard, white_bitboard, x, y, mask))
+
+
+cdef _get_flippable_discs_num(color, size, black_bitboard, white_bitboard, x, y, mask):
+    """_get_flippable_discs_num
+    """
     flippable_discs = 0
     player, opponent = (black_bitboard, white_bitboard) if color == 'black' else (white_bitboard, black_bitboard)
 
     # 石を置く場所
     put = 1 << ((size*size-1)-(y*size+x))
 
-    # 8方向を順番にチェック
-    for direction in ('U', 'UR', 'R', 'BR', 'B', 'BL', 'L', 'UL'):
-        tmp = 0
-        check = _get_next_put(size, put, direction, mask)
-
-        # 相手の石が存在する限り位置を記憶
-        while check & opponent:
-            tmp |= check
-            check = _get_next_put(size, check, direction, mask)
+    # 水平,垂直,斜め2方向の左右両シフトをKogge-Stone法でチェック
+    for direction_mask, shifts in mask.fill:
+        propagator = opponent & direction_mask & ~put
+
+        # 置いた場所から連続する相手の石
+        lshift_generator, rshift_generator = put, put
+        lshift_propagator, rshift_propagator = propagator, propagator
+        for shift_size in shifts:
+            lshift_generator |= lshift_propagator & (lshift_generator << shift_size)
+            rshift_generator |= rshift_propagator & (rshift_generator >> shift_size)
+            lshift_propagator &= lshift_propagator << shift_size
+            rshift_propagator &= rshift_propagator >> shift_size
+        lshift_generator &= propagator
+        rshift_generator &= propagator
 
         # 自分の石で囲まれている場合は結果を格納する
-        if check & player:
-            flippable_discs |= tmp
-
-    # 配列に変換
-    check = 1 << (size*size-1)
-    for y in range(size):
-        for x in range(size):
-            if flippable_discs & check:
-                ret += [(x, y)]
-            check >>= 1
+        if (lshift_generator << shifts[0]) & player:
+            flippable_discs |= lshift_generator
+        if (rshift_generator >> shifts[0]) & player:
+            flippable_discs |= rshift_generator
 
-    return ret
-
-
-cdef _get_next_put(size, put, direction, mask):
-    """_get_next_put
-           指定位置から指定方向に1マス分移動した場所を返す(ボードサイズ8以外)
-    """
-    if direction == 'U':     # 上
-        return (put << size) & mask.u
-    elif direction == 'UR':  # 右上
-        return (put << (size-1)) & mask.ur
-    elif direction == 'R':   # 右
-        return (put >> 1) & mask.r
-    elif direction == 'BR':  # 右下
-        return (put >> (size+1)) & mask.br
-    elif direction == 'B':   # 下
-        return (put >> size) & mask.b
-    elif direction == 'BL':  # 左下
-        return (put >> (size-1)) & mask.bl
-    elif direction == 'L':   # 左
-        return (put << 1) & mask.l
-    elif direction == 'UL':  # 左上
-        return (put << (size+1)) & mask.ul
-    else:
-        return 0
+    return flippable_discs
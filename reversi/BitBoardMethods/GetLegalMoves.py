@@ -1,6 +1,8 @@
 """GetLegalMoves.py
 """
 
+from reversi.BitBoardMethods.Bits import popcount, bits_to_coords
+
 
 def get_legal_moves(color, size, b, w, h, mask):
     """
@@ -9,16 +11,7 @@ def get_legal_moves(color, size, b, w, h, mask):
     legal_moves_bits = get_legal_moves_bits(color, size, b, w, h, mask)
 
     # 石が置ける場所を格納
-    ret = []
-    check = 1 << (size * size - 1)
-    for y in range(size):
-        for x in range(size):
-            # 石が置ける場合
-            if legal_moves_bits & check:
-                ret += [(x, y)]
-            check >>= 1
-
-    return ret
+    return bits_to_coords(size, legal_moves_bits)
 
 
 def get_legal_moves_bits(color, size, b, w, h, mask):
@@ -28,58 +21,24 @@ def get_legal_moves_bits(color, size, b, w, h, mask):
     # 前準備
     player, opponent = (b, w) if color == 'black' else (w, b)  # プレイヤーと相手を決定
     legal_moves_bits = 0                                       # 石が置ける場所
-    horizontal = opponent & mask.h                             # 水平方向のチェック値
-    vertical = opponent & mask.v                               # 垂直方向のチェック値
-    diagonal = opponent & mask.d                               # 斜め方向のチェック値
-    blank = ~(player | opponent)                               # 空きマス位置
-
-    # 置ける場所を探す
-    legal_moves_bits |= get_legal_moves_lshift(size, horizontal, player, blank, 1)     # 左方向
-    legal_moves_bits |= get_legal_moves_rshift(size, horizontal, player, blank, 1)     # 右方向
-    legal_moves_bits |= get_legal_moves_lshift(size, vertical, player, blank, size)    # 上方向
-    legal_moves_bits |= get_legal_moves_rshift(size, vertical, player, blank, size)    # 下方向
-    legal_moves_bits |= get_legal_moves_lshift(size, diagonal, player, blank, size+1)  # 左斜め上方向
-    legal_moves_bits |= get_legal_moves_lshift(size, diagonal, player, blank, size-1)  # 右斜め上方向
-    legal_moves_bits |= get_legal_moves_rshift(size, diagonal, player, blank, size-1)  # 左斜め下方向
-    legal_moves_bits |= get_legal_moves_rshift(size, diagonal, player, blank, size+1)  # 右斜め下方向
-
-    # 穴抜き
-    legal_moves_bits &= ~h
-
-    return legal_moves_bits
-
-
-def get_legal_moves_lshift(size, mask, player, blank, shift_size):
-    """
-    左シフトで石が置ける場所を取得
-    """
-    tmp = mask & (player << shift_size)
-    for _ in range(size-3):
-        tmp |= mask & (tmp << shift_size)
 
-    return blank & (tmp << shift_size)
+    # 置ける場所を探す(水平,垂直,斜め2方向について左右両シフトをKogge-Stone法で求める)
+    for direction_mask, shifts in mask.fill:
+        propagator = opponent & direction_mask
+        lshift_generator, rshift_generator = player, player
+        lshift_propagator, rshift_propagator = propagator, propagator
+        for shift_size in shifts:
+            lshift_generator |= lshift_propagator & (lshift_generator << shift_size)
+            rshift_generator |= rshift_propagator & (rshift_generator >> shift_size)
+            lshift_propagator &= lshift_propagator << shift_size
+            rshift_propagator &= rshift_propagator >> shift_size
+        legal_moves_bits |= ((lshift_generator & propagator) << shifts[0]) | ((rshift_generator & propagator) >> shifts[0])
 
-
-def get_legal_moves_rshift(size, mask, player, blank, shift_size):
-    """
-    右シフトで石が置ける場所を取得
-    """
-    tmp = mask & (player >> shift_size)
-    for _ in range(size-3):
-        tmp |= mask & (tmp >> shift_size)
-
-    return blank & (tmp >> shift_size)
+    # 空きマスのみ(穴抜き)
+    return legal_moves_bits & ~(player | opponent | h)
 
 
 def get_bit_count(size, bits):
     """get_bit_count
     """
-    count = 0
-    mask = 1 << ((size**2)-1)
-    for y in range(size):
-        for x in range(size):
-            if bits & mask:
-                count += 1
-            mask >>= 1
-
-    return count
+    return popcount(bits & ((1 << (size**2)) - 1))
@@ -1,6 +1,10 @@
 """PutDisc.py
 """
 
+from reversi.BitBoardMethods.Bits import popcount
+from reversi.BitBoardMethods.GetFlippableDiscs import get_flippable_discs_num
+from reversi.BitBoardMethods.Zobrist import get_put_hash
+
 
 def put_disc(board, color, x, y):
     """put_disc
@@ -12,26 +16,25 @@ def put_disc(board, color, x, y):
         return 0
 
     # 反転位置を整数に変換
-    flippable_discs = board.get_flippable_discs(color, x, y)
-    flippable_discs_num = 0
-    for tmp_x, tmp_y in flippable_discs:
-        flippable_discs_num |= 1 << ((size*size-1)-(tmp_y*size+tmp_x))
+    flippable_discs_num = get_flippable_discs_num(color, size, board._black_bitboard, board._white_bitboard, x, y, board._mask)
+    flippable_discs_count = popcount(flippable_discs_num)
 
     # 打つ前の状態を格納
-    board.prev += [(board._black_bitboard, board._white_bitboard, board._black_score, board._white_score)]
+    board.prev += [(board._black_bitboard, board._white_bitboard, board._black_score, board._white_score, board._hash)]
 
     # 自分の石を置いて相手の石をひっくり返す
     put = 1 << ((size*size-1)-(y*size+x))
+    board._hash ^= get_put_hash(color, put, flippable_discs_num)
     if color == 'black':
         board._black_bitboard ^= put | flippable_discs_num
         board._white_bitboard ^= flippable_discs_num
-        board._black_score += 1 + len(flippable_discs)
-        board._white_score -= len(flippable_discs)
+        board._black_score += 1 + flippable_discs_count
+        board._white_score -= flippable_discs_count
     else:
         board._white_bitboard ^= put | flippable_discs_num
         board._black_bitboard ^= flippable_discs_num
-        board._black_score -= len(flippable_discs)
-        board._white_score += 1 + len(flippable_discs)
+        board._black_score -= flippable_discs_count
+        board._white_score += 1 + flippable_discs_count
 
     board._flippable_discs_num = flippable_discs_num
 
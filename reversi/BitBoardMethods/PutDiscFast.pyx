@@ -4,10 +4,33 @@
 
 import sys
 
+from reversi.BitBoardMethods.Bits import popcount
+from reversi.BitBoardMethods.GetFlippableDiscsFast import get_flippable_discs_num
+from reversi.BitBoardMethods.Zobrist import ZOBRIST_BLACK, ZOBRIST_WHITE, get_put_hash
+
 
 MAXSIZE64 = 2**63 - 1
 
 
+cdef:
+    unsigned long long[64] zobrist_black
+    unsigned long long[64] zobrist_white
+
+
+cdef inline void _init_zobrist():
+    """_init_zobrist
+    """
+    global zobrist_black, zobrist_white
+    cdef:
+        unsigned int i
+    for i in range(64):
+        zobrist_black[i] = ZOBRIST_BLACK[i]
+        zobrist_white[i] = ZOBRIST_WHITE[i]
+
+
+_init_zobrist()
+
+
 def put_disc(board, color, x, y):
     """put_disc
     """
@@ -43,7 +66,8 @@ cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color,
     flippable_discs_count = _get_flippable_discs_count_size8_64bit(flippable_discs_num)
 
     # 打つ前の状態を格納
-    board.prev += [(black_bitboard, white_bitboard, black_score, white_score)]
+    board.prev += [(black_bitboard, white_bitboard, black_score, white_score, board._hash)]
+    board._hash ^= _get_put_hash_size8_64bit(color, put, flippable_discs_num)
 
     # 自分の石を置いて相手の石をひっくり返す
     if color:
@@ -143,6 +167,22 @@ cdef inline unsigned long long _get_flippable_discs_count_size8_64bit(unsigned l
     return (discs & <unsigned long long>0x00000000FFFFFFFF) + (discs >> <unsigned int>32 & <unsigned long long>0x00000000FFFFFFFF)
 
 
+cdef inline unsigned long long _get_put_hash_size8_64bit(unsigned int color, unsigned long long put, unsigned long long flippable_discs_num):
+    """_get_put_hash_size8_64bit
+    """
+    cdef:
+        unsigned long long key, lowest
+        unsigned int index
+    index = <unsigned int>_get_flippable_discs_count_size8_64bit(put - 1)
+    key = zobrist_black[index] if color else zobrist_white[index]
+    while flippable_discs_num:
+        lowest = flippable_discs_num & (~flippable_discs_num + 1)
+        index = <unsigned int>_get_flippable_discs_count_size8_64bit(lowest - 1)
+        key ^= zobrist_black[index] ^ zobrist_white[index]
+        flippable_discs_num ^= lowest
+    return key
+
+
 cdef inline _put_disc(size, board, color, unsigned int x, unsigned int y):
     """_put_disc
     """
@@ -154,27 +194,24 @@ cdef inline _put_disc(size, board, color, unsigned int x, unsigned int y):
     put = 1 << ((size*size-1)-(y*size+x))
 
     # 反転位置を整数に変換
-    flippable_discs = board.get_flippable_discs(color, x, y)
-    flippable_discs_num = 0
-    cdef:
-        unsigned int tmp_x, tmp_y
-    for tmp_x, tmp_y in flippable_discs:
-        flippable_discs_num |= 1 << ((size*size-1)-(tmp_y*size+tmp_x))
+    flippable_discs_num = get_flippable_discs_num(color, size, board._black_bitboard, board._white_bitboard, x, y, board._mask)
+    flippable_discs_count = popcount(flippable_discs_num)
 
     # 打つ前の状態を格納
-    board.prev += [(board._black_bitboard, board._white_bitboard, board._black_score, board._white_score)]
+    board.prev += [(board._black_bitboard, board._white_bitboard, board._black_score, board._white_score, board._hash)]
+    board._hash ^= get_put_hash(color, put, flippable_discs_num)
 
     # 自分の石を置いて相手の石をひっくり返す
     if color == 'black':
         board._black_bitboard ^= put | flippable_discs_num
         board._white_bitboard ^= flippable_discs_num
-        board._black_score += 1 + len(flippable_discs)
-        board._white_score -= len(flippable_discs)
+        board._black_score += 1 + flippable_discs_count
+        board._white_score -= flippable_discs_count
     else:
         board._white_bitboard ^= put | flippable_discs_num
         board._black_bitboard ^= flippable_discs_num
-        board._black_score -= len(flippable_discs)
-        board._white_score += 1 + len(flippable_discs)
+        board._black_score -= flippable_discs_count
+        board._white_score += 1 + flippable_discs_count
 
     board._flippable_discs_num = flippable_discs_num
 
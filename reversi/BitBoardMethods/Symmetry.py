@@ -0,0 +1,135 @@
+"""Symmetry
+       盤面の回転・反転(8通りの対称変換)と正規化
+"""
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+TRANSFORMS = range(8)  # bit0:左右反転, bit1:上下反転, bit2:転置 の順に適用する
+
+_tables = {}  # ボードサイズ毎の変換テーブル(プロセス内で1度だけ生成する)
+
+
+def flip_horizontal(bits, size=8):
+    """flip_horizontal
+           左右反転
+    """
+    if size == 8:
+        bits = ((bits >> 1) & 0x5555555555555555) | ((bits & 0x5555555555555555) << 1)
+        bits = ((bits >> 2) & 0x3333333333333333) | ((bits & 0x3333333333333333) << 2)
+        return ((bits >> 4) & 0x0F0F0F0F0F0F0F0F) | ((bits & 0x0F0F0F0F0F0F0F0F) << 4)
+
+    return _transform_by_table(bits, size, 1)
+
+
+def flip_vertical(bits, size=8):
+    """flip_vertical
+           上下反転
+    """
+    if size == 8:
+        return int.from_bytes(bits.to_bytes(8, 'big'), 'little')
+
+    return _transform_by_table(bits, size, 2)
+
+
+def transpose(bits, size=8):
+    """transpose
+           左上-右下の対角線で反転
+    """
+    if size == 8:
+        tmp = 0x0F0F0F0F00000000 & (bits ^ (bits << 28))
+        bits ^= tmp ^ (tmp >> 28)
+        tmp = 0x3333000033330000 & (bits ^ (bits << 14))
+        bits ^= tmp ^ (tmp >> 14)
+        tmp = 0x5500550055005500 & (bits ^ (bits << 7))
+        return (bits ^ tmp ^ (tmp >> 7)) & MASK64
+
+    return _transform_by_table(bits, size, 4)
+
+
+def rotate90(bits, size=8):
+    """rotate90
+           時計回りに90度回転
+    """
+    return flip_horizontal(transpose(bits, size), size)
+
+
+def transform(bits, t, size=8):
+    """transform
+           変換番号tの対称変換を行う
+    """
+    if size == 8:
+        if t & 1:
+            bits = flip_horizontal(bits)
+        if t & 2:
+            bits = flip_vertical(bits)
+        if t & 4:
+            bits = transpose(bits)
+        return bits
+
+    return _transform_by_table(bits, size, t)
+
+
+def transform_move(x, y, t, size=8):
+    """transform_move
+           元の盤面の座標を変換番号tの変換後の座標にする
+    """
+    if t & 1:
+        x = size - 1 - x
+    if t & 2:
+        y = size - 1 - y
+    if t & 4:
+        x, y = y, x
+
+    return x, y
+
+
+def restore_move(x, y, t, size=8):
+    """restore_move
+           変換番号tの変換後の座標を元の盤面の座標に戻す
+    """
+    if t & 4:
+        x, y = y, x
+    if t & 2:
+        y = size - 1 - y
+    if t & 1:
+        x = size - 1 - x
+
+    return x, y
+
+
+def get_canonical(size, black, white, hole=0):
+    """get_canonical
+           8通りの変換のうち(黒, 白, 穴)が最小となる盤面と、その変換番号を返す
+    """
+    return min(((transform(black, t, size), transform(white, t, size), transform(hole, t, size)), t) for t in TRANSFORMS)
+
+
+def _transform_by_table(bits, size, t):
+    """_transform_by_table
+           任意サイズ用(立っているビットを1つずつ変換先に移す)
+    """
+    table = _get_table(size)[t]
+    ret = 0
+    while bits:
+        lowest = bits & -bits
+        ret |= table[lowest.bit_length() - 1]
+        bits ^= lowest
+
+    return ret
+
+
+def _get_table(size):
+    """_get_table
+           変換番号毎に、ビット位置から変換後のビットを引くテーブルを返す
+    """
+    if size not in _tables:
+        last = size * size - 1
+        tables = []
+        for t in TRANSFORMS:
+            table = []
+            for index in range(size * size):
+                x, y = transform_move((last - index) % size, (last - index) // size, t, size)
+                table.append(1 << (last - (y * size + x)))
+            tables.append(tuple(table))
+        _tables[size] = tuple(tables)
+
+    return _tables[size]
@@ -0,0 +1,44 @@
+"""Zobrist
+"""
+
+import random
+
+
+MAX_SQUARES = 26 * 26
+SEED = 0x5265766572736921
+
+
+# 各マスの乱数(ビット位置で参照する、サイズ8なら0が右下のマス)
+_random = random.Random(SEED)
+ZOBRIST_BLACK = [_random.getrandbits(64) for _ in range(MAX_SQUARES)]
+ZOBRIST_WHITE = [_random.getrandbits(64) for _ in range(MAX_SQUARES)]
+ZOBRIST_HOLE = [_random.getrandbits(64) for _ in range(MAX_SQUARES)]
+
+
+def get_hash(black_bitboard, white_bitboard, hole_bitboard):
+    """get_hash
+           盤面全体からハッシュ値を求める
+    """
+    key = 0
+    for table, bits in ((ZOBRIST_BLACK, black_bitboard), (ZOBRIST_WHITE, white_bitboard), (ZOBRIST_HOLE, hole_bitboard)):
+        while bits:
+            lowest = bits & -bits
+            key ^= table[lowest.bit_length() - 1]
+            bits ^= lowest
+
+    return key
+
+
+def get_put_hash(color, put, flippable_discs_num):
+    """get_put_hash
+           石を置いた時のハッシュ値の差分を返す(現在のハッシュ値とXORして使う)
+    """
+    key = ZOBRIST_BLACK[put.bit_length() - 1] if color == 'black' else ZOBRIST_WHITE[put.bit_length() - 1]
+    bits = flippable_discs_num
+    while bits:
+        lowest = bits & -bits
+        index = lowest.bit_length() - 1
+        key ^= ZOBRIST_BLACK[index] ^ ZOBRIST_WHITE[index]
+        bits ^= lowest
+
+    return key
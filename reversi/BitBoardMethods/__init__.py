@@ -1,5 +1,13 @@
 import os
 import pyximport
+
+from reversi.BitBoardMethods.Bits import popcount, iter_bits, iter_indices, iter_coords, bits_to_coords, coord_to_bit
+from reversi.BitBoardMethods.BitMask import get_bit_mask
+from reversi.BitBoardMethods.Zobrist import get_hash, get_put_hash
+from reversi.BitBoardMethods.BoardView import get_board_view, get_board_line_info, export_boards
+from reversi.BitBoardMethods.Codec import get_record_size, encode_position, decode_position, pack_positions, iter_positions, unpack_positions
+from reversi.BitBoardMethods.Symmetry import flip_horizontal, flip_vertical, transpose, rotate90, transform, transform_move, restore_move, get_canonical
+
 pyximport.install()
 
 
@@ -9,6 +17,8 @@ SLOW_MODE3 = True
 SLOW_MODE4 = True
 SLOW_MODE5 = True
 CYBOARD_ERROR = True
+CYBOARD256_ERROR = True
+BATCHBOARD_ERROR = True
 
 
 try:
@@ -71,13 +81,61 @@ try:
 except ImportError:
     pass
 
+try:
+    if 'FORCE_CYBOARD_IMPORT_ERROR' in os.environ:
+        if os.environ['FORCE_CYBOARD_IMPORT_ERROR'] == 'RAISE':
+            raise ImportError
+
+    from reversi.BitBoardMethods.CyBoard16_256bit import CythonBitBoard256
+    CYBOARD256_ERROR = False
+except ImportError:
+    pass
+
+try:
+    if 'FORCE_BATCHBOARD_IMPORT_ERROR' in os.environ:
+        if os.environ['FORCE_BATCHBOARD_IMPORT_ERROR'] == 'RAISE':
+            raise ImportError
+
+    from reversi.BitBoardMethods import BatchBoard  # NumPyが必要
+    BATCHBOARD_ERROR = False
+except ImportError:
+    pass
+
 __all__ = [
     'get_legal_moves',
     'get_legal_moves_bits',
     'get_bit_count',
     'get_flippable_discs',
     'get_board_info',
+    'get_board_view',
+    'get_board_line_info',
+    'export_boards',
+    'get_record_size',
+    'encode_position',
+    'decode_position',
+    'pack_positions',
+    'iter_positions',
+    'unpack_positions',
     'undo',
     'put_disc',
+    'popcount',
+    'iter_bits',
+    'iter_indices',
+    'iter_coords',
+    'bits_to_coords',
+    'coord_to_bit',
+    'get_bit_mask',
+    'get_hash',
+    'get_put_hash',
+    'flip_horizontal',
+    'flip_vertical',
+    'transpose',
+    'rotate90',
+    'transform',
+    'transform_move',
+    'restore_move',
+    'get_canonical',
     'CythonBitBoard',
+    'CythonBitBoard256',
+    'BatchBoard',
 ]
@@ -55,3 +55,12 @@ setup(
     cmdclass={'build_ext': build_ext},
     ext_modules=ext_modules
 )
+
+# CyBoard16_256bit
+ext_modules = [Extension("CyBoard16_256bit", ["CyBoard16_256bit.pyx"])]
+
+setup(
+    name='CyBoard16_256bit',
+    cmdclass={'build_ext': build_ext},
+    ext_modules=ext_modules
+)
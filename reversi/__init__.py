@@ -12,6 +12,7 @@ from .elucidator import Elucidator
 from .simulator import Simulator
 from . import strategies
 from . import genetic_algorithm
+from .perft import Perft, PerftError
 
 
 __all__ = [
@@ -38,4 +39,6 @@ __all__ = [
     'Simulator',
     'strategies',
     'genetic_algorithm',
+    'Perft',
+    'PerftError',
 ]
@@ -19,7 +19,7 @@ class Reversi:
     """
     INIT, DEMO, PLAY, END, REINIT = 'INIT', 'DEMO', 'PLAY', 'END', 'REINIT'
 
-    def __init__(self, players_info={}, turn_disc_wait=0.1, sleep_time_play=1.5, sleep_time_end=0.01, sleep_time_turn=0.3, sleep_time_move=0.3):
+    def __init__(self, players_info={}, turn_disc_wait=0.1, sleep_time_play=1.5, sleep_time_end=0.01, sleep_time_turn=0.3, sleep_time_move=0.3, ponder=False):
         root = tk.Tk()
         root.withdraw()  # 表示が整うまで隠す
 
@@ -42,6 +42,8 @@ class Reversi:
         self.sleep_time_turn = sleep_time_turn
         self.sleep_time_move = sleep_time_move
 
+        self.ponder = ponder  # 相手の手番の間に先読みする(Ponder戦略のみ)
+
     @property
     def state(self):
         return self._state
@@ -219,6 +221,7 @@ class Reversi:
             board,
             WindowDisplay(self.window, sleep_time_turn=self.sleep_time_turn, sleep_time_move=self.sleep_time_move),
             cancel=self.window.menu,
+            ponder=self.ponder,
         ).play()
 
         time.sleep(self.sleep_time_play)  # 少し待って終了状態へ
@@ -293,7 +296,7 @@ class Reversic:
         'Xhole':     [0x8142241818244281, 0x0008102244081000, 0x0010084422100800],
     }
 
-    def __init__(self, players_info={}, sleep_time_play=2, sleep_time_turn=1, sleep_time_move=1):
+    def __init__(self, players_info={}, sleep_time_play=2, sleep_time_turn=1, sleep_time_move=1, ponder=False):
         self.board_type = 'Square-8'
         self.player_names = {'black': 'User1', 'white': 'User2'}
         self.state = Reversic.START
@@ -310,6 +313,8 @@ class Reversic:
         self.sleep_time_turn = sleep_time_turn
         self.sleep_time_move = sleep_time_move
 
+        self.ponder = ponder  # 相手の手番の間に先読みする(Ponder戦略のみ)
+
         if 'win' in system().lower():
             kernel = windll.kernel32
             kernel.SetConsoleMode(kernel.GetStdHandle(-11), 7)
@@ -458,6 +463,7 @@ class Reversic:
             selected_players['white'],
             board,
             ConsoleDisplay(sleep_time_turn=self.sleep_time_turn, sleep_time_move=self.sleep_time_move),
+            ponder=self.ponder,
         ).play()
 
         # Enterでスタートに戻る
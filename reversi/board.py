@@ -3,7 +3,6 @@
 
 import sys
 import abc
-from collections import namedtuple
 
 from reversi.color import C as c
 from reversi.disc import D as d
@@ -14,6 +13,8 @@ MIN_BOARD_SIZE = 4
 MAX_BOARD_SIZE = 26
 
 MAXSIZE64 = 2**63 - 1
+SIZE_64BIT = (4, 6, 8)  # Cython版(64bit)に対応したボードサイズ
+SIZE_256BIT = (10, 12, 14, 16)  # Cython版(64bit×4)に対応したボードサイズ
 
 
 class AbstractBoard(metaclass=abc.ABCMeta):
@@ -78,6 +79,9 @@ class Board(AbstractBoard):
         if self.size == 8:
             self._set_hole()
 
+        # 局面のハッシュ値
+        self._hash = BitBoardMethods.get_hash(*self.get_bitboard_info())
+
 
     def _set_ini(self, size, ini_black, ini_white):
         center = size // 2
@@ -120,6 +124,14 @@ class Board(AbstractBoard):
         """
         return not(MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE and size % 2 == 0)
 
+    @property
+    def hash(self):
+        """hash
+
+               局面のハッシュ値(64bit、手番は含まない)
+        """
+        return self._hash
+
     def __str__(self):
         header = '   ' + ' '.join([chr(97 + i) for i in range(self.size)]) + '\n'
         body = ''
@@ -270,10 +282,15 @@ class Board(AbstractBoard):
         for tmp_x, tmp_y, in flippable_discs:
             self._board[tmp_y][tmp_x] = d[color]
 
-        self.update_score()                                                                  # スコア更新
-        self.prev += [{'color': color, 'x': x, 'y': y, 'flippable_discs': flippable_discs}]  # 打った手の記録
+        self.update_score()                                                                                      # スコア更新
+        self.prev += [{'color': color, 'x': x, 'y': y, 'flippable_discs': flippable_discs, 'hash': self._hash}]  # 打った手の記録
+
+        # ハッシュ値更新
+        size = self.size
+        flippable_discs_num = self._get_bit_pos(flippable_discs)
+        self._hash ^= BitBoardMethods.get_put_hash(color, 1 << ((size*size-1)-(y*size+x)), flippable_discs_num)
 
-        return self._get_bit_pos(flippable_discs)
+        return flippable_discs_num
 
     def update_score(self):
         """update_score
@@ -287,13 +304,8 @@ class Board(AbstractBoard):
                discs配列の石が置いてあるビット位置を返す
         """
         ret = 0
-        size = self.size
-        mask = 1 << (size*size-1)
-        for y in range(self.size):
-            for x in range(self.size):
-                if (x, y) in discs:
-                    ret |= mask
-                mask >>= 1
+        for x, y in discs:
+            ret |= BitBoardMethods.coord_to_bit(self.size, x, y)
 
         return ret
 
@@ -314,40 +326,32 @@ class Board(AbstractBoard):
 
         return board_info
 
-    def get_board_line_info(self, player, black='*', white='O', empty='-'):
-        """get_board_line_info
+    def get_board_view(self):
+        """get_board_view
+
+               ボードの情報を(size, size)のint8のmemoryviewで返す
         """
-        board_line_info = ''
-        # board
+        buf = bytearray(self.size * self.size)
+        i = 0
         for row in self._board:
             for col in row:
                 if d.is_black(col):
-                    board_line_info += black
+                    buf[i] = 0x01
                 elif d.is_white(col):
-                    board_line_info += white
-                else:
-                    board_line_info += empty
-        # player
-        if player == c.black:
-            board_line_info += black
-        elif player == c.white:
-            board_line_info += white
-        else:
-            board_line_info += empty
-        return board_line_info
+                    buf[i] = 0xFF
+                i += 1
+
+        return memoryview(buf).cast('b', (self.size, self.size))
+
+    def get_board_line_info(self, player, black='*', white='O', empty='-'):
+        """get_board_line_info
+        """
+        return BitBoardMethods.get_board_line_info(self.get_board_view(), player, black, white, empty)
 
     def get_bit_count(self, bits):
         """get_bit_count
         """
-        count = 0
-        size = self.size
-        mask = 1 << ((size**2)-1)
-        for _ in range(size**2):
-            if bits & mask:
-                count += 1
-            mask >>= 1
-
-        return count
+        return BitBoardMethods.popcount(bits & ((1 << (self.size**2)) - 1))
 
     def get_bitboard_info(self):
         """get_bitboard_info
@@ -374,12 +378,58 @@ class Board(AbstractBoard):
         self._board[prev['y']][prev['x']] = d.blank     # 置いた石を取り除く
         for prev_x, prev_y in prev['flippable_discs']:  # ひっくり返された石を反転させる
             self._board[prev_y][prev_x] = d[c.next_color(prev['color'])]
+        self._hash = prev['hash']
         self.update_score()
 
+    def encode(self, color='black'):
+        """encode
+
+               局面を固定長のバイト列にする(8x8は17バイト)
+        """
+        return BitBoardMethods.encode_position(self.size, color, *self.get_bitboard_info())
+
+    @classmethod
+    def decode(cls, data):
+        """decode
+
+               バイト列からボードと手番を作る
+        """
+        size, color, black, white, hole = BitBoardMethods.decode_position(data)
+        return cls(size, hole=hole, ini_black=black, ini_white=white), color
+
+    def clone(self, with_history=False):
+        """clone
+
+               盤面と石数をコピーしたボードを返す(履歴はwith_history=Trueの場合のみコピー)
+        """
+        board = self.__class__.__new__(self.__class__)
+        board.__dict__.update(self.__dict__)
+        board._board = [row[:] for row in self._board]
+        board.prev = list(self.prev) if with_history else []
+        return board
+
+    def snapshot(self):
+        """snapshot
+
+               restoreで戻すための現在の局面を返す
+        """
+        return [row[:] for row in self._board], self._black_score, self._white_score, self._hash, len(self.prev)
+
+    def restore(self, snap):
+        """restore
+
+               snapshotの局面に戻す(履歴はsnapshot時点の長さまで切り詰める)
+        """
+        board, self._black_score, self._white_score, self._hash, prev_len = snap
+        self._board = [row[:] for row in board]
+        del self.prev[prev_len:]
+
 
 def BitBoard(size=8, hole=0x0, ini_black=None, ini_white=None):
-    if size == 8 and sys.maxsize == MAXSIZE64 and not BitBoardMethods.CYBOARD_ERROR:
-        return BitBoardMethods.CythonBitBoard(hole=hole, ini_black=ini_black, ini_white=ini_white)
+    if size in SIZE_64BIT and sys.maxsize == MAXSIZE64 and not BitBoardMethods.CYBOARD_ERROR:
+        return BitBoardMethods.CythonBitBoard(size, hole=hole, ini_black=ini_black, ini_white=ini_white)
+    if size in SIZE_256BIT and sys.maxsize == MAXSIZE64 and not BitBoardMethods.CYBOARD256_ERROR:
+        return BitBoardMethods.CythonBitBoard256(size, hole=hole, ini_black=ini_black, ini_white=ini_white)
     return PyBitBoard(size, hole=hole, ini_black=ini_black, ini_white=ini_white)
 
 
@@ -400,26 +450,16 @@ class PyBitBoard(AbstractBoard):
         self._set_ini(size, ini_black, ini_white)
 
         # 置ける場所の検出用マスク
-        BitMask = namedtuple('BitMask', 'h v d u ur r br b bl l ul')
-        self._mask = BitMask(
-            int(''.join((['0'] + ['1'] * (size-2) + ['0']) * size), 2),                                      # 水平方向のマスク値
-            int(''.join(['0'] * size + ['1'] * size * (size-2) + ['0'] * size), 2),                          # 垂直方向のマスク値
-            int(''.join(['0'] * size + (['0'] + (['1'] * (size-2)) + ['0']) * (size-2) + ['0'] * size), 2),  # 斜め方向のマスク値
-            int(''.join(['1'] * size * (size-1) + ['0'] * size), 2),                                         # 上方向のマスク値
-            int(''.join((['0'] + ['1'] * (size-1)) * (size-1) + ['0'] * size), 2),                           # 右上方向のマスク値
-            int(''.join((['0'] + ['1'] * (size-1)) * size), 2),                                              # 右方向のマスク値
-            int(''.join(['0'] * size + (['0'] + ['1'] * (size-1)) * (size-1)), 2),                           # 右下方向のマスク値
-            int(''.join(['0'] * size + ['1'] * size * (size-1)), 2),                                         # 下方向のマスク値
-            int(''.join(['0'] * size + (['1'] * (size-1) + ['0']) * (size-1)), 2),                           # 左下方向のマスク値
-            int(''.join((['1'] * (size-1) + ['0']) * size), 2),                                              # 左方向のマスク値
-            int(''.join((['1'] * (size-1) + ['0']) * (size-1) + ['0'] * size), 2)                            # 左上方向のマスク値
-        )
+        self._mask = BitBoardMethods.get_bit_mask(size)
 
         # 穴をあける(サイズ8のみ
         self._hole_bitboard = hole
         if self.size == 8:
             self._set_hole()
 
+        # 局面のハッシュ値
+        self._hash = BitBoardMethods.get_hash(*self.get_bitboard_info())
+
     def _set_ini(self, size, ini_black, ini_white):
         center = size // 2
         self._ini_black = 1 << ((size*size-1)-(size*(center-1)+center))
@@ -452,6 +492,14 @@ class PyBitBoard(AbstractBoard):
         """
         return not(MIN_BOARD_SIZE <= size <= MAX_BOARD_SIZE and size % 2 == 0)
 
+    @property
+    def hash(self):
+        """hash
+
+               局面のハッシュ値(64bit、手番は含まない)
+        """
+        return self._hash
+
     def __str__(self):
         size = self.size
         header = '   ' + ' '.join([chr(97 + i) for i in range(size)]) + '\n'
@@ -514,46 +562,25 @@ class PyBitBoard(AbstractBoard):
     def update_score(self):
         """update_score
         """
-        self._black_score, self._white_score = 0, 0
-        size = self.size
-        mask = 1 << (size * size - 1)
-        for y in range(size):
-            for x in range(size):
-                if self._black_bitboard & mask:
-                    self._black_score += 1
-                elif self._white_bitboard & mask:
-                    self._white_score += 1
-                mask >>= 1
+        self._black_score = BitBoardMethods.popcount(self._black_bitboard)
+        self._white_score = BitBoardMethods.popcount(self._white_bitboard)
 
     def get_board_info(self):
         """get_board_info
         """
         return BitBoardMethods.get_board_info(self.size, self._black_bitboard, self._white_bitboard)
 
+    def get_board_view(self):
+        """get_board_view
+
+               ボードの情報を(size, size)のint8のmemoryviewで返す
+        """
+        return BitBoardMethods.get_board_view(self.size, self._black_bitboard, self._white_bitboard)
+
     def get_board_line_info(self, player, black='*', white='O', empty='-'):
         """get_board_line_info
         """
-        board_line_info = ''
-        # board
-        size = self.size
-        mask = 1 << (size * size - 1)
-        for y in range(size):
-            for x in range(size):
-                if self._black_bitboard & mask:
-                    board_line_info += black
-                elif self._white_bitboard & mask:
-                    board_line_info += white
-                else:
-                    board_line_info += empty
-                mask >>= 1
-        # player
-        if player == c.black:
-            board_line_info += black
-        elif player == c.white:
-            board_line_info += white
-        else:
-            board_line_info += empty
-        return board_line_info
+        return BitBoardMethods.get_board_line_info(self.get_board_view(), player, black, white, empty)
 
     def get_bit_count(self, bits):
         """get_git_count
@@ -569,3 +596,44 @@ class PyBitBoard(AbstractBoard):
         """undo
         """
         BitBoardMethods.undo(self)
+
+    def encode(self, color='black'):
+        """encode
+
+               局面を固定長のバイト列にする(8x8は17バイト)
+        """
+        return BitBoardMethods.encode_position(self.size, color, *self.get_bitboard_info())
+
+    @classmethod
+    def decode(cls, data):
+        """decode
+
+               バイト列からボードと手番を作る
+        """
+        size, color, black, white, hole = BitBoardMethods.decode_position(data)
+        return cls(size, hole=hole, ini_black=black, ini_white=white), color
+
+    def clone(self, with_history=False):
+        """clone
+
+               盤面と石数をコピーしたボードを返す(履歴はwith_history=Trueの場合のみコピー)
+        """
+        board = self.__class__.__new__(self.__class__)
+        board.__dict__.update(self.__dict__)
+        board.prev = list(self.prev) if with_history else []
+        return board
+
+    def snapshot(self):
+        """snapshot
+
+               restoreで戻すための現在の局面を返す
+        """
+        return self._black_bitboard, self._white_bitboard, self._black_score, self._white_score, self._hash, len(self.prev)
+
+    def restore(self, snap):
+        """restore
+
+               snapshotの局面に戻す(履歴はsnapshot時点の長さまで切り詰める)
+        """
+        self._black_bitboard, self._white_bitboard, self._black_score, self._white_score, self._hash, prev_len = snap
+        del self.prev[prev_len:]
@@ -9,55 +9,88 @@ class Game:
     """
     BLACK_WIN, WHITE_WIN, DRAW = 0, 1, 2
 
-    def __init__(self, black_player, white_player, board=BitBoard(), display=NoneDisplay(), color='black', cancel=None):
+    def __init__(self, black_player, white_player, board=BitBoard(), display=NoneDisplay(), color='black', cancel=None, ponder=False):
         self.black_player = black_player
         self.white_player = white_player
         self.board = board
         self.players = [self.black_player, self.white_player] if color == 'black' else [self.white_player, self.black_player]
         self.display = display
         self.cancel = cancel
+        self.ponder = ponder  # 相手の手番の間に先読みする(start_ponderを持つ戦略のみ)
         self.result = []
 
     def play(self):
         """play
         """
         if not self.result:
-            self.display.progress(self.board, self.black_player, self.white_player)
+            from reversi.strategies.common import Timer  # strategiesがGameを使うため、ここで読み込む
 
-            while True:
-                playable, foul_player = 0, None
+            Timer.set_cancel_event(self.cancel.event if self.cancel else None)  # 中止時は探索中の手も打ち切る
+            try:
+                self._play()
+            finally:
+                self._stop_ponder()
+                Timer.set_cancel_event(None)
 
-                for player in self.players:
-                    if self.cancel:
-                        if self.cancel.event.is_set():
-                            break
+    def _play(self):
+        """_play
+        """
+        self.display.progress(self.board, self.black_player, self.white_player)
 
-                    legal_moves = self.board.get_legal_moves(player.color)
+        while True:
+            playable, foul_player = 0, None
 
-                    if not legal_moves:
-                        continue
+            for player in self.players:
+                if self.cancel:
+                    if self.cancel.event.is_set():
+                        break
 
-                    self.display.turn(player, legal_moves)
+                legal_moves = self.board.get_legal_moves(player.color)
 
-                    player.put_disc(self.board)
+                if not legal_moves:
+                    continue
 
-                    self.display.move(player, legal_moves)
-                    self.display.progress(self.board, self.black_player, self.white_player)
+                self.display.turn(player, legal_moves)
 
-                    if not player.captures:
-                        foul_player = player
-                        break
+                player.put_disc(self.board)
 
-                    playable += 1
+                if self.ponder:
+                    self._start_ponder(player)
 
-                if foul_player:
-                    self._foul(foul_player)
-                    break
+                self.display.move(player, legal_moves)
+                self.display.progress(self.board, self.black_player, self.white_player)
 
-                if not playable:
-                    self._judge()
+                if not player.captures:
+                    foul_player = player
                     break
 
+                playable += 1
+
+            if foul_player:
+                self._foul(foul_player)
+                break
+
+            if not playable:
+                self._judge()
+                break
+
+    def _start_ponder(self, player):
+        """start_ponder
+        """
+        start_ponder = getattr(player.strategy, 'start_ponder', None)
+
+        if start_ponder is not None and player.captures:
+            start_ponder(player.color, self.board)
+
+    def _stop_ponder(self):
+        """stop_ponder
+        """
+        for player in self.players:
+            stop_ponder = getattr(player.strategy, 'stop_ponder', None)
+
+            if stop_ponder is not None:
+                stop_ponder()
+
     def _foul(self, player):
         """foul
         """
@@ -96,15 +129,17 @@ class Game:
             winlose,
             self.black_player.name, self.white_player.name,
             self.board._black_score, self.board._white_score,
+            self.board.encode(),
         )
 
 
 class GameResult:
     """GameResult
     """
-    def __init__(self, winlose, black_name, white_name, black_num, white_num):
+    def __init__(self, winlose, black_name, white_name, black_num, white_num, position=None):
         self.winlose = winlose
         self.black_name = black_name
         self.white_name = white_name
         self.black_num = black_num
         self.white_num = white_num
+        self.position = position  # 終局面(BitBoardMethods.encode_positionのバイト列)
@@ -0,0 +1,149 @@
+"""Perft
+"""
+
+import os
+import json
+import time
+
+from reversi import Board, BitBoard, PyBitBoard
+from reversi import C as c
+from reversi.strategies import AlphaBetaMethods, NegaScoutMethods, EndGameMethods, BlankMethods
+
+
+BOARD_CONF_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'examples', 'board_conf.json')
+SIZE_64BIT = (4, 6, 8)           # Cython版(64bit)のカーネルに対応したボードサイズ
+SIZE_256BIT = (10, 12, 14, 16)  # Cython版(64bit x 4)のカーネルに対応したボードサイズ
+
+
+class PerftError(Exception):
+    """
+    バックエンド間で局面数が一致しない
+    """
+    pass
+
+
+class Perft:
+    """
+    指定した深さまでの末端局面数を数え、バックエンド毎の指し手生成を検証・計測する
+    (パスも1手として数え、深さ到達前のゲーム終了は1局面として数える)
+    """
+    def __init__(self, size=8, first=c.black, hole=0x0, ini_black=None, ini_white=None):
+        self.size = size
+        self.first = first
+        self.hole = hole
+        self.ini_black = ini_black
+        self.ini_white = ini_white
+
+    def get_backends(self):
+        """get_backends
+               このボードで使用できるバックエンドの一覧を返す
+        """
+        backends = {
+            'Board': self._count_board(Board),
+            'PyBitBoard': self._count_board(PyBitBoard),
+        }
+        if type(self._create(BitBoard)) is not PyBitBoard:
+            backends['BitBoard'] = self._count_board(BitBoard)
+
+        kernels = []
+        if self.size in SIZE_64BIT:
+            kernels = [
+                ('AlphaBetaMethods', AlphaBetaMethods.ALPHABETA_SIZE8_64BIT_ERROR, AlphaBetaMethods, 'perft'),
+                ('NegaScoutMethods', NegaScoutMethods.NEGASCOUT_SIZE8_64BIT_ERROR, NegaScoutMethods, 'perft'),
+                ('EndGameMethods', EndGameMethods.ENDGAME_SIZE8_64BIT_ERROR, EndGameMethods, 'perft'),
+            ]
+            if self.size == 8:
+                kernels += [('BlankMethods', BlankMethods.BLANK_SIZE8_64BIT_ERROR, BlankMethods, 'perft')]
+        elif self.size in SIZE_256BIT:
+            kernels = [
+                ('AlphaBetaMethods', AlphaBetaMethods.ALPHABETA_SIZE16_256BIT_ERROR, AlphaBetaMethods, 'perft_size16_256bit'),
+                ('NegaScoutMethods', NegaScoutMethods.NEGASCOUT_SIZE16_256BIT_ERROR, NegaScoutMethods, 'perft_size16_256bit'),
+            ]
+        for name, error, methods, func in kernels:
+            if not error:
+                backends[name] = self._count_kernel(getattr(methods, func))
+
+        return backends
+
+    def count(self, depth, backend='BitBoard'):
+        """count
+               末端局面数を返す
+        """
+        return self.get_backends()[backend](depth)
+
+    def run(self, depth, backends=None, verbose=False):
+        """run
+               各バックエンドの局面数と速度(nodes/sec)を返す(局面数が一致しない場合はPerftErrorを送出する)
+        """
+        result = {}
+        for name, func in self.get_backends().items():
+            if backends is not None and name not in backends:
+                continue
+            start = time.perf_counter()
+            nodes = func(depth)
+            elapsed = time.perf_counter() - start
+            result[name] = {'nodes': nodes, 'time': elapsed, 'nps': nodes / elapsed if elapsed > 0 else float('inf')}
+            if verbose:
+                print(f'{name:18s} depth={depth:2d} nodes={nodes:12d} time={elapsed:9.3f}s nps={result[name]["nps"]:14.0f}')
+
+        counts = {name: value['nodes'] for name, value in result.items()}
+        if len(set(counts.values())) > 1:
+            raise PerftError('perft mismatch at depth ' + str(depth) + ' : ' + str(counts))
+
+        return result
+
+    def _create(self, board_class):
+        return board_class(self.size, hole=self.hole, ini_black=self.ini_black, ini_white=self.ini_white)
+
+    def _count_board(self, board_class):
+        def count(depth):
+            return _count(self._create(board_class), self.first, depth, False)
+        return count
+
+    def _count_kernel(self, perft):
+        def count(depth):
+            return perft(self.first, self._create(BitBoard), depth)
+        return count
+
+
+def _count(board, color, depth, pas):
+    """_count
+    """
+    if not depth:
+        return 1
+
+    next_color = c.white if color == c.black else c.black
+    legal_moves = board.get_legal_moves(color)
+
+    # パスの場合
+    if not legal_moves:
+        if pas:
+            return 1  # ゲーム終了
+        return _count(board, next_color, depth-1, True)
+
+    count = 0
+    for move in legal_moves:
+        board.put_disc(color, *move)
+        count += _count(board, next_color, depth-1, False)
+        board.undo()
+
+    return count
+
+
+def load_board_conf(board_conf_json=BOARD_CONF_JSON):
+    """load_board_conf
+           board_conf.jsonの各ボードからPerftを作る
+    """
+    with open(board_conf_json) as f:
+        board_conf = json.load(f)
+
+    perfts = {}
+    for name, conf in board_conf.items():
+        first = c.black if not int(conf['first'], 16) else c.white
+        size = 8 if not int(conf['size'], 16) else 10
+        hole = int('0x' + ''.join([i.replace('0x', '') for i in conf['hole']]), 16)
+        ini_black = int('0x' + ''.join([i.replace('0x', '') for i in conf['init_black']]), 16)
+        ini_white = int('0x' + ''.join([i.replace('0x', '') for i in conf['init_white']]), 16)
+        perfts[name] = Perft(size=size, first=first, hole=hole, ini_black=ini_black, ini_white=ini_white)
+
+    return perfts
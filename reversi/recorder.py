@@ -3,6 +3,7 @@
 
 from reversi import Board, BitBoard, Move, LOWER, UPPER
 from reversi import C as c
+from reversi.BitBoardMethods import popcount, iter_coords
 
 
 class Recorder:
@@ -38,7 +39,8 @@ class Recorder:
 
     def get_record_by_custom(self, size, last_bb, last_wb, prev):
         record = []
-        for index, (board_b, board_w, score_b, _) in enumerate(prev):
+        for index, item in enumerate(prev):
+            board_b, board_w, score_b = item[0], item[1], item[2]
             next_board_b = prev[index+1][0] if index < len(prev) - 1 else last_bb
             next_board_w = prev[index+1][1] if index < len(prev) - 1 else last_wb
             next_score_b = prev[index+1][2] if index < len(prev) - 1 else self.popcount(size, last_bb)
@@ -48,24 +50,12 @@ class Recorder:
         return ''.join(record)
 
     def popcount(self, size, bits):
-        count = 0
-        mask = 1 << ((size**2)-1)
-        for _ in range(size**2):
-            if bits & mask:
-                count += 1
-            mask >>= 1
-        return count
+        return popcount(bits & ((1 << (size**2)) - 1))
 
     def _get_move_bit(self, size, bb_pre, wb_pre, bb_now, wb_now):
         all_pre = bb_pre | wb_pre
         move = (bb_now & ~all_pre) | (wb_now & ~all_pre)
-        mask = 1 << ((size * size) - 1)
-        for y in range(size):
-            for x in range(size):
-                if move & mask:
-                    return x, y
-                mask >>= 1
-        return -1, -1
+        return next(iter_coords(size, move), (-1, -1))
 
     def play(self, record=None, board=None, show_moves=True, show_result=True):
         if record is None:
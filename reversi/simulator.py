@@ -236,6 +236,13 @@ class Simulator:
 
         self._totalize_results()
 
+    def save_positions(self, positions_file):
+        """
+        終局面を固定長のバイナリ形式で連結して保存する(BitBoardMethods.iter_positionsで読み出せる)
+        """
+        with open(positions_file, 'wb') as f:
+            f.write(b''.join([result.position for result in self.game_results if result and result.position]))
+
     def _game_play(self, info):
         """
         ゲームを実行
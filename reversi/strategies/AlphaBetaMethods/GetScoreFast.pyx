@@ -3,7 +3,6 @@
 """
 
 import sys
-import time
 
 from reversi.strategies.common import Timer, Measure
 
@@ -166,7 +165,7 @@ cdef inline signed int timer(pid):
     """timer
     """
     if pid:
-        if time.time() > Timer.deadline[pid]:
+        if Timer.poll(pid):
             Timer.timeout_flag[pid] = True  # タイムアウト発生
             return Timer.timeout_value[pid]
 
@@ -179,12 +178,15 @@ cdef double _get_score_size8_64bit(func, alphabeta, color, board, double alpha,
     cdef:
         double score
         unsigned long long b, w, legal_moves_b_bits, legal_moves_w_bits, legal_moves_bits, mask
+        unsigned int bs, ws
         unsigned int is_game_end, color_num, x, y
         signed int sign
 
     # ゲーム終了 or 最大深さに到達
     b = board._black_bitboard
     w = board._white_bitboard
+    bs = board._black_score
+    ws = board._white_score
     legal_moves_b_bits = _get_legal_moves_bits_size8_64bit(1, b, w)
     legal_moves_w_bits = _get_legal_moves_bits_size8_64bit(0, b, w)
     is_game_end = <unsigned int>1 if not legal_moves_b_bits and not legal_moves_w_bits else <unsigned int>0
@@ -214,7 +216,7 @@ cdef double _get_score_size8_64bit(func, alphabeta, color, board, double alpha,
             if legal_moves_bits & mask:
                 _put_disc_size8_64bit(board, color_num, x, y)
                 score = -func(func, alphabeta, next_color, board, -beta, -alpha, depth-1, pid)
-                _undo(board)
+                _undo(board, b, w, bs, ws)
 
                 if score > alpha:
                     alpha = score
@@ -317,9 +319,6 @@ cdef inline unsigned long long _put_disc_size8_64bit(board, unsigned int color,
     flippable_discs_num = _get_flippable_discs_num_size8_64bit(color, black_bitboard, white_bitboard, shift_size)
     flippable_discs_count = _get_bit_count_size8_64bit(flippable_discs_num)
 
-    # 打つ前の状態を格納
-    board.prev += [(black_bitboard, white_bitboard, black_score, white_score)]
-
     # 自分の石を置いて相手の石をひっくり返す
     if color:
         black_bitboard ^= put | flippable_discs_num
@@ -406,7 +405,11 @@ cdef inline unsigned long long _get_next_put_size8_64bit(unsigned long long put,
     return next_put
 
 
-cdef inline _undo(board):
+cdef inline _undo(board, unsigned long long b, unsigned long long w, unsigned int bs, unsigned int ws):
     """_undo
+           呼び出し元で退避した打つ前の状態に戻す
     """
-    (board._black_bitboard, board._white_bitboard, board._black_score, board._white_score) = board.prev.pop()
+    board._black_bitboard = b
+    board._white_bitboard = w
+    board._black_score = bs
+    board._white_score = ws
@@ -0,0 +1,872 @@
+#cython: language_level=3, profile=False, boundscheck=False, wraparound=False, initializedcheck=False, cdivision=True
+"""Next Move(Size10-16,64bit×4) of AlphaBeta strategy
+"""
+
+from libc.time cimport timespec, timespec_get, TIME_UTC
+from cpython.ref cimport PyObject
+
+from reversi.strategies.common import Timer, Measure
+from reversi.BitBoardMethods.BitMask import get_bit_mask
+
+
+cdef extern from *:
+    """
+    #ifdef _WIN32
+    #include <windows.h>
+    static double _monotonic_time(void) {
+        LARGE_INTEGER count, frequency;
+        QueryPerformanceCounter(&count);
+        QueryPerformanceFrequency(&frequency);
+        return (double)count.QuadPart / (double)frequency.QuadPart;
+    }
+    #else
+    #include <time.h>
+    static double _monotonic_time(void) {
+        struct timespec ts;
+        clock_gettime(CLOCK_MONOTONIC, &ts);
+        return (double)ts.tv_sec + (double)ts.tv_nsec * 1e-9;
+    }
+    #endif
+    """
+    double _monotonic_time() nogil  # 単調増加する時計(s)
+
+
+DEF POSITIVE_INFINITY = 10000000
+DEF NEGATIVE_INFINITY = -10000000
+DEF TRANSPOSITION_TABLE_DEPTH = 2  # 置換表を有効にする残りの探索深さ
+DEF MAX_LIMBS = 4                  # 64bit単位の最大数
+DEF MAX_SIZE = 16                  # 最大ボードサイズ
+DEF MAX_SQUARES = 256              # 最大マス数
+DEF NO_MOVE = 256
+DEF TIMER_CHECK_INTERVAL = 1024    # 時間と中止要求を確認するノード数の間隔(CancelTokenを使わない場合)
+DEF EVALUATE_ERROR = -1.0e300      # 評価関数で例外が発生した時の戻り値(GILを取って例外を確認する)
+
+
+ctypedef struct Bits:
+    unsigned long long limb[MAX_LIMBS]  # limb[0]が下位64bit
+
+
+ctypedef struct TTEntry:
+    Bits black
+    Bits white
+    double lower
+    double upper
+    unsigned int generation
+    unsigned short move
+    unsigned char depth
+    unsigned char color
+
+
+ctypedef struct SearchContext:  # 探索毎の状態(探索毎に持つため、複数の探索を同時に実行できる)
+    Bits bb                              # 黒のビットボード
+    Bits wb                              # 白のビットボード
+    Bits hb                              # 穴のビットボード
+    Bits fd                              # 直前にひっくり返した石
+    Bits pbb[MAX_SQUARES]                # 打つ前の黒のビットボード
+    Bits pwb[MAX_SQUARES]                # 打つ前の白のビットボード
+    unsigned int bs                      # 黒の石数
+    unsigned int ws                      # 白の石数
+    unsigned int pbs[MAX_SQUARES]        # 打つ前の黒の石数
+    unsigned int pws[MAX_SQUARES]        # 打つ前の白の石数
+    unsigned int tail                    # 退避した手数
+    unsigned int board_size              # ボードサイズ(10,12,14,16)
+    unsigned long long measure_count     # 探索ノード数
+    double timer_deadline                # タイムアウトする時刻(単調増加する時計)
+    unsigned int timer_timeout           # タイムアウト発生
+    signed int timer_timeout_value       # タイムアウト時に返す評価値
+    unsigned int timer_interval          # 時間と中止要求を確認するノード数の間隔
+    unsigned int timer_countdown         # 次に確認するまでのノード数
+    unsigned char* cancel_flag           # 中止要求(CancelToken.flag、NULLなら無し)
+    PyObject* cancel_event               # 中止要求のイベント(CancelToken.event、NULLなら無し)
+    PyObject* board                      # 評価に使うボード(葉でGILを取って参照する)
+    PyObject* evaluator                  # 評価関数(葉でGILを取って呼ぶ)
+    TTEntry* tt_entries                  # 置換表(NULLなら使用しない)
+    unsigned long long tt_count
+    unsigned int tt_generation
+    unsigned int tt_persist
+    unsigned long long tt_probes
+    unsigned long long tt_hits
+    unsigned long long tt_stores
+
+
+cdef:
+    unsigned long long[64][256] zobrist
+    unsigned long long zobrist_color
+    Bits[MAX_SIZE+1] mask_full              # 盤面全体のマスク値(サイズ毎)
+    Bits[MAX_SIZE+1][4] mask_line           # 水平,垂直,斜め,斜めのマスク値(サイズ毎)
+    unsigned int[MAX_SIZE+1][4] shift_line  # 上記4方向のシフト量(サイズ毎)
+    Bits[MAX_SIZE+1][8] mask_dir            # 上,右上,左,左上(左シフト),右,右下,下,左下(右シフト)のマスク値(サイズ毎)
+    unsigned int[MAX_SIZE+1][8] shift_dir   # 上記8方向のシフト量(サイズ毎)
+
+
+cdef inline void _init_geometry():
+    """_init_geometry
+           サイズ10～16のマスク値とシフト量を設定する
+    """
+    global mask_full, mask_line, shift_line, mask_dir, shift_dir
+    cdef:
+        unsigned int size, i
+    for size in (10, 12, 14, 16):
+        mask = get_bit_mask(size)
+        mask_full[size] = _from_int((<object>1 << (size * size)) - 1)
+        for i, (line_mask, shift_size) in enumerate(((mask.h, 1), (mask.v, size), (mask.d, size+1), (mask.d, size-1))):
+            mask_line[size][i] = _from_int(line_mask)
+            shift_line[size][i] = shift_size
+        for i, (direction_mask, shift_size) in enumerate(((mask.u, size), (mask.ur, size-1), (mask.l, 1), (mask.ul, size+1), (mask.r, 1), (mask.br, size+1), (mask.b, size), (mask.bl, size-1))):
+            mask_dir[size][i] = _from_int(direction_mask)
+            shift_dir[size][i] = shift_size
+
+
+_init_geometry()
+
+
+def next_move(color, board, param_min, param_max, depth, evaluator, pid, timer, measure, tt=None, result=None):
+    """next_move
+    """
+    if pid is None:
+        timer, measure = False, False
+    return _next_move(color, board, param_min, param_max, depth, evaluator, pid, timer, measure, tt, result)
+
+
+def get_best_move(color, board, moves, alpha, beta, depth, evaluator, pid, timer, measure, tt=None, result=None):
+    """get_best_move
+    """
+    if pid is None:
+        timer, measure = False, False
+    return _get_best_move_wrap(color, board, moves, alpha, beta, depth, evaluator, pid, timer, measure, tt, result)
+
+
+def perft(color, board, depth):
+    """perft
+           指定した深さまでの末端局面数を数える(パスも1手、深さ到達前のゲーム終了は1局面として数える)
+    """
+    return _perft_wrap(color, board, depth)
+
+
+cdef inline unsigned long long _splitmix64(unsigned long long* state) noexcept nogil:
+    """_splitmix64
+    """
+    cdef:
+        unsigned long long z
+    state[0] += <unsigned long long>0x9E3779B97F4A7C15
+    z = state[0]
+    z = (z ^ (z >> <unsigned int>30)) * <unsigned long long>0xBF58476D1CE4E5B9
+    z = (z ^ (z >> <unsigned int>27)) * <unsigned long long>0x94D049BB133111EB
+    return z ^ (z >> <unsigned int>31)
+
+
+cdef inline void _init_zobrist():
+    """_init_zobrist
+    """
+    global zobrist, zobrist_color
+    cdef:
+        unsigned int i, j
+        unsigned long long state = 0x5265766572736921  # 固定シード
+    for i in range(64):
+        for j in range(256):
+            zobrist[i][j] = _splitmix64(&state)
+    zobrist_color = _splitmix64(&state)
+
+
+_init_zobrist()
+
+
+cdef inline unsigned long long _get_hash(unsigned int int_color, Bits b, Bits w) noexcept nogil:
+    """_get_hash
+           8bit単位のZobristハッシュ
+    """
+    cdef:
+        unsigned int i, j
+        unsigned long long key = 0
+    if int_color:
+        key = zobrist_color
+    for i in range(MAX_LIMBS):
+        for j in range(8):
+            key ^= zobrist[i*8+j][(b.limb[i] >> (j * 8)) & <unsigned long long>0xFF]
+            key ^= zobrist[i*8+j+32][(w.limb[i] >> (j * 8)) & <unsigned long long>0xFF]
+    return key
+
+
+cdef inline void _begin_transposition_table(SearchContext* ctx, tt, unsigned char[::1] table):
+    """_begin_transposition_table
+    """
+    ctx.tt_entries = NULL
+    ctx.tt_probes = 0
+    ctx.tt_hits = 0
+    ctx.tt_stores = 0
+    if table is not None and <unsigned long long>table.shape[0] >= sizeof(TTEntry):
+        ctx.tt_entries = <TTEntry*>&table[0]
+        ctx.tt_count = <unsigned long long>(table.shape[0] // sizeof(TTEntry))
+        ctx.tt_generation = <unsigned int>tt.generation
+        ctx.tt_persist = <unsigned int>tt.persist
+
+
+cdef inline void _end_transposition_table(SearchContext* ctx, tt):
+    """_end_transposition_table
+    """
+    if ctx.tt_entries != NULL:
+        tt.probes += ctx.tt_probes
+        tt.hits += ctx.tt_hits
+        tt.stores += ctx.tt_stores
+    ctx.tt_entries = NULL
+
+
+cdef inline TTEntry* _probe(SearchContext* ctx, unsigned long long key, unsigned int int_color, Bits b, Bits w) noexcept nogil:
+    """_probe
+    """
+    cdef:
+        TTEntry* entry = &ctx.tt_entries[key % ctx.tt_count]
+    ctx.tt_probes += 1
+    if _is_equal(entry.black, b) and _is_equal(entry.white, w) and entry.color == int_color and (ctx.tt_persist or entry.generation == ctx.tt_generation):
+        ctx.tt_hits += 1
+        return entry
+    return NULL
+
+
+cdef inline void _store(SearchContext* ctx, unsigned long long key, unsigned int int_color, Bits b, Bits w, unsigned int depth, double score, double alpha, double beta, Bits move) noexcept nogil:
+    """_store
+           置き換え方針 : 古い世代の結果 > 同一局面 > 探索深さが同じか深い
+    """
+    cdef:
+        TTEntry* entry = &ctx.tt_entries[key % ctx.tt_count]
+    if entry.generation != ctx.tt_generation or (_is_equal(entry.black, b) and _is_equal(entry.white, w) and entry.color == int_color) or depth >= entry.depth:
+        entry.black = b
+        entry.white = w
+        entry.color = <unsigned char>int_color
+        entry.depth = <unsigned char>depth
+        entry.generation = ctx.tt_generation
+        entry.move = NO_MOVE
+        if not _is_zero(move):
+            entry.move = <unsigned short>_get_index(move)
+        if score <= alpha:
+            entry.lower = NEGATIVE_INFINITY
+            entry.upper = score
+        elif score >= beta:
+            entry.lower = score
+            entry.upper = POSITIVE_INFINITY
+        else:
+            entry.lower = score
+            entry.upper = score
+        ctx.tt_stores += 1
+
+
+cdef inline tuple _next_move(str color, board, signed int param_min, signed int param_max, int depth, evaluator, str pid, int timer, int measure, tt, result):
+    cdef:
+        SearchContext context
+        SearchContext* ctx = &context
+        double alpha = param_min, beta = param_max
+        Bits legal_moves
+        Bits[MAX_SQUARES] legal_moves_bit_list
+        unsigned int[MAX_SQUARES] legal_moves_x
+        unsigned int[MAX_SQUARES] legal_moves_y
+        unsigned int int_color = 0
+        unsigned int index = 0
+        unsigned char[::1] tt_table = None
+        unsigned char[::1] cancel_flag = None
+        unsigned long long nodes = 0
+    ctx.measure_count = 0
+    ctx.timer_timeout = <unsigned int>0
+    token = Timer.tokens.get(pid) if timer and pid else None  # 他のスレッドからの中止要求
+    if token is not None:
+        cancel_flag = token.flag
+    _begin_timer(ctx, timer, pid, token, cancel_flag)
+    if measure and pid:
+        if pid not in Measure.count:
+            Measure.count[pid] = 0
+        ctx.measure_count = Measure.count[pid]
+    nodes = ctx.measure_count
+    if color == 'black':
+        int_color = <unsigned int>1
+    ctx.board_size = board.size
+    b, w, h = board.get_bitboard_info()
+    legal_moves = _get_legal_moves_bits(ctx, int_color, _from_int(b), _from_int(w), _from_int(h))
+    index = _get_moves_list(ctx.board_size, legal_moves, legal_moves_bit_list, legal_moves_x, legal_moves_y)
+    if tt is not None:
+        tt_table = tt.table
+    _begin_transposition_table(ctx, tt, tt_table)
+    best_move, scores = _get_best_move(ctx, int_color, board, index, legal_moves_bit_list, legal_moves_x, legal_moves_y, alpha, beta, depth, evaluator, timer)
+    _end_result(ctx, result, nodes, best_move, scores)
+    _end_transposition_table(ctx, tt)
+    if measure and pid:
+        Measure.count[pid] = ctx.measure_count
+    if timer and pid and ctx.timer_timeout:
+        Timer.timeout_flag[pid] = True  # タイムアウト発生
+    return best_move
+
+
+cdef inline _get_best_move_wrap(str color, board, moves, double alpha, double beta, int depth, evaluator, str pid, int timer, int measure, tt, result):
+    cdef:
+        SearchContext context
+        SearchContext* ctx = &context
+        Bits[MAX_SQUARES] legal_moves_bit_list
+        unsigned int[MAX_SQUARES] legal_moves_x
+        unsigned int[MAX_SQUARES] legal_moves_y
+        unsigned int x, y, index = 0, int_color = 0
+        unsigned char[::1] tt_table = None
+        unsigned char[::1] cancel_flag = None
+        unsigned long long nodes = 0
+    ctx.measure_count = 0
+    ctx.timer_timeout = <unsigned int>0
+    token = Timer.tokens.get(pid) if timer and pid else None  # 他のスレッドからの中止要求
+    if token is not None:
+        cancel_flag = token.flag
+    _begin_timer(ctx, timer, pid, token, cancel_flag)
+    if measure and pid:
+        if pid not in Measure.count:
+            Measure.count[pid] = 0
+        ctx.measure_count = Measure.count[pid]
+    nodes = ctx.measure_count
+    ctx.board_size = board.size
+    for x, y in moves:
+        legal_moves_bit_list[index] = _get_put(ctx.board_size*ctx.board_size-1-(y*ctx.board_size+x))
+        legal_moves_x[index] = x
+        legal_moves_y[index] = y
+        index += 1
+    if color == 'black':
+        int_color = <unsigned int>1
+    if tt is not None:
+        tt_table = tt.table
+    _begin_transposition_table(ctx, tt, tt_table)
+    best_move, scores = _get_best_move(ctx, int_color, board, index, legal_moves_bit_list, legal_moves_x, legal_moves_y, alpha, beta, depth, evaluator, timer)
+    _end_result(ctx, result, nodes, best_move, scores)
+    _end_transposition_table(ctx, tt)
+    if measure and pid:
+        Measure.count[pid] = ctx.measure_count
+    if timer and pid and ctx.timer_timeout:
+        Timer.timeout_flag[pid] = True  # タイムアウト発生
+    return (best_move, scores)
+
+
+cdef inline _end_result(SearchContext* ctx, result, unsigned long long nodes, best_move, dict scores):
+    """_end_result
+           探索結果(SearchResult)にノード数、置換表の統計、各手の評価値、最善手順(最善手のみ)を記録する
+    """
+    if result is not None:
+        result.nodes += ctx.measure_count - nodes
+        result.tt_probes += ctx.tt_probes
+        result.tt_hits += ctx.tt_hits
+        result.scores = scores
+        result.pv = [best_move] if best_move is not None else []
+
+
+cdef inline _get_best_move(SearchContext* ctx, unsigned int int_color, board, unsigned int index, Bits* moves_bit_list, unsigned int* moves_x, unsigned int* moves_y, double alpha, double beta, int depth, evaluator, int timer):
+    cdef:
+        double score = alpha
+        unsigned int int_color_next = 1, i, best = MAX_SQUARES
+    scores = {}
+    # 手番
+    if int_color:
+        int_color_next = <unsigned int>0
+    ctx.board = <PyObject*>board
+    ctx.evaluator = <PyObject*>evaluator
+    # ボード情報取得
+    board_bb, board_wb, board_hb = board.get_bitboard_info()
+    ctx.bb = _from_int(board_bb)
+    ctx.wb = _from_int(board_wb)
+    ctx.hb = _from_int(board_hb)
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
+    ctx.tail = 0
+    # ボード情報退避
+    board_bs = ctx.bs
+    board_ws = ctx.ws
+    # 各手のスコア取得
+    for i in range(index):
+        with nogil:  # 探索中はGILを解放する(評価関数を呼ぶ時だけGILを取る)
+            _put_disc(ctx, int_color, moves_bit_list[i])
+            score = -_get_score(ctx, int_color_next, -beta, -alpha, depth-1, timer, <unsigned int>0)
+            _undo(ctx)
+        scores[(moves_x[i], moves_y[i])] = score
+        if ctx.timer_timeout:  # タイムアウト判定
+            if best == MAX_SQUARES:
+                best = i
+            break
+        if score > alpha:  # 最善手を更新
+            alpha = score
+            best = i
+    # ボードを元に戻す
+    board._black_bitboard = board_bb
+    board._white_bitboard = board_wb
+    board._black_score = board_bs
+    board._white_score = board_ws
+    if best == MAX_SQUARES:  # alphaを超える手がない場合
+        return None, scores
+    return (moves_x[best], moves_y[best]), scores
+
+
+cdef inline double _get_time() noexcept nogil:
+    """_get_time
+           現在時刻(time.time()と同じ基準)をGILを取らずに返す
+    """
+    cdef:
+        timespec ts
+    timespec_get(&ts, TIME_UTC)
+    return <double>ts.tv_sec + <double>ts.tv_nsec * 1e-9
+
+
+cdef inline void _begin_timer(SearchContext* ctx, int timer, str pid, token, unsigned char[::1] cancel_flag):
+    """_begin_timer
+           タイムアウトする時刻を単調増加する時計に換算し、他のスレッドからの中止要求を参照できるようにする
+    """
+    ctx.timer_countdown = 0
+    ctx.timer_interval = TIMER_CHECK_INTERVAL
+    ctx.cancel_flag = NULL
+    ctx.cancel_event = NULL
+    if timer and pid:
+        ctx.timer_deadline = _monotonic_time() + (Timer.deadline[pid] - _get_time())
+        ctx.timer_timeout_value = Timer.timeout_value[pid]
+        if token is not None:
+            ctx.timer_interval = token.interval
+            ctx.cancel_flag = &cancel_flag[0]
+            if token.event is not None:
+                ctx.cancel_event = <PyObject*>token.event
+
+
+cdef inline bint _is_event_set(PyObject* event) noexcept nogil:
+    """_is_event_set
+    """
+    with gil:
+        return (<object>event).is_set()
+
+
+cdef inline signed int check_timeout(SearchContext* ctx) noexcept nogil:
+    """check_timeout
+           TIMER_CHECK_INTERVALノード毎に、タイムアウトと中止要求を確認する
+    """
+    if ctx.timer_timeout:
+        return ctx.timer_timeout_value
+    if ctx.timer_countdown:
+        ctx.timer_countdown -= 1
+        return <signed int>0
+    ctx.timer_countdown = ctx.timer_interval - 1
+    if _monotonic_time() > ctx.timer_deadline or (ctx.cancel_flag != NULL and ctx.cancel_flag[0]) or (ctx.cancel_event != NULL and _is_event_set(ctx.cancel_event)):
+        ctx.timer_timeout = <unsigned int>1
+        return ctx.timer_timeout_value
+    return <signed int>0
+
+
+cdef inline double _evaluate(SearchContext* ctx, unsigned int int_color, unsigned int legal_moves_b, unsigned int legal_moves_w) except? EVALUATE_ERROR:
+    """_evaluate
+           探索中の盤面をボードに反映して評価関数を呼ぶ(GILを持って呼ぶ)
+    """
+    board = <object>ctx.board
+    board._black_bitboard = _to_int(ctx.bb)
+    board._white_bitboard = _to_int(ctx.wb)
+    board._black_score = ctx.bs
+    board._white_score = ctx.ws
+    board._flippable_discs_num = _to_int(ctx.fd)
+    return (<object>ctx.evaluator).evaluate('black' if int_color else 'white', board, legal_moves_b, legal_moves_w)
+
+
+cdef inline double _get_score(SearchContext* ctx, unsigned int int_color, double alpha, double beta, unsigned int depth, int t, unsigned int pas) except? EVALUATE_ERROR nogil:
+    """_get_score
+           GILを取らずに探索する(評価関数を呼ぶ時だけGILを取る)
+    """
+    cdef:
+        signed int timeout
+        double score, alpha_ini
+        Bits legal_moves_b_bits, legal_moves_w_bits, legal_moves_bits, move, tt_move, best_move
+        unsigned long long key = 0
+        unsigned int i, is_game_end = 0, int_color_next = 1, use_tt = 0, has_tt_move = 0
+        signed int sign = -1
+        TTEntry* entry
+    # タイムアウト判定
+    if t:
+        timeout = check_timeout(ctx)
+        if timeout:
+            return timeout
+    # 探索ノード数カウント
+    ctx.measure_count += 1
+    # 合法手を取得
+    legal_moves_bits = _get_legal_moves_bits(ctx, int_color, ctx.bb, ctx.wb, ctx.hb)
+    # 前回パス and 打てる場所なし の場合ゲーム終了
+    if pas and _is_zero(legal_moves_bits):
+        is_game_end = <unsigned int>1
+    # 最大深さに到達 or ゲーム終了
+    if not depth or is_game_end:
+        if int_color:
+            legal_moves_b_bits = legal_moves_bits
+            legal_moves_w_bits = _get_legal_moves_bits(ctx, <unsigned int>0, ctx.bb, ctx.wb, ctx.hb)
+            sign = <signed int>1
+        else:
+            legal_moves_b_bits = _get_legal_moves_bits(ctx, <unsigned int>1, ctx.bb, ctx.wb, ctx.hb)
+            legal_moves_w_bits = legal_moves_bits
+        with gil:
+            score = _evaluate(ctx, int_color, _popcount(legal_moves_b_bits), _popcount(legal_moves_w_bits))
+        return score * sign
+    # 次の手番
+    if int_color:
+        int_color_next = <unsigned int>0
+    # パスの場合
+    if _is_zero(legal_moves_bits):
+        return -_get_score(ctx, int_color_next, -beta, -alpha, depth, t, <unsigned int>1)
+    # 置換表に結果が存在する場合、その値を返す
+    tt_move = _get_zero()
+    best_move = _get_zero()
+    if ctx.tt_entries != NULL and depth >= TRANSPOSITION_TABLE_DEPTH:
+        use_tt = <unsigned int>1
+        key = _get_hash(int_color, ctx.bb, ctx.wb)
+        entry = _probe(ctx, key, int_color, ctx.bb, ctx.wb)
+        if entry != NULL:
+            if entry.depth >= depth:
+                if entry.lower >= beta:
+                    return entry.lower
+                if entry.upper <= alpha:
+                    return entry.upper
+                if entry.lower == entry.upper:
+                    return entry.lower
+            if entry.move != NO_MOVE:
+                move = _get_put(entry.move)
+                if not _is_zero(_and(legal_moves_bits, move)):
+                    tt_move = move  # 置換表の最善手から評価する
+                    has_tt_move = <unsigned int>1
+    alpha_ini = alpha
+    # 評価値を算出
+    while not _is_zero(legal_moves_bits):
+        if has_tt_move:
+            move = tt_move
+            has_tt_move = <unsigned int>0
+        else:
+            move = _get_lowest(legal_moves_bits)  # 一番右のONしているビットのみ取り出す
+        _put_disc(ctx, int_color, move)
+        score = -_get_score(ctx, int_color_next, -beta, -alpha, depth-1, t, <unsigned int>0)
+        _undo(ctx)
+        legal_moves_bits = _xor(legal_moves_bits, move)  # 一番右のONしているビットをOFFする
+        if score > alpha:
+            alpha = score
+            best_move = move
+        if ctx.timer_timeout:
+            return alpha
+        if alpha >= beta:  # 枝刈り
+            break
+    # 置換表に結果を格納
+    if use_tt:
+        _store(ctx, key, int_color, ctx.bb, ctx.wb, depth, alpha, alpha_ini, beta, best_move)
+    return alpha
+
+
+cdef inline unsigned long long _perft_wrap(str color, board, unsigned int depth):
+    cdef:
+        SearchContext context
+        SearchContext* ctx = &context
+        unsigned int int_color
+        unsigned long long count
+    ctx.board_size = board.size
+    board_bb, board_wb, board_hb = board.get_bitboard_info()
+    ctx.bb = _from_int(board_bb)
+    ctx.wb = _from_int(board_wb)
+    ctx.hb = _from_int(board_hb)
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
+    ctx.tail = 0
+    int_color = <unsigned int>1 if color == 'black' else <unsigned int>0
+    with nogil:
+        count = _perft(ctx, int_color, depth, <unsigned int>0)
+    return count
+
+
+cdef inline unsigned long long _perft(SearchContext* ctx, unsigned int int_color, unsigned int depth, unsigned int pas) noexcept nogil:
+    """_perft
+    """
+    cdef:
+        Bits legal_moves_bits, move
+        unsigned long long count = 0
+        unsigned int int_color_next = 1
+    if not depth:
+        return 1
+    if int_color:
+        int_color_next = <unsigned int>0
+    legal_moves_bits = _get_legal_moves_bits(ctx, int_color, ctx.bb, ctx.wb, ctx.hb)
+    # パスの場合
+    if _is_zero(legal_moves_bits):
+        if pas:
+            return 1  # ゲーム終了
+        return _perft(ctx, int_color_next, depth-1, <unsigned int>1)
+    while not _is_zero(legal_moves_bits):
+        move = _get_lowest(legal_moves_bits)  # 一番右のONしているビットのみ取り出す
+        _put_disc(ctx, int_color, move)
+        count += _perft(ctx, int_color_next, depth-1, <unsigned int>0)
+        _undo(ctx)
+        legal_moves_bits = _xor(legal_moves_bits, move)  # 一番右のONしているビットをOFFする
+    return count
+
+
+cdef inline unsigned int _get_moves_list(unsigned int size, Bits legal_moves, Bits* moves_bit_list, unsigned int* moves_x, unsigned int* moves_y) noexcept nogil:
+    """_get_moves_list
+           合法手のビットと座標を左上から順に格納し、その数を返す(立っているビットの数だけ処理する)
+    """
+    cdef:
+        unsigned long long limb, lowest
+        unsigned int i, index, square, count = _popcount(legal_moves)
+    i = count
+    for index in range(MAX_LIMBS):
+        limb = legal_moves.limb[index]
+        while limb:
+            lowest = limb & (~limb + 1)  # 下位ビットから取り出し、後ろから格納する
+            square = index * 64 + <unsigned int>_popcount_64bit(lowest - 1)
+            i -= 1
+            moves_bit_list[i] = _get_put(square)
+            moves_x[i] = (size * size - 1 - square) % size
+            moves_y[i] = (size * size - 1 - square) // size
+            limb ^= lowest
+    return count
+
+
+cdef inline Bits _get_legal_moves_bits(SearchContext* ctx, unsigned int int_color, Bits b, Bits w, Bits h) noexcept nogil:
+    """_get_legal_moves_bits
+    """
+    cdef:
+        unsigned int i, j, shift_size, size = ctx.board_size
+        Bits player = w, opponent = b
+        Bits blank, masked, tmp, prev, legal_moves
+    if int_color:
+        player = b
+        opponent = w
+    blank = _andnot(mask_full[size], _or(_or(player, opponent), h))
+    legal_moves = _get_zero()
+    for i in range(4):
+        masked = _and(opponent, mask_line[size][i])
+        shift_size = shift_line[size][i]
+        tmp = _and(masked, _or(_shl(player, shift_size), _shr(player, shift_size)))
+        for j in range(size-3):
+            prev = tmp
+            tmp = _or(tmp, _and(masked, _or(_shl(tmp, shift_size), _shr(tmp, shift_size))))
+            if _is_equal(tmp, prev):
+                break
+        legal_moves = _or(legal_moves, _or(_shl(tmp, shift_size), _shr(tmp, shift_size)))
+    return _and(blank, legal_moves)
+
+
+cdef inline Bits _get_flippable_discs_num(SearchContext* ctx, unsigned int int_color, Bits b, Bits w, Bits move) noexcept nogil:
+    """_get_flippable_discs_num
+    """
+    cdef:
+        unsigned int i, size = ctx.board_size
+        Bits player = w, opponent = b
+        Bits tmp, check, flippable_discs_num
+    if int_color:
+        player = b
+        opponent = w
+    flippable_discs_num = _get_zero()
+    for i in range(8):
+        tmp = _get_zero()
+        if i < 4:
+            check = _and(_shl(move, shift_dir[size][i]), mask_dir[size][i])
+            while not _is_zero(_and(check, opponent)):
+                tmp = _or(tmp, check)
+                check = _and(_shl(check, shift_dir[size][i]), mask_dir[size][i])
+        else:
+            check = _and(_shr(move, shift_dir[size][i]), mask_dir[size][i])
+            while not _is_zero(_and(check, opponent)):
+                tmp = _or(tmp, check)
+                check = _and(_shr(check, shift_dir[size][i]), mask_dir[size][i])
+        if not _is_zero(_and(check, player)):
+            flippable_discs_num = _or(flippable_discs_num, tmp)
+    return flippable_discs_num
+
+
+cdef inline void _put_disc(SearchContext* ctx, unsigned int int_color, Bits move) noexcept nogil:
+    """_put_disc
+    """
+    cdef:
+        unsigned int count
+    # ひっくり返せる石を取得
+    ctx.fd = _get_flippable_discs_num(ctx, int_color, ctx.bb, ctx.wb, move)
+    count = _popcount(ctx.fd)
+    # 打つ前の状態を格納
+    ctx.pbb[ctx.tail] = ctx.bb
+    ctx.pwb[ctx.tail] = ctx.wb
+    ctx.pbs[ctx.tail] = ctx.bs
+    ctx.pws[ctx.tail] = ctx.ws
+    ctx.tail += 1
+    # 自分の石を置いて相手の石をひっくり返す
+    if int_color:
+        ctx.bb = _xor(ctx.bb, _or(move, ctx.fd))
+        ctx.wb = _xor(ctx.wb, ctx.fd)
+        ctx.bs += <unsigned int>1 + count
+        ctx.ws -= count
+    else:
+        ctx.wb = _xor(ctx.wb, _or(move, ctx.fd))
+        ctx.bb = _xor(ctx.bb, ctx.fd)
+        ctx.bs -= count
+        ctx.ws += <unsigned int>1 + count
+
+
+cdef inline void _undo(SearchContext* ctx) noexcept nogil:
+    """_undo
+    """
+    ctx.tail -= 1
+    ctx.bb = ctx.pbb[ctx.tail]
+    ctx.wb = ctx.pwb[ctx.tail]
+    ctx.bs = ctx.pbs[ctx.tail]
+    ctx.ws = ctx.pws[ctx.tail]
+
+
+cdef inline Bits _from_int(value):
+    """_from_int
+           整数を64bit単位に分割する
+    """
+    cdef:
+        unsigned int i
+        Bits ret
+    for i in range(MAX_LIMBS):
+        ret.limb[i] = value & 0xFFFFFFFFFFFFFFFF
+        value >>= 64
+    return ret
+
+
+cdef inline _to_int(Bits bits):
+    """_to_int
+           64bit単位の値を整数に戻す
+    """
+    return (<object>bits.limb[3] << 192) | (<object>bits.limb[2] << 128) | (<object>bits.limb[1] << 64) | <object>bits.limb[0]
+
+
+cdef inline Bits _get_zero() noexcept nogil:
+    """_get_zero
+    """
+    cdef:
+        unsigned int i
+        Bits ret
+    for i in range(MAX_LIMBS):
+        ret.limb[i] = 0
+    return ret
+
+
+cdef inline Bits _get_put(unsigned int index) noexcept nogil:
+    """_get_put
+           指定位置のビットのみ立てた値を返す
+    """
+    cdef:
+        Bits ret = _get_zero()
+    ret.limb[index >> 6] = <unsigned long long>1 << (index & 63)
+    return ret
+
+
+cdef inline unsigned int _get_index(Bits bits) noexcept nogil:
+    """_get_index
+           一番右のONしているビットの位置を返す
+    """
+    cdef:
+        unsigned int i
+    for i in range(MAX_LIMBS):
+        if bits.limb[i]:
+            return (i << 6) + <unsigned int>_popcount_64bit((bits.limb[i] & (~bits.limb[i]+1)) - 1)
+    return NO_MOVE
+
+
+cdef inline Bits _get_lowest(Bits bits) noexcept nogil:
+    """_get_lowest
+           一番右のONしているビットのみ取り出す
+    """
+    cdef:
+        unsigned int i
+        Bits ret = _get_zero()
+    for i in range(MAX_LIMBS):
+        if bits.limb[i]:
+            ret.limb[i] = bits.limb[i] & (~bits.limb[i]+1)
+            break
+    return ret
+
+
+cdef inline unsigned int _test(Bits bits, unsigned int index) noexcept nogil:
+    """_test
+           指定位置のビットが立っているか
+    """
+    return (bits.limb[index >> 6] >> (index & 63)) & 1
+
+
+cdef inline unsigned int _is_zero(Bits bits) noexcept nogil:
+    """_is_zero
+    """
+    return not (bits.limb[0] | bits.limb[1] | bits.limb[2] | bits.limb[3])
+
+
+cdef inline unsigned int _is_equal(Bits a, Bits b) noexcept nogil:
+    """_is_equal
+    """
+    return a.limb[0] == b.limb[0] and a.limb[1] == b.limb[1] and a.limb[2] == b.limb[2] and a.limb[3] == b.limb[3]
+
+
+cdef inline Bits _and(Bits a, Bits b) noexcept nogil:
+    """_and
+    """
+    cdef:
+        unsigned int i
+    for i in range(MAX_LIMBS):
+        a.limb[i] &= b.limb[i]
+    return a
+
+
+cdef inline Bits _or(Bits a, Bits b) noexcept nogil:
+    """_or
+    """
+    cdef:
+        unsigned int i
+    for i in range(MAX_LIMBS):
+        a.limb[i] |= b.limb[i]
+    return a
+
+
+cdef inline Bits _xor(Bits a, Bits b) noexcept nogil:
+    """_xor
+    """
+    cdef:
+        unsigned int i
+    for i in range(MAX_LIMBS):
+        a.limb[i] ^= b.limb[i]
+    return a
+
+
+cdef inline Bits _andnot(Bits a, Bits b) noexcept nogil:
+    """_andnot
+           a & ~b
+    """
+    cdef:
+        unsigned int i
+    for i in range(MAX_LIMBS):
+        a.limb[i] &= ~b.limb[i]
+    return a
+
+
+cdef inline Bits _shl(Bits a, unsigned int n) noexcept nogil:
+    """_shl
+           左シフト(1 <= n < 64)
+    """
+    a.limb[3] = (a.limb[3] << n) | (a.limb[2] >> (64 - n))
+    a.limb[2] = (a.limb[2] << n) | (a.limb[1] >> (64 - n))
+    a.limb[1] = (a.limb[1] << n) | (a.limb[0] >> (64 - n))
+    a.limb[0] = a.limb[0] << n
+    return a
+
+
+cdef inline Bits _shr(Bits a, unsigned int n) noexcept nogil:
+    """_shr
+           右シフト(1 <= n < 64)
+    """
+    a.limb[0] = (a.limb[0] >> n) | (a.limb[1] << (64 - n))
+    a.limb[1] = (a.limb[1] >> n) | (a.limb[2] << (64 - n))
+    a.limb[2] = (a.limb[2] >> n) | (a.limb[3] << (64 - n))
+    a.limb[3] = a.limb[3] >> n
+    return a
+
+
+cdef inline unsigned int _popcount(Bits bits) noexcept nogil:
+    """_popcount
+    """
+    cdef:
+        unsigned int i, count = 0
+    for i in range(MAX_LIMBS):
+        count += <unsigned int>_popcount_64bit(bits.limb[i])
+    return count
+
+
+cdef inline unsigned long long _popcount_64bit(unsigned long long bits) noexcept nogil:
+    """_popcount_64bit
+    """
+    bits = bits - ((bits >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
+    bits = (bits & <unsigned long long>0x3333333333333333) + ((bits >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
+    bits = (bits + (bits >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
+    bits = bits + (bits >> <unsigned int>8)
+    bits = bits + (bits >> <unsigned int>16)
+    return (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
@@ -2,105 +2,472 @@
 """Next Move(Size8,64bit) of AlphaBeta strategy
 """
 
-import time
+from libc.time cimport timespec, timespec_get, TIME_UTC
+from cpython.ref cimport PyObject
 
 from reversi.strategies.common import Timer, Measure
+from reversi.BitBoardMethods.BitMask import get_bit_mask
+
+
+cdef extern from *:
+    """
+    #ifdef _WIN32
+    #include <windows.h>
+    static double _monotonic_time(void) {
+        LARGE_INTEGER count, frequency;
+        QueryPerformanceCounter(&count);
+        QueryPerformanceFrequency(&frequency);
+        return (double)count.QuadPart / (double)frequency.QuadPart;
+    }
+    #else
+    #include <time.h>
+    static double _monotonic_time(void) {
+        struct timespec ts;
+        clock_gettime(CLOCK_MONOTONIC, &ts);
+        return (double)ts.tv_sec + (double)ts.tv_nsec * 1e-9;
+    }
+    #endif
+    """
+    double _monotonic_time() nogil  # 単調増加する時計(s)
+
+
+DEF TIMER_CHECK_INTERVAL = 1024  # 時間と中止要求を確認するノード数の間隔(CancelTokenを使わない場合)
+DEF POSITIVE_INFINITY = 10000000
+DEF NEGATIVE_INFINITY = -10000000
+DEF TRANSPOSITION_TABLE_DEPTH = 2  # 置換表を有効にする残りの探索深さ
+DEF NO_MOVE = 64
+DEF EVALUATE_ERROR = -1.0e300  # 評価関数で例外が発生した時の戻り値(GILを取って例外を確認する)
+
+
+ctypedef struct TTEntry:
+    unsigned long long black
+    unsigned long long white
+    double lower
+    double upper
+    unsigned int generation
+    unsigned char depth
+    unsigned char color
+    unsigned char move
+    unsigned char reserved
+
+
+ctypedef struct OrderingTable:  # 探索中の手の並び替えに使う表(Orderer_KHのtableを参照する)
+    unsigned int killer[64][2]           # 手数毎のキラー手(マスの番号+1、0は無し)
+    unsigned long long history[2][64]    # 手番とマス毎のヒストリー値
+
+
+ctypedef struct SearchContext:  # 探索毎の状態(探索毎に持つため、複数の探索を同時に実行できる)
+    unsigned long long bb                # 黒のビットボード
+    unsigned long long wb                # 白のビットボード
+    unsigned long long hb                # 穴のビットボード
+    unsigned long long fd                # 直前にひっくり返した石
+    unsigned long long pbb[64]           # 打つ前の黒のビットボード
+    unsigned long long pwb[64]           # 打つ前の白のビットボード
+    unsigned int bs                      # 黒の石数
+    unsigned int ws                      # 白の石数
+    unsigned int pbs[64]                 # 打つ前の黒の石数
+    unsigned int pws[64]                 # 打つ前の白の石数
+    unsigned int tail                    # 退避した手数
+    unsigned int board_size              # ボードサイズ(4,6,8)
+    unsigned long long measure_count     # 探索ノード数
+    double timer_deadline                # タイムアウトする時刻(単調増加する時計)
+    unsigned int timer_timeout           # タイムアウト発生
+    signed int timer_timeout_value       # タイムアウト時に返す評価値
+    unsigned int timer_interval          # 時間と中止要求を確認するノード数の間隔
+    unsigned int timer_countdown         # 次に確認するまでのノード数
+    unsigned char* cancel_flag           # 中止要求(CancelToken.flag、NULLなら無し)
+    PyObject* cancel_event               # 中止要求のイベント(CancelToken.event、NULLなら無し)
+    PyObject* board                      # 評価に使うボード(葉でGILを取って参照する)
+    PyObject* evaluator                  # 評価関数(葉でGILを取って呼ぶ)
+    TTEntry* tt_entries                  # 置換表(NULLなら使用しない)
+    unsigned long long tt_count
+    unsigned int tt_generation
+    unsigned int tt_persist
+    unsigned long long tt_probes
+    unsigned long long tt_hits
+    unsigned long long tt_stores
+    OrderingTable* ot                    # 手の並び替えに使う表(NULLなら使用しない)
+    unsigned int use_killer              # キラー手を優先する
+    unsigned int use_history             # ヒストリー値の高い手を優先する
+    unsigned long long cutoffs           # 枝刈りの回数
+    unsigned long long first_cutoffs     # 最初の手で枝刈りした回数
 
 
 cdef:
-    unsigned long long measure_count
-    unsigned long long[64] legal_moves_bit_list
-    unsigned int[64] legal_moves_x
-    unsigned int[64] legal_moves_y
-    unsigned long long bb
-    unsigned long long wb
-    unsigned long long hb
-    unsigned long long fd
-    unsigned long long[64] pbb
-    unsigned long long[64] pwb
-    unsigned int bs
-    unsigned int ws
-    unsigned int[64] pbs
-    unsigned int[64] pws
-    unsigned int tail
-    double timer_deadline
-    unsigned int timer_timeout
-    signed int timer_timeout_value
-
-
-def next_move(color, board, param_min, param_max, depth, evaluator, pid, timer, measure):
+    unsigned long long[16][256] zobrist
+    unsigned long long zobrist_color
+    unsigned long long[9] mask_h       # 水平方向のマスク値(サイズ毎)
+    unsigned long long[9] mask_v       # 垂直方向のマスク値(サイズ毎)
+    unsigned long long[9] mask_d       # 斜め方向のマスク値(サイズ毎)
+    unsigned long long[9][8] mask_dir  # 上,右上,左,左上(左シフト),右,右下,下,左下(右シフト)のマスク値(サイズ毎)
+    unsigned int[9][8] shift_dir       # 上記8方向のシフト量(サイズ毎)
+
+
+cdef inline void _init_geometry():
+    """_init_geometry
+           サイズ4,6のマスク値とシフト量を設定する(サイズ8は定数を使用)
+    """
+    global mask_h, mask_v, mask_d, mask_dir, shift_dir
+    cdef:
+        unsigned int size, i
+    for size in (4, 6):
+        mask = get_bit_mask(size)
+        mask_h[size] = mask.h
+        mask_v[size] = mask.v
+        mask_d[size] = mask.d
+        for i, (direction_mask, shift_size) in enumerate(((mask.u, size), (mask.ur, size-1), (mask.l, 1), (mask.ul, size+1), (mask.r, 1), (mask.br, size+1), (mask.b, size), (mask.bl, size-1))):
+            mask_dir[size][i] = direction_mask
+            shift_dir[size][i] = shift_size
+
+
+_init_geometry()
+
+
+def next_move(color, board, param_min, param_max, depth, evaluator, pid, timer, measure, tt=None, orderer=None, result=None):
     """next_move
     """
     if pid is None:
         timer, measure = False, False
-    return _next_move(color, board, param_min, param_max, depth, evaluator, pid, timer, measure)
+    return _next_move(color, board, param_min, param_max, depth, evaluator, pid, timer, measure, tt, orderer, result)
 
 
-def get_best_move(color, board, moves, alpha, beta, depth, evaluator, pid, timer, measure):
+def get_best_move(color, board, moves, alpha, beta, depth, evaluator, pid, timer, measure, tt=None, orderer=None, result=None):
     """get_best_move
     """
     if pid is None:
         timer, measure = False, False
-    return _get_best_move_wrap(color, board, moves, alpha, beta, depth, evaluator, pid, timer, measure)
+    return _get_best_move_wrap(color, board, moves, alpha, beta, depth, evaluator, pid, timer, measure, tt, orderer, result)
+
+
+def iterative_deepening(color, board, moves, depth, limit, window, evaluator, pid, timer, measure, tt=None, orderer=None, result=None):
+    """iterative_deepening
+           反復深化(2回目以降は前回の評価値を中心とした窓で、前回の最善手から探索する)
+           (最善手, 各手の評価値, 読んだ深さ)を返す
+    """
+    if pid is None:
+        timer, measure = False, False
+    return _iterative_deepening_wrap(color, board, moves, depth, limit, window, evaluator, pid, timer, measure, tt, orderer, result)
+
+
+def perft(color, board, depth):
+    """perft
+           指定した深さまでの末端局面数を数える(パスも1手、深さ到達前のゲーム終了は1局面として数える)
+    """
+    return _perft_wrap(color, board, depth)
+
+
+cdef inline unsigned long long _splitmix64(unsigned long long* state) noexcept nogil:
+    """_splitmix64
+    """
+    cdef:
+        unsigned long long z
+    state[0] += <unsigned long long>0x9E3779B97F4A7C15
+    z = state[0]
+    z = (z ^ (z >> <unsigned int>30)) * <unsigned long long>0xBF58476D1CE4E5B9
+    z = (z ^ (z >> <unsigned int>27)) * <unsigned long long>0x94D049BB133111EB
+    return z ^ (z >> <unsigned int>31)
+
+
+cdef inline void _init_zobrist():
+    """_init_zobrist
+    """
+    global zobrist, zobrist_color
+    cdef:
+        unsigned int i, j
+        unsigned long long state = 0x5265766572736921  # 固定シード
+    for i in range(16):
+        for j in range(256):
+            zobrist[i][j] = _splitmix64(&state)
+    zobrist_color = _splitmix64(&state)
 
 
-cdef inline tuple _next_move(str color, board, signed int param_min, signed int param_max, int depth, evaluator, str pid, int timer, int measure):
-    global timer_deadline, timer_timeout, timer_timeout_value, measure_count, legal_moves_bit_list, legal_moves_x, legal_moves_y
+_init_zobrist()
+
+
+cdef inline unsigned long long _get_hash(unsigned int int_color, unsigned long long b, unsigned long long w) noexcept nogil:
+    """_get_hash
+           8bit単位のZobristハッシュ
+    """
     cdef:
+        unsigned int i
+        unsigned long long key = 0
+    if int_color:
+        key = zobrist_color
+    for i in range(8):
+        key ^= zobrist[i][(b >> (i * 8)) & <unsigned long long>0xFF]
+        key ^= zobrist[i+8][(w >> (i * 8)) & <unsigned long long>0xFF]
+    return key
+
+
+cdef inline void _begin_transposition_table(SearchContext* ctx, tt, unsigned char[::1] table):
+    """_begin_transposition_table
+    """
+    ctx.tt_entries = NULL
+    ctx.tt_probes = 0
+    ctx.tt_hits = 0
+    ctx.tt_stores = 0
+    if table is not None and <unsigned long long>table.shape[0] >= sizeof(TTEntry):
+        ctx.tt_entries = <TTEntry*>&table[0]
+        ctx.tt_count = <unsigned long long>(table.shape[0] // sizeof(TTEntry))
+        ctx.tt_generation = <unsigned int>tt.generation
+        ctx.tt_persist = <unsigned int>tt.persist
+
+
+cdef inline void _end_transposition_table(SearchContext* ctx, tt):
+    """_end_transposition_table
+    """
+    if ctx.tt_entries != NULL:
+        tt.probes += ctx.tt_probes
+        tt.hits += ctx.tt_hits
+        tt.stores += ctx.tt_stores
+    ctx.tt_entries = NULL
+
+
+cdef inline TTEntry* _probe(SearchContext* ctx, unsigned long long key, unsigned int int_color, unsigned long long b, unsigned long long w) noexcept nogil:
+    """_probe
+    """
+    cdef:
+        TTEntry* entry = &ctx.tt_entries[key % ctx.tt_count]
+    ctx.tt_probes += 1
+    if entry.black == b and entry.white == w and entry.color == int_color and (ctx.tt_persist or entry.generation == ctx.tt_generation):
+        ctx.tt_hits += 1
+        return entry
+    return NULL
+
+
+cdef inline void _store(SearchContext* ctx, unsigned long long key, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned int depth, double score, double alpha, double beta, unsigned long long move) noexcept nogil:
+    """_store
+           置き換え方針 : 古い世代の結果 > 同一局面 > 探索深さが同じか深い
+    """
+    cdef:
+        TTEntry* entry = &ctx.tt_entries[key % ctx.tt_count]
+    if entry.generation != ctx.tt_generation or (entry.black == b and entry.white == w and entry.color == int_color) or depth >= entry.depth:
+        entry.black = b
+        entry.white = w
+        entry.color = <unsigned char>int_color
+        entry.depth = <unsigned char>depth
+        entry.generation = ctx.tt_generation
+        entry.move = NO_MOVE
+        if move:
+            entry.move = <unsigned char>_popcount(move - 1)
+        if score <= alpha:
+            entry.lower = NEGATIVE_INFINITY
+            entry.upper = score
+        elif score >= beta:
+            entry.lower = score
+            entry.upper = POSITIVE_INFINITY
+        else:
+            entry.lower = score
+            entry.upper = score
+        ctx.tt_stores += 1
+
+
+cdef inline _end_result(SearchContext* ctx, result, unsigned long long nodes, unsigned int int_color, best_move, dict scores, int depth):
+    """_end_result
+           探索結果(SearchResult)にノード数、置換表の統計、各手の評価値、最善手順を記録する
+    """
+    if result is not None:
+        result.nodes += ctx.measure_count - nodes
+        result.tt_probes += ctx.tt_probes
+        result.tt_hits += ctx.tt_hits
+        result.scores = scores
+        result.pv = _get_pv(ctx, int_color, best_move, depth)
+
+
+cdef inline list _get_pv(SearchContext* ctx, unsigned int int_color, best_move, int depth):
+    """_get_pv
+           最善手から置換表に記録した手を辿って最善手順を求める(置換表がない場合は最善手のみ、パスで打ち切る)
+    """
+    cdef:
+        list pv = []
+        unsigned int i, pos, count = 1, size = ctx.board_size
+        unsigned long long move
+        TTEntry* entry
+    if best_move is None:
+        return pv
+    pv.append(best_move)
+    if ctx.tt_entries == NULL:
+        return pv
+    _put_disc(ctx, int_color, <unsigned long long>1 << (size*size-1-(best_move[1]*size+best_move[0])))
+    int_color ^= 1
+    while <int>count < depth:
+        entry = &ctx.tt_entries[_get_hash(int_color, ctx.bb, ctx.wb) % ctx.tt_count]
+        if entry.black != ctx.bb or entry.white != ctx.wb or entry.color != int_color or entry.move == NO_MOVE or not (ctx.tt_persist or entry.generation == ctx.tt_generation):
+            break
+        move = <unsigned long long>1 << entry.move
+        if not (_get_legal_moves_bits(ctx, int_color, ctx.bb, ctx.wb, ctx.hb) & move):
+            break
+        pos = size*size-1-entry.move
+        pv.append((pos % size, pos // size))
+        _put_disc(ctx, int_color, move)
+        int_color ^= 1
+        count += 1
+    for i in range(count):
+        _undo(ctx)
+    return pv
+
+
+cdef inline void _begin_move_ordering(SearchContext* ctx, orderer, unsigned char[::1] table):
+    """_begin_move_ordering
+    """
+    ctx.ot = NULL
+    ctx.use_killer = 0
+    ctx.use_history = 0
+    ctx.cutoffs = 0
+    ctx.first_cutoffs = 0
+    if table is not None and <unsigned long long>table.shape[0] >= sizeof(OrderingTable):
+        ctx.ot = <OrderingTable*>&table[0]
+        ctx.use_killer = <unsigned int>orderer.killer
+        ctx.use_history = <unsigned int>orderer.history
+
+
+cdef inline void _end_move_ordering(SearchContext* ctx, orderer):
+    """_end_move_ordering
+    """
+    if ctx.ot != NULL:
+        orderer.cutoffs += ctx.cutoffs
+        orderer.first_cutoffs += ctx.first_cutoffs
+    ctx.ot = NULL
+
+
+cdef inline void _order_moves(SearchContext* ctx, unsigned int int_color, unsigned int count, unsigned long long[64] moves_list) noexcept nogil:
+    """_order_moves
+           ヒストリー値の高い順に並べ(同じ値は元の順番を保つ)、キラー手を先頭に移動する
+    """
+    cdef:
+        unsigned int i, j, k, square
+        unsigned long long move, value
+        unsigned long long[64] values
+    if ctx.use_history:
+        for i in range(count):
+            move = moves_list[i]
+            value = ctx.ot.history[int_color][_popcount(move - 1)]
+            j = i
+            while j and values[j-1] < value:
+                values[j] = values[j-1]
+                moves_list[j] = moves_list[j-1]
+                j -= 1
+            values[j] = value
+            moves_list[j] = move
+    if ctx.use_killer and ctx.tail < 64:
+        for k in range(1, -1, -1):  # 2番目、1番目の順に先頭に移動する
+            square = ctx.ot.killer[ctx.tail][k]
+            if square:
+                _move_to_front_bits(<unsigned long long>1 << (square - 1), count, moves_list)
+
+
+cdef inline void _move_to_front_bits(unsigned long long move, unsigned int count, unsigned long long[64] moves_list) noexcept nogil:
+    """_move_to_front_bits
+           指定した手を先頭に移動する(他の手の順番は変えない)
+    """
+    cdef:
+        unsigned int i, j
+    for i in range(count):
+        if moves_list[i] == move:
+            for j in range(i, 0, -1):
+                moves_list[j] = moves_list[j-1]
+            moves_list[0] = move
+            break
+
+
+cdef inline void _update_cutoff(SearchContext* ctx, unsigned int int_color, unsigned long long move, unsigned int depth, unsigned int first) noexcept nogil:
+    """_update_cutoff
+           枝刈りを起こした手をキラー手とヒストリーに記録する
+    """
+    cdef:
+        unsigned int square
+    ctx.cutoffs += 1
+    if first:
+        ctx.first_cutoffs += 1
+    if ctx.ot != NULL:
+        square = <unsigned int>_popcount(move - 1) + 1
+        if ctx.use_killer and ctx.tail < 64 and ctx.ot.killer[ctx.tail][0] != square:
+            ctx.ot.killer[ctx.tail][1] = ctx.ot.killer[ctx.tail][0]
+            ctx.ot.killer[ctx.tail][0] = square
+        if ctx.use_history:
+            ctx.ot.history[int_color][square - 1] += depth * depth
+
+
+cdef inline tuple _next_move(str color, board, signed int param_min, signed int param_max, int depth, evaluator, str pid, int timer, int measure, tt, orderer, result):
+    cdef:
+        SearchContext context
+        SearchContext* ctx = &context
+        unsigned long long[64] legal_moves_bit_list
+        unsigned int[64] legal_moves_x
+        unsigned int[64] legal_moves_y
         double alpha = param_min, beta = param_max
         unsigned long long b, w, h
         unsigned int int_color = 0
-        unsigned int x, y, index = 0
-        unsigned long long legal_moves, mask = 0x8000000000000000
-    measure_count = 0
-    timer_timeout = <unsigned int>0
-    if timer and pid:
-        timer_deadline = Timer.deadline[pid]
-        timer_timeout_value = Timer.timeout_value[pid]
+        unsigned int index = 0
+        unsigned long long legal_moves
+        unsigned char[::1] tt_table = None
+        unsigned char[::1] ot_table = None
+        unsigned char[::1] cancel_flag = None
+        unsigned long long nodes = 0
+    ctx.tail = 0
+    ctx.measure_count = 0
+    ctx.timer_timeout = <unsigned int>0
+    token = Timer.tokens.get(pid) if timer and pid else None  # 他のスレッドからの中止要求
+    if token is not None:
+        cancel_flag = token.flag
+    _begin_timer(ctx, timer, pid, token, cancel_flag)
     if measure and pid:
         if pid not in Measure.count:
             Measure.count[pid] = 0
-        measure_count = Measure.count[pid]
+        ctx.measure_count = Measure.count[pid]
+    nodes = ctx.measure_count
     if color == 'black':
         int_color = <unsigned int>1
+    ctx.board_size = board.size
     b, w, h = board.get_bitboard_info()
-    legal_moves = _get_legal_moves_bits(int_color, b, w, h)
-    for y in range(8):
-        for x in range(8):
-            if legal_moves & mask:
-                legal_moves_bit_list[index] = mask
-                legal_moves_x[index] = x
-                legal_moves_y[index] = y
-                index += 1
-            mask >>= 1
-    best_move, _ = _get_best_move(int_color, board, index, legal_moves_bit_list, legal_moves_x, legal_moves_y, alpha, beta, depth, evaluator, timer)
+    legal_moves = _get_legal_moves_bits(ctx, int_color, b, w, h)
+    index = _get_moves_list(ctx.board_size, legal_moves, legal_moves_bit_list, legal_moves_x, legal_moves_y)
+    if tt is not None:
+        tt_table = tt.table
+    _begin_transposition_table(ctx, tt, tt_table)
+    if orderer is not None:
+        ot_table = orderer.table
+    _begin_move_ordering(ctx, orderer, ot_table)
+    best_move, scores = _get_best_move(ctx, int_color, board, index, legal_moves_bit_list, legal_moves_x, legal_moves_y, alpha, beta, depth, evaluator, timer)
+    _end_result(ctx, result, nodes, int_color, best_move, scores, depth)
+    _end_transposition_table(ctx, tt)
+    _end_move_ordering(ctx, orderer)
     if measure and pid:
-        Measure.count[pid] = measure_count
-    if timer and pid and timer_timeout:
+        Measure.count[pid] = ctx.measure_count
+    if timer and pid and ctx.timer_timeout:
         Timer.timeout_flag[pid] = True  # タイムアウト発生
     return best_move
 
 
-cdef inline _get_best_move_wrap(str color, board, moves, double alpha, double beta, int depth, evaluator, str pid, int timer, int measure):
-    global timer_deadline, timer_timeout, timer_timeout_value, measure_count
+cdef inline _get_best_move_wrap(str color, board, moves, double alpha, double beta, int depth, evaluator, str pid, int timer, int measure, tt, orderer, result):
     cdef:
+        SearchContext context
+        SearchContext* ctx = &context
         unsigned long long[64] moves_bit_list
         unsigned int[64] moves_x
         unsigned int[64] moves_y
         unsigned int x, y, index = 0, int_color = 0
         unsigned long long put
         signed int lshift
-    measure_count = 0
-    timer_timeout = <unsigned int>0
-    if timer and pid:
-        timer_deadline = Timer.deadline[pid]
-        timer_timeout_value = Timer.timeout_value[pid]
+        unsigned char[::1] tt_table = None
+        unsigned char[::1] ot_table = None
+        unsigned char[::1] cancel_flag = None
+        unsigned long long nodes = 0
+    ctx.tail = 0
+    ctx.measure_count = 0
+    ctx.timer_timeout = <unsigned int>0
+    token = Timer.tokens.get(pid) if timer and pid else None  # 他のスレッドからの中止要求
+    if token is not None:
+        cancel_flag = token.flag
+    _begin_timer(ctx, timer, pid, token, cancel_flag)
     if measure and pid:
         if pid not in Measure.count:
             Measure.count[pid] = 0
-        measure_count = Measure.count[pid]
+        ctx.measure_count = Measure.count[pid]
+    nodes = ctx.measure_count
+    ctx.board_size = board.size
     for x, y in moves:
-        lshift = (63-(y*8+x))
+        lshift = (ctx.board_size*ctx.board_size-1-(y*ctx.board_size+x))
         put = <unsigned long long>1 << lshift
         moves_bit_list[index] = put
         moves_x[index] = x
@@ -108,16 +475,24 @@ cdef inline _get_best_move_wrap(str color, board, moves, double alpha, double be
         index += 1
     if color == 'black':
         int_color = <unsigned int>1
-    best_move, scores = _get_best_move(int_color, board, index, moves_bit_list, moves_x, moves_y, alpha, beta, depth, evaluator, timer)
+    if tt is not None:
+        tt_table = tt.table
+    _begin_transposition_table(ctx, tt, tt_table)
+    if orderer is not None:
+        ot_table = orderer.table
+    _begin_move_ordering(ctx, orderer, ot_table)
+    best_move, scores = _get_best_move(ctx, int_color, board, index, moves_bit_list, moves_x, moves_y, alpha, beta, depth, evaluator, timer)
+    _end_result(ctx, result, nodes, int_color, best_move, scores, depth)
+    _end_transposition_table(ctx, tt)
+    _end_move_ordering(ctx, orderer)
     if measure and pid:
-        Measure.count[pid] = measure_count
-    if timer and pid and timer_timeout:
+        Measure.count[pid] = ctx.measure_count
+    if timer and pid and ctx.timer_timeout:
         Timer.timeout_flag[pid] = True  # タイムアウト発生
     return (best_move, scores)
 
 
-cdef inline _get_best_move(unsigned int int_color, board, unsigned int index, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y, double alpha, double beta, int depth, evaluator, int timer):
-    global timer_timeout, bb, wb, hb, bs, ws
+cdef inline _get_best_move(SearchContext* ctx, unsigned int int_color, board, unsigned int index, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y, double alpha, double beta, int depth, evaluator, int timer):
     cdef:
         double score = alpha
         unsigned int int_color_next = 1, i, best = 64
@@ -125,23 +500,25 @@ cdef inline _get_best_move(unsigned int int_color, board, unsigned int index, un
     # 手番
     if int_color:
         int_color_next = <unsigned int>0
+    ctx.board = <PyObject*>board
+    ctx.evaluator = <PyObject*>evaluator
     # ボード情報取得
-    bb, wb, hb = board.get_bitboard_info()
-    bs = board._black_score
-    ws = board._white_score
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
     # ボード情報退避
-    board_bb = bb
-    board_wb = wb
-    board_bs = bs
-    board_ws = ws
-    board_prev = [(item[0], item[1], item[2], item[3]) for item in board.prev]
+    board_bb = ctx.bb
+    board_wb = ctx.wb
+    board_bs = ctx.bs
+    board_ws = ctx.ws
     # 各手のスコア取得
     for i in range(index):
-        _put_disc(int_color, moves_bit_list[i])
-        score = -_get_score(int_color_next, board, -beta, -alpha, depth-1, evaluator, timer, <unsigned int>0)
-        _undo()
+        with nogil:  # 探索中はGILを解放する(評価関数を呼ぶ時だけGILを取る)
+            _put_disc(ctx, int_color, moves_bit_list[i])
+            score = -_get_score(ctx, int_color_next, -beta, -alpha, depth-1, timer, <unsigned int>0)
+            _undo(ctx)
         scores[(moves_x[i], moves_y[i])] = score
-        if timer_timeout:  # タイムアウト判定
+        if ctx.timer_timeout:  # タイムアウト判定
             if best == 64:
                 best = i
             break
@@ -153,39 +530,241 @@ cdef inline _get_best_move(unsigned int int_color, board, unsigned int index, un
     board._white_bitboard = board_wb
     board._black_score = board_bs
     board._white_score = board_ws
-    board.prev = [(item[0], item[1], item[2], item[3]) for item in board_prev]
+    if best == 64:  # alphaを超える手がない場合
+        return None, scores
     return (moves_x[best], moves_y[best]), scores
 
 
-cdef inline signed int check_timeout():
+cdef inline tuple _iterative_deepening_wrap(str color, board, moves, int depth, int limit, double window, evaluator, str pid, int timer, int measure, tt, orderer, result):
+    cdef:
+        SearchContext context
+        SearchContext* ctx = &context
+        unsigned long long[64] moves_bit_list
+        unsigned int[64] moves_x
+        unsigned int[64] moves_y
+        double[64] root_scores
+        unsigned int x, y, i, count = 0, searched = 0, int_color = 0, best, empties, board_bs, board_ws
+        unsigned long long board_bb, board_wb
+        int first_depth = depth
+        double alpha, beta, score = 0
+        unsigned char[::1] tt_table = None
+        unsigned char[::1] ot_table = None
+        object manager = None
+        unsigned char[::1] cancel_flag = None
+        unsigned long long nodes = 0
+    ctx.tail = 0
+    ctx.measure_count = 0
+    ctx.timer_timeout = <unsigned int>0
+    token = Timer.tokens.get(pid) if timer and pid else None  # 他のスレッドからの中止要求
+    if token is not None:
+        cancel_flag = token.flag
+    _begin_timer(ctx, timer, pid, token, cancel_flag)
+    manager = Timer.managers.get(pid) if timer and pid else None  # 持ち時間の管理(反復深化の打ち切りに使う)
+    if measure and pid:
+        if pid not in Measure.count:
+            Measure.count[pid] = 0
+        ctx.measure_count = Measure.count[pid]
+    nodes = ctx.measure_count
+    ctx.board_size = board.size
+    for x, y in moves:
+        moves_bit_list[count] = <unsigned long long>1 << (ctx.board_size*ctx.board_size-1-(y*ctx.board_size+x))
+        moves_x[count] = x
+        moves_y[count] = y
+        count += 1
+    if color == 'black':
+        int_color = <unsigned int>1
+    if tt is not None:
+        tt_table = tt.table
+    _begin_transposition_table(ctx, tt, tt_table)
+    if orderer is not None:
+        ot_table = orderer.table
+    _begin_move_ordering(ctx, orderer, ot_table)
+    # ボード情報取得(深さを増やしても読み直さない)
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
+    board_bb = ctx.bb
+    board_wb = ctx.wb
+    board_bs = ctx.bs
+    board_ws = ctx.ws
+    empties = ctx.board_size * ctx.board_size - <unsigned int>_popcount(ctx.bb | ctx.wb | ctx.hb)
+    while count:
+        alpha = NEGATIVE_INFINITY
+        beta = POSITIVE_INFINITY
+        if depth > first_depth and window > 0:  # 前回の評価値の周辺に絞る
+            alpha = score - window
+            beta = score + window
+        best = _search_root(ctx, int_color, board, count, moves_bit_list, root_scores, alpha, beta, depth, evaluator, timer, &score, &searched)
+        if not ctx.timer_timeout and alpha > NEGATIVE_INFINITY and score <= alpha:
+            # 窓より低い場合は下側を広げて再探索
+            best = _search_root(ctx, int_color, board, count, moves_bit_list, root_scores, NEGATIVE_INFINITY, alpha + 1, depth, evaluator, timer, &score, &searched)
+        elif not ctx.timer_timeout and beta < POSITIVE_INFINITY and score >= beta:
+            # 窓より高い場合は上側を広げて再探索
+            best = _search_root(ctx, int_color, board, count, moves_bit_list, root_scores, beta - 1, POSITIVE_INFINITY, depth, evaluator, timer, &score, &searched)
+        if best != NO_MOVE:
+            _move_to_front(best, moves_bit_list, moves_x, moves_y, root_scores)  # 最善手を次の反復の先頭にする
+        if ctx.timer_timeout:  # タイムアウト発生時は途中までの最善手(なければ前回の最善手)
+            break
+        if (limit and depth >= limit) or <unsigned int>depth >= empties:  # 限界深さに到達時、または終局まで読み切った時
+            break
+        if manager is not None and not manager.next_iteration(pid, (moves_x[0], moves_y[0])):  # 持ち時間の管理で打ち切る時
+            break
+        depth += 1
+    # ボードを元に戻す
+    board._black_bitboard = board_bb
+    board._white_bitboard = board_wb
+    board._black_score = board_bs
+    board._white_score = board_ws
+    best_move, scores = None, {}
+    if count:
+        best_move = (moves_x[0], moves_y[0])
+        for i in range(searched):
+            scores[(moves_x[i], moves_y[i])] = root_scores[i]
+    _end_result(ctx, result, nodes, int_color, best_move, scores, depth)
+    _end_transposition_table(ctx, tt)
+    _end_move_ordering(ctx, orderer)
+    if measure and pid:
+        Measure.count[pid] = ctx.measure_count
+    if timer and pid and ctx.timer_timeout:
+        Timer.timeout_flag[pid] = True  # タイムアウト発生
+    return (best_move, scores, depth)
+
+
+cdef inline unsigned int _search_root(SearchContext* ctx, unsigned int int_color, board, unsigned int count, unsigned long long[64] moves_bit_list, double[64] root_scores, double alpha, double beta, int depth, evaluator, int timer, double* best_score, unsigned int* searched):
+    """_search_root
+           ルートの各手を探索し最善手の位置を返す(alphaを超える手がない場合はNO_MOVE、betaを超えた時点で打ち切る)
+    """
+    cdef:
+        double score
+        unsigned int i, best = NO_MOVE, int_color_next = 1
+    if int_color:
+        int_color_next = <unsigned int>0
+    ctx.board = <PyObject*>board
+    ctx.evaluator = <PyObject*>evaluator
+    best_score[0] = alpha
+    searched[0] = 0
+    for i in range(count):
+        with nogil:  # 探索中はGILを解放する(評価関数を呼ぶ時だけGILを取る)
+            _put_disc(ctx, int_color, moves_bit_list[i])
+            score = -_get_score(ctx, int_color_next, -beta, -best_score[0], depth-1, timer, <unsigned int>0)
+            _undo(ctx)
+        if ctx.timer_timeout:  # タイムアウト判定
+            break
+        root_scores[i] = score
+        searched[0] += 1
+        if score > best_score[0]:  # 最善手を更新
+            best_score[0] = score
+            best = i
+            if score >= beta:
+                break
+    return best
+
+
+cdef inline void _move_to_front(unsigned int best, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y, double[64] root_scores) noexcept nogil:
+    """_move_to_front
+           最善手を先頭に移動する(他の手の順番は変えない)
+    """
+    cdef:
+        unsigned int i, x = moves_x[best], y = moves_y[best]
+        unsigned long long move = moves_bit_list[best]
+        double score = root_scores[best]
+    for i in range(best, 0, -1):
+        moves_bit_list[i] = moves_bit_list[i-1]
+        moves_x[i] = moves_x[i-1]
+        moves_y[i] = moves_y[i-1]
+        root_scores[i] = root_scores[i-1]
+    moves_bit_list[0] = move
+    moves_x[0] = x
+    moves_y[0] = y
+    root_scores[0] = score
+
+
+cdef inline double _get_time() noexcept nogil:
+    """_get_time
+           現在時刻(time.time()と同じ基準)をGILを取らずに返す
+    """
+    cdef:
+        timespec ts
+    timespec_get(&ts, TIME_UTC)
+    return <double>ts.tv_sec + <double>ts.tv_nsec * 1e-9
+
+
+cdef inline void _begin_timer(SearchContext* ctx, int timer, str pid, token, unsigned char[::1] cancel_flag):
+    """_begin_timer
+           タイムアウトする時刻を単調増加する時計に換算し、他のスレッドからの中止要求を参照できるようにする
+    """
+    ctx.timer_countdown = 0
+    ctx.timer_interval = TIMER_CHECK_INTERVAL
+    ctx.cancel_flag = NULL
+    ctx.cancel_event = NULL
+    if timer and pid:
+        ctx.timer_deadline = _monotonic_time() + (Timer.deadline[pid] - _get_time())
+        ctx.timer_timeout_value = Timer.timeout_value[pid]
+        if token is not None:
+            ctx.timer_interval = token.interval
+            ctx.cancel_flag = &cancel_flag[0]
+            if token.event is not None:
+                ctx.cancel_event = <PyObject*>token.event
+
+
+cdef inline bint _is_event_set(PyObject* event) noexcept nogil:
+    """_is_event_set
+    """
+    with gil:
+        return (<object>event).is_set()
+
+
+cdef inline signed int check_timeout(SearchContext* ctx) noexcept nogil:
     """check_timeout
+           TIMER_CHECK_INTERVALノード毎に、タイムアウトと中止要求を確認する
     """
-    global timer_deadline, timer_timeout, timer_timeout_value
-    if time.time() > timer_deadline:
-        timer_timeout = <unsigned int>1
-        return timer_timeout_value
+    if ctx.timer_timeout:
+        return ctx.timer_timeout_value
+    if ctx.timer_countdown:
+        ctx.timer_countdown -= 1
+        return <signed int>0
+    ctx.timer_countdown = ctx.timer_interval - 1
+    if _monotonic_time() > ctx.timer_deadline or (ctx.cancel_flag != NULL and ctx.cancel_flag[0]) or (ctx.cancel_event != NULL and _is_event_set(ctx.cancel_event)):
+        ctx.timer_timeout = <unsigned int>1
+        return ctx.timer_timeout_value
     return <signed int>0
 
 
-cdef inline double _get_score(unsigned int int_color, board, double alpha, double beta, unsigned int depth, evaluator, int t, unsigned int pas):
+cdef inline double _evaluate(SearchContext* ctx, unsigned int int_color, unsigned long long legal_moves_b, unsigned long long legal_moves_w) except? EVALUATE_ERROR:
+    """_evaluate
+           探索中の盤面をボードに反映して評価関数を呼ぶ(GILを持って呼ぶ)
+    """
+    board = <object>ctx.board
+    board._black_bitboard = ctx.bb
+    board._white_bitboard = ctx.wb
+    board._black_score = ctx.bs
+    board._white_score = ctx.ws
+    board._flippable_discs_num = ctx.fd
+    return (<object>ctx.evaluator).evaluate('black' if int_color else 'white', board, legal_moves_b, legal_moves_w)
+
+
+cdef inline double _get_score(SearchContext* ctx, unsigned int int_color, double alpha, double beta, unsigned int depth, int t, unsigned int pas) except? EVALUATE_ERROR nogil:
     """_get_score
+           GILを取らずに探索する(評価関数を呼ぶ時だけGILを取る)
     """
-    global timer_timeout, measure_count, bb, wb, hb, bs, ws, pbb, pwb, pbs, pws, fd, tail
     cdef:
         signed int timeout
-        double score
+        double score, alpha_ini
         unsigned long long legal_moves_b_bits, legal_moves_w_bits, legal_moves_bits, move
-        unsigned int i, is_game_end = 0, int_color_next = 1, x, y
+        unsigned long long key = 0, tt_move = 0, best_move = 0
+        unsigned int i, is_game_end = 0, int_color_next = 1, x, y, use_tt = 0, count = 0, searched = 0
         signed int sign = -1
+        TTEntry* entry
+        unsigned long long[64] next_moves_list
     # タイムアウト判定
     if t:
-        timeout = check_timeout()
+        timeout = check_timeout(ctx)
         if timeout:
             return timeout
     # 探索ノード数カウント
-    measure_count += 1
+    ctx.measure_count += 1
     # 合法手を取得
-    legal_moves_bits = _get_legal_moves_bits(int_color, bb, wb, hb)
+    legal_moves_bits = _get_legal_moves_bits(ctx, int_color, ctx.bb, ctx.wb, ctx.hb)
     # 前回パス and 打てる場所なし の場合ゲーム終了
     if pas and not legal_moves_bits:
         is_game_end = <unsigned int>1
@@ -193,45 +772,140 @@ cdef inline double _get_score(unsigned int int_color, board, double alpha, doubl
     if not depth or is_game_end:
         if int_color:
             legal_moves_b_bits = legal_moves_bits
-            legal_moves_w_bits = _get_legal_moves_bits(<unsigned int>0, bb, wb, hb)
+            legal_moves_w_bits = _get_legal_moves_bits(ctx, <unsigned int>0, ctx.bb, ctx.wb, ctx.hb)
             sign = <signed int>1
-            str_color = 'black'
         else:
-            legal_moves_b_bits = _get_legal_moves_bits(<unsigned int>1, bb, wb, hb)
+            legal_moves_b_bits = _get_legal_moves_bits(ctx, <unsigned int>1, ctx.bb, ctx.wb, ctx.hb)
             legal_moves_w_bits = legal_moves_bits
-            str_color = 'white'
-        board._black_bitboard = bb
-        board._white_bitboard = wb
-        board._black_score = bs
-        board._white_score = ws
-        board._flippable_discs_num = fd
-        board.prev = []
-        for i in range(tail):
-            board.prev += [(pbb[i], pwb[i], pbs[i], pws[i])]
-        return evaluator.evaluate(str_color, board, _popcount(legal_moves_b_bits), _popcount(legal_moves_w_bits)) * sign
+        with gil:
+            score = _evaluate(ctx, int_color, _popcount(legal_moves_b_bits), _popcount(legal_moves_w_bits))
+        return score * sign
     # 次の手番
     if int_color:
         int_color_next = <unsigned int>0
     # パスの場合
     if not legal_moves_bits:
-        return -_get_score(int_color_next, board, -beta, -alpha, depth, evaluator, t, <unsigned int>1)
+        return -_get_score(ctx, int_color_next, -beta, -alpha, depth, t, <unsigned int>1)
+    # 置換表に結果が存在する場合、その値を返す
+    if ctx.tt_entries != NULL and depth >= TRANSPOSITION_TABLE_DEPTH:
+        use_tt = <unsigned int>1
+        key = _get_hash(int_color, ctx.bb, ctx.wb)
+        entry = _probe(ctx, key, int_color, ctx.bb, ctx.wb)
+        if entry != NULL:
+            if entry.depth >= depth:
+                if entry.lower >= beta:
+                    return entry.lower
+                if entry.upper <= alpha:
+                    return entry.upper
+                if entry.lower == entry.upper:
+                    return entry.lower
+            if entry.move != NO_MOVE:
+                move = <unsigned long long>1 << entry.move
+                if legal_moves_bits & move:
+                    tt_move = move  # 置換表の最善手から評価する
+    alpha_ini = alpha
+    # キラー手とヒストリーで手を並び替え
+    if ctx.use_killer or ctx.use_history:
+        while legal_moves_bits:
+            move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
+            next_moves_list[count] = move
+            count += 1
+            legal_moves_bits ^= move  # 一番右のONしているビットをOFFする
+        _order_moves(ctx, int_color, count, next_moves_list)
+        if tt_move:
+            _move_to_front_bits(tt_move, count, next_moves_list)  # 置換表の最善手を先頭に移動
+            tt_move = 0
+        legal_moves_bits = _get_legal_moves_bits(ctx, int_color, ctx.bb, ctx.wb, ctx.hb)
     # 評価値を算出
     while (legal_moves_bits):
-        move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
-        _put_disc(int_color, move)
-        score = -_get_score(int_color_next, board, -beta, -alpha, depth-1, evaluator, t, <unsigned int>0)
-        _undo()
+        if count:
+            move = next_moves_list[searched]
+        elif tt_move:
+            move = tt_move
+            tt_move = 0
+        else:
+            move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
+        _put_disc(ctx, int_color, move)
+        score = -_get_score(ctx, int_color_next, -beta, -alpha, depth-1, t, <unsigned int>0)
+        _undo(ctx)
         legal_moves_bits ^= move  # 一番右のONしているビットをOFFする
+        searched += 1
         if score > alpha:
             alpha = score
-        if timer_timeout:
+            best_move = move
+        if ctx.timer_timeout:
             return alpha
         if alpha >= beta:  # 枝刈り
-            return alpha
+            _update_cutoff(ctx, int_color, move, depth, searched == 1)
+            break
+    # 置換表に結果を格納
+    if use_tt:
+        _store(ctx, key, int_color, ctx.bb, ctx.wb, depth, alpha, alpha_ini, beta, best_move)
     return alpha
 
 
-cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h):
+cdef inline unsigned long long _perft_wrap(str color, board, unsigned int depth):
+    cdef:
+        SearchContext context
+        SearchContext* ctx = &context
+        unsigned int int_color
+        unsigned long long count
+    ctx.board_size = board.size
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
+    ctx.tail = 0
+    int_color = <unsigned int>1 if color == 'black' else <unsigned int>0
+    with nogil:
+        count = _perft(ctx, int_color, depth, <unsigned int>0)
+    return count
+
+
+cdef inline unsigned long long _perft(SearchContext* ctx, unsigned int int_color, unsigned int depth, unsigned int pas) noexcept nogil:
+    """_perft
+    """
+    cdef:
+        unsigned long long legal_moves_bits, move, count = 0
+        unsigned int int_color_next = 1
+    if not depth:
+        return 1
+    if int_color:
+        int_color_next = <unsigned int>0
+    legal_moves_bits = _get_legal_moves_bits(ctx, int_color, ctx.bb, ctx.wb, ctx.hb)
+    # パスの場合
+    if not legal_moves_bits:
+        if pas:
+            return 1  # ゲーム終了
+        return _perft(ctx, int_color_next, depth-1, <unsigned int>1)
+    while legal_moves_bits:
+        move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
+        _put_disc(ctx, int_color, move)
+        count += _perft(ctx, int_color_next, depth-1, <unsigned int>0)
+        _undo(ctx)
+        legal_moves_bits ^= move  # 一番右のONしているビットをOFFする
+    return count
+
+
+cdef inline unsigned int _get_moves_list(unsigned int size, unsigned long long legal_moves, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y) noexcept nogil:
+    """_get_moves_list
+           合法手のビットと座標を左上から順に格納し、その数を返す(立っているビットの数だけ処理する)
+    """
+    cdef:
+        unsigned long long lowest
+        unsigned int square, count = <unsigned int>_popcount(legal_moves), i
+    i = count
+    while legal_moves:
+        lowest = legal_moves & (~legal_moves + 1)  # 下位ビットから取り出し、後ろから格納する
+        square = size * size - 1 - <unsigned int>_popcount(lowest - 1)
+        i -= 1
+        moves_bit_list[i] = lowest
+        moves_x[i] = square % size
+        moves_y[i] = square // size
+        legal_moves ^= lowest
+    return count
+
+
+cdef inline unsigned long long _get_legal_moves_bits(SearchContext* ctx, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h) noexcept nogil:
     """_get_legal_moves_bits
     """
     cdef:
@@ -239,6 +913,8 @@ cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, uns
     if int_color:
         player = b
         opponent = w
+    if ctx.board_size != 8:
+        return _get_legal_moves_bits_n(ctx, player, opponent, h)
     cdef:
         unsigned long long blank = ~(player | opponent | h)
         unsigned long long horizontal = opponent & <unsigned long long>0x7E7E7E7E7E7E7E7E  # horizontal mask value
@@ -276,7 +952,54 @@ cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, uns
     return blank & ((tmp_h << 1) | (tmp_h >> 1) | (tmp_v << 8) | (tmp_v >> 8) | (tmp_d1 << 9) | (tmp_d1 >> 9) | (tmp_d2 << 7) | (tmp_d2 >> 7))
 
 
-cdef inline unsigned long long _popcount(unsigned long long bits):
+cdef inline unsigned long long _get_legal_moves_bits_n(SearchContext* ctx, unsigned long long player, unsigned long long opponent, unsigned long long h) noexcept nogil:
+    """_get_legal_moves_bits_n
+           サイズ4,6の合法手
+    """
+    cdef:
+        unsigned int i, size = ctx.board_size
+        unsigned long long blank = ~(player | opponent | h)
+        unsigned long long horizontal = opponent & mask_h[size]  # horizontal mask value
+        unsigned long long vertical = opponent & mask_v[size]    # vertical mask value
+        unsigned long long diagonal = opponent & mask_d[size]    # diagonal mask value
+        unsigned long long tmp_h, tmp_v, tmp_d1, tmp_d2
+    tmp_h = horizontal & ((player << 1) | (player >> 1))
+    tmp_v = vertical & ((player << size) | (player >> size))
+    tmp_d1 = diagonal & ((player << (size+1)) | (player >> (size+1)))
+    tmp_d2 = diagonal & ((player << (size-1)) | (player >> (size-1)))
+    for i in range(size-3):
+        tmp_h |= horizontal & ((tmp_h << 1) | (tmp_h >> 1))
+        tmp_v |= vertical & ((tmp_v << size) | (tmp_v >> size))
+        tmp_d1 |= diagonal & ((tmp_d1 << (size+1)) | (tmp_d1 >> (size+1)))
+        tmp_d2 |= diagonal & ((tmp_d2 << (size-1)) | (tmp_d2 >> (size-1)))
+    return blank & ((tmp_h << 1) | (tmp_h >> 1) | (tmp_v << size) | (tmp_v >> size) | (tmp_d1 << (size+1)) | (tmp_d1 >> (size+1)) | (tmp_d2 << (size-1)) | (tmp_d2 >> (size-1)))
+
+
+cdef inline unsigned long long _get_flippable_discs_num_n(SearchContext* ctx, unsigned long long player, unsigned long long opponent, unsigned long long move) noexcept nogil:
+    """_get_flippable_discs_num_n
+           サイズ4,6のひっくり返せる石
+    """
+    cdef:
+        unsigned int i, size = ctx.board_size
+        unsigned long long tmp, check, flippable_discs_num = 0
+    for i in range(8):
+        tmp = 0
+        if i < 4:
+            check = (move << shift_dir[size][i]) & mask_dir[size][i]
+            while check & opponent:
+                tmp |= check
+                check = (check << shift_dir[size][i]) & mask_dir[size][i]
+        else:
+            check = (move >> shift_dir[size][i]) & mask_dir[size][i]
+            while check & opponent:
+                tmp |= check
+                check = (check >> shift_dir[size][i]) & mask_dir[size][i]
+        if check & player:
+            flippable_discs_num |= tmp
+    return flippable_discs_num
+
+
+cdef inline unsigned long long _popcount(unsigned long long bits) noexcept nogil:
     """_popcount
     """
     bits = bits - ((bits >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
@@ -287,36 +1010,35 @@ cdef inline unsigned long long _popcount(unsigned long long bits):
     return (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
 
 
-cdef inline void _put_disc(unsigned int int_color, unsigned long long move):
+cdef inline void _put_disc(SearchContext* ctx, unsigned int int_color, unsigned long long move) noexcept nogil:
     """_put_disc
     """
-    global bb, wb, bs, ws, pbb, pwb, pbs, pws, fd, tail
     cdef:
         unsigned long long count
         signed int lshift
     # ひっくり返せる石を取得
-    fd = _get_flippable_discs_num(int_color, bb, wb, move)
-    count = _popcount(fd)
+    ctx.fd = _get_flippable_discs_num(ctx, int_color, ctx.bb, ctx.wb, move)
+    count = _popcount(ctx.fd)
     # 打つ前の状態を格納
-    pbb[tail] = bb
-    pwb[tail] = wb
-    pbs[tail] = bs
-    pws[tail] = ws
-    tail += 1
+    ctx.pbb[ctx.tail] = ctx.bb
+    ctx.pwb[ctx.tail] = ctx.wb
+    ctx.pbs[ctx.tail] = ctx.bs
+    ctx.pws[ctx.tail] = ctx.ws
+    ctx.tail += 1
     # 自分の石を置いて相手の石をひっくり返す
     if int_color:
-        bb ^= move | fd
-        wb ^= fd
-        bs += <unsigned int>1 + <unsigned int>count
-        ws -= <unsigned int>count
+        ctx.bb ^= move | ctx.fd
+        ctx.wb ^= ctx.fd
+        ctx.bs += <unsigned int>1 + <unsigned int>count
+        ctx.ws -= <unsigned int>count
     else:
-        wb ^= move | fd
-        bb ^= fd
-        bs -= <unsigned int>count
-        ws += <unsigned int>1 + <unsigned int>count
+        ctx.wb ^= move | ctx.fd
+        ctx.bb ^= ctx.fd
+        ctx.bs -= <unsigned int>count
+        ctx.ws += <unsigned int>1 + <unsigned int>count
 
 
-cdef inline unsigned long long _get_flippable_discs_num(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long move):
+cdef inline unsigned long long _get_flippable_discs_num(SearchContext* ctx, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long move) noexcept nogil:
     """_get_flippable_discs_size8_64bit
     """
     cdef:
@@ -326,6 +1048,8 @@ cdef inline unsigned long long _get_flippable_discs_num(unsigned int int_color,
     if int_color:
         player = b
         opponent = w
+    if ctx.board_size != 8:
+        return _get_flippable_discs_num_n(ctx, player, opponent, move)
     t_ = <unsigned long long>0xFFFFFFFFFFFFFF00 & (move << <unsigned int>8)  # top
     rt = <unsigned long long>0x7F7F7F7F7F7F7F00 & (move << <unsigned int>7)  # right-top
     r_ = <unsigned long long>0x7F7F7F7F7F7F7F7F & (move >> <unsigned int>1)  # right
@@ -378,12 +1102,11 @@ cdef inline unsigned long long _get_flippable_discs_num(unsigned int int_color,
     return flippable_discs_num
 
 
-cdef inline void _undo():
+cdef inline void _undo(SearchContext* ctx) noexcept nogil:
     """_undo
     """
-    global bb, wb, bs, ws, pbb, pwb, pbs, pws, tail
-    tail -= 1
-    bb = pbb[tail]
-    wb = pwb[tail]
-    bs = pbs[tail]
-    ws = pws[tail]
+    ctx.tail -= 1
+    ctx.bb = ctx.pbb[ctx.tail]
+    ctx.wb = ctx.pwb[ctx.tail]
+    ctx.bs = ctx.pbs[ctx.tail]
+    ctx.ws = ctx.pws[ctx.tail]
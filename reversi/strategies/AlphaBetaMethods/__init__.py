@@ -5,6 +5,7 @@ pyximport.install()
 
 SLOW_MODE = True
 ALPHABETA_SIZE8_64BIT_ERROR = True
+ALPHABETA_SIZE16_256BIT_ERROR = True
 
 try:
     if 'FORCE_ALPHABETAMETHODS_IMPORT_ERROR' in os.environ:
@@ -21,11 +22,22 @@ try:
         if os.environ['FORCE_ALPHABETAMETHODS_IMPORT_ERROR'] == 'RAISE':
             raise ImportError
 
-    from ...strategies.AlphaBetaMethods.NextMoveSize8_64bit import next_move, get_best_move
+    from ...strategies.AlphaBetaMethods.NextMoveSize8_64bit import next_move, get_best_move, iterative_deepening, perft
     ALPHABETA_SIZE8_64BIT_ERROR = False
 except ImportError:
     pass
 
+try:
+    if 'FORCE_ALPHABETAMETHODS_IMPORT_ERROR' in os.environ:
+        if os.environ['FORCE_ALPHABETAMETHODS_IMPORT_ERROR'] == 'RAISE':
+            raise ImportError
+
+    from ...strategies.AlphaBetaMethods.NextMoveSize16_256bit import next_move as next_move_size16_256bit, get_best_move as get_best_move_size16_256bit
+    from ...strategies.AlphaBetaMethods.NextMoveSize16_256bit import perft as perft_size16_256bit
+    ALPHABETA_SIZE16_256BIT_ERROR = False
+except ImportError:
+    pass
+
 
 __all__ = [
     'get_score',
@@ -34,4 +46,9 @@ __all__ = [
     'get_score_measure_timer',
     'next_move',
     'get_best_move',
+    'iterative_deepening',
+    'perft',
+    'next_move_size16_256bit',
+    'get_best_move_size16_256bit',
+    'perft_size16_256bit',
 ]
@@ -2,322 +2,119 @@
 """Next Move(Size8,64bit) of Blank strategy
 """
 
-import time
+from libc.time cimport timespec, timespec_get, TIME_UTC
+from cpython.ref cimport PyObject
+from libc.math cimport ceil, floor
+from libc.stdlib cimport calloc, free
+from libc.string cimport memset
 
 from reversi.strategies.common import Timer, Measure
 
 
+cdef extern from *:
+    """
+    #ifdef _WIN32
+    #include <windows.h>
+    static double _monotonic_time(void) {
+        LARGE_INTEGER count, frequency;
+        QueryPerformanceCounter(&count);
+        QueryPerformanceFrequency(&frequency);
+        return (double)count.QuadPart / (double)frequency.QuadPart;
+    }
+    #else
+    #include <time.h>
+    static double _monotonic_time(void) {
+        struct timespec ts;
+        clock_gettime(CLOCK_MONOTONIC, &ts);
+        return (double)ts.tv_sec + (double)ts.tv_nsec * 1e-9;
+    }
+    #endif
+    """
+    double _monotonic_time() nogil  # 単調増加する時計(s)
+
+
+DEF TIMER_CHECK_INTERVAL = 1024  # 時間と中止要求を確認するノード数の間隔(CancelTokenを使わない場合)
 DEF POSITIVE_INFINITY = 10000000
 DEF NEGATIVE_INFINITY = -10000000
 DEF MAX_POSSIBILITY = 40  # 着手可能数の最大(想定)
 DEF POSSIBILITY_RANGE = MAX_POSSIBILITY * 2 + 1
 DEF BUCKET_SIZE = MAX_POSSIBILITY
 DEF TRANSPOSITION_TABLE_DEPTH = 3  # 置換表を有効にする残りの探索深さ
+DEF TRANSPOSITION_TABLE_SIZE = 4096  # 置換表の初期のエントリ数(2のべき乗、足りなくなれば倍に広げる)
+DEF PROBCUT_STAGES = 8      # 石数による段階の数(ProbCutと同じ)
+DEF PROBCUT_MAX_DEPTH = 16  # パラメータを持つ深さの上限(ProbCutと同じ)
+DEF PROBCUT_CHECKS = 2      # 1つの深さで試す浅い探索の数(ProbCutと同じ)
+
+
+ctypedef struct OrderingTable:  # 探索中の手の並び替えに使う表(Orderer_KHのtableを参照する)
+    unsigned int killer[64][2]           # 手数毎のキラー手(マスの番号+1、0は無し)
+    unsigned long long history[2][64]    # 手番とマス毎のヒストリー値
+
+
+ctypedef struct ProbCutEntry:  # Multi-ProbCutのパラメータ(ProbCutのtableを参照する)
+    double a
+    double b
+    double sigma
+    signed int shallow                   # 浅い探索の深さ(-1は無し)
+    unsigned int reserved
+
+
+ctypedef struct ProbCutTable:
+    ProbCutEntry entries[PROBCUT_STAGES][PROBCUT_MAX_DEPTH+1][PROBCUT_CHECKS]
+
+
+ctypedef struct TTEntry:  # 置換表のエントリ
+    unsigned long long bb                # 黒のビットボード
+    unsigned long long wb                # 白のビットボード
+    signed int lower                     # 評価値の下限
+    signed int upper                     # 評価値の上限
+    unsigned int color                   # 手番
+    unsigned int used                    # 使用中
+
+
+ctypedef struct TTable:  # 置換表(探索毎に確保し、探索の終わりに解放する)
+    TTEntry* entries                     # エントリ(開番地法)
+    unsigned long long size              # エントリ数(2のべき乗)
+    unsigned long long count             # 格納したエントリ数
+
+
+ctypedef struct SearchContext:  # 探索毎の状態(探索毎に持つため、複数の探索を同時に実行できる)
+    unsigned long long bb                # 黒のビットボード
+    unsigned long long wb                # 白のビットボード
+    unsigned long long hb                # 穴のビットボード
+    unsigned long long fd                # 直前にひっくり返した石
+    unsigned long long pbb[64]           # 打つ前の黒のビットボード
+    unsigned long long pwb[64]           # 打つ前の白のビットボード
+    unsigned int bs                      # 黒の石数
+    unsigned int ws                      # 白の石数
+    unsigned int pbs[64]                 # 打つ前の黒の石数
+    unsigned int pws[64]                 # 打つ前の白の石数
+    unsigned int tail                    # 退避した手数
+    unsigned long long measure_count     # 探索ノード数
+    double timer_deadline                # タイムアウトする時刻(単調増加する時計)
+    unsigned int timer_timeout           # タイムアウト発生
+    signed int timer_timeout_value       # タイムアウト時に返す評価値
+    unsigned int timer_interval          # 時間と中止要求を確認するノード数の間隔
+    unsigned int timer_countdown         # 次に確認するまでのノード数
+    unsigned char* cancel_flag           # 中止要求(CancelToken.flag、NULLなら無し)
+    PyObject* cancel_event               # 中止要求のイベント(CancelToken.event、NULLなら無し)
+    signed int corner, c, a1, a2, b1, b2, b3, wx, o1, o2, wp, ww, we, wb1, wb2, wb3  # 評価パラメータ
+    signed int table_values[8][256]      # 行毎の石の並びに対するテーブルの評価値
+    OrderingTable* ot                    # 手の並び替えに使う表(NULLなら使用しない)
+    unsigned int use_killer              # キラー手を優先する
+    unsigned int use_history             # ヒストリー値の高い手を優先する
+    unsigned long long cutoffs           # 枝刈りの回数
+    unsigned long long first_cutoffs     # 最初の手で枝刈りした回数
+    ProbCutTable* pc                     # Multi-ProbCutのパラメータ(NULLなら使用しない)
+    double pc_t                          # 枝刈りの閾値
+    unsigned int pc_active               # 浅い探索中(浅い探索の中ではProbCutしない)
+    unsigned long long pc_probes         # 浅い探索の回数
+    unsigned long long pc_cuts           # 枝刈りした回数
+    TTable tt                            # 置換表
+    TTable pc_tt                         # 浅い探索の置換表(浅い探索毎に空にする)
+
+
 cdef:
-    unsigned long long measure_count
-    unsigned long long bb
-    unsigned long long wb
-    unsigned long long hb
-    unsigned long long fd
-    unsigned long long[64] pbb
-    unsigned long long[64] pwb
-    unsigned int bs
-    unsigned int ws
-    unsigned int[64] pbs
-    unsigned int[64] pws
-    unsigned int tail
-    double timer_deadline
-    unsigned int timer_timeout
-    signed int timer_timeout_value
-    signed int corner, c, a1, a2, b1, b2, b3, wx, o1, o2, wp, ww, we, wb1, wb2, wb3
-    # {{{ -- signed int[8][8] t_table= [ --
-    signed int[8][8] t_table= [
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-    ]
-    # -- signed int[8][8] t_table= [ -- }}}
-    # {{{ --- signed int[8][256] table_values= [ ---
-    signed int[8][256] table_values= [
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-        [
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-            0, 0, 0, 0, 0, 0, 0, 0,
-        ],
-    ]
-    # --- signed int[8][256] table_values= [ --- }}}
     # {{{ -- signed int[256] edge_table8 = [ --
     signed int[256] edge_table8 = [
         0, 0, 0, 1, 0, 0, 0, 2,
@@ -354,139 +151,360 @@ cdef:
         4, 4, 4, 5, 5, 5, 6, 13
     ]
     # -- signed int[256] edge_table8 = [ -- }}}
-    dict tp_table = {}  # Trans Position Table
 
 
-def next_move(color, board, params, depth, pid, timer, measure):
+def next_move(color, board, params, depth, pid, timer, measure, orderer=None, probcut=None, result=None):
     """next_move
     """
     if pid is None:
         timer, measure = False, False
-    return _next_move(color, board, params, depth, pid, timer, measure)
+    return _next_move(color, board, params, depth, pid, timer, measure, orderer, probcut, result)
 
 
-def get_best_move(color, board, params, moves, alpha, beta, depth, pid, timer, measure):
+def get_best_move(color, board, params, moves, alpha, beta, depth, pid, timer, measure, orderer=None, probcut=None, result=None):
     """get_best_move
     """
     if pid is None:
         timer, measure = False, False
-    return _get_best_move_wrap(color, board, params, moves, alpha, beta, depth, pid, timer, measure)
+    return _get_best_move_wrap(color, board, params, moves, alpha, beta, depth, pid, timer, measure, orderer, probcut, result)
+
+
+def perft(color, board, depth):
+    """perft
+           指定した深さまでの末端局面数を数える(パスも1手、深さ到達前のゲーム終了は1局面として数える)
+    """
+    return _perft_wrap(color, board, depth)
+
+
+cdef inline void _begin_move_ordering(SearchContext* ctx, orderer, unsigned char[::1] table):
+    """_begin_move_ordering
+    """
+    ctx.ot = NULL
+    ctx.use_killer = 0
+    ctx.use_history = 0
+    ctx.cutoffs = 0
+    ctx.first_cutoffs = 0
+    if table is not None and <unsigned long long>table.shape[0] >= sizeof(OrderingTable):
+        ctx.ot = <OrderingTable*>&table[0]
+        ctx.use_killer = <unsigned int>orderer.killer
+        ctx.use_history = <unsigned int>orderer.history
+
+
+cdef inline void _end_move_ordering(SearchContext* ctx, orderer):
+    """_end_move_ordering
+    """
+    if ctx.ot != NULL:
+        orderer.cutoffs += ctx.cutoffs
+        orderer.first_cutoffs += ctx.first_cutoffs
+    ctx.ot = NULL
+
+
+cdef inline void _order_moves(SearchContext* ctx, unsigned int int_color, unsigned int count, unsigned long long[64] moves_list) noexcept nogil:
+    """_order_moves
+           ヒストリー値の高い順に並べ(同じ値は元の順番を保つ)、キラー手を先頭に移動する
+    """
+    cdef:
+        unsigned int i, j, k, square
+        unsigned long long move, value
+        unsigned long long[64] values
+    if ctx.use_history:
+        for i in range(count):
+            move = moves_list[i]
+            value = ctx.ot.history[int_color][_popcount(move - 1)]
+            j = i
+            while j and values[j-1] < value:
+                values[j] = values[j-1]
+                moves_list[j] = moves_list[j-1]
+                j -= 1
+            values[j] = value
+            moves_list[j] = move
+    if ctx.use_killer and ctx.tail < 64:
+        for k in range(1, -1, -1):  # 2番目、1番目の順に先頭に移動する
+            square = ctx.ot.killer[ctx.tail][k]
+            if square:
+                _move_to_front_bits(<unsigned long long>1 << (square - 1), count, moves_list)
+
+
+cdef inline void _move_to_front_bits(unsigned long long move, unsigned int count, unsigned long long[64] moves_list) noexcept nogil:
+    """_move_to_front_bits
+           指定した手を先頭に移動する(他の手の順番は変えない)
+    """
+    cdef:
+        unsigned int i, j
+    for i in range(count):
+        if moves_list[i] == move:
+            for j in range(i, 0, -1):
+                moves_list[j] = moves_list[j-1]
+            moves_list[0] = move
+            break
+
+
+cdef inline void _update_cutoff(SearchContext* ctx, unsigned int int_color, unsigned long long move, unsigned int depth, unsigned int first) noexcept nogil:
+    """_update_cutoff
+           枝刈りを起こした手をキラー手とヒストリーに記録する
+    """
+    cdef:
+        unsigned int square
+    ctx.cutoffs += 1
+    if first:
+        ctx.first_cutoffs += 1
+    if ctx.ot != NULL:
+        square = <unsigned int>_popcount(move - 1) + 1
+        if ctx.use_killer and ctx.tail < 64 and ctx.ot.killer[ctx.tail][0] != square:
+            ctx.ot.killer[ctx.tail][1] = ctx.ot.killer[ctx.tail][0]
+            ctx.ot.killer[ctx.tail][0] = square
+        if ctx.use_history:
+            ctx.ot.history[int_color][square - 1] += depth * depth
+
+
+cdef inline void _begin_probcut(SearchContext* ctx, probcut, unsigned char[::1] table):
+    """_begin_probcut
+    """
+    ctx.pc = NULL
+    ctx.pc_active = 0
+    ctx.pc_probes = 0
+    ctx.pc_cuts = 0
+    if table is not None and <unsigned long long>table.shape[0] >= sizeof(ProbCutTable):
+        ctx.pc = <ProbCutTable*>&table[0]
+        ctx.pc_t = <double>probcut.t
+
+
+cdef inline void _end_probcut(SearchContext* ctx, probcut):
+    """_end_probcut
+    """
+    if ctx.pc != NULL:
+        probcut.probes += ctx.pc_probes
+        probcut.cuts += ctx.pc_cuts
+    ctx.pc = NULL
+
+
+cdef inline unsigned int _tt_init(TTable* tt, unsigned long long size) noexcept nogil:
+    """_tt_init
+           置換表を確保する(確保できない場合は0を返す)
+    """
+    tt.entries = <TTEntry*>calloc(size, sizeof(TTEntry))
+    tt.size = size if tt.entries != NULL else 0
+    tt.count = 0
+    return tt.entries != NULL
+
+
+cdef inline void _tt_free(TTable* tt) noexcept nogil:
+    """_tt_free
+    """
+    free(tt.entries)
+    tt.entries = NULL
+    tt.size = 0
+    tt.count = 0
+
+
+cdef inline void _tt_clear(TTable* tt) noexcept nogil:
+    """_tt_clear
+    """
+    if tt.count:
+        memset(tt.entries, 0, tt.size * sizeof(TTEntry))
+        tt.count = 0
 
 
-cdef inline tuple _next_move(str color, board, params, int depth, str pid, int timer, int measure):
-    global timer_deadline, timer_timeout, timer_timeout_value, measure_count, bb, wb, hb, bs, ws, corner, c, a1, a2, b1, b2, b3, wx, o1, o2, wp, ww, we, wb1, wb2, wb3
+cdef inline TTEntry* _tt_slot(TTEntry* entries, unsigned long long size, unsigned long long b, unsigned long long w, unsigned int int_color) noexcept nogil:
+    """_tt_slot
+           盤面のエントリ、無ければ格納先の空きエントリを返す
+    """
+    cdef:
+        unsigned long long index = (b * <unsigned long long>0x9E3779B97F4A7C15) ^ (w * <unsigned long long>0xC2B2AE3D27D4EB4F) ^ int_color
+        TTEntry* entry
+    index ^= index >> 29
+    while True:
+        entry = &entries[index & (size - 1)]
+        if not entry.used or (entry.bb == b and entry.wb == w and entry.color == int_color):
+            return entry
+        index += 1
+
+
+cdef inline TTEntry* _tt_find(TTable* tt, unsigned long long b, unsigned long long w, unsigned int int_color) noexcept nogil:
+    """_tt_find
+           盤面のエントリを返す(無い場合はNULL)
+    """
+    cdef:
+        TTEntry* entry
+    if not tt.count:
+        return NULL
+    entry = _tt_slot(tt.entries, tt.size, b, w, int_color)
+    return entry if entry.used else NULL
+
+
+cdef inline void _tt_store(TTable* tt, unsigned long long b, unsigned long long w, unsigned int int_color, signed int lower, signed int upper) noexcept nogil:
+    """_tt_store
+           盤面の評価値の範囲を格納する(半分埋まれば倍に広げ、広げられない場合は格納しない)
+    """
+    cdef:
+        TTEntry* entry
+        TTEntry* entries
+        unsigned long long i
+    if (tt.count + 1) * 2 > tt.size:
+        entries = <TTEntry*>calloc(tt.size * 2, sizeof(TTEntry))
+        if entries == NULL:
+            if tt.count + 1 >= tt.size:
+                return
+        else:
+            for i in range(tt.size):
+                if tt.entries[i].used:
+                    _tt_slot(entries, tt.size * 2, tt.entries[i].bb, tt.entries[i].wb, tt.entries[i].color)[0] = tt.entries[i]
+            free(tt.entries)
+            tt.entries = entries
+            tt.size *= 2
+    entry = _tt_slot(tt.entries, tt.size, b, w, int_color)
+    if not entry.used:
+        entry.bb = b
+        entry.wb = w
+        entry.color = int_color
+        entry.used = 1
+        tt.count += 1
+    entry.lower = lower
+    entry.upper = upper
+
+
+cdef inline tuple _next_move(str color, board, params, int depth, str pid, int timer, int measure, orderer, probcut, result):
     cdef:
+        SearchContext context
+        SearchContext* ctx = &context
         signed int alpha = NEGATIVE_INFINITY, beta = POSITIVE_INFINITY
         unsigned int int_color = 0
-        unsigned int x, y, index = 0
-        unsigned long long legal_moves, mask = 0x8000000000000000
+        unsigned int index = 0
+        unsigned long long legal_moves
         unsigned long long[64] legal_moves_bit_list
         unsigned int[64] legal_moves_x
         unsigned int[64] legal_moves_y
+        unsigned char[::1] ot_table = None
+        unsigned char[::1] pc_table = None
+        unsigned char[::1] cancel_flag = None
+        unsigned long long nodes = 0
     # タイマーとメジャー準備
-    measure_count = 0
-    timer_timeout = <unsigned int>0
-    if timer and pid:
-        timer_deadline = Timer.deadline[pid]
-        timer_timeout_value = Timer.timeout_value[pid]
+    ctx.tail = 0
+    ctx.measure_count = 0
+    ctx.timer_timeout = <unsigned int>0
+    token = Timer.tokens.get(pid) if timer and pid else None  # 他のスレッドからの中止要求
+    if token is not None:
+        cancel_flag = token.flag
+    _begin_timer(ctx, timer, pid, token, cancel_flag)
     if measure and pid:
         if pid not in Measure.count:
             Measure.count[pid] = <unsigned int>0
-        measure_count = Measure.count[pid]
+        ctx.measure_count = Measure.count[pid]
+    nodes = ctx.measure_count
     # 評価パラメータ取得
-    corner = params[0]
-    c = params[1]
-    a1 = params[2]
-    a2 = params[3]
-    b1 = params[4]
-    b2 = params[5]
-    b3 = params[6]
-    wx = params[7]
-    o1 = params[8]
-    o2 = params[9]
-    wp = params[10]
-    ww = params[11]
-    we = params[12]
-    wb1 = params[13]
-    wb2 = params[14]
-    wb3 = params[15]
-    _set_t_table()
+    ctx.corner = params[0]
+    ctx.c = params[1]
+    ctx.a1 = params[2]
+    ctx.a2 = params[3]
+    ctx.b1 = params[4]
+    ctx.b2 = params[5]
+    ctx.b3 = params[6]
+    ctx.wx = params[7]
+    ctx.o1 = params[8]
+    ctx.o2 = params[9]
+    ctx.wp = params[10]
+    ctx.ww = params[11]
+    ctx.we = params[12]
+    ctx.wb1 = params[13]
+    ctx.wb2 = params[14]
+    ctx.wb3 = params[15]
+    _set_t_table(ctx)
+    # 手の並び替えの準備
+    if orderer is not None:
+        ot_table = orderer.table
+    _begin_move_ordering(ctx, orderer, ot_table)
+    # ProbCutの準備
+    if probcut is not None and probcut.size == 8:
+        pc_table = probcut.table
+    _begin_probcut(ctx, probcut, pc_table)
     # 次の手番
     if color == 'black':
         int_color = <unsigned int>1
     # ボード情報取得
-    bb, wb, hb = board.get_bitboard_info()
-    bs = board._black_score
-    ws = board._white_score
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
     # 最大深さ調整
-    if depth > <int>(64 - (bs + ws)):
-        depth =  <int>64 - (bs + ws)
+    if depth > <int>(64 - (ctx.bs + ctx.ws)):
+        depth =  <int>64 - (ctx.bs + ctx.ws)
     # 最善手を取得
-    legal_moves = _get_legal_moves_bits(int_color, bb, wb, hb)
-    for y in range(8):
-        for x in range(8):
-            if legal_moves & mask:
-                legal_moves_bit_list[index] = mask
-                legal_moves_x[index] = x
-                legal_moves_y[index] = y
-                index += 1
-            mask >>= 1
-    best_move, scores = _get_best_move(int_color, index, legal_moves_bit_list, legal_moves_x, legal_moves_y, alpha, beta, depth, timer)
+    legal_moves = _get_legal_moves_bits(int_color, ctx.bb, ctx.wb, ctx.hb)
+    index = _get_moves_list(8, legal_moves, legal_moves_bit_list, legal_moves_x, legal_moves_y)
+    best_move, scores = _get_best_move(ctx, int_color, index, legal_moves_bit_list, legal_moves_x, legal_moves_y, alpha, beta, depth, timer)
+    _end_result(ctx, result, nodes, best_move, scores)
+    _end_move_ordering(ctx, orderer)
+    _end_probcut(ctx, probcut)
     # タイマーとメジャー格納
     if measure and pid:
-        Measure.count[pid] = measure_count
-    if timer and pid and timer_timeout:
+        Measure.count[pid] = ctx.measure_count
+    if timer and pid and ctx.timer_timeout:
         Timer.timeout_flag[pid] = True  # タイムアウト発生
     return best_move
 
 
-cdef inline _get_best_move_wrap(str color, board, params, moves, signed int alpha, signed int beta, int depth, str pid, int timer, int measure):
-    global timer_deadline, timer_timeout, timer_timeout_value, measure_count, bb, wb, hb, bs, ws, corner, c, a1, a2, b1, b2, b3, wx, o1, o2, wp, ww, we, wb1, wb2, wb3
+cdef inline _get_best_move_wrap(str color, board, params, moves, signed int alpha, signed int beta, int depth, str pid, int timer, int measure, orderer, probcut, result):
     cdef:
+        SearchContext context
+        SearchContext* ctx = &context
         unsigned long long[64] moves_bit_list
         unsigned int[64] moves_x
         unsigned int[64] moves_y
         unsigned int x, y, index = 0, int_color = 0
         unsigned long long put
         signed int lshift
+        unsigned char[::1] ot_table = None
+        unsigned char[::1] pc_table = None
+        unsigned char[::1] cancel_flag = None
+        unsigned long long nodes = 0
     # タイマーとメジャー準備
-    measure_count = 0
-    timer_timeout = <unsigned int>0
-    if timer and pid:
-        timer_deadline = Timer.deadline[pid]
-        timer_timeout_value = Timer.timeout_value[pid]
+    ctx.tail = 0
+    ctx.measure_count = 0
+    ctx.timer_timeout = <unsigned int>0
+    token = Timer.tokens.get(pid) if timer and pid else None  # 他のスレッドからの中止要求
+    if token is not None:
+        cancel_flag = token.flag
+    _begin_timer(ctx, timer, pid, token, cancel_flag)
     if measure and pid:
         if pid not in Measure.count:
             Measure.count[pid] = <unsigned int>0
-        measure_count = Measure.count[pid]
+        ctx.measure_count = Measure.count[pid]
+    nodes = ctx.measure_count
     # 評価パラメータ取得
-    corner = params[0]
-    c = params[1]
-    a1 = params[2]
-    a2 = params[3]
-    b1 = params[4]
-    b2 = params[5]
-    b3 = params[6]
-    wx = params[7]
-    o1 = params[8]
-    o2 = params[9]
-    wp = params[10]
-    ww = params[11]
-    we = params[12]
-    wb1 = params[13]
-    wb2 = params[14]
-    wb3 = params[15]
-    _set_t_table()
+    ctx.corner = params[0]
+    ctx.c = params[1]
+    ctx.a1 = params[2]
+    ctx.a2 = params[3]
+    ctx.b1 = params[4]
+    ctx.b2 = params[5]
+    ctx.b3 = params[6]
+    ctx.wx = params[7]
+    ctx.o1 = params[8]
+    ctx.o2 = params[9]
+    ctx.wp = params[10]
+    ctx.ww = params[11]
+    ctx.we = params[12]
+    ctx.wb1 = params[13]
+    ctx.wb2 = params[14]
+    ctx.wb3 = params[15]
+    _set_t_table(ctx)
+    # 手の並び替えの準備
+    if orderer is not None:
+        ot_table = orderer.table
+    _begin_move_ordering(ctx, orderer, ot_table)
+    # ProbCutの準備
+    if probcut is not None and probcut.size == 8:
+        pc_table = probcut.table
+    _begin_probcut(ctx, probcut, pc_table)
     # 次の手番
     if color == 'black':
         int_color = <unsigned int>1
     # ボード情報取得
-    bb, wb, hb = board.get_bitboard_info()
-    bs = board._black_score
-    ws = board._white_score
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
     # 最大深さ調整
-    if depth > <int>(64 - (bs + ws)):
-        depth =  <int>64 - (bs + ws)
+    if depth > <int>(64 - (ctx.bs + ctx.ws)):
+        depth =  <int>64 - (ctx.bs + ctx.ws)
     # 最善手を取得
     for x, y in moves:
         lshift = (63-(y*8+x))
@@ -495,52 +513,111 @@ cdef inline _get_best_move_wrap(str color, board, params, moves, signed int alph
         moves_x[index] = x
         moves_y[index] = y
         index += 1
-    best_move, scores = _get_best_move(int_color, index, moves_bit_list, moves_x, moves_y, alpha, beta, depth, timer)
+    best_move, scores = _get_best_move(ctx, int_color, index, moves_bit_list, moves_x, moves_y, alpha, beta, depth, timer)
+    _end_result(ctx, result, nodes, best_move, scores)
+    _end_move_ordering(ctx, orderer)
+    _end_probcut(ctx, probcut)
     # タイマーとメジャー格納
     if measure and pid:
-        Measure.count[pid] = measure_count
-    if timer and pid and timer_timeout:
+        Measure.count[pid] = ctx.measure_count
+    if timer and pid and ctx.timer_timeout:
         Timer.timeout_flag[pid] = True  # タイムアウト発生
     return (best_move, scores)
 
 
-cdef inline _get_best_move(unsigned int int_color, unsigned int index, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y, signed int alpha, signed int beta, int depth, int timer):
-    global timer_timeout, tp_table
+cdef inline _end_result(SearchContext* ctx, result, unsigned long long nodes, best_move, dict scores):
+    """_end_result
+           探索結果(SearchResult)にノード数、各手の評価値、最善手順(置換表を使わないため最善手のみ)を記録する
+    """
+    if result is not None:
+        result.nodes += ctx.measure_count - nodes
+        result.scores = scores
+        result.pv = [best_move] if best_move is not None else []
+
+
+cdef inline _get_best_move(SearchContext* ctx, unsigned int int_color, unsigned int index, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y, signed int alpha, signed int beta, int depth, int timer):
     cdef:
         signed int score = alpha
         unsigned int int_color_next = 1, i, best = 0
-    scores, tp_table = {}, {}
+    scores = {}
+    # 置換表は探索毎に作る
+    if not _tt_init(&ctx.tt, TRANSPOSITION_TABLE_SIZE) or not _tt_init(&ctx.pc_tt, TRANSPOSITION_TABLE_SIZE):
+        _tt_free(&ctx.tt)
+        raise MemoryError()
     # 手番
     if int_color:
         int_color_next = <unsigned int>0
     # 各手のスコア取得
     for i in range(index):
-        _put_disc(int_color, moves_bit_list[i])
-        score = -_get_score(int_color_next, -beta, -alpha, depth-1, timer, <unsigned int>0)
-        _undo()
+        with nogil:  # 探索中はGILを解放する
+            _put_disc(ctx, int_color, moves_bit_list[i])
+            score = -_get_score(ctx, &ctx.tt, int_color_next, -beta, -alpha, depth-1, timer, <unsigned int>0)
+            _undo(ctx)
         scores[(moves_x[i], moves_y[i])] = score
-        if timer_timeout:
+        if ctx.timer_timeout:
             break
         if score > alpha:  # 最善手を更新
             alpha = score
             best = i
+    _tt_free(&ctx.tt)
+    _tt_free(&ctx.pc_tt)
     return (moves_x[best], moves_y[best]), scores
 
 
-cdef inline signed int check_timeout():
+cdef inline double _get_time() noexcept nogil:
+    """_get_time
+           現在時刻(time.time()と同じ基準)をGILを取らずに返す
+    """
+    cdef:
+        timespec ts
+    timespec_get(&ts, TIME_UTC)
+    return <double>ts.tv_sec + <double>ts.tv_nsec * 1e-9
+
+
+cdef inline void _begin_timer(SearchContext* ctx, int timer, str pid, token, unsigned char[::1] cancel_flag):
+    """_begin_timer
+           タイムアウトする時刻を単調増加する時計に換算し、他のスレッドからの中止要求を参照できるようにする
+    """
+    ctx.timer_countdown = 0
+    ctx.timer_interval = TIMER_CHECK_INTERVAL
+    ctx.cancel_flag = NULL
+    ctx.cancel_event = NULL
+    if timer and pid:
+        ctx.timer_deadline = _monotonic_time() + (Timer.deadline[pid] - _get_time())
+        ctx.timer_timeout_value = Timer.timeout_value[pid]
+        if token is not None:
+            ctx.timer_interval = token.interval
+            ctx.cancel_flag = &cancel_flag[0]
+            if token.event is not None:
+                ctx.cancel_event = <PyObject*>token.event
+
+
+cdef inline bint _is_event_set(PyObject* event) noexcept nogil:
+    """_is_event_set
+    """
+    with gil:
+        return (<object>event).is_set()
+
+
+cdef inline signed int check_timeout(SearchContext* ctx) noexcept nogil:
     """check_timeout
+           TIMER_CHECK_INTERVALノード毎に、タイムアウトと中止要求を確認する
     """
-    global timer_deadline, timer_timeout, timer_timeout_value
-    if time.time() > timer_deadline:
-        timer_timeout = <unsigned int>1
-        return timer_timeout_value
+    if ctx.timer_timeout:
+        return ctx.timer_timeout_value
+    if ctx.timer_countdown:
+        ctx.timer_countdown -= 1
+        return <signed int>0
+    ctx.timer_countdown = ctx.timer_interval - 1
+    if _monotonic_time() > ctx.timer_deadline or (ctx.cancel_flag != NULL and ctx.cancel_flag[0]) or (ctx.cancel_event != NULL and _is_event_set(ctx.cancel_event)):
+        ctx.timer_timeout = <unsigned int>1
+        return ctx.timer_timeout_value
     return <signed int>0
 
 
-cdef inline signed int _get_score(unsigned int int_color, signed int alpha, signed int beta, unsigned int depth, int t, unsigned int pas):
+cdef inline signed int _get_score(SearchContext* ctx, TTable* tt, unsigned int int_color, signed int alpha, signed int beta, unsigned int depth, int t, unsigned int pas) noexcept nogil:
     """_get_score
     """
-    global timer_timeout, measure_count, bb, wb, hb, bs, ws, pbb, pwb, pbs, pws, fd, tail, tp_table
     cdef:
         signed int null_window
         unsigned long long legal_moves_b_bits, legal_moves_w_bits, legal_moves_bits, move
@@ -556,39 +633,39 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
         unsigned long long legal_moves_bits_opponent
         signed int score
         unsigned long long bits_count
-        signed int upper, lower, score_max = NEGATIVE_INFINITY, alpha_ini = alpha
+        signed int score_max = NEGATIVE_INFINITY, alpha_ini = alpha
+        TTEntry* entry
 
     # タイムアウト判定
     if t:
-        timeout = check_timeout()
+        timeout = check_timeout(ctx)
         if timeout:
             return timeout
 
     # 探索ノード数カウント
-    measure_count += 1
+    ctx.measure_count += 1
 
     # 置換表に結果が存在する場合、その値を返す
-    key = (bb, wb, int_color)
     if depth >= TRANSPOSITION_TABLE_DEPTH:
-        if key in tp_table:
-            lower, upper = tp_table[key]
-            if upper <= alpha:
-                return upper
-            if lower >= beta:
-                return lower
-            if upper == lower:
-                return upper
-            if lower > alpha:
-                alpha = lower
-            if upper < beta:
-                beta = upper
+        entry = _tt_find(tt, ctx.bb, ctx.wb, int_color)
+        if entry != NULL:
+            if entry.upper <= alpha:
+                return entry.upper
+            if entry.lower >= beta:
+                return entry.lower
+            if entry.upper == entry.lower:
+                return entry.upper
+            if entry.lower > alpha:
+                alpha = entry.lower
+            if entry.upper < beta:
+                beta = entry.upper
 
     # 合法手を取得
     # {{{ -- _get_legal_moves_bits(int_color, bb, wb, hb) --
-    player, opponent = wb, bb
+    player, opponent = ctx.wb, ctx.bb
     if int_color:
-        player, opponent = bb, wb
-    blank = ~(player | opponent | hb)
+        player, opponent = ctx.bb, ctx.wb
+    blank = ~(player | opponent | ctx.hb)
     horizontal = opponent & <unsigned long long>0x7E7E7E7E7E7E7E7E  # horizontal mask value
     vertical = opponent & <unsigned long long>0x00FFFFFFFFFFFF00    # vertical mask value
     diagonal = opponent & <unsigned long long>0x007E7E7E7E7E7E00    # diagonal mask value
@@ -633,22 +710,22 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
         # 前回もパスの場合ゲーム終了
         if pas:
             # {{{ --- return _evaluate(int_color, <signed int>0, <signed int>0) * sign ---
-            score = bs - ws
+            score = ctx.bs - ctx.ws
             if score > 0:    # 黒が勝った
-                score += ww
+                score += ctx.ww
             elif score < 0:  # 白が勝った
-                score -= ww
+                score -= ctx.ww
             return score * sign
             # --- return _evaluate(int_color, <signed int>0, <signed int>0) * sign --- }}}
 
-        return -_get_score(int_color_next, -beta, -alpha, depth, t, <unsigned int>1)
+        return -_get_score(ctx, tt, int_color_next, -beta, -alpha, depth, t, <unsigned int>1)
 
     # 最大深さに到達
     if not depth:
         # 相手の着手可能数を取得
         # {{{ -- _get_legal_moves_bits(<unsigned int>0 if int_color else <unsigned int>1, bb, wb, hb) --
         player, opponent = opponent, player  # reversed for opponent
-        blank = ~(player | opponent | hb)
+        blank = ~(player | opponent | ctx.hb)
         horizontal = opponent & <unsigned long long>0x7E7E7E7E7E7E7E7E  # horizontal mask value
         vertical = opponent & <unsigned long long>0x00FFFFFFFFFFFF00    # vertical mask value
         diagonal = opponent & <unsigned long long>0x007E7E7E7E7E7E00    # diagonal mask value
@@ -716,22 +793,27 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
         # {{{ --- return _evaluate(int_color, <signed int>legal_moves_b_bits, <signed int>legal_moves_w_bits) * sign ---
         # 勝敗が決まっている場合
         if not legal_moves_b_bits and not legal_moves_w_bits:
-            score = bs - ws
+            score = ctx.bs - ctx.ws
             if score > 0:    # 黒が勝った
-                score += ww
+                score += ctx.ww
             elif score < 0:  # 白が勝った
-                score -= ww
+                score -= ctx.ww
             return score * sign
         # 勝敗が決まっていない場合
-        score = _get_t() + _get_p(<signed int>legal_moves_b_bits, <signed int>legal_moves_w_bits) + _get_e() + _get_b()
+        score = _get_t(ctx) + _get_p(ctx, <signed int>legal_moves_b_bits, <signed int>legal_moves_w_bits) + _get_e(ctx) + _get_b(ctx)
         return score * sign
         # --- return _evaluate(int_color, <signed int>legal_moves_b_bits, <signed int>legal_moves_w_bits) * sign --- }}}
 
+    # Multi-ProbCut
+    if ctx.pc != NULL and not ctx.pc_active and depth <= PROBCUT_MAX_DEPTH:
+        if _probcut(ctx, int_color, alpha, beta, depth, t, &score):
+            return score
+
     # 合法手と着手可能数の格納
     while (legal_moves_bits):
         move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
         next_moves_list[count] = move
-        b, w = bb, wb
+        b, w = ctx.bb, ctx.wb
 
         # ひっくり返せる石を取得
         # {{{ -- _get_flippable_discs_num --
@@ -800,7 +882,7 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
         player, opponent = w, b
         if int_color:
             player, opponent = b, w
-        blank = ~(player | opponent | hb)
+        blank = ~(player | opponent | ctx.hb)
         horizontal = opponent & <unsigned long long>0x7E7E7E7E7E7E7E7E  # horizontal mask value
         vertical = opponent & <unsigned long long>0x00FFFFFFFFFFFF00    # vertical mask value
         diagonal = opponent & <unsigned long long>0x007E7E7E7E7E7E00    # diagonal mask value
@@ -849,6 +931,9 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
     # 着手可能数に応じて並び替え
     _sort_moves_by_possibility(count, next_moves_list, possibilities)
 
+    # キラー手とヒストリーで手を並び替え
+    _order_moves(ctx, int_color, count, next_moves_list)
+
     # 次の手の探索
     for i in range(count):
         # 一手打つ
@@ -858,9 +943,9 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
         flippable_discs_num = 0
         bf_t_, bf_rt, bf_r_, bf_rb, bf_b_, bf_lb, bf_l_, bf_lt = 0, 0, 0, 0, 0, 0, 0, 0
         move = next_moves_list[i]
-        player, opponent = wb, bb
+        player, opponent = ctx.wb, ctx.bb
         if int_color:
-            player, opponent = bb, wb
+            player, opponent = ctx.bb, ctx.wb
         t_ = <unsigned long long>0xFFFFFFFFFFFFFF00 & (move << <unsigned int>8)  # top
         rt = <unsigned long long>0x7F7F7F7F7F7F7F00 & (move << <unsigned int>7)  # right-top
         r_ = <unsigned long long>0x7F7F7F7F7F7F7F7F & (move >> <unsigned int>1)  # right
@@ -910,10 +995,10 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
             flippable_discs_num |= bf_l_
         if lt & player:
             flippable_discs_num |= bf_lt
-        fd = flippable_discs_num
+        ctx.fd = flippable_discs_num
         # -- _get_flippable_discs_num -- }}}
         # {{{ -- _popcount --
-        bits = fd
+        bits = ctx.fd
         bits = bits - ((bits >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
         bits = (bits & <unsigned long long>0x3333333333333333) + ((bits >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
         bits = (bits + (bits >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
@@ -922,37 +1007,37 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
         bits_count = (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
         # -- _popcount -- }}}
         # 打つ前の状態を格納
-        pbb[tail] = bb
-        pwb[tail] = wb
-        pbs[tail] = bs
-        pws[tail] = ws
-        tail += 1
+        ctx.pbb[ctx.tail] = ctx.bb
+        ctx.pwb[ctx.tail] = ctx.wb
+        ctx.pbs[ctx.tail] = ctx.bs
+        ctx.pws[ctx.tail] = ctx.ws
+        ctx.tail += 1
         # 自分の石を置いて相手の石をひっくり返す
         if int_color:
-            bb ^= move | fd
-            wb ^= fd
-            bs += <unsigned int>1 + <unsigned int>bits_count
-            ws -= <unsigned int>bits_count
+            ctx.bb ^= move | ctx.fd
+            ctx.wb ^= ctx.fd
+            ctx.bs += <unsigned int>1 + <unsigned int>bits_count
+            ctx.ws -= <unsigned int>bits_count
         else:
-            wb ^= move | fd
-            bb ^= fd
-            bs -= <unsigned int>bits_count
-            ws += <unsigned int>1 + <unsigned int>bits_count
+            ctx.wb ^= move | ctx.fd
+            ctx.bb ^= ctx.fd
+            ctx.bs -= <unsigned int>bits_count
+            ctx.ws += <unsigned int>1 + <unsigned int>bits_count
         # --- _put_disc(int_color, next_moves_list[i]) --- }}}
 
         # Null Window Search
         null_window = beta if not i else alpha + 1
-        score = -_get_score(int_color_next, -null_window, -alpha, depth-1, t, <unsigned int>0)
+        score = -_get_score(ctx, tt, int_color_next, -null_window, -alpha, depth-1, t, <unsigned int>0)
         if alpha < score:
             if i and score <= null_window:
-                score = -_get_score(int_color_next, -beta, -score, depth-1, t, <unsigned int>0)
+                score = -_get_score(ctx, tt, int_color_next, -beta, -score, depth-1, t, <unsigned int>0)
             alpha = score
 
         # 手を戻す
-        _undo()
+        _undo(ctx)
 
         # タイムアウト判定
-        if timer_timeout:
+        if ctx.timer_timeout:
             return alpha
 
         # 最大値の更新
@@ -961,21 +1046,75 @@ cdef inline signed int _get_score(unsigned int int_color, signed int alpha, sign
 
         # beta cut
         if score_max >= beta:
+            _update_cutoff(ctx, int_color, next_moves_list[i], depth, not i)
             if depth >= TRANSPOSITION_TABLE_DEPTH:
-                tp_table[key] = (score_max, POSITIVE_INFINITY)
+                _tt_store(tt, ctx.bb, ctx.wb, int_color, score_max, POSITIVE_INFINITY)
             return score_max
 
     if depth >= TRANSPOSITION_TABLE_DEPTH:
         # 置換表に結果を格納
         if score_max > alpha_ini:
-            tp_table[key] = (score_max, score_max)
+            _tt_store(tt, ctx.bb, ctx.wb, int_color, score_max, score_max)
         else:
-            tp_table[key] = (NEGATIVE_INFINITY, score_max)
+            _tt_store(tt, ctx.bb, ctx.wb, int_color, NEGATIVE_INFINITY, score_max)
 
     return score_max
 
 
-cdef inline void _sort_moves_by_possibility(unsigned int count, unsigned long long[64] next_moves_list, signed int[64] possibilities):
+cdef inline unsigned int _probcut(SearchContext* ctx, unsigned int int_color, signed int alpha, signed int beta, unsigned int depth, int t, signed int* result) noexcept nogil:
+    """_probcut
+           浅い探索の評価値から、深い探索の評価値がbeta以上(alpha以下)となる見込みが高い場合に枝刈りする(枝刈りした場合は1を返す)
+           (浅い探索は深さが異なるため、置換表を分ける)
+    """
+    cdef:
+        unsigned int i, stage, cut = 0
+        signed int bound, score
+        ProbCutEntry* entry
+        unsigned long long bits = ctx.bb | ctx.wb
+    # {{{ -- _popcount --
+    bits = bits - ((bits >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
+    bits = (bits & <unsigned long long>0x3333333333333333) + ((bits >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
+    bits = (bits + (bits >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
+    bits = bits + (bits >> <unsigned int>8)
+    bits = bits + (bits >> <unsigned int>16)
+    bits = (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
+    # -- _popcount -- }}}
+    stage = <unsigned int>bits * PROBCUT_STAGES // 65
+    ctx.pc_active = 1
+    for i in range(PROBCUT_CHECKS):
+        entry = &ctx.pc.entries[stage][depth][i]
+        if entry.shallow < 0:
+            break
+        ctx.pc_probes += 1
+        # betaを超える見込み
+        if beta < POSITIVE_INFINITY:
+            bound = <signed int>ceil((beta + ctx.pc_t * entry.sigma - entry.b) / entry.a)
+            _tt_clear(&ctx.pc_tt)
+            score = _get_score(ctx, &ctx.pc_tt, int_color, bound - 1, bound, <unsigned int>entry.shallow, t, <unsigned int>0)
+            if ctx.timer_timeout:
+                break
+            if score >= bound:
+                result[0] = beta
+                cut = 1
+                break
+        # alphaを下回る見込み
+        if alpha > NEGATIVE_INFINITY:
+            bound = <signed int>floor((alpha - ctx.pc_t * entry.sigma - entry.b) / entry.a)
+            _tt_clear(&ctx.pc_tt)
+            score = _get_score(ctx, &ctx.pc_tt, int_color, bound, bound + 1, <unsigned int>entry.shallow, t, <unsigned int>0)
+            if ctx.timer_timeout:
+                break
+            if score <= bound:
+                result[0] = alpha
+                cut = 1
+                break
+    ctx.pc_active = 0
+    if cut:
+        ctx.pc_cuts += 1
+    return cut
+
+
+cdef inline void _sort_moves_by_possibility(unsigned int count, unsigned long long[64] next_moves_list, signed int[64] possibilities) noexcept nogil:
     """_sort_moves_by_possibility
     """
     if count >= 2:
@@ -985,7 +1124,7 @@ cdef inline void _sort_moves_by_possibility(unsigned int count, unsigned long lo
             _merge_sort(count, next_moves_list, possibilities)
 
 
-cdef inline void _bucket_sort(unsigned int count, unsigned long long[64] next_moves_list, signed int[64] possibilities):
+cdef inline void _bucket_sort(unsigned int count, unsigned long long[64] next_moves_list, signed int[64] possibilities) noexcept nogil:
     """_bucket_sort
     """
     cdef:
@@ -1009,7 +1148,7 @@ cdef inline void _bucket_sort(unsigned int count, unsigned long long[64] next_mo
             k -= 1
 
 
-cdef inline void _merge_sort(unsigned int count, unsigned long long[64] next_moves_list, signed int[64] possibilities):
+cdef inline void _merge_sort(unsigned int count, unsigned long long[64] next_moves_list, signed int[64] possibilities) noexcept nogil:
     """_merge_sort
     """
     cdef:
@@ -1032,7 +1171,7 @@ cdef inline void _merge_sort(unsigned int count, unsigned long long[64] next_mov
         _merge(len1, len2, array_move1, array_p1, array_move2, array_p2, next_moves_list, possibilities)
 
 
-cdef inline void _merge(unsigned int len1, unsigned int len2, unsigned long long[32] array_move1, signed int[32] array_p1, unsigned long long[32] array_move2, signed int[32] array_p2, unsigned long long[64] next_moves_list, signed int[64] possibilities):
+cdef inline void _merge(unsigned int len1, unsigned int len2, unsigned long long[32] array_move1, signed int[32] array_p1, unsigned long long[32] array_move2, signed int[32] array_p2, unsigned long long[64] next_moves_list, signed int[64] possibilities) noexcept nogil:
     """_merge
     """
     cdef:
@@ -1048,7 +1187,78 @@ cdef inline void _merge(unsigned int len1, unsigned int len2, unsigned long long
             j += 1
 
 
-cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h):
+cdef inline unsigned long long _perft_wrap(str color, board, unsigned int depth):
+    cdef:
+        SearchContext context
+        SearchContext* ctx = &context
+        unsigned int int_color
+        unsigned long long count
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
+    ctx.tail = 0
+    int_color = <unsigned int>1 if color == 'black' else <unsigned int>0
+    with nogil:
+        count = _perft(ctx, int_color, depth, <unsigned int>0)
+    return count
+
+
+cdef inline unsigned long long _perft(SearchContext* ctx, unsigned int int_color, unsigned int depth, unsigned int pas) noexcept nogil:
+    """_perft
+    """
+    cdef:
+        unsigned long long legal_moves_bits, move, count = 0
+        unsigned int int_color_next = 1
+    if not depth:
+        return 1
+    if int_color:
+        int_color_next = <unsigned int>0
+    legal_moves_bits = _get_legal_moves_bits(int_color, ctx.bb, ctx.wb, ctx.hb)
+    # パスの場合
+    if not legal_moves_bits:
+        if pas:
+            return 1  # ゲーム終了
+        return _perft(ctx, int_color_next, depth-1, <unsigned int>1)
+    while legal_moves_bits:
+        move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
+        _put_disc(ctx, int_color, move)
+        count += _perft(ctx, int_color_next, depth-1, <unsigned int>0)
+        _undo(ctx)
+        legal_moves_bits ^= move  # 一番右のONしているビットをOFFする
+    return count
+
+
+cdef inline unsigned int _get_moves_list(unsigned int size, unsigned long long legal_moves, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y) noexcept nogil:
+    """_get_moves_list
+           合法手のビットと座標を左上から順に格納し、その数を返す(立っているビットの数だけ処理する)
+    """
+    cdef:
+        unsigned long long lowest
+        unsigned int square, count = <unsigned int>_popcount(legal_moves), i
+    i = count
+    while legal_moves:
+        lowest = legal_moves & (~legal_moves + 1)  # 下位ビットから取り出し、後ろから格納する
+        square = size * size - 1 - <unsigned int>_popcount(lowest - 1)
+        i -= 1
+        moves_bit_list[i] = lowest
+        moves_x[i] = square % size
+        moves_y[i] = square // size
+        legal_moves ^= lowest
+    return count
+
+
+cdef inline unsigned long long _popcount(unsigned long long bits) noexcept nogil:
+    """_popcount
+    """
+    bits = bits - ((bits >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
+    bits = (bits & <unsigned long long>0x3333333333333333) + ((bits >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
+    bits = (bits + (bits >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
+    bits = bits + (bits >> <unsigned int>8)
+    bits = bits + (bits >> <unsigned int>16)
+    return (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
+
+
+cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h) noexcept nogil:
     """_get_legal_moves_bits
     """
     cdef:
@@ -1093,10 +1303,9 @@ cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, uns
     return blank & ((tmp_h << 1) | (tmp_h >> 1) | (tmp_v << 8) | (tmp_v >> 8) | (tmp_d1 << 9) | (tmp_d1 >> 9) | (tmp_d2 << 7) | (tmp_d2 >> 7))
 
 
-cdef inline void _put_disc(unsigned int int_color, unsigned long long move):
+cdef inline void _put_disc(SearchContext* ctx, unsigned int int_color, unsigned long long move) noexcept nogil:
     """_put_disc
     """
-    global bb, wb, bs, ws, pbb, pwb, pbs, pws, fd, tail
     cdef:
         unsigned long long count, bits
         unsigned long long t_, rt, r_, rb, b_, lb, l_, lt
@@ -1104,11 +1313,11 @@ cdef inline void _put_disc(unsigned int int_color, unsigned long long move):
         unsigned long long player, opponent, flippable_discs_num = 0
     # ひっくり返せる石を取得
     # {{{ -- _get_flippable_discs_num --
-    player = wb
-    opponent = bb
+    player = ctx.wb
+    opponent = ctx.bb
     if int_color:
-        player = bb
-        opponent = wb
+        player = ctx.bb
+        opponent = ctx.wb
     t_ = <unsigned long long>0xFFFFFFFFFFFFFF00 & (move << <unsigned int>8)  # top
     rt = <unsigned long long>0x7F7F7F7F7F7F7F00 & (move << <unsigned int>7)  # right-top
     r_ = <unsigned long long>0x7F7F7F7F7F7F7F7F & (move >> <unsigned int>1)  # right
@@ -1158,10 +1367,10 @@ cdef inline void _put_disc(unsigned int int_color, unsigned long long move):
         flippable_discs_num |= bf_l_
     if lt & player:
         flippable_discs_num |= bf_lt
-    fd = flippable_discs_num
+    ctx.fd = flippable_discs_num
     # -- _get_flippable_discs_num -- }}}
     # {{{ -- _popcount --
-    bits = fd
+    bits = ctx.fd
     bits = bits - ((bits >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
     bits = (bits & <unsigned long long>0x3333333333333333) + ((bits >> <unsigned int>2) & <unsigned long long>0x3333333333333333)
     bits = (bits + (bits >> <unsigned int>4)) & <unsigned long long>0x0F0F0F0F0F0F0F0F
@@ -1170,104 +1379,103 @@ cdef inline void _put_disc(unsigned int int_color, unsigned long long move):
     count = (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
     # -- _popcount -- }}}
     # 打つ前の状態を格納
-    pbb[tail] = bb
-    pwb[tail] = wb
-    pbs[tail] = bs
-    pws[tail] = ws
-    tail += 1
+    ctx.pbb[ctx.tail] = ctx.bb
+    ctx.pwb[ctx.tail] = ctx.wb
+    ctx.pbs[ctx.tail] = ctx.bs
+    ctx.pws[ctx.tail] = ctx.ws
+    ctx.tail += 1
     # 自分の石を置いて相手の石をひっくり返す
     if int_color:
-        bb ^= move | fd
-        wb ^= fd
-        bs += <unsigned int>1 + <unsigned int>count
-        ws -= <unsigned int>count
+        ctx.bb ^= move | ctx.fd
+        ctx.wb ^= ctx.fd
+        ctx.bs += <unsigned int>1 + <unsigned int>count
+        ctx.ws -= <unsigned int>count
     else:
-        wb ^= move | fd
-        bb ^= fd
-        bs -= <unsigned int>count
-        ws += <unsigned int>1 + <unsigned int>count
+        ctx.wb ^= move | ctx.fd
+        ctx.bb ^= ctx.fd
+        ctx.bs -= <unsigned int>count
+        ctx.ws += <unsigned int>1 + <unsigned int>count
 
 
-cdef inline void _undo():
+cdef inline void _undo(SearchContext* ctx) noexcept nogil:
     """_undo
     """
-    global bb, wb, bs, ws, pbb, pwb, pbs, pws, tail
-    tail -= 1
-    bb = pbb[tail]
-    wb = pwb[tail]
-    bs = pbs[tail]
-    ws = pws[tail]
+    ctx.tail -= 1
+    ctx.bb = ctx.pbb[ctx.tail]
+    ctx.wb = ctx.pwb[ctx.tail]
+    ctx.bs = ctx.pbs[ctx.tail]
+    ctx.ws = ctx.pws[ctx.tail]
 
 
-cdef inline signed int _set_t_table():
-    global t_table, corner, c, a1, a2, b1, b2, b3, wx, o1, o2
+cdef inline signed int _set_t_table(SearchContext* ctx) noexcept nogil:
     cdef:
+        signed int[8][8] t_table
         unsigned int row, col, bit8, mask
         signed int value
-    t_table[0][0] = corner
-    t_table[0][1] = c
-    t_table[0][2] = a2
-    t_table[0][3] = b3
-    t_table[0][4] = b3
-    t_table[0][5] = a2
-    t_table[0][6] = c
-    t_table[0][7] = corner
-    t_table[1][0] = c
-    t_table[1][1] = wx
-    t_table[1][2] = o1
-    t_table[1][3] = o2
-    t_table[1][4] = o2
-    t_table[1][5] = o1
-    t_table[1][6] = wx
-    t_table[1][7] = c
-    t_table[2][0] = a2
-    t_table[2][1] = o1
-    t_table[2][2] = a1
-    t_table[2][3] = b2
-    t_table[2][4] = b2
-    t_table[2][5] = a1
-    t_table[2][6] = o1
-    t_table[2][7] = a2
-    t_table[3][0] = b3
-    t_table[3][1] = o2
-    t_table[3][2] = b2
-    t_table[3][3] = b1
-    t_table[3][4] = b1
-    t_table[3][5] = b2
-    t_table[3][6] = o2
-    t_table[3][7] = b3
-    t_table[4][0] = b3
-    t_table[4][1] = o2
-    t_table[4][2] = b2
-    t_table[4][3] = b1
-    t_table[4][4] = b1
-    t_table[4][5] = b2
-    t_table[4][6] = o2
-    t_table[4][7] = b3
-    t_table[5][0] = a2
-    t_table[5][1] = o1
-    t_table[5][2] = a1
-    t_table[5][3] = b2
-    t_table[5][4] = b2
-    t_table[5][5] = a1
-    t_table[5][6] = o1
-    t_table[5][7] = a2
-    t_table[6][0] = c
-    t_table[6][1] = wx
-    t_table[6][2] = o1
-    t_table[6][3] = o2
-    t_table[6][4] = o2
-    t_table[6][5] = o1
-    t_table[6][6] = wx
-    t_table[6][7] = c
-    t_table[7][0] = corner
-    t_table[7][1] = c
-    t_table[7][2] = a2
-    t_table[7][3] = b3
-    t_table[7][4] = b3
-    t_table[7][5] = a2
-    t_table[7][6] = c
-    t_table[7][7] = corner
+    t_table[0][0] = ctx.corner
+    t_table[0][1] = ctx.c
+    t_table[0][2] = ctx.a2
+    t_table[0][3] = ctx.b3
+    t_table[0][4] = ctx.b3
+    t_table[0][5] = ctx.a2
+    t_table[0][6] = ctx.c
+    t_table[0][7] = ctx.corner
+    t_table[1][0] = ctx.c
+    t_table[1][1] = ctx.wx
+    t_table[1][2] = ctx.o1
+    t_table[1][3] = ctx.o2
+    t_table[1][4] = ctx.o2
+    t_table[1][5] = ctx.o1
+    t_table[1][6] = ctx.wx
+    t_table[1][7] = ctx.c
+    t_table[2][0] = ctx.a2
+    t_table[2][1] = ctx.o1
+    t_table[2][2] = ctx.a1
+    t_table[2][3] = ctx.b2
+    t_table[2][4] = ctx.b2
+    t_table[2][5] = ctx.a1
+    t_table[2][6] = ctx.o1
+    t_table[2][7] = ctx.a2
+    t_table[3][0] = ctx.b3
+    t_table[3][1] = ctx.o2
+    t_table[3][2] = ctx.b2
+    t_table[3][3] = ctx.b1
+    t_table[3][4] = ctx.b1
+    t_table[3][5] = ctx.b2
+    t_table[3][6] = ctx.o2
+    t_table[3][7] = ctx.b3
+    t_table[4][0] = ctx.b3
+    t_table[4][1] = ctx.o2
+    t_table[4][2] = ctx.b2
+    t_table[4][3] = ctx.b1
+    t_table[4][4] = ctx.b1
+    t_table[4][5] = ctx.b2
+    t_table[4][6] = ctx.o2
+    t_table[4][7] = ctx.b3
+    t_table[5][0] = ctx.a2
+    t_table[5][1] = ctx.o1
+    t_table[5][2] = ctx.a1
+    t_table[5][3] = ctx.b2
+    t_table[5][4] = ctx.b2
+    t_table[5][5] = ctx.a1
+    t_table[5][6] = ctx.o1
+    t_table[5][7] = ctx.a2
+    t_table[6][0] = ctx.c
+    t_table[6][1] = ctx.wx
+    t_table[6][2] = ctx.o1
+    t_table[6][3] = ctx.o2
+    t_table[6][4] = ctx.o2
+    t_table[6][5] = ctx.o1
+    t_table[6][6] = ctx.wx
+    t_table[6][7] = ctx.c
+    t_table[7][0] = ctx.corner
+    t_table[7][1] = ctx.c
+    t_table[7][2] = ctx.a2
+    t_table[7][3] = ctx.b3
+    t_table[7][4] = ctx.b3
+    t_table[7][5] = ctx.a2
+    t_table[7][6] = ctx.c
+    t_table[7][7] = ctx.corner
 
     # 事前計算
     for row in range(8):
@@ -1278,40 +1486,37 @@ cdef inline signed int _set_t_table():
                 if mask & bit8:
                     value += t_table[row][col]
                 mask >>= 1
-            table_values[row][bit8] = value
+            ctx.table_values[row][bit8] = value
 
 
-cdef inline signed int _get_t():
+cdef inline signed int _get_t(SearchContext* ctx) noexcept nogil:
     """テーブルによる評価値
     """
-    global bb, wb, table_values
     cdef:
         unsigned long long mask = 0x00000000000000FF, tb, tw
         unsigned int row, shift
         signed int score = 0
     for row in range(8):
         shift = (7 - row) * 8
-        tb = (bb >> shift) & mask
-        tw = (wb >> shift) & mask
-        score += table_values[row][tb] - table_values[row][tw]
+        tb = (ctx.bb >> shift) & mask
+        tw = (ctx.wb >> shift) & mask
+        score += ctx.table_values[row][tb] - ctx.table_values[row][tw]
     return score
 
 
-cdef inline signed int _get_p(signed int pos_b, signed int pos_w):
+cdef inline signed int _get_p(SearchContext* ctx, signed int pos_b, signed int pos_w) noexcept nogil:
     """着手可能数による評価値
     """
-    global wp
-    return (pos_b - pos_w) * wp
+    return (pos_b - pos_w) * ctx.wp
 
 
-cdef inline signed int _get_e():
+cdef inline signed int _get_e(SearchContext* ctx) noexcept nogil:
     """辺の確定石による評価値
     """
-    global bb, wb, we
     cdef:
         signed int score = 0
         unsigned long long all_bitboard, bit_pos, lt, rt, lb, rb, b_t, w_t, b_b, w_b, b_l, w_l, b_r, w_r
-    all_bitboard = bb | wb
+    all_bitboard = ctx.bb | ctx.wb
     bit_pos = <unsigned long long>0x8000000000000000
     lt = <unsigned long long>0x8000000000000000
     rt = <unsigned long long>0x0100000000000000
@@ -1322,91 +1527,90 @@ cdef inline signed int _get_e():
         # 上辺
         b_t, w_t = 0, 0
         if (lt | rt) & all_bitboard:
-            b_t = (<unsigned long long>0xFF00000000000000 & bb) >> 56
-            w_t = (<unsigned long long>0xFF00000000000000 & wb) >> 56
+            b_t = (<unsigned long long>0xFF00000000000000 & ctx.bb) >> 56
+            w_t = (<unsigned long long>0xFF00000000000000 & ctx.wb) >> 56
         # 下辺
-        b_b = <unsigned long long>0x00000000000000FF & bb
-        w_b = <unsigned long long>0x00000000000000FF & wb
+        b_b = <unsigned long long>0x00000000000000FF & ctx.bb
+        w_b = <unsigned long long>0x00000000000000FF & ctx.wb
         # 左辺
         b_l, w_l = 0, 0
-        if (lt | lb) & bb:
-            if bb & <unsigned long long>0x8000000000000000:
+        if (lt | lb) & ctx.bb:
+            if ctx.bb & <unsigned long long>0x8000000000000000:
                 b_l += <unsigned long long>0x0000000000000080
-            if bb & <unsigned long long>0x0080000000000000:
+            if ctx.bb & <unsigned long long>0x0080000000000000:
                 b_l += <unsigned long long>0x0000000000000040
-            if bb & <unsigned long long>0x0000800000000000:
+            if ctx.bb & <unsigned long long>0x0000800000000000:
                 b_l += <unsigned long long>0x0000000000000020
-            if bb & <unsigned long long>0x0000008000000000:
+            if ctx.bb & <unsigned long long>0x0000008000000000:
                 b_l += <unsigned long long>0x0000000000000010
-            if bb & <unsigned long long>0x0000000080000000:
+            if ctx.bb & <unsigned long long>0x0000000080000000:
                 b_l += <unsigned long long>0x0000000000000008
-            if bb & <unsigned long long>0x0000000000800000:
+            if ctx.bb & <unsigned long long>0x0000000000800000:
                 b_l += <unsigned long long>0x0000000000000004
-            if bb & <unsigned long long>0x0000000000008000:
+            if ctx.bb & <unsigned long long>0x0000000000008000:
                 b_l += <unsigned long long>0x0000000000000002
-            if bb & <unsigned long long>0x0000000000000080:
+            if ctx.bb & <unsigned long long>0x0000000000000080:
                 b_l += <unsigned long long>0x0000000000000001
-        if (lt | lb) & wb:
-            if wb & <unsigned long long>0x8000000000000000:
+        if (lt | lb) & ctx.wb:
+            if ctx.wb & <unsigned long long>0x8000000000000000:
                 w_l += <unsigned long long>0x0000000000000080
-            if wb & <unsigned long long>0x0080000000000000:
+            if ctx.wb & <unsigned long long>0x0080000000000000:
                 w_l += <unsigned long long>0x0000000000000040
-            if wb & <unsigned long long>0x0000800000000000:
+            if ctx.wb & <unsigned long long>0x0000800000000000:
                 w_l += <unsigned long long>0x0000000000000020
-            if wb & <unsigned long long>0x0000008000000000:
+            if ctx.wb & <unsigned long long>0x0000008000000000:
                 w_l += <unsigned long long>0x0000000000000010
-            if wb & <unsigned long long>0x0000000080000000:
+            if ctx.wb & <unsigned long long>0x0000000080000000:
                 w_l += <unsigned long long>0x0000000000000008
-            if wb & <unsigned long long>0x0000000000800000:
+            if ctx.wb & <unsigned long long>0x0000000000800000:
                 w_l += <unsigned long long>0x0000000000000004
-            if wb & <unsigned long long>0x0000000000008000:
+            if ctx.wb & <unsigned long long>0x0000000000008000:
                 w_l += <unsigned long long>0x0000000000000002
-            if wb & <unsigned long long>0x0000000000000080:
+            if ctx.wb & <unsigned long long>0x0000000000000080:
                 w_l += <unsigned long long>0x0000000000000001
         # 右辺
         b_r, w_r = 0, 0
-        if (rt | rb) & bb:
-            if bb & <unsigned long long>0x0100000000000000:
+        if (rt | rb) & ctx.bb:
+            if ctx.bb & <unsigned long long>0x0100000000000000:
                 b_r += <unsigned long long>0x0000000000000080
-            if bb & <unsigned long long>0x0001000000000000:
+            if ctx.bb & <unsigned long long>0x0001000000000000:
                 b_r += <unsigned long long>0x0000000000000040
-            if bb & <unsigned long long>0x0000010000000000:
+            if ctx.bb & <unsigned long long>0x0000010000000000:
                 b_r += <unsigned long long>0x0000000000000020
-            if bb & <unsigned long long>0x0000000100000000:
+            if ctx.bb & <unsigned long long>0x0000000100000000:
                 b_r += <unsigned long long>0x0000000000000010
-            if bb & <unsigned long long>0x0000000001000000:
+            if ctx.bb & <unsigned long long>0x0000000001000000:
                 b_r += <unsigned long long>0x0000000000000008
-            if bb & <unsigned long long>0x0000000000010000:
+            if ctx.bb & <unsigned long long>0x0000000000010000:
                 b_r += <unsigned long long>0x0000000000000004
-            if bb & <unsigned long long>0x0000000000000100:
+            if ctx.bb & <unsigned long long>0x0000000000000100:
                 b_r += <unsigned long long>0x0000000000000002
-            if bb & <unsigned long long>0x0000000000000001:
+            if ctx.bb & <unsigned long long>0x0000000000000001:
                 b_r += <unsigned long long>0x0000000000000001
-        if (rt | rb) & wb:
-            if wb & <unsigned long long>0x0100000000000000:
+        if (rt | rb) & ctx.wb:
+            if ctx.wb & <unsigned long long>0x0100000000000000:
                 w_r += <unsigned long long>0x0000000000000080
-            if wb & <unsigned long long>0x0001000000000000:
+            if ctx.wb & <unsigned long long>0x0001000000000000:
                 w_r += <unsigned long long>0x0000000000000040
-            if wb & <unsigned long long>0x0000010000000000:
+            if ctx.wb & <unsigned long long>0x0000010000000000:
                 w_r += <unsigned long long>0x0000000000000020
-            if wb & <unsigned long long>0x0000000100000000:
+            if ctx.wb & <unsigned long long>0x0000000100000000:
                 w_r += <unsigned long long>0x0000000000000010
-            if wb & <unsigned long long>0x0000000001000000:
+            if ctx.wb & <unsigned long long>0x0000000001000000:
                 w_r += <unsigned long long>0x0000000000000008
-            if wb & <unsigned long long>0x0000000000010000:
+            if ctx.wb & <unsigned long long>0x0000000000010000:
                 w_r += <unsigned long long>0x0000000000000004
-            if wb & <unsigned long long>0x0000000000000100:
+            if ctx.wb & <unsigned long long>0x0000000000000100:
                 w_r += <unsigned long long>0x0000000000000002
-            if wb & <unsigned long long>0x0000000000000001:
+            if ctx.wb & <unsigned long long>0x0000000000000001:
                 w_r += <unsigned long long>0x0000000000000001
-        score = ((edge_table8[b_t] - edge_table8[w_t]) + (edge_table8[b_b] - edge_table8[w_b]) + (edge_table8[b_l] - edge_table8[w_l]) + (edge_table8[b_r] - edge_table8[w_r])) * we
+        score = ((edge_table8[b_t] - edge_table8[w_t]) + (edge_table8[b_b] - edge_table8[w_b]) + (edge_table8[b_l] - edge_table8[w_l]) + (edge_table8[b_r] - edge_table8[w_r])) * ctx.we
     return score
 
 
-cdef inline signed int _get_b():
+cdef inline signed int _get_b(SearchContext* ctx) noexcept nogil:
     """空きマスのパターンによる評価値
     """
-    global bb, wb, wb1, wb2, wb3
     cdef:
         signed int score = 0
         unsigned long long blackwhite, blank
@@ -1418,8 +1622,8 @@ cdef inline signed int _get_b():
         unsigned int i;
         unsigned long long[8] blanks;
         unsigned long long bits;
-    black = bb
-    white = wb
+    black = ctx.bb
+    white = ctx.wb
     blackwhite = black | white
     horizontal = blackwhite & <unsigned long long>0x7E7E7E7E7E7E7E7E  # 左右チェック用マスク
     vertical = blackwhite & <unsigned long long>0x00FFFFFFFFFFFF00    # 上下チェック用マスク
@@ -1473,32 +1677,32 @@ cdef inline signed int _get_b():
             bits = bits + (bits >> <unsigned int>16)
             score -= <signed int>(bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
             # -- _popcount -- }}}
-    score *= wb1
+    score *= ctx.wb1
     # wb2の計算
     lt_x = lt_blank & <unsigned long long>0x0040000000000000  # 左上のX打ち
     if lt_x:
         if lt_x & black:
-            score += wb2
+            score += ctx.wb2
         else:
-            score -= wb2
+            score -= ctx.wb2
     rt_x = rt_blank & <unsigned long long>0x0002000000000000  # 右上のX打ち
     if rt_x:
         if rt_x & black:
-            score += wb2
+            score += ctx.wb2
         else:
-            score -= wb2
+            score -= ctx.wb2
     lb_x = lb_blank & <unsigned long long>0x0000000000004000  # 左下のX打ち
     if lb_x:
         if lb_x & black:
-            score += wb2
+            score += ctx.wb2
         else:
-            score -= wb2
+            score -= ctx.wb2
     rb_x = rb_blank & <unsigned long long>0x0000000000000200  # 右下のX打ち
     if rb_x:
         if rb_x & black:
-            score += wb2
+            score += ctx.wb2
         else:
-            score -= wb2
+            score -= ctx.wb2
     # wb3の計算
     lt_r = l_blank & <unsigned long long>0x4000000000000000
     lt_b = t_blank & <unsigned long long>0x0080000000000000
@@ -1527,28 +1731,28 @@ cdef inline signed int _get_b():
     for i in range(1, 5):
         lt_r >>= 1
         if lt_r & blank:
-            score += wb3 * lt_r_sign
+            score += ctx.wb3 * lt_r_sign
         lt_b >>= 8
         if lt_b & blank:
-            score += wb3 * lt_b_sign
+            score += ctx.wb3 * lt_b_sign
         rt_l <<= 1
         if rt_l & blank:
-            score += wb3 * rt_l_sign
+            score += ctx.wb3 * rt_l_sign
         rt_b >>= 8
         if rt_b & blank:
-            score += wb3 * rt_b_sign
+            score += ctx.wb3 * rt_b_sign
         lb_t <<= 8
         if lb_t & blank:
-            score += wb3 * lb_t_sign
+            score += ctx.wb3 * lb_t_sign
         lb_r >>= 1
         if lb_r & blank:
-            score += wb3 * lb_r_sign
+            score += ctx.wb3 * lb_r_sign
         rb_t <<= 8
         if rb_t & blank:
-            score += wb3 * rb_t_sign
+            score += ctx.wb3 * rb_t_sign
         rb_l <<= 1
         if rb_l & blank:
-            score += wb3 * rb_l_sign
+            score += ctx.wb3 * rb_l_sign
     return score
 
 
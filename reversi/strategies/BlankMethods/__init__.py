@@ -10,7 +10,7 @@ try:
         if os.environ['FORCE_BLANKMETHODS_IMPORT_ERROR'] == 'RAISE':
             raise ImportError
 
-    from ...strategies.BlankMethods.NextMoveSize8_64bit import next_move, get_best_move
+    from ...strategies.BlankMethods.NextMoveSize8_64bit import next_move, get_best_move, perft
     BLANK_SIZE8_64BIT_ERROR = False
 except ImportError:
     pass
@@ -19,4 +19,5 @@ except ImportError:
 __all__ = [
     'next_move',
     'get_best_move',
+    'perft',
 ]
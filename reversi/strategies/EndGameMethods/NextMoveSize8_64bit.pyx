@@ -2,126 +2,205 @@
 """Next Move(Size8,64bit) of EndGame strategy
 """
 
-import time
+from libc.time cimport timespec, timespec_get, TIME_UTC
+from cpython.ref cimport PyObject
 
 from reversi.strategies.common import Timer, Measure
+from reversi.BitBoardMethods.BitMask import get_bit_mask
 from reversi.recorder import Recorder
 
 
+cdef extern from *:
+    """
+    #ifdef _WIN32
+    #include <windows.h>
+    static double _monotonic_time(void) {
+        LARGE_INTEGER count, frequency;
+        QueryPerformanceCounter(&count);
+        QueryPerformanceFrequency(&frequency);
+        return (double)count.QuadPart / (double)frequency.QuadPart;
+    }
+    #else
+    #include <time.h>
+    static double _monotonic_time(void) {
+        struct timespec ts;
+        clock_gettime(CLOCK_MONOTONIC, &ts);
+        return (double)ts.tv_sec + (double)ts.tv_nsec * 1e-9;
+    }
+    #endif
+    """
+    double _monotonic_time() nogil  # 単調増加する時計(s)
+
+
+DEF TIMER_CHECK_INTERVAL = 1024  # 時間と中止要求を確認するノード数の間隔(CancelTokenを使わない場合)
 DEF BEST_MATCH = 0
 DEF BLACK_MAX = 1
 DEF WHITE_MAX = 2
 DEF BLACK_SHORTEST = 3
 DEF WHITE_SHORTEST = 4
+DEF WIN_LOSS_DRAW = 5
 
 DEF SHORTEST_REWARD = 10000
 
-
-cdef:
-    unsigned long long measure_count
-    unsigned long long bb
-    unsigned long long wb
+DEF LAST_N_EMPTIES = 4           # 専用の終盤ソルバーで解く空きマス数
+DEF FASTEST_FIRST_EMPTIES = 6    # 速さ優先(相手の着手可能数が少ない順)で並べる空きマス数
+
+
+ctypedef struct SearchContext:  # 探索毎の状態(探索毎に持つため、複数の探索を同時に実行できる)
+    unsigned long long bb                # 黒のビットボード
+    unsigned long long wb                # 白のビットボード
+    unsigned long long hb                # 穴のビットボード
+    unsigned long long fd                # 直前にひっくり返した石
+    unsigned long long pbb[64]           # 打つ前の黒のビットボード
+    unsigned long long pwb[64]           # 打つ前の白のビットボード
+    unsigned int bs                      # 黒の石数
+    unsigned int ws                      # 白の石数
+    unsigned int pbs[64]                 # 打つ前の黒の石数
+    unsigned int pws[64]                 # 打つ前の白の石数
+    unsigned int tail                    # 退避した手数
+    unsigned int board_size              # ボードサイズ(4,6,8)
+    unsigned int max_depth               # 最大の石数(穴を除くマス数)
+    unsigned long long measure_count     # 探索ノード数
+    unsigned int is_timer_enabled        # タイマー有効
+    double timer_deadline                # タイムアウトする時刻(単調増加する時計)
+    unsigned int timer_timeout           # タイムアウト発生
+    signed int timer_timeout_value       # タイムアウト時に返す評価値
+    unsigned int timer_interval          # 時間と中止要求を確認するノード数の間隔
+    unsigned int timer_countdown         # 次に確認するまでのノード数
+    unsigned char* cancel_flag           # 中止要求(CancelToken.flag、NULLなら無し)
+    PyObject* cancel_event               # 中止要求のイベント(CancelToken.event、NULLなら無し)
+    unsigned int rol                     # 役割
+    signed int taker_sign                # 役割の符号(黒:1, 白:-1)
+    unsigned int rec                     # 棋譜を記録する
+    unsigned int rec_depth               # 記録した手数
+    unsigned int start_depth             # 探索開始時の深さ
+    double rec_score                     # 記録した手順の評価値
     unsigned long long rec_bb
     unsigned long long rec_wb
-    unsigned long long hb
-    unsigned long long fd
-    unsigned long long[64] pbb
-    unsigned long long[64] pwb
-    unsigned long long[64] rec_pbb
-    unsigned long long[64] rec_pwb
-    unsigned int rol
-    unsigned int rec
-    unsigned int rec_depth
-    unsigned int bs
-    unsigned int ws
-    unsigned int max_depth
-    unsigned int start_depth
-    unsigned int[64] pbs
-    unsigned int[64] pws
-    unsigned int[64] rec_pbs
-    unsigned int[64] rec_pws
-    unsigned int tail
-    unsigned int is_timer_enabled
-    double timer_deadline
-    double rec_score
-    unsigned int timer_timeout
-    signed int timer_timeout_value
-    signed int taker_sign
-
-
-def next_move(color, board, depth, pid, timer, measure, role):
+    unsigned long long rec_pbb[64]
+    unsigned long long rec_pwb[64]
+    unsigned int rec_pbs[64]
+    unsigned int rec_pws[64]
+
+
+cdef:
+    unsigned long long[9] mask_h       # 水平方向のマスク値(サイズ毎)
+    unsigned long long[9] mask_v       # 垂直方向のマスク値(サイズ毎)
+    unsigned long long[9] mask_d       # 斜め方向のマスク値(サイズ毎)
+    unsigned long long[9][8] mask_dir  # 上,右上,左,左上(左シフト),右,右下,下,左下(右シフト)のマスク値(サイズ毎)
+    unsigned int[9][8] shift_dir       # 上記8方向のシフト量(サイズ毎)
+    unsigned long long[9][4] mask_quad # 4象限のマスク値(サイズ毎)
+
+
+cdef inline void _init_geometry():
+    """_init_geometry
+           サイズ4,6のマスク値とシフト量を設定する(サイズ8は定数を使用)
+    """
+    global mask_h, mask_v, mask_d, mask_dir, shift_dir, mask_quad
+    cdef:
+        unsigned int size, i, x, y
+    for size in (4, 6):
+        mask = get_bit_mask(size)
+        mask_h[size] = mask.h
+        mask_v[size] = mask.v
+        mask_d[size] = mask.d
+        for i, (direction_mask, shift_size) in enumerate(((mask.u, size), (mask.ur, size-1), (mask.l, 1), (mask.ul, size+1), (mask.r, 1), (mask.br, size+1), (mask.b, size), (mask.bl, size-1))):
+            mask_dir[size][i] = direction_mask
+            shift_dir[size][i] = shift_size
+    for size in (4, 6, 8):
+        for i in range(4):
+            mask_quad[size][i] = 0
+        for y in range(size):
+            for x in range(size):
+                i = (y * 2 // size) * 2 + (x * 2 // size)
+                mask_quad[size][i] |= <unsigned long long>1 << (size * size - 1 - (y * size + x))
+
+
+_init_geometry()
+
+
+def next_move(color, board, depth, pid, timer, measure, role, result=None):
     """next_move
     """
     if pid is None:
         timer, measure = False, False
-    return _next_move(color, board, depth, pid, timer, measure, role)
+    return _next_move(color, board, depth, pid, timer, measure, role, result)
 
 
-def get_best_move(color, board, moves, alpha, beta, depth, pid, timer, measure, role, recorder):
+def get_best_move(color, board, moves, alpha, beta, depth, pid, timer, measure, role, recorder, result=None):
     """get_best_move
     """
     if pid is None:
         timer, measure = False, False
-    return _get_best_move_wrap(color, board, moves, alpha, beta, depth, pid, timer, measure, role, recorder)
+    return _get_best_move_wrap(color, board, moves, alpha, beta, depth, pid, timer, measure, role, recorder, result)
+
+
+def perft(color, board, depth):
+    """perft
+           指定した深さまでの末端局面数を数える(パスも1手、深さ到達前のゲーム終了は1局面として数える)
+    """
+    return _perft_wrap(color, board, depth)
 
 
-cdef inline tuple _next_move(str color, board, int depth, str pid, int timer, int measure, str role):
-    global is_timer_enabled, timer_deadline, timer_timeout, timer_timeout_value, measure_count, bb, wb, hb, bs, ws, max_depth
+cdef inline tuple _next_move(str color, board, int depth, str pid, int timer, int measure, str role, result):
     cdef:
+        SearchContext context
+        SearchContext* ctx = &context
         double alpha = -10000000, beta = 10000000
         unsigned int int_color = 0
-        unsigned int x, y, i, index = 0
-        unsigned long long legal_moves, mask = 0x8000000000000000
+        unsigned int index = 0
+        unsigned long long legal_moves
         unsigned long long[64] legal_moves_bit_list
         unsigned int[64] legal_moves_x
         unsigned int[64] legal_moves_y
+        unsigned char[::1] cancel_flag = None
+        unsigned long long nodes = 0
     # タイマーとメジャー準備
-    measure_count = 0
-    timer_timeout = <unsigned int>0
-    is_timer_enabled = timer
-    if is_timer_enabled and pid:
-        timer_deadline = Timer.deadline[pid]
-        timer_timeout_value = Timer.timeout_value[pid]
+    ctx.tail = 0
+    ctx.measure_count = 0
+    ctx.timer_timeout = <unsigned int>0
+    ctx.is_timer_enabled = timer
+    token = Timer.tokens.get(pid) if timer and pid else None  # 他のスレッドからの中止要求
+    if token is not None:
+        cancel_flag = token.flag
+    _begin_timer(ctx, timer, pid, token, cancel_flag)
     if measure and pid:
         if pid not in Measure.count:
             Measure.count[pid] = <unsigned int>0
-        measure_count = Measure.count[pid]
+        ctx.measure_count = Measure.count[pid]
+    nodes = ctx.measure_count
     # 次の手番
     if color == 'black':
         int_color = <unsigned int>1
     # ボード情報取得
-    bb, wb, hb = board.get_bitboard_info()
-    bs = board._black_score
-    ws = board._white_score
+    ctx.board_size = board.size
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
     # 役割
-    beta = _set_role(role, beta)
+    beta = _set_role(ctx, role, beta)
     # 最大深さ調整
-    if depth > <int>(max_depth - (bs + ws)):
-        depth =  <int>max_depth - (bs + ws)
+    if depth > <int>(ctx.max_depth - (ctx.bs + ctx.ws)):
+        depth =  <int>ctx.max_depth - (ctx.bs + ctx.ws)
     # 棋譜初期化(無効)
-    _init_recorder(<unsigned int>0, depth)
+    _init_recorder(ctx, <unsigned int>0, depth)
     # 最善手を取得
-    legal_moves = _get_legal_moves_bits(int_color, bb, wb, hb)
-    for y in range(8):
-        for x in range(8):
-            if legal_moves & mask:
-                legal_moves_bit_list[index] = mask
-                legal_moves_x[index] = x
-                legal_moves_y[index] = y
-                index += 1
-            mask >>= 1
-    best_move, scores = _get_best_move(int_color, index, legal_moves_bit_list, legal_moves_x, legal_moves_y, alpha, beta, depth)
+    legal_moves = _get_legal_moves_bits(ctx, int_color, ctx.bb, ctx.wb, ctx.hb)
+    index = _get_moves_list(ctx.board_size, legal_moves, legal_moves_bit_list, legal_moves_x, legal_moves_y)
+    best_move, scores = _get_best_move(ctx, int_color, index, legal_moves_bit_list, legal_moves_x, legal_moves_y, alpha, beta, depth)
+    _end_result(ctx, result, nodes, best_move, scores)
     # タイマーとメジャー格納
     if measure and pid:
-        Measure.count[pid] = measure_count
-    if is_timer_enabled and pid and timer_timeout:
+        Measure.count[pid] = ctx.measure_count
+    if ctx.is_timer_enabled and pid and ctx.timer_timeout:
         Timer.timeout_flag[pid] = True  # タイムアウト発生
     return best_move
 
 
-cdef inline _get_best_move_wrap(str color, board, moves, double alpha, double beta, int depth, str pid, int timer, int measure, str role, int recorder):
-    global is_timer_enabled, timer_deadline, timer_timeout, timer_timeout_value, measure_count, bb, wb, hb, bs, ws, max_depth, rec, rec_depth, rec_bb, rec_wb, rec_pbb, rec_pbs, rec_pwb, rec_pws
+cdef inline _get_best_move_wrap(str color, board, moves, double alpha, double beta, int depth, str pid, int timer, int measure, str role, int recorder, result):
     cdef:
+        SearchContext context
+        SearchContext* ctx = &context
         unsigned long long[64] moves_bit_list
         unsigned int[64] moves_x
         unsigned int[64] moves_y
@@ -129,97 +208,114 @@ cdef inline _get_best_move_wrap(str color, board, moves, double alpha, double be
         unsigned long long put
         signed int lshift
         list prev
+        unsigned char[::1] cancel_flag = None
+        unsigned long long nodes = 0
     # タイマーとメジャー準備
-    measure_count = 0
-    timer_timeout = <unsigned int>0
-    is_timer_enabled = timer
-    if is_timer_enabled and pid:
-        timer_deadline = Timer.deadline[pid]
-        timer_timeout_value = Timer.timeout_value[pid]
+    ctx.tail = 0
+    ctx.measure_count = 0
+    ctx.timer_timeout = <unsigned int>0
+    ctx.is_timer_enabled = timer
+    token = Timer.tokens.get(pid) if timer and pid else None  # 他のスレッドからの中止要求
+    if token is not None:
+        cancel_flag = token.flag
+    _begin_timer(ctx, timer, pid, token, cancel_flag)
     if measure and pid:
         if pid not in Measure.count:
             Measure.count[pid] = <unsigned int>0
-        measure_count = Measure.count[pid]
+        ctx.measure_count = Measure.count[pid]
+    nodes = ctx.measure_count
     # 次の手番
     if color == 'black':
         int_color = <unsigned int>1
     # ボード情報取得
-    bb, wb, hb = board.get_bitboard_info()
-    bs = board._black_score
-    ws = board._white_score
+    ctx.board_size = board.size
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
     # 役割
-    beta = _set_role(role, beta)
+    beta = _set_role(ctx, role, beta)
     # 最大深さ調整
-    if depth > <int>(max_depth - (bs + ws)):
-        depth =  <int>max_depth - (bs + ws)
+    if depth > <int>(ctx.max_depth - (ctx.bs + ctx.ws)):
+        depth =  <int>ctx.max_depth - (ctx.bs + ctx.ws)
     # 棋譜初期化
-    _init_recorder(recorder, depth)
+    _init_recorder(ctx, recorder, depth)
     # 最善手を取得
     for x, y in moves:
-        lshift = (63-(y*8+x))
+        lshift = (ctx.board_size*ctx.board_size-1-(y*ctx.board_size+x))
         put = <unsigned long long>1 << lshift
         moves_bit_list[index] = put
         moves_x[index] = x
         moves_y[index] = y
         index += 1
-    best_move, scores = _get_best_move(int_color, index, moves_bit_list, moves_x, moves_y, alpha, beta, depth)
+    best_move, scores = _get_best_move(ctx, int_color, index, moves_bit_list, moves_x, moves_y, alpha, beta, depth)
+    _end_result(ctx, result, nodes, best_move, scores)
     # タイマーとメジャー格納
     if measure and pid:
-        Measure.count[pid] = measure_count
-    if is_timer_enabled and pid and timer_timeout:
+        Measure.count[pid] = ctx.measure_count
+    if ctx.is_timer_enabled and pid and ctx.timer_timeout:
         Timer.timeout_flag[pid] = True  # タイムアウト発生
-    if rec:
+    if ctx.rec:
         prev = []
-        for i in range(rec_depth):
-            prev += [(rec_pbb[i], rec_pwb[i], rec_pbs[i], rec_pws[i])]
-        return (best_move, scores, str(Recorder().get_record_by_custom(8, rec_bb, rec_wb, prev)))
+        for i in range(ctx.rec_depth):
+            prev += [(ctx.rec_pbb[i], ctx.rec_pwb[i], ctx.rec_pbs[i], ctx.rec_pws[i])]
+        return (best_move, scores, str(Recorder().get_record_by_custom(ctx.board_size, ctx.rec_bb, ctx.rec_wb, prev)))
     return (best_move, scores)
 
 
-cdef inline void _init_recorder(unsigned int recorder, unsigned int  depth):
-    global rec, rec_score, rec_depth, start_depth, rec_bb, rec_wb, rec_pbb, rec_pwb, rec_pbs, rec_pws
+cdef inline _end_result(SearchContext* ctx, result, unsigned long long nodes, best_move, dict scores):
+    """_end_result
+           探索結果(SearchResult)にノード数、各手の評価値、最善手順(置換表を使わないため最善手のみ)を記録する
+    """
+    if result is not None:
+        result.nodes += ctx.measure_count - nodes
+        result.scores = scores
+        result.pv = [best_move] if best_move is not None else []
+
+
+cdef inline void _init_recorder(SearchContext* ctx, unsigned int recorder, unsigned int  depth):
     cdef:
         unsigned int i
-    rec = recorder
-    rec_score = <double>0
-    rec_depth = <unsigned int>0
-    rec_bb = <unsigned long long>0
-    rec_wb = <unsigned long long>0
+    ctx.rec = recorder
+    ctx.rec_score = <double>0
+    ctx.rec_depth = <unsigned int>0
+    ctx.rec_bb = <unsigned long long>0
+    ctx.rec_wb = <unsigned long long>0
     for i in range(64):
-        rec_pbb[i] = <unsigned long long>0
-        rec_pwb[i] = <unsigned long long>0
-        rec_pbs[i] = <unsigned int>0
-        rec_pws[i] = <unsigned int>0
-    start_depth = depth
-
-
-cdef inline double _set_role(str role, double beta):
-    global rol, hb, max_depth, taker_sign
-    rol = BEST_MATCH
-    max_depth = <unsigned int>64 - <unsigned int>_popcount(hb)
-    if role != 'best_match':
+        ctx.rec_pbb[i] = <unsigned long long>0
+        ctx.rec_pwb[i] = <unsigned long long>0
+        ctx.rec_pbs[i] = <unsigned int>0
+        ctx.rec_pws[i] = <unsigned int>0
+    ctx.start_depth = depth
+
+
+cdef inline double _set_role(SearchContext* ctx, str role, double beta):
+    ctx.rol = BEST_MATCH
+    ctx.max_depth = <unsigned int>(ctx.board_size*ctx.board_size) - <unsigned int>_popcount(ctx.hb & (<unsigned long long>0xFFFFFFFFFFFFFFFF >> (64-ctx.board_size*ctx.board_size)))
+    if role == 'wld':
+        beta = <double>1  # 勝ち(1以上)/引き分け(0)/負け(-1以下)のみを判定する窓
+        ctx.rol = WIN_LOSS_DRAW
+    elif role != 'best_match':
         # TODO : MUCH_TAKER:確定石の場所を記憶し、相手が確定石に置く手を後回しにする
         if role == 'black_max':
-            beta = <double>max_depth
-            rol = BLACK_MAX
-            taker_sign = <signed int>1
+            beta = <double>ctx.max_depth
+            ctx.rol = BLACK_MAX
+            ctx.taker_sign = <signed int>1
         elif role == 'white_max':
-            beta = <double>max_depth
-            rol = WHITE_MAX
-            taker_sign = <signed int>-1
+            beta = <double>ctx.max_depth
+            ctx.rol = WHITE_MAX
+            ctx.taker_sign = <signed int>-1
         elif role == 'black_shortest':
             beta = <double>SHORTEST_REWARD * 64
-            rol = BLACK_SHORTEST
-            taker_sign = <signed int>1
+            ctx.rol = BLACK_SHORTEST
+            ctx.taker_sign = <signed int>1
         elif role == 'white_shortest':
             beta = <double>SHORTEST_REWARD * 64
-            rol = WHITE_SHORTEST
-            taker_sign = <signed int>-1
+            ctx.rol = WHITE_SHORTEST
+            ctx.taker_sign = <signed int>-1
     return beta
 
 
-cdef inline _get_best_move(unsigned int int_color, unsigned int index, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y, double alpha, double beta, int depth):
-    global timer_timeout, rol
+cdef inline _get_best_move(SearchContext* ctx, unsigned int int_color, unsigned int index, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y, double alpha, double beta, int depth):
     cdef:
         double score = alpha
         unsigned int int_color_next = 1, i, best = 64
@@ -227,98 +323,335 @@ cdef inline _get_best_move(unsigned int int_color, unsigned int index, unsigned
     # 手番
     if int_color:
         int_color_next = <unsigned int>0
+    # 勝敗のみの場合は0付近の窓で探索する
+    if ctx.rol == WIN_LOSS_DRAW:
+        alpha = -1
     # 各手のスコア取得
     for i in range(index):
-        _put_disc(int_color, moves_bit_list[i])
-        if rol == BEST_MATCH:
-            score = -_get_score(int_color_next, -beta, -alpha, depth-1, <unsigned int>0)
-        else:
-            score = _get_score_taker(int_color_next, alpha, beta, depth-1, <unsigned int>0)
-        _undo()
+        with nogil:  # 探索中はGILを解放する
+            _put_disc(ctx, int_color, moves_bit_list[i])
+            if ctx.rol == BEST_MATCH or ctx.rol == WIN_LOSS_DRAW:
+                score = -_get_score(ctx, int_color_next, -beta, -alpha, depth-1, <unsigned int>0)
+            else:
+                score = _get_score_taker(ctx, int_color_next, alpha, beta, depth-1, <unsigned int>0)
+            _undo(ctx)
+        if ctx.rol == WIN_LOSS_DRAW and not ctx.timer_timeout:
+            score = <double>(1 if score > 0 else -1 if score < 0 else 0)  # 勝ち:1, 引き分け:0, 負け:-1
         scores[(moves_x[i], moves_y[i])] = score
         #print(moves_x[i], moves_y[i], score)
-        if timer_timeout:
+        if ctx.timer_timeout:
             if best == 64:
                 best = i
             break
-        if score > alpha:  # 最善手を更新
+        if score > alpha or best == 64 and ctx.rol == WIN_LOSS_DRAW:  # 最善手を更新
             alpha = score
             best = i
+        if ctx.rol == WIN_LOSS_DRAW and alpha >= beta:  # 勝ちが見つかれば打ち切る
+            break
     return (moves_x[best], moves_y[best]), scores
 
 
-cdef inline signed int check_timeout():
+cdef inline double _get_time() noexcept nogil:
+    """_get_time
+           現在時刻(time.time()と同じ基準)をGILを取らずに返す
+    """
+    cdef:
+        timespec ts
+    timespec_get(&ts, TIME_UTC)
+    return <double>ts.tv_sec + <double>ts.tv_nsec * 1e-9
+
+
+cdef inline void _begin_timer(SearchContext* ctx, int timer, str pid, token, unsigned char[::1] cancel_flag):
+    """_begin_timer
+           タイムアウトする時刻を単調増加する時計に換算し、他のスレッドからの中止要求を参照できるようにする
+    """
+    ctx.timer_countdown = 0
+    ctx.timer_interval = TIMER_CHECK_INTERVAL
+    ctx.cancel_flag = NULL
+    ctx.cancel_event = NULL
+    if timer and pid:
+        ctx.timer_deadline = _monotonic_time() + (Timer.deadline[pid] - _get_time())
+        ctx.timer_timeout_value = Timer.timeout_value[pid]
+        if token is not None:
+            ctx.timer_interval = token.interval
+            ctx.cancel_flag = &cancel_flag[0]
+            if token.event is not None:
+                ctx.cancel_event = <PyObject*>token.event
+
+
+cdef inline bint _is_event_set(PyObject* event) noexcept nogil:
+    """_is_event_set
+    """
+    with gil:
+        return (<object>event).is_set()
+
+
+cdef inline signed int check_timeout(SearchContext* ctx) noexcept nogil:
     """check_timeout
+           TIMER_CHECK_INTERVALノード毎に、タイムアウトと中止要求を確認する
     """
-    global timer_deadline, timer_timeout, timer_timeout_value
-    if time.time() > timer_deadline:
-        timer_timeout = <unsigned int>1
-        return timer_timeout_value
+    if ctx.timer_timeout:
+        return ctx.timer_timeout_value
+    if ctx.timer_countdown:
+        ctx.timer_countdown -= 1
+        return <signed int>0
+    ctx.timer_countdown = ctx.timer_interval - 1
+    if _monotonic_time() > ctx.timer_deadline or (ctx.cancel_flag != NULL and ctx.cancel_flag[0]) or (ctx.cancel_event != NULL and _is_event_set(ctx.cancel_event)):
+        ctx.timer_timeout = <unsigned int>1
+        return ctx.timer_timeout_value
     return <signed int>0
 
 
-cdef inline double _get_score(unsigned int int_color, double alpha, double beta, unsigned int depth, unsigned int pas):
+cdef inline double _get_score(SearchContext* ctx, unsigned int int_color, double alpha, double beta, unsigned int depth, unsigned int pas) noexcept nogil:
     """_get_score
     """
-    global timer_timeout, measure_count, bb, wb, bs, ws, pbb, pwb, pbs, pws, fd, tail, is_timer_enabled, max_depth
     cdef:
         signed int timeout
         double score
-        unsigned long long legal_moves_bits, move, count
-        unsigned int i, is_game_end = 0, int_color_next = 1, x, y
-        signed int sign = -1
+        unsigned long long legal_moves_bits, odd
+        unsigned long long[64] moves
+        unsigned int i, index, is_game_end = 0, int_color_next = 1, empties
     # タイムアウト判定
-    if is_timer_enabled:
-        timeout = check_timeout()
+    if ctx.is_timer_enabled:
+        timeout = check_timeout(ctx)
         if timeout:
             return timeout
+    # 残り数マスは専用のソルバーで解く
+    empties = ctx.max_depth - (ctx.bs + ctx.ws)
+    if empties <= LAST_N_EMPTIES and depth >= empties:
+        if int_color:
+            return _solve_last_n(ctx, ctx.bb, ctx.wb, alpha, beta, empties, pas)
+        return _solve_last_n(ctx, ctx.wb, ctx.bb, alpha, beta, empties, pas)
     # 探索ノード数カウント
-    measure_count += 1
+    ctx.measure_count += 1
     # 合法手を取得
-    legal_moves_bits = _get_legal_moves_bits(int_color, bb, wb, hb)
+    legal_moves_bits = _get_legal_moves_bits(ctx, int_color, ctx.bb, ctx.wb, ctx.hb)
     # 前回パス and 打てる場所なし の場合ゲーム終了
     if pas and not legal_moves_bits:
         is_game_end = <unsigned int>1
     # 最大深さに到達 or ゲーム終了
     if not depth or is_game_end:
         if int_color:
-            sign = <signed int>1
-        return <double>((<double>bs - <double>ws) * <double>sign)
+            return <double>(<double>ctx.bs - <double>ctx.ws)
+        return <double>(<double>ctx.ws - <double>ctx.bs)
     # 次の手番
     if int_color:
         int_color_next = <unsigned int>0
     # パスの場合
     if not legal_moves_bits:
-        return -_get_score(int_color_next, -beta, -alpha, depth, <unsigned int>1)
-    # 最終1手
-    if bs + ws == <unsigned int>(max_depth - 1):
-        measure_count += 1
-        count = _popcount(_get_flippable_discs_num(int_color, bb, wb, legal_moves_bits))
-        if rol == BEST_MATCH:
-            if int_color:
-                return <double>(<double>bs - <double>ws + <double>(1 + count*2))
-            else:
-                return <double>-(<double>bs - <double>ws - <double>(1 + count*2))
+        return -_get_score(ctx, int_color_next, -beta, -alpha, depth, <unsigned int>1)
+    # 手の並び替え(空きマスが多い場合は速さ優先、少ない場合は偶数理論)
+    odd = _get_odd_empties(ctx, ~(ctx.bb | ctx.wb | ctx.hb))
+    if empties >= FASTEST_FIRST_EMPTIES:
+        index = _sort_by_mobility(ctx, int_color, legal_moves_bits, odd, moves)
+    else:
+        index = _sort_by_parity(legal_moves_bits, odd, moves)
     # 評価値を算出
-    while (legal_moves_bits):
-        move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
-        _put_disc(int_color, move)
-        score = -_get_score(int_color_next, -beta, -alpha, depth-1, <unsigned int>0)
-        _undo()
-        legal_moves_bits ^= move  # 一番右のONしているビットをOFFする
+    for i in range(index):
+        _put_disc(ctx, int_color, moves[i])
+        score = -_get_score(ctx, int_color_next, -beta, -alpha, depth-1, <unsigned int>0)
+        _undo(ctx)
         if score > alpha:
             alpha = score
-        if timer_timeout:
+        if ctx.timer_timeout:
+            return alpha
+        if alpha >= beta:  # 枝刈り
             return alpha
+    return alpha
+
+
+cdef inline unsigned long long _get_odd_empties(SearchContext* ctx, unsigned long long blank) noexcept nogil:
+    """_get_odd_empties
+           空きマスが奇数個の象限に含まれる空きマスを返す(偶数理論)
+    """
+    cdef:
+        unsigned int i
+        unsigned long long odd = 0, quad
+    for i in range(4):
+        quad = blank & mask_quad[ctx.board_size][i]
+        if _popcount(quad) & 1:
+            odd |= quad
+    return odd
+
+
+cdef inline unsigned int _sort_by_parity(unsigned long long legal_moves_bits, unsigned long long odd, unsigned long long[64] moves) noexcept nogil:
+    """_sort_by_parity
+           奇数個の象限の手を先にして並べ、その数を返す
+    """
+    cdef:
+        unsigned int index = 0, i
+        unsigned long long bits, move
+    for i in range(2):
+        bits = legal_moves_bits & odd if i == 0 else legal_moves_bits & ~odd
+        while bits:
+            move = bits & (~bits+1)  # 一番右のONしているビットのみ取り出す
+            moves[index] = move
+            index += 1
+            bits ^= move
+    return index
+
+
+cdef inline unsigned int _sort_by_mobility(SearchContext* ctx, unsigned int int_color, unsigned long long legal_moves_bits, unsigned long long odd, unsigned long long[64] moves) noexcept nogil:
+    """_sort_by_mobility
+           相手の着手可能数が少ない順(同数の場合は奇数個の象限を優先)に並べ、その数を返す
+    """
+    cdef:
+        unsigned int index = 0, i, key, int_color_next = 0 if int_color else 1
+        unsigned int[64] keys
+        unsigned long long move
+    while legal_moves_bits:
+        move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
+        legal_moves_bits ^= move
+        _put_disc(ctx, int_color, move)
+        key = <unsigned int>_popcount(_get_legal_moves_bits(ctx, int_color_next, ctx.bb, ctx.wb, ctx.hb)) * 2
+        _undo(ctx)
+        if not move & odd:
+            key += 1
+        # 挿入ソート(同じキーは元の順番を保つ)
+        i = index
+        while i and keys[i-1] > key:
+            keys[i] = keys[i-1]
+            moves[i] = moves[i-1]
+            i -= 1
+        keys[i] = key
+        moves[i] = move
+        index += 1
+    return index
+
+
+cdef inline double _solve_last_n(SearchContext* ctx, unsigned long long player, unsigned long long opponent, double alpha, double beta, unsigned int empties, unsigned int pas) noexcept nogil:
+    """_solve_last_n
+           残り空きマス数に応じたソルバーを呼び出す
+    """
+    cdef:
+        unsigned long long blank = ~(player | opponent | ctx.hb) & (<unsigned long long>0xFFFFFFFFFFFFFFFF >> (64 - ctx.board_size * ctx.board_size))
+    if empties == 4:
+        return _solve_4(ctx, player, opponent, alpha, beta, blank, pas)
+    elif empties == 3:
+        return _solve_3(ctx, player, opponent, alpha, beta, blank, pas)
+    elif empties == 2:
+        return _solve_2(ctx, player, opponent, alpha, beta, blank, pas)
+    elif empties == 1:
+        return _solve_1(ctx, player, opponent, blank)
+    ctx.measure_count += 1
+    return _get_final_score(player, opponent)
+
+
+cdef inline double _get_final_score(unsigned long long player, unsigned long long opponent) noexcept nogil:
+    """_get_final_score
+           終局時の石差(手番から見た値)
+    """
+    return <double>_popcount(player) - <double>_popcount(opponent)
+
+
+cdef inline double _solve_1(SearchContext* ctx, unsigned long long player, unsigned long long opponent, unsigned long long move) noexcept nogil:
+    """_solve_1
+           残り1マス(手番が打てなければ相手が打ち、どちらも打てなければ終局)
+    """
+    cdef:
+        double score = _get_final_score(player, opponent)
+        unsigned long long count
+    ctx.measure_count += 1
+    count = _popcount(_get_flippable_discs_num(ctx, 1, player, opponent, move))
+    if count:
+        return score + <double>(1 + count*2)
+    count = _popcount(_get_flippable_discs_num(ctx, 1, opponent, player, move))
+    if count:
+        return score - <double>(1 + count*2)
+    return score
+
+
+cdef inline double _solve_2(SearchContext* ctx, unsigned long long player, unsigned long long opponent, double alpha, double beta, unsigned long long blank, unsigned int pas) noexcept nogil:
+    """_solve_2
+           残り2マス
+    """
+    cdef:
+        double score
+        unsigned long long move1 = blank & (~blank+1), move2 = blank ^ move1, flippable
+        unsigned int is_movable = 0
+    ctx.measure_count += 1
+    flippable = _get_flippable_discs_num(ctx, 1, player, opponent, move1)
+    if flippable:
+        is_movable = 1
+        score = -_solve_1(ctx, opponent ^ flippable, player | move1 | flippable, move2)
+        if score > alpha:
+            alpha = score
         if alpha >= beta:  # 枝刈り
             return alpha
+    flippable = _get_flippable_discs_num(ctx, 1, player, opponent, move2)
+    if flippable:
+        is_movable = 1
+        score = -_solve_1(ctx, opponent ^ flippable, player | move2 | flippable, move1)
+        if score > alpha:
+            alpha = score
+    if not is_movable:
+        if pas:
+            return _get_final_score(player, opponent)
+        return -_solve_2(ctx, opponent, player, -beta, -alpha, blank, <unsigned int>1)
+    return alpha
+
+
+cdef inline double _solve_3(SearchContext* ctx, unsigned long long player, unsigned long long opponent, double alpha, double beta, unsigned long long blank, unsigned int pas) noexcept nogil:
+    """_solve_3
+           残り3マス(奇数個の象限の手を優先)
+    """
+    cdef:
+        double score
+        unsigned long long odd = _get_odd_empties(ctx, blank), bits, move, flippable
+        unsigned int is_movable = 0, i
+    ctx.measure_count += 1
+    for i in range(2):
+        bits = blank & odd if i == 0 else blank & ~odd
+        while bits:
+            move = bits & (~bits+1)  # 一番右のONしているビットのみ取り出す
+            bits ^= move
+            flippable = _get_flippable_discs_num(ctx, 1, player, opponent, move)
+            if flippable:
+                is_movable = 1
+                score = -_solve_2(ctx, opponent ^ flippable, player | move | flippable, -beta, -alpha, blank ^ move, <unsigned int>0)
+                if score > alpha:
+                    alpha = score
+                if alpha >= beta:  # 枝刈り
+                    return alpha
+    if not is_movable:
+        if pas:
+            return _get_final_score(player, opponent)
+        return -_solve_3(ctx, opponent, player, -beta, -alpha, blank, <unsigned int>1)
     return alpha
 
 
-cdef inline double _get_score_taker(unsigned int int_color, double alpha, double beta, unsigned int depth, unsigned int pas):
+cdef inline double _solve_4(SearchContext* ctx, unsigned long long player, unsigned long long opponent, double alpha, double beta, unsigned long long blank, unsigned int pas) noexcept nogil:
+    """_solve_4
+           残り4マス(奇数個の象限の手を優先)
+    """
+    cdef:
+        double score
+        unsigned long long odd = _get_odd_empties(ctx, blank), bits, move, flippable
+        unsigned int is_movable = 0, i
+    ctx.measure_count += 1
+    for i in range(2):
+        bits = blank & odd if i == 0 else blank & ~odd
+        while bits:
+            move = bits & (~bits+1)  # 一番右のONしているビットのみ取り出す
+            bits ^= move
+            flippable = _get_flippable_discs_num(ctx, 1, player, opponent, move)
+            if flippable:
+                is_movable = 1
+                score = -_solve_3(ctx, opponent ^ flippable, player | move | flippable, -beta, -alpha, blank ^ move, <unsigned int>0)
+                if score > alpha:
+                    alpha = score
+                if alpha >= beta:  # 枝刈り
+                    return alpha
+    if not is_movable:
+        if pas:
+            return _get_final_score(player, opponent)
+        return -_solve_4(ctx, opponent, player, -beta, -alpha, blank, <unsigned int>1)
+    return alpha
+
+
+cdef inline double _get_score_taker(SearchContext* ctx, unsigned int int_color, double alpha, double beta, unsigned int depth, unsigned int pas) noexcept nogil:
     """_get_score_taker
     """
-    global timer_timeout, measure_count, bb, wb, bs, ws, pbb, pwb, pbs, pws, fd, tail, is_timer_enabled, rol, taker_sign, max_depth
     cdef:
         signed int timeout
         double score
@@ -326,73 +659,135 @@ cdef inline double _get_score_taker(unsigned int int_color, double alpha, double
         unsigned int i, is_game_end = 0, int_color_next = 1, x, y, reward
         signed int sign = -1
     # タイムアウト判定
-    if is_timer_enabled:
-        timeout = check_timeout()
+    if ctx.is_timer_enabled:
+        timeout = check_timeout(ctx)
         if timeout:
             return timeout
     # 探索ノード数カウント
-    measure_count += 1
+    ctx.measure_count += 1
     # 合法手を取得
-    legal_moves_bits = _get_legal_moves_bits(int_color, bb, wb, hb)
+    legal_moves_bits = _get_legal_moves_bits(ctx, int_color, ctx.bb, ctx.wb, ctx.hb)
     # 前回パス and 打てる場所なし の場合ゲーム終了
     if pas and not legal_moves_bits:
         is_game_end = <unsigned int>1
     # 最大深さに到達 or ゲーム終了
     if not depth or is_game_end:
-        if rol == BLACK_SHORTEST or rol == WHITE_SHORTEST:
-            if is_game_end and <signed int>(bs * taker_sign) > <signed int>(ws * taker_sign):
-                reward = (max_depth - (bs + ws)) * SHORTEST_REWARD
+        if ctx.rol == BLACK_SHORTEST or ctx.rol == WHITE_SHORTEST:
+            if is_game_end and <signed int>(ctx.bs * ctx.taker_sign) > <signed int>(ctx.ws * ctx.taker_sign):
+                reward = (ctx.max_depth - (ctx.bs + ctx.ws)) * SHORTEST_REWARD
                 if reward > SHORTEST_REWARD:
-                    score = <double>((<double>bs - <double>ws) * taker_sign + <double>reward)
+                    score = <double>((<double>ctx.bs - <double>ctx.ws) * ctx.taker_sign + <double>reward)
                     #print(depth, score, hex(bs), hex(ws))
-                    _save_record(score, depth)
+                    _save_record(ctx, score, depth)
                     return score
-        return <double>(<double>bs - <double>ws) * taker_sign
+        return <double>(<double>ctx.bs - <double>ctx.ws) * ctx.taker_sign
     # 次の手番
     if int_color:
         int_color_next = <unsigned int>0
     # パスの場合
     if not legal_moves_bits:
-        return _get_score_taker(int_color_next, alpha, beta, depth, <unsigned int>1)
+        return _get_score_taker(ctx, int_color_next, alpha, beta, depth, <unsigned int>1)
     # 最終1手
-    if bs + ws == <unsigned int>(max_depth - 1):
-        measure_count += 1
-        count = _popcount(_get_flippable_discs_num(int_color, bb, wb, legal_moves_bits))
+    if ctx.bs + ctx.ws == <unsigned int>(ctx.max_depth - 1):
+        ctx.measure_count += 1
+        count = _popcount(_get_flippable_discs_num(ctx, int_color, ctx.bb, ctx.wb, legal_moves_bits))
         if int_color:
-            return <double>(<double>bs - <double>ws + <double>(1 + count*2)) * taker_sign
+            return <double>(<double>ctx.bs - <double>ctx.ws + <double>(1 + count*2)) * ctx.taker_sign
         else:
-            return <double>(<double>bs - <double>ws - <double>(1 + count*2)) * taker_sign
+            return <double>(<double>ctx.bs - <double>ctx.ws - <double>(1 + count*2)) * ctx.taker_sign
     # 評価値を算出
     while (legal_moves_bits):
         move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
-        _put_disc(int_color, move)
-        score = _get_score_taker(int_color_next, alpha, beta, depth-1, <unsigned int>0)
-        _undo()
+        _put_disc(ctx, int_color, move)
+        score = _get_score_taker(ctx, int_color_next, alpha, beta, depth-1, <unsigned int>0)
+        _undo(ctx)
         legal_moves_bits ^= move  # 一番右のONしているビットをOFFする
         if score > alpha:
             alpha = score
-        if timer_timeout:
+        if ctx.timer_timeout:
             return alpha
         if alpha >= beta:  # 枝刈り
             return alpha
     return alpha
 
 
-cdef inline void _save_record(double score, unsigned int depth):
-    global rec, rec_score, rec_depth, start_depth, rec_bb, rec_wb, rec_pbb, rec_pwb, rec_pbs, rec_pws, bb, wb, pbb, pwb, pbs, pws
-    if rec and (score > rec_score):
-        rec_depth = start_depth - depth
-        rec_score = score
-        rec_bb = bb
-        rec_wb = wb
-        for i in range(rec_depth):
-            rec_pbb[i] = pbb[i]
-            rec_pwb[i] = pwb[i]
-            rec_pbs[i] = pbs[i]
-            rec_pws[i] = pws[i]
+cdef inline void _save_record(SearchContext* ctx, double score, unsigned int depth) noexcept nogil:
+    cdef:
+        unsigned int i
+    if ctx.rec and (score > ctx.rec_score):
+        ctx.rec_depth = ctx.start_depth - depth
+        ctx.rec_score = score
+        ctx.rec_bb = ctx.bb
+        ctx.rec_wb = ctx.wb
+        for i in range(ctx.rec_depth):
+            ctx.rec_pbb[i] = ctx.pbb[i]
+            ctx.rec_pwb[i] = ctx.pwb[i]
+            ctx.rec_pbs[i] = ctx.pbs[i]
+            ctx.rec_pws[i] = ctx.pws[i]
+
+
+cdef inline unsigned long long _perft_wrap(str color, board, unsigned int depth):
+    cdef:
+        SearchContext context
+        SearchContext* ctx = &context
+        unsigned int int_color
+        unsigned long long count
+    ctx.board_size = board.size
+    ctx.bb, ctx.wb, ctx.hb = board.get_bitboard_info()
+    ctx.bs = board._black_score
+    ctx.ws = board._white_score
+    ctx.tail = 0
+    int_color = <unsigned int>1 if color == 'black' else <unsigned int>0
+    with nogil:
+        count = _perft(ctx, int_color, depth, <unsigned int>0)
+    return count
+
+
+cdef inline unsigned long long _perft(SearchContext* ctx, unsigned int int_color, unsigned int depth, unsigned int pas) noexcept nogil:
+    """_perft
+    """
+    cdef:
+        unsigned long long legal_moves_bits, move, count = 0
+        unsigned int int_color_next = 1
+    if not depth:
+        return 1
+    if int_color:
+        int_color_next = <unsigned int>0
+    legal_moves_bits = _get_legal_moves_bits(ctx, int_color, ctx.bb, ctx.wb, ctx.hb)
+    # パスの場合
+    if not legal_moves_bits:
+        if pas:
+            return 1  # ゲーム終了
+        return _perft(ctx, int_color_next, depth-1, <unsigned int>1)
+    while legal_moves_bits:
+        move = legal_moves_bits & (~legal_moves_bits+1)  # 一番右のONしているビットのみ取り出す
+        _put_disc(ctx, int_color, move)
+        count += _perft(ctx, int_color_next, depth-1, <unsigned int>0)
+        _undo(ctx)
+        legal_moves_bits ^= move  # 一番右のONしているビットをOFFする
+    return count
 
 
-cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h):
+cdef inline unsigned int _get_moves_list(unsigned int size, unsigned long long legal_moves, unsigned long long[64] moves_bit_list, unsigned int[64] moves_x, unsigned int[64] moves_y) noexcept nogil:
+    """_get_moves_list
+           合法手のビットと座標を左上から順に格納し、その数を返す(立っているビットの数だけ処理する)
+    """
+    cdef:
+        unsigned long long lowest
+        unsigned int square, count = <unsigned int>_popcount(legal_moves), i
+    i = count
+    while legal_moves:
+        lowest = legal_moves & (~legal_moves + 1)  # 下位ビットから取り出し、後ろから格納する
+        square = size * size - 1 - <unsigned int>_popcount(lowest - 1)
+        i -= 1
+        moves_bit_list[i] = lowest
+        moves_x[i] = square % size
+        moves_y[i] = square // size
+        legal_moves ^= lowest
+    return count
+
+
+cdef inline unsigned long long _get_legal_moves_bits(SearchContext* ctx, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long h) noexcept nogil:
     """_get_legal_moves_bits
     """
     cdef:
@@ -400,6 +795,8 @@ cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, uns
     if int_color:
         player = b
         opponent = w
+    if ctx.board_size != 8:
+        return _get_legal_moves_bits_n(ctx, player, opponent, h)
     cdef:
         unsigned long long blank = ~(player | opponent | h)
         unsigned long long horizontal = opponent & <unsigned long long>0x7E7E7E7E7E7E7E7E  # horizontal mask value
@@ -437,7 +834,54 @@ cdef inline unsigned long long _get_legal_moves_bits(unsigned int int_color, uns
     return blank & ((tmp_h << 1) | (tmp_h >> 1) | (tmp_v << 8) | (tmp_v >> 8) | (tmp_d1 << 9) | (tmp_d1 >> 9) | (tmp_d2 << 7) | (tmp_d2 >> 7))
 
 
-cdef inline unsigned long long _popcount(unsigned long long bits):
+cdef inline unsigned long long _get_legal_moves_bits_n(SearchContext* ctx, unsigned long long player, unsigned long long opponent, unsigned long long h) noexcept nogil:
+    """_get_legal_moves_bits_n
+           サイズ4,6の合法手
+    """
+    cdef:
+        unsigned int i, size = ctx.board_size
+        unsigned long long blank = ~(player | opponent | h)
+        unsigned long long horizontal = opponent & mask_h[size]  # horizontal mask value
+        unsigned long long vertical = opponent & mask_v[size]    # vertical mask value
+        unsigned long long diagonal = opponent & mask_d[size]    # diagonal mask value
+        unsigned long long tmp_h, tmp_v, tmp_d1, tmp_d2
+    tmp_h = horizontal & ((player << 1) | (player >> 1))
+    tmp_v = vertical & ((player << size) | (player >> size))
+    tmp_d1 = diagonal & ((player << (size+1)) | (player >> (size+1)))
+    tmp_d2 = diagonal & ((player << (size-1)) | (player >> (size-1)))
+    for i in range(size-3):
+        tmp_h |= horizontal & ((tmp_h << 1) | (tmp_h >> 1))
+        tmp_v |= vertical & ((tmp_v << size) | (tmp_v >> size))
+        tmp_d1 |= diagonal & ((tmp_d1 << (size+1)) | (tmp_d1 >> (size+1)))
+        tmp_d2 |= diagonal & ((tmp_d2 << (size-1)) | (tmp_d2 >> (size-1)))
+    return blank & ((tmp_h << 1) | (tmp_h >> 1) | (tmp_v << size) | (tmp_v >> size) | (tmp_d1 << (size+1)) | (tmp_d1 >> (size+1)) | (tmp_d2 << (size-1)) | (tmp_d2 >> (size-1)))
+
+
+cdef inline unsigned long long _get_flippable_discs_num_n(SearchContext* ctx, unsigned long long player, unsigned long long opponent, unsigned long long move) noexcept nogil:
+    """_get_flippable_discs_num_n
+           サイズ4,6のひっくり返せる石
+    """
+    cdef:
+        unsigned int i, size = ctx.board_size
+        unsigned long long tmp, check, flippable_discs_num = 0
+    for i in range(8):
+        tmp = 0
+        if i < 4:
+            check = (move << shift_dir[size][i]) & mask_dir[size][i]
+            while check & opponent:
+                tmp |= check
+                check = (check << shift_dir[size][i]) & mask_dir[size][i]
+        else:
+            check = (move >> shift_dir[size][i]) & mask_dir[size][i]
+            while check & opponent:
+                tmp |= check
+                check = (check >> shift_dir[size][i]) & mask_dir[size][i]
+        if check & player:
+            flippable_discs_num |= tmp
+    return flippable_discs_num
+
+
+cdef inline unsigned long long _popcount(unsigned long long bits) noexcept nogil:
     """_popcount
     """
     bits = bits - ((bits >> <unsigned int>1) & <unsigned long long>0x5555555555555555)
@@ -448,36 +892,35 @@ cdef inline unsigned long long _popcount(unsigned long long bits):
     return (bits + (bits >> <unsigned int>32)) & <unsigned long long>0x000000000000007F
 
 
-cdef inline void _put_disc(unsigned int int_color, unsigned long long move):
+cdef inline void _put_disc(SearchContext* ctx, unsigned int int_color, unsigned long long move) noexcept nogil:
     """_put_disc
     """
-    global bb, wb, bs, ws, pbb, pwb, pbs, pws, fd, tail
     cdef:
         unsigned long long count
         signed int lshift
     # ひっくり返せる石を取得
-    fd = _get_flippable_discs_num(int_color, bb, wb, move)
-    count = _popcount(fd)
+    ctx.fd = _get_flippable_discs_num(ctx, int_color, ctx.bb, ctx.wb, move)
+    count = _popcount(ctx.fd)
     # 打つ前の状態を格納
-    pbb[tail] = bb
-    pwb[tail] = wb
-    pbs[tail] = bs
-    pws[tail] = ws
-    tail += 1
+    ctx.pbb[ctx.tail] = ctx.bb
+    ctx.pwb[ctx.tail] = ctx.wb
+    ctx.pbs[ctx.tail] = ctx.bs
+    ctx.pws[ctx.tail] = ctx.ws
+    ctx.tail += 1
     # 自分の石を置いて相手の石をひっくり返す
     if int_color:
-        bb ^= move | fd
-        wb ^= fd
-        bs += <unsigned int>1 + <unsigned int>count
-        ws -= <unsigned int>count
+        ctx.bb ^= move | ctx.fd
+        ctx.wb ^= ctx.fd
+        ctx.bs += <unsigned int>1 + <unsigned int>count
+        ctx.ws -= <unsigned int>count
     else:
-        wb ^= move | fd
-        bb ^= fd
-        bs -= <unsigned int>count
-        ws += <unsigned int>1 + <unsigned int>count
+        ctx.wb ^= move | ctx.fd
+        ctx.bb ^= ctx.fd
+        ctx.bs -= <unsigned int>count
+        ctx.ws += <unsigned int>1 + <unsigned int>count
 
 
-cdef inline unsigned long long _get_flippable_discs_num(unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long move):
+cdef inline unsigned long long _get_flippable_discs_num(SearchContext* ctx, unsigned int int_color, unsigned long long b, unsigned long long w, unsigned long long move) noexcept nogil:
     """_get_flippable_discs_size8_64bit
     """
     cdef:
@@ -487,6 +930,8 @@ cdef inline unsigned long long _get_flippable_discs_num(unsigned int int_color,
     if int_color:
         player = b
         opponent = w
+    if ctx.board_size != 8:
+        return _get_flippable_discs_num_n(ctx, player, opponent, move)
     t_ = <unsigned long long>0xFFFFFFFFFFFFFF00 & (move << <unsigned int>8)  # top
     rt = <unsigned long long>0x7F7F7F7F7F7F7F00 & (move << <unsigned int>7)  # right-top
     r_ = <unsigned long long>0x7F7F7F7F7F7F7F7F & (move >> <unsigned int>1)  # right
@@ -539,12 +984,11 @@ cdef inline unsigned long long _get_flippable_discs_num(unsigned int int_color,
     return flippable_discs_num
 
 
-cdef inline void _undo():
+cdef inline void _undo(SearchContext* ctx) noexcept nogil:
     """_undo
     """
-    global bb, wb, bs, ws, pbb, pwb, pbs, pws, tail
-    tail -= 1
-    bb = pbb[tail]
-    wb = pwb[tail]
-    bs = pbs[tail]
-    ws = pws[tail]
+    ctx.tail -= 1
+    ctx.bb = ctx.pbb[ctx.tail]
+    ctx.wb = ctx.pwb[ctx.tail]
+    ctx.bs = ctx.pbs[ctx.tail]
+    ctx.ws = ctx.pws[ctx.tail]
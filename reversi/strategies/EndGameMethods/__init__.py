@@ -10,7 +10,7 @@ try:
         if os.environ['FORCE_ENDGAMEMETHODS_IMPORT_ERROR'] == 'RAISE':
             raise ImportError
 
-    from ...strategies.EndGameMethods.NextMoveSize8_64bit import next_move, get_best_move
+    from ...strategies.EndGameMethods.NextMoveSize8_64bit import next_move, get_best_move, perft
     ENDGAME_SIZE8_64BIT_ERROR = False
 except ImportError:
     pass
@@ -19,4 +19,5 @@ except ImportError:
 __all__ = [
     'next_move',
     'get_best_move',
+    'perft',
 ]
@@ -1,8 +1,6 @@
 """Get Score of NegaScout strategy
 """
 
-import time
-
 from reversi.strategies.common import Timer, Measure
 
 
@@ -130,7 +128,7 @@ def timer(pid):
     """timer
     """
     if pid:
-        if time.time() > Timer.deadline[pid]:
+        if Timer.poll(pid):
             Timer.timeout_flag[pid] = True  # タイムアウト発生
             return Timer.timeout_value[pid]
 
@@ -20,3 +20,12 @@ setup(
     cmdclass={'build_ext': build_ext},
     ext_modules=ext_modules
 )
+
+# NextMoveSize16_256bit
+ext_modules = [Extension("NextMoveSize16_256bit", ["NextMoveSize16_256bit.pyx"])]
+
+setup(
+    name='NextMoveSize16_256bit',
+    cmdclass={'build_ext': build_ext},
+    ext_modules=ext_modules
+)
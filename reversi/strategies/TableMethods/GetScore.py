@@ -5,12 +5,12 @@
 def get_score(table, board):
     """get_score
     """
-    board_info = board.get_board_info()
+    board_view = board.get_board_view()
     size = board.size
     score = 0
 
     for y in range(size):
         for x in range(size):
-            score += table[y][x] * board_info[y][x]
+            score += table[y][x] * board_view[y, x]
 
     return score
@@ -46,11 +46,12 @@ cdef inline signed int _get_score(table, board):
     cdef:
         unsigned int x, y, size
         signed int score
-    board_info = board.get_board_info()
+        signed char[:, :] board_view = board.get_board_view()
     size = board.size
     score = 0
     for y in range(size):
         for x in range(size):
-            score += table[y][x] * board_info[y][x]
+            if board_view[y, x]:
+                score += <signed int>table[y][x] * board_view[y, x]
 
     return score
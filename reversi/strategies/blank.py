@@ -1,55 +1,71 @@
 """Blank
 """
 
+import os
 import sys
 
-from reversi.strategies.common import Timer, Measure, AbstractStrategy
+from reversi.strategies.common import Timer, Measure, SearchResult, AbstractStrategy
 from reversi.strategies.coordinator import Evaluator_TPWEB
 from reversi.strategies.negascout import _NegaScout_, _NegaScout, NegaScout_, NegaScout
 import reversi.strategies.BlankMethods as BlankMethods
 
 
 MAXSIZE64 = 2**63 - 1
+PROBCUT_JSON = os.path.join(os.path.dirname(os.path.abspath(BlankMethods.__file__)), 'probcut.json')  # Blankの探索ログから求めたMulti-ProbCutのパラメータ
 
 
 class _Blank_(AbstractStrategy):
     """
     空きマスの状態を形勢判断に加えて次の手を決める
     """
-    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10):
+    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10, orderer=None, probcut=None):  # noqa: E501
         self._MIN = -10000000
         self._MAX = 10000000
         self.params = [corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3]
         self.evaluator = Evaluator_TPWEB(corner=corner, c=c, a1=a1, a2=a2, b1=b1, b2=b2, b3=b3, x=x, o1=o1, o2=o2, wp=wp, ww=ww, we=we, wb1=wb1, wb2=wb2, wb3=wb3)  # noqa: E501
         self.depth = depth
+        self.orderer = orderer  # 探索中の手の並び替え(Orderer_KHなど、Cython版の探索のみ使用)
+        self.probcut = probcut  # Multi-ProbCutのパラメータ(ProbCut、Cython版の探索のみ使用)
         self.negascout_tpweb = _NegaScout_(depth=depth, evaluator=self.evaluator)
         self.timer = False
         self.measure = False
+        self.result = None  # 直前の探索結果(SearchResult)
 
+    @SearchResult.record
     def next_move(self, color, board):
         """
         次の一手
         """
         pid = Timer.get_pid(self)  # タイムアウト監視用のプロセスID
         if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not BlankMethods.BLANK_SIZE8_64BIT_ERROR:
-            return BlankMethods.next_move(color, board, self.params, self.depth, pid, self.timer, self.measure)
-        return self.negascout_tpweb.next_move(color, board)
+            return BlankMethods.next_move(color, board, self.params, self.depth, pid, self.timer, self.measure, self.orderer, self.probcut, self.result)
+        move = self.negascout_tpweb.next_move(color, board)
+        self.result = self.negascout_tpweb.result  # 置き換えた探索クラスの探索結果
+        return move
 
-    def get_best_move(self, color, board, moves, depth=4, pid=None):
+    def get_best_move(self, color, board, moves, depth=4, pid=None, result=None):
         """
-        最善手を選ぶ
+        最善手を選ぶ(resultを指定した場合は探索結果を記録する)
         """
         alpha, beta = self._MIN, self._MAX
         if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not BlankMethods.BLANK_SIZE8_64BIT_ERROR:
-            return BlankMethods.get_best_move(color, board, self.params, moves, alpha, beta, depth, pid, self.timer, self.measure)
-        return self.negascout_tpweb.get_best_move(color, board, moves, depth, pid)
+            return BlankMethods.get_best_move(color, board, self.params, moves, alpha, beta, depth, pid, self.timer, self.measure, self.orderer, self.probcut, result)  # noqa: E501
+        return self.negascout_tpweb.get_best_move(color, board, moves, depth, pid, result)
+
+    def analyze(self, color, board):
+        """
+        次の一手を探索し、探索結果(SearchResult)を返す
+        """
+        self.next_move(color, board)
+
+        return self.result
 
 
 class _Blank(_Blank_):
     """Blank + Measure
     """
-    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10):
-        super().__init__(depth, corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3)
+    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10, orderer=None, probcut=None):  # noqa: E501
+        super().__init__(depth, corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3, orderer, probcut)
         self.negascout_tpweb = _NegaScout(depth=depth, evaluator=self.evaluator)
         self.timer = False
         self.measure = True
@@ -64,8 +80,8 @@ class _Blank(_Blank_):
 class Blank_(_Blank_):
     """Blank + Timer
     """
-    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10):
-        super().__init__(depth, corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3)
+    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10, orderer=None, probcut=None):  # noqa: E501
+        super().__init__(depth, corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3, orderer, probcut)
         self.negascout_tpweb = NegaScout_(depth=depth, evaluator=self.evaluator)
         self.timer = True
         self.measure = False
@@ -80,8 +96,8 @@ class Blank_(_Blank_):
 class Blank(_Blank_):
     """Blank + Measure + Timer
     """
-    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10):
-        super().__init__(depth, corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3)
+    def __init__(self, depth=4, corner=50, c=-20, a1=0, a2=-1, b1=-1, b2=-1, b3=-1, x=-25, o1=-5, o2=-5, wp=5, ww=10000, we=100, wb1=-5, wb2=-20, wb3=-10, orderer=None, probcut=None):  # noqa: E501
+        super().__init__(depth, corner, c, a1, a2, b1, b2, b3, x, o1, o2, wp, ww, we, wb1, wb2, wb3, orderer, probcut)
         self.negascout_tpweb = NegaScout(depth=depth, evaluator=self.evaluator)
         self.timer = True
         self.measure = True
@@ -1,13 +1,26 @@
 from ...strategies.common.cputime import CPU_TIME
+from ...strategies.common.cancel import CancelToken
 from ...strategies.common.timer import Timer
 from ...strategies.common.measure import Measure
+from ...strategies.common.result import SearchResult
+from ...strategies.common.timemanager import TimeManager
+from ...strategies.common.transposition import TranspositionTable
+from ...strategies.common.probcut import ProbCut
+from ...strategies.common.parallel import get_best_move_parallel, get_time_to_depth
 from ...strategies.common.abstract import AbstractStrategy, AbstractScorer, AbstractEvaluator, AbstractOrderer, AbstractSelector
 
 
 __all__ = [
     'CPU_TIME',
+    'CancelToken',
     'Timer',
     'Measure',
+    'SearchResult',
+    'TimeManager',
+    'TranspositionTable',
+    'ProbCut',
+    'get_best_move_parallel',
+    'get_time_to_depth',
     'AbstractStrategy',
     'AbstractScorer',
     'AbstractEvaluator',
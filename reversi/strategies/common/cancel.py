@@ -0,0 +1,46 @@
+"""CancelToken
+       探索毎の中止要求(他のスレッドから探索を中止する)
+
+       ・Cython版の探索は、CHECK_INTERVALノード毎にタイムアウト(単調増加する時計)と中止要求を確認する
+       ・Python版の探索も、Timer.pollでinterval回の呼び出し毎に同じように確認する
+       ・cancel()はflagを1にするだけなので、GILを解放して探索中のスレッドにもすぐに伝わる
+       ・eventを指定した場合は、event.is_set()も中止要求とみなす(GameのcancelやPonderの停止など)
+"""
+
+import time
+
+
+CHECK_INTERVAL = 1024  # 時間と中止要求を確認するノード数の間隔
+
+
+class CancelToken:
+    """
+    中止要求
+    """
+    def __init__(self, event=None, interval=CHECK_INTERVAL):
+        self.event = event        # 中止要求のイベント(is_set()を持つもの、Noneの場合は無し)
+        self.interval = interval  # 時間と中止要求を確認するノード数の間隔
+        self.flag = bytearray(1)  # 中止要求(Cython版の探索が直接参照する)
+        self.countdown = 1        # 次に確認するまでの呼び出し回数(Python版の探索用、最初の呼び出しで確認する)
+        self.deadline = None      # タイムアウトする時刻(単調増加する時計)
+        self.wall = None          # deadlineの換算元にしたTimer.deadlineの値
+
+    def cancel(self):
+        """cancel
+        """
+        self.flag[0] = 1
+
+    def is_cancelled(self):
+        """is_cancelled
+        """
+        return bool(self.flag[0]) or (self.event is not None and self.event.is_set())
+
+    def poll(self, wall):
+        """
+        タイムアウトと中止要求の確認
+        (wallはtime.time()基準の期限、換算元から変わった場合は単調増加する時計に換算し直す)
+        """
+        if wall != self.wall:
+            self.wall, self.deadline = wall, time.monotonic() + (wall - time.time())
+
+        return self.is_cancelled() or time.monotonic() > self.deadline
@@ -4,7 +4,8 @@
 """
 
 import time
-import os
+
+from reversi.strategies.common.timer import Timer
 
 
 class Measure:
@@ -20,7 +21,7 @@ class Measure:
         時間計測
         """
         def wrapper(*args, **kwargs):
-            key = args[0].__class__.__name__ + str(os.getpid())
+            key = Timer.get_pid(args[0])
 
             if key not in Measure.elp_time:
                 Measure.elp_time[key] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
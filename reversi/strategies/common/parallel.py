@@ -0,0 +1,152 @@
+"""Parallel
+       ルートの手を複数のプロセスに分けて探索する(ルート分割)
+
+       ・最初の手は呼び出し元で全幅の窓で探索し、alphaを決める
+       ・残りの手をプロセスプールに渡し、全プロセスで共有したalphaを下限として探索する
+       ・alphaを超えなかった手の評価値は上限値となる(逐次探索と同じ)
+"""
+
+import copy
+import time
+import atexit
+import multiprocessing
+
+from reversi.strategies.common.timer import Timer
+from reversi.strategies.common.measure import Measure
+from reversi.strategies.common.transposition import TranspositionTable
+
+
+_pools = {}           # ワーカー数毎のプロセスプールと共有alpha(プロセス内で使い回す)
+_shared_alpha = None  # 全ワーカーで共有するalpha(ワーカー側)
+_tables = {}          # サイズ毎の置換表(ワーカー側、同じルートの探索では結果を使い回す)
+
+
+def is_parallel(search, moves):
+    """is_parallel
+           ルート分割で探索するかどうか(デーモンプロセスの中では子プロセスを作れないため逐次探索とする)
+    """
+    workers = getattr(search, 'workers', None)
+
+    return workers is not None and workers > 1 and len(moves) > 1 and not multiprocessing.current_process().daemon
+
+
+def get_pool(workers):
+    """get_pool
+           ワーカー数に応じたプロセスプールと共有alphaを返す
+    """
+    if workers not in _pools:
+        shared_alpha = multiprocessing.Value('d', 0.0)
+        pool = multiprocessing.Pool(processes=workers, initializer=_init_worker, initargs=(shared_alpha,))
+        _pools[workers] = (pool, shared_alpha)
+
+    return _pools[workers]
+
+
+def close_pools():
+    """close_pools
+           作成したプロセスプールを全て終了する
+    """
+    for pool, _ in _pools.values():
+        pool.terminate()
+        pool.join()
+    _pools.clear()
+
+
+atexit.register(close_pools)
+
+
+def get_best_move_parallel(search, color, board, moves, depth, pid=None):
+    """get_best_move_parallel
+           ルート分割で最善手を選ぶ(search.get_best_moveと同じ(最善手, 各手の評価値)を返す)
+    """
+    pool, shared_alpha = get_pool(search.workers)
+
+    # 最初の手で全幅の窓で探索しalphaを決める
+    best_move = moves[0]
+    _, scores = search._get_best_move(color, board, [best_move], search._MIN, search._MAX, depth, pid)
+    alpha = scores[best_move]
+    if Timer.is_timeout(pid):
+        return best_move, scores
+
+    # 残りの手をワーカーで探索する
+    with shared_alpha.get_lock():
+        shared_alpha.value = alpha
+    worker = copy.copy(search)
+    worker.workers, worker.tt = None, None
+    tt_size = search.tt.size if search.tt is not None else None
+    deadline = (Timer.deadline[pid], Timer.timeout_value[pid]) if search.timer and pid in Timer.deadline else None
+    data = board.encode(color)
+    tasks = [(worker, type(board), data, move, search._MAX, depth, tt_size, deadline, pid is not None) for move in moves[1:]]
+
+    for move, score, alpha_used, count, timeout in pool.imap(_search_move, tasks):
+        scores[move] = score
+        if search.measure and pid:
+            Measure.count[pid] = Measure.count.get(pid, 0) + count
+        if timeout:
+            Timer.timeout_flag[pid] = True
+        elif score > alpha_used and score > alpha:  # 窓の内側で求めた評価値のみ最善手とする(同点は先の手を優先)
+            alpha = score
+            best_move = move
+
+    return best_move, {move: scores[move] for move in moves if move in scores}
+
+
+def get_time_to_depth(search, color, board, depth, workers=(1, 2, 4), verbose=False):
+    """get_time_to_depth
+           ワーカー数毎に、指定した深さの探索に掛かる時間と速度向上率を返す
+    """
+    result, original = {}, search.workers
+    moves = board.get_legal_moves(color)
+    pid = Timer.get_pid(search)
+    try:
+        for num in workers:
+            search.workers = num
+            if is_parallel(search, moves):
+                get_pool(num)  # プールの作成時間は含めない
+            if search.timer:
+                Timer.set_deadline(pid, search._MIN)
+            start = time.perf_counter()
+            best_move, scores = search.get_best_move(color, board, moves, depth, pid)
+            elapsed = time.perf_counter() - start
+            speedup = result[workers[0]]['time'] / elapsed if result else 1.0
+            result[num] = {'time': elapsed, 'best_move': best_move, 'score': scores[best_move], 'speedup': speedup}
+            if verbose:
+                print(f'workers={num:3d} depth={depth:2d} time={elapsed:9.3f}s speedup={result[num]["speedup"]:6.2f} best_move={best_move}')
+    finally:
+        search.workers = original
+
+    return result
+
+
+def _init_worker(shared_alpha):
+    """_init_worker
+    """
+    global _shared_alpha
+    _shared_alpha = shared_alpha
+
+
+def _search_move(task):
+    """_search_move
+           共有alphaを下限として1手を探索する(ワーカー側)
+    """
+    search, board_class, data, move, beta, depth, tt_size, deadline, use_pid = task
+    board, color = board_class.decode(data)
+    pid = Timer.get_pid(search) if use_pid else None  # 呼び出し元がpidなしの場合は計測もタイマーも使わない
+    if tt_size is not None:
+        if tt_size not in _tables:
+            _tables[tt_size] = TranspositionTable(size=tt_size)
+        search.tt = _tables[tt_size]
+    if deadline is not None:
+        Timer.deadline[pid], Timer.timeout_value[pid] = deadline
+    if pid is not None:
+        Timer.timeout_flag[pid] = False
+        Measure.count[pid] = 0
+
+    alpha = _shared_alpha.value
+    _, scores = search._get_best_move(color, board, [move], alpha, beta, depth, pid)
+    score = scores[move]
+    with _shared_alpha.get_lock():
+        if score > _shared_alpha.value:
+            _shared_alpha.value = score
+
+    return move, score, alpha, Measure.count.get(pid, 0), Timer.is_timeout(pid)
@@ -0,0 +1,185 @@
+"""ProbCut
+       Multi-ProbCut(浅い探索の評価値から深い探索の評価値を予測し、結果に影響しない見込みが高い手を途中で枝刈りする)
+
+       ・深さdの評価値v_dを、浅い深さsの評価値v_sから v_d = a * v_s + b (誤差の標準偏差sigma) と予測する
+       ・v_s >= (beta + t * sigma - b) / a なら v_d >= beta、v_s <= (alpha - t * sigma - b) / a なら v_d <= alpha とみなす
+       ・a, b, sigmaは石数の段階(ステージ)・深さ毎に、探索ログ(同じ局面の浅い/深い探索の評価値)から最小二乗法で求める
+       ・1つの深さに対して浅い探索を最大PROBCUT_CHECKS回(浅い順に)試す
+"""
+
+import json
+import math
+import struct
+
+
+PROBCUT_STAGES = 8      # 石数による段階の数
+PROBCUT_MAX_DEPTH = 16  # パラメータを持つ深さの上限
+PROBCUT_CHECKS = 2      # 1つの深さで試す浅い探索の数
+ENTRY_FORMAT = '<dddii'  # a, b, sigma, 浅い探索の深さ(-1は無し), 予備
+ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+PROBCUT_TABLE_SIZE = PROBCUT_STAGES * (PROBCUT_MAX_DEPTH + 1) * PROBCUT_CHECKS * ENTRY_SIZE
+MIN_SAMPLES = 10        # パラメータを求めるのに必要なサンプル数
+SCORE_LIMIT = 10000     # 評価値の絶対値がこれ以上のサンプル(勝敗が確定した局面)は使わない
+
+DEFAULT_PAIRS = {       # 深い探索の深さ : 浅い探索の深さ
+    3: (1,),
+    4: (0, 2),
+    5: (1, 3),
+    6: (2, 4),
+    7: (3, 5),
+    8: (2, 4),
+    9: (3, 5),
+    10: (4, 6),
+    11: (5, 7),
+    12: (4, 6),
+}
+
+
+def get_stage(discs, size=8):
+    """get_stage
+           石数から段階を返す(Cython版の探索と同じ式)
+    """
+    return discs * PROBCUT_STAGES // (size * size + 1)
+
+
+class ProbCut:
+    """
+    Multi-ProbCutのパラメータ(Cython版の探索で使用する固定長の配列)
+    """
+    def __init__(self, t=1.5, size=8, pairs=None):
+        self.t = t          # 枝刈りの閾値(標準偏差の何倍まで予測を外れる可能性を考慮するか)
+        self.size = size    # パラメータを求めたボードサイズ(これ以外のサイズでは枝刈りしない)
+        self.pairs = {int(deep): tuple(shallows) for deep, shallows in (pairs if pairs is not None else DEFAULT_PAIRS).items()}
+        self.params = {}    # (段階, 深い探索の深さ, 浅い探索の深さ) : (a, b, sigma)
+        self.table = bytearray(PROBCUT_TABLE_SIZE)
+        self.probes = 0
+        self.cuts = 0
+        self._update_table()
+
+    def clear(self):
+        """clear
+        """
+        self.params = {}
+        self.probes = 0
+        self.cuts = 0
+        self._update_table()
+
+    def cut_rate(self):
+        """cut_rate
+        """
+        return self.cuts / self.probes if self.probes else 0.0
+
+    def set_param(self, stage, deep, shallow, a, b, sigma):
+        """set_param
+        """
+        self.params[(stage, deep, shallow)] = (a, b, sigma)
+        self._update_table()
+
+    def collect(self, search, positions, pid=None):
+        """collect
+
+               各局面(ボード, 手番)を浅い/深い探索の全ての深さで探索し、(石数, 浅い深さ, 評価値, 深い深さ, 評価値)のリストを返す
+               (探索クラスのget_best_moveを使う。探索中はProbCutを無効にする)
+        """
+        samples = []
+        depths = sorted(set(self.pairs) | {shallow for shallows in self.pairs.values() for shallow in shallows})
+        original = getattr(search, 'probcut', None)
+        search.probcut = None
+        try:
+            for board, color in positions:
+                moves = board.get_legal_moves(color)
+                if not moves:
+                    continue
+                discs = board._black_score + board._white_score
+                values = {depth: self._get_value(search, color, board, moves, depth, pid) for depth in depths}
+                for deep, shallows in self.pairs.items():
+                    for shallow in shallows:
+                        samples.append((discs, shallow, values[shallow], deep, values[deep]))
+        finally:
+            search.probcut = original
+
+        return samples
+
+    def fit(self, samples, score_limit=SCORE_LIMIT):
+        """fit
+
+               サンプル(石数, 浅い深さ, 評価値, 深い深さ, 評価値)から段階・深さ毎のa, b, sigmaを求める
+        """
+        groups = {}
+        for discs, shallow, shallow_score, deep, deep_score in samples:
+            if abs(shallow_score) >= score_limit or abs(deep_score) >= score_limit:
+                continue
+            key = (get_stage(discs, self.size), deep, shallow)
+            groups.setdefault(key, []).append((shallow_score, deep_score))
+
+        for key, values in groups.items():
+            if len(values) < MIN_SAMPLES:
+                continue
+            n = len(values)
+            mean_x = sum(x for x, _ in values) / n
+            mean_y = sum(y for _, y in values) / n
+            var_x = sum((x - mean_x) ** 2 for x, _ in values)
+            if not var_x:
+                continue
+            a = sum((x - mean_x) * (y - mean_y) for x, y in values) / var_x
+            b = mean_y - a * mean_x
+            sigma = math.sqrt(sum((y - a * x - b) ** 2 for x, y in values) / n)
+            self.params[key] = (a, b, sigma)
+
+        self._update_table()
+
+    def save(self, path):
+        """save
+        """
+        pairs = {str(deep): list(shallows) for deep, shallows in self.pairs.items()}
+        params = [[stage, deep, shallow, a, b, sigma] for (stage, deep, shallow), (a, b, sigma) in sorted(self.params.items())]
+
+        with open(path, 'w') as f:
+            json.dump({'t': self.t, 'size': self.size, 'pairs': pairs, 'params': params}, f, indent=1)
+
+    @classmethod
+    def load(cls, path, t=None):
+        """load
+        """
+        with open(path) as f:
+            data = json.load(f)
+
+        probcut = cls(t=data['t'] if t is None else t, size=data['size'], pairs=data['pairs'])
+        for stage, deep, shallow, a, b, sigma in data['params']:
+            probcut.params[(stage, deep, shallow)] = (a, b, sigma)
+        probcut._update_table()
+
+        return probcut
+
+    def _get_value(self, search, color, board, moves, depth, pid):
+        """_get_value
+               手番から見た評価値(深さ0は評価関数の値)
+        """
+        if not depth:
+            sign = 1 if color == 'black' else -1
+            return search.evaluator.evaluate(color, board, len(board.get_legal_moves('black')), len(board.get_legal_moves('white'))) * sign
+
+        _, scores = search.get_best_move(color, board, moves, depth, pid)
+
+        return max(scores.values())
+
+    def _update_table(self):
+        """_update_table
+               パラメータをCython版の探索で使う配列に書き込む(深さ毎に浅い探索の深さが浅い順、無い所は浅い探索の深さを-1とする)
+        """
+        table = bytearray(PROBCUT_TABLE_SIZE)
+        for offset in range(0, PROBCUT_TABLE_SIZE, ENTRY_SIZE):
+            struct.pack_into(ENTRY_FORMAT, table, offset, 0.0, 0.0, 0.0, -1, 0)
+
+        for stage in range(PROBCUT_STAGES):
+            for deep, shallows in self.pairs.items():
+                if deep > PROBCUT_MAX_DEPTH:
+                    continue
+                shallows = [shallow for shallow in sorted(shallows) if shallow < deep and (stage, deep, shallow) in self.params]
+                params = [(shallow,) + self.params[(stage, deep, shallow)] for shallow in shallows]
+                params = [param for param in params if param[1] > 0][:PROBCUT_CHECKS]
+                for check, (shallow, a, b, sigma) in enumerate(params):
+                    offset = ((stage * (PROBCUT_MAX_DEPTH + 1) + deep) * PROBCUT_CHECKS + check) * ENTRY_SIZE
+                    struct.pack_into(ENTRY_FORMAT, table, offset, a, b, sigma, shallow, 0)
+
+        self.table = table
@@ -0,0 +1,75 @@
+"""SearchResult
+       探索結果(最善手、最善手順、読んだ深さ、ノード数、経過時間、置換表のヒット率、各手の評価値)
+
+       ・探索クラスのnext_moveは探索の度にresult属性へ記録し、analyze(color, board)は次の一手を探索して記録を返す
+       ・ノード数、置換表の統計、最善手順はCython版の探索が記録する(Python版の探索のノード数はMeasure版の場合のみ、ルート分割の子プロセスの分は含まない)
+       ・最善手順は置換表(64bit版)を辿って求め、置換表がない場合は最善手のみ
+"""
+
+import time
+
+from reversi.strategies.common.timer import Timer
+from reversi.strategies.common.measure import Measure
+
+
+class SearchResult:
+    """
+    探索結果
+    """
+    def __init__(self, depth=None):
+        self.move = None      # 最善手
+        self.score = None     # 最善手の評価値
+        self.scores = {}      # 各手の評価値(探索した手のみ)
+        self.pv = []          # 最善手順
+        self.depth = depth    # 読んだ深さ
+        self.nodes = 0        # 探索ノード数
+        self.elapsed = 0.0    # 経過時間(s)
+        self.timeout = False  # タイムアウト(中止)で打ち切ったかどうか
+        self.tt_probes = 0    # 置換表の参照回数
+        self.tt_hits = 0      # 置換表のヒット回数
+
+    def __repr__(self):
+        return f'SearchResult(move={self.move}, score={self.score}, pv={self.pv}, depth={self.depth}, nodes={self.nodes}, elapsed={self.elapsed:.6f}, timeout={self.timeout})'  # noqa: E501
+
+    def nps(self):
+        """nps
+               1秒あたりの探索ノード数
+        """
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def tt_hit_rate(self):
+        """tt_hit_rate
+        """
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @classmethod
+    def record(cls, func):
+        """
+        探索結果の記録(探索クラスのnext_moveに付ける)
+        """
+        def wrapper(*args, **kwargs):
+            strategy = args[0]
+            search = getattr(strategy, 'search', strategy)  # 反復深化は探索クラスのプロセスID
+            pid = Timer.begin_search(search)
+            try:
+                count = Measure.count.get(pid, 0)
+
+                strategy.result = cls(strategy.depth)
+                time_s = time.perf_counter()
+                move = func(*args, **kwargs)
+                elapsed = time.perf_counter() - time_s
+
+                result = strategy.result  # 他の探索クラスに任せた場合はその探索結果
+                result.move = move
+                result.score = result.scores.get(move)
+                result.elapsed = elapsed
+                result.timeout = result.timeout or Timer.is_timeout(pid)
+                if not result.nodes:
+                    result.nodes = Measure.count.get(pid, 0) - count  # Python版の探索(Measure版)
+                if not result.pv and move is not None:
+                    result.pv = [move]
+
+                return move
+            finally:
+                Timer.end_search(search)
+        return wrapper
@@ -0,0 +1,110 @@
+"""TimeManager
+       持ち時間(1局の持ち時間 + 1手毎の加算時間)から1手毎の考慮時間を決める
+
+       ・残りの持ち時間を自分の残りの手数(空きマス数の半分)で割った時間を基準とし、合法手の数に応じて増減させる(ソフトな期限)
+       ・ソフトな期限の数倍(残りの持ち時間の範囲内)をハードな期限とし、探索クラスのタイムアウトに使う
+       ・反復深化では、最善手が変わった場合はソフトな期限を延ばし、最善手が続けて変わらない場合は早めに打ち切る
+       ・前回の手より石数が少ない局面で呼ばれた場合は新しい対局とみなし、持ち時間を戻す
+       ・先読み(Ponder)のスレッドの探索は持ち時間から引かない
+"""
+
+import time
+
+from reversi.BitBoardMethods import popcount
+from reversi.strategies.common.timer import Timer
+
+
+BRANCHING = 10            # 考慮時間を増減させる基準の合法手の数
+MIN_BRANCHING_RATIO = 0.5
+MAX_BRANCHING_RATIO = 1.5
+
+
+class TimeManager:
+    """
+    持ち時間の管理
+    """
+    def __init__(self, total=60.0, increment=0.0, reserve=1.0, min_time=0.01, hard_ratio=4.0, extension=1.5, stable=3, shrink=0.5):
+        self.total = total            # 1局の持ち時間(s)
+        self.increment = increment    # 1手毎に加算する時間(s)
+        self.reserve = reserve        # 使わずに残しておく時間(s)
+        self.min_time = min_time      # 1手の最小の考慮時間(s)
+        self.hard_ratio = hard_ratio  # ハードな期限のソフトな期限に対する倍率
+        self.extension = extension    # 最善手が変わった時にソフトな期限を延ばす倍率
+        self.stable = stable          # 最善手がこの回数続けて変わらない場合は早めに打ち切る
+        self.shrink = shrink          # 早めに打ち切る場合のソフトな期限の倍率
+        self.remaining = total        # 残りの持ち時間(s)
+        self.discs = None             # 前回の手の石数(新しい対局の判定用)
+        self.moves = {}               # プロセスID : 考慮中の手の情報
+
+    def new_game(self):
+        """new_game
+        """
+        self.remaining = self.total
+        self.discs = None
+        self.moves = {}
+
+    def allocate(self, color, board):
+        """allocate
+
+               (ソフトな期限, ハードな期限)までの時間(s)を返す
+        """
+        _, _, hole = board.get_bitboard_info()
+        empties = board.size * board.size - (board._black_score + board._white_score) - popcount(hole)  # 穴は空きマスに含めない
+        moves_left = max(1, (empties + 1) // 2)                  # 自分の残りの手数
+        available = max(self.remaining - self.reserve, self.min_time)
+
+        branching = len(board.get_legal_moves(color))
+        if branching <= 1:
+            return self.min_time, self.min_time                  # 1手しかない場合は考えない
+
+        ratio = min(max(branching / BRANCHING, MIN_BRANCHING_RATIO), MAX_BRANCHING_RATIO)
+        soft = min(max((available / moves_left + self.increment) * ratio, self.min_time), available)
+        hard = min(max(soft * self.hard_ratio, self.min_time), available)
+
+        return soft, hard
+
+    def start_move(self, pid, value, color, board):
+        """start_move
+
+               考慮時間を決めて探索クラスのタイムアウトを設定する
+        """
+        discs = board._black_score + board._white_score
+        if self.discs is not None and discs < self.discs:
+            self.new_game()
+        self.discs = discs
+
+        soft, hard = self.allocate(color, board)
+        Timer.set_deadline(pid, value, hard)
+        Timer.managers[pid] = self
+        self.moves[pid] = {'start': time.time(), 'soft': soft, 'hard': hard, 'best_move': None, 'count': 0}
+
+    def next_iteration(self, pid, best_move):
+        """next_iteration
+
+               反復深化の1回分の探索が終わった時に呼び、次の深さを探索するかどうかを返す
+        """
+        move = self.moves.get(pid)
+        if move is None:
+            return True
+
+        if move['best_move'] is not None:
+            if best_move != move['best_move']:
+                move['soft'] = min(move['soft'] * self.extension, move['hard'])  # 最善手が変わった場合は延ばす
+                move['count'] = 0
+            else:
+                move['count'] += 1
+        move['best_move'] = best_move
+
+        soft = move['soft'] * self.shrink if move['count'] >= self.stable else move['soft']
+
+        return time.time() - move['start'] < soft
+
+    def end_move(self, pid):
+        """end_move
+
+               考慮時間を持ち時間から引き、加算時間を足す
+        """
+        Timer.managers.pop(pid, None)
+        move = self.moves.pop(pid, None)
+        if move is not None and not getattr(Timer.local, 'suffix', ''):
+            self.remaining = self.remaining - (time.time() - move['start']) + self.increment
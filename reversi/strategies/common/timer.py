@@ -3,8 +3,10 @@
 
 import time
 import os
+import threading
 
 from reversi.strategies.common import CPU_TIME
+from reversi.strategies.common.cancel import CancelToken
 
 
 class Timer:
@@ -15,22 +17,91 @@ class Timer:
     timeout_flag = {}
     timeout_value = {}
     time_limit = CPU_TIME
+    managers = {}  # プロセスID : 考慮中の持ち時間の管理(TimeManager)
+    tokens = {}    # プロセスID : 探索中の中止要求(CancelToken)
+    searches = {}  # (プロセスID, 戦略のid) : [探索毎のプロセスID, 入れ子の数]
+    lock = threading.Lock()
+    local = threading.local()  # スレッド毎のプロセスIDの接尾辞(先読みのスレッドで相手の探索とタイマーを分ける)
 
     @classmethod
     def get_pid(cls, obj):
         """
-        プロセスID取得
+        プロセスID取得(探索中の場合は探索毎のプロセスID)
         """
-        return obj.__class__.__name__ + str(os.getpid())
+        pid = obj.__class__.__name__ + str(os.getpid()) + getattr(Timer.local, 'suffix', '')
+        search = Timer.searches.get((pid, id(obj)))
+
+        return search[0] if search else pid
+
+    @classmethod
+    def begin_search(cls, obj):
+        """
+        探索開始
+        (同じクラスの他の戦略が探索中の場合は、プロセスIDに番号を付けて期限・中止要求・持ち時間の管理を分ける)
+        """
+        pid = obj.__class__.__name__ + str(os.getpid()) + getattr(Timer.local, 'suffix', '')
+        key = (pid, id(obj))
+        with Timer.lock:
+            if key in Timer.searches:
+                Timer.searches[key][1] += 1  # 同じ戦略の入れ子の呼び出し
+            else:
+                used = {search[0] for search in Timer.searches.values()}
+                search_pid, number = pid, 1
+                while search_pid in used:
+                    number += 1
+                    search_pid = pid + '#' + str(number)
+                Timer.searches[key] = [search_pid, 1]
+
+            return Timer.searches[key][0]
 
     @classmethod
-    def set_deadline(cls, pid, value):
+    def end_search(cls, obj):
         """
-        期限を設定
+        探索終了
+        (終了した探索の中止要求を削除する。以降のTimer.pollは呼び出し毎に期限を確認する)
         """
-        Timer.deadline[pid] = time.time() + Timer.time_limit  # デッドラインを設定する
+        pid = obj.__class__.__name__ + str(os.getpid()) + getattr(Timer.local, 'suffix', '')
+        key = (pid, id(obj))
+        with Timer.lock:
+            search = Timer.searches.get(key)
+            if search is not None:
+                search[1] -= 1
+                if not search[1]:
+                    del Timer.searches[key]
+                    Timer.tokens.pop(search[0], None)
+
+    @classmethod
+    def set_pid_suffix(cls, suffix):
+        """
+        現在のスレッドのプロセスIDの接尾辞を設定
+        """
+        Timer.local.suffix = suffix
+
+    @classmethod
+    def set_cancel_event(cls, event):
+        """
+        現在のスレッドの探索を中止するイベントを設定(Noneで解除)
+        """
+        Timer.local.event = event
+
+    @classmethod
+    def cancel(cls, pid):
+        """
+        探索中止(探索中の戦略はTimer.get_pid(戦略)で指定する)
+        """
+        if pid in Timer.tokens:
+            Timer.tokens[pid].cancel()
+
+    @classmethod
+    def set_deadline(cls, pid, value, time_limit=None):
+        """
+        期限を設定(time_limitを省略した場合はTimer.time_limit)
+        """
+        time_limit = Timer.time_limit if time_limit is None else time_limit
+        Timer.deadline[pid] = time.time() + time_limit        # デッドラインを設定する
         Timer.timeout_flag[pid] = False                       # タイムアウト未発生
         Timer.timeout_value[pid] = value                      # タイムアウト発生時の値を設定する
+        Timer.tokens[pid] = CancelToken(getattr(Timer.local, 'event', None))  # 探索毎の中止要求
 
     @classmethod
     def start(cls, value):
@@ -39,9 +110,20 @@ class Timer:
         """
         def _start(func):
             def wrapper(*args, **kwargs):
-                pid = cls.get_pid(args[0])
-                cls.set_deadline(pid, value)
-                return func(*args, **kwargs)
+                pid = cls.begin_search(args[0])
+                try:
+                    time_manager = getattr(args[0], 'time_manager', None)
+                    if time_manager is None:
+                        cls.set_deadline(pid, value)
+                        return func(*args, **kwargs)
+
+                    time_manager.start_move(pid, value, *args[1:3])  # 持ち時間から考慮時間を決める
+                    try:
+                        return func(*args, **kwargs)
+                    finally:
+                        time_manager.end_move(pid)
+                finally:
+                    cls.end_search(args[0])
             return wrapper
         return _start
 
@@ -54,12 +136,29 @@ class Timer:
             if 'pid' in kwargs:
                 pid = kwargs['pid']
                 if pid:
-                    if time.time() > Timer.deadline[pid]:
+                    if cls.poll(pid):
                         Timer.timeout_flag[pid] = True  # タイムアウト発生
                         return Timer.timeout_value[pid]
             return func(*args, **kwargs)
         return wrapper
 
+    @classmethod
+    def poll(cls, pid):
+        """
+        タイムアウトと中止要求の確認
+        (中止要求が有る場合は、Cython版の探索と同じくtoken.interval回の呼び出し毎に単調増加する時計で確認する)
+        """
+        token = Timer.tokens.get(pid)
+        if token is None:
+            return time.time() > Timer.deadline[pid]
+
+        token.countdown -= 1
+        if token.countdown > 0:
+            return False
+        token.countdown = token.interval
+
+        return token.poll(Timer.deadline[pid])
+
     @classmethod
     def is_timeout(cls, pid):
         """
@@ -0,0 +1,57 @@
+"""TranspositionTable
+"""
+
+
+MEGABYTE = 1024 * 1024
+
+
+class TranspositionTable:
+    """
+    置換表(Cython版の探索で使用する固定長の配列)
+    """
+    def __init__(self, size=16, persist=False):
+        self.size = size        # テーブルサイズ(MB)
+        self.persist = persist  # 1ゲーム内で次の手以降も結果を使い回すかどうか
+        self.table = bytearray(int(size * MEGABYTE))
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self._root = None
+        self._discs = None
+
+    def __len__(self):
+        return len(self.table)
+
+    def clear(self):
+        """clear
+        """
+        self.table = bytearray(len(self.table))
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self._root = None
+        self._discs = None
+
+    def new_search(self, color, board):
+        """new_search
+
+               探索開始時に呼び出す
+               ・同じ局面の再探索(反復深化)では世代を維持し、前回の結果を使う
+               ・異なる局面の場合は世代を更新する(persist=Falseの場合は古い世代を無効とする)
+               ・persist=Trueでも石数が減った場合は新しいゲームとみなして表を消去する
+        """
+        root = (color,) + tuple(board.get_bitboard_info())
+        discs = board._black_score + board._white_score
+        if self.persist and self._discs is not None and discs < self._discs:
+            self.clear()
+        if root != self._root:
+            self.generation += 1
+        self._root = root
+        self._discs = discs
+
+    def hit_rate(self):
+        """hit_rate
+        """
+        return self.hits / self.probes if self.probes else 0.0
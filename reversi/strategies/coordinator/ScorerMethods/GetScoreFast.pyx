@@ -168,11 +168,11 @@ cdef inline signed int _get_blank_score(board, signed int w1, signed int w2, sig
         signed int i, x, y, value, j, dx, dy, next_x1, next_y1, next_x2, next_y2, d, dx_abs, dy_abs, k, next_x3, next_y3
         signed int score = 0
         signed int board_info[26][26]
+        signed char[:, :] board_view = board.get_board_view()
 
-    board_info_tmp = board.get_board_info()
     for y in range(size):
         for x in range(size):
-            board_info[x][y] = board_info_tmp[x][y]
+            board_info[x][y] = board_view[x, y]
 
     for y in range(size):
         for x in range(size):
@@ -1,6 +1,6 @@
 from ...strategies.coordinator.scorer import TableScorer, PossibilityScorer, OpeningScorer, WinLoseScorer, NumberScorer, EdgeScorer, CornerScorer, BlankScorer, EdgeCornerScorer  # noqa: E501
 from ...strategies.coordinator.selector import Selector, Selector_W
-from ...strategies.coordinator.orderer import Orderer, Orderer_B, Orderer_C, Orderer_P, Orderer_BC, Orderer_CB, Orderer_PCB
+from ...strategies.coordinator.orderer import Orderer, Orderer_B, Orderer_C, Orderer_P, Orderer_BC, Orderer_CB, Orderer_PCB, Orderer_KH, Orderer_K, Orderer_H, Orderer_BKH  # noqa: E501
 from ...strategies.coordinator.evaluator import Evaluator, Evaluator_T, Evaluator_P, Evaluator_O, Evaluator_W, Evaluator_N, Evaluator_N_Fast, Evaluator_E, Evaluator_C, Evaluator_B, Evaluator_Ec, Evaluator_TP, Evaluator_TPO, Evaluator_NW, Evaluator_PW, Evaluator_TPW, Evaluator_TPW_Fast, Evaluator_TPOW, Evaluator_TPWE, Evaluator_TPWE_Fast, Evaluator_TPWEC, Evaluator_PWE, Evaluator_BW, Evaluator_EcW, Evaluator_BWEc, Evaluator_PBWEc, Evaluator_TPWEB  # noqa: E501
 
 
@@ -23,6 +23,10 @@ __all__ = [
     'Orderer_BC',
     'Orderer_CB',
     'Orderer_PCB',
+    'Orderer_KH',
+    'Orderer_K',
+    'Orderer_H',
+    'Orderer_BKH',
     'Evaluator',
     'Evaluator_T',
     'Evaluator_P',
@@ -4,6 +4,9 @@
 from reversi.strategies.common import AbstractOrderer
 
 
+ORDERING_TABLE_SIZE = 64 * 2 * 4 + 2 * 64 * 8  # キラー手(手数毎に2手) + ヒストリー値(手番・マス毎)
+
+
 class Orderer(AbstractOrderer):
     """Orderer
     """
@@ -123,3 +126,68 @@ class Orderer_PCB(AbstractOrderer):
         kwargs['moves'] = self.sorter_b.move_ordering(*args, **kwargs)
 
         return kwargs['moves']
+
+
+class Orderer_KH(Orderer):
+    """Orderer_KH
+
+           探索の途中(Cython版の探索の内部)で、キラー手とヒストリー値の高い手を優先的に
+           (探索クラスのorderer、またはIterativeDeepningのordererに指定する。ルートの手は並び替えない)
+
+           ・キラー手 : 同じ手数で直前に枝刈りを起こした手(手数毎に2手)
+           ・ヒストリー : 枝刈りを起こした手に残りの深さの2乗を加算した値(手番・マス毎)
+           ・killer, historyを両方Falseにすると並び替えずに枝刈りの回数だけを数える
+    """
+    def __init__(self, killer=True, history=True):
+        self.killer = killer
+        self.history = history
+        self.table = bytearray(ORDERING_TABLE_SIZE)
+        self.cutoffs = 0        # 枝刈りの回数
+        self.first_cutoffs = 0  # 最初の手で枝刈りした回数
+
+    def clear(self):
+        """clear
+        """
+        self.table = bytearray(ORDERING_TABLE_SIZE)
+        self.cutoffs = 0
+        self.first_cutoffs = 0
+
+    def first_cutoff_rate(self):
+        """first_cutoff_rate
+
+               枝刈りのうち最初の手で枝刈りした割合
+        """
+        return self.first_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+
+class Orderer_K(Orderer_KH):
+    """Orderer_K
+
+           探索の途中でキラー手を優先的に
+    """
+    def __init__(self):
+        super().__init__(killer=True, history=False)
+
+
+class Orderer_H(Orderer_KH):
+    """Orderer_H
+
+           探索の途中でヒストリー値の高い手を優先的に
+    """
+    def __init__(self):
+        super().__init__(killer=False, history=True)
+
+
+class Orderer_BKH(Orderer_KH):
+    """Orderer_B + Orderer_KH
+
+           ルートでは前回の最善手を、探索の途中ではキラー手とヒストリー値の高い手を優先的に
+    """
+    def __init__(self):
+        super().__init__()
+        self.sorter_b = Orderer_B()
+
+    def move_ordering(self, *args, **kwargs):
+        """move_ordering
+        """
+        return self.sorter_b.move_ordering(*args, **kwargs)
@@ -5,8 +5,7 @@ from reversi.strategies.common import AbstractScorer
 from reversi.strategies.table import Table
 import reversi.strategies.coordinator.ScorerMethods as ScorerMethods
 
-from reversi.board import PyBitBoard
-from reversi.BitBoardMethods import CythonBitBoard
+from reversi.BitBoardMethods import iter_coords
 
 
 class TableScorer(AbstractScorer):
@@ -51,7 +50,7 @@ class OpeningScorer(AbstractScorer):
         """
         評価値の算出
         """
-        size, board_info, opening = board.size, board.get_board_info(), 0
+        size, board_view, opening = board.size, board.get_board_view(), 0
 
         directions = [
             (-1,  1), (0,  1), (1,  1),
@@ -60,15 +59,8 @@ class OpeningScorer(AbstractScorer):
         ]
 
         # 最後にひっくり返された石の場所を取得する
-        if isinstance(board, PyBitBoard) or isinstance(board, CythonBitBoard):
-            flippable_discs = board._flippable_discs_num
-            discs = []
-            mask = 1 << ((size * size) - 1)
-            for y in range(size):
-                for x in range(size):
-                    if mask & flippable_discs:
-                        discs.append([x, y])
-                    mask >>= 1
+        if hasattr(board, '_flippable_discs_num'):  # ビットボード(サイズ・実装によらない)
+            discs = iter_coords(size, board._flippable_discs_num)
         else:
             discs = board.prev[-1]['flippable_discs']
 
@@ -78,7 +70,7 @@ class OpeningScorer(AbstractScorer):
                 x, y = disc_x + dx, disc_y + dy
 
                 if 0 <= x < size and 0 <= y < size:
-                    if board_info[y][x] == 0:
+                    if board_view[y, x] == 0:
                         opening += 1  # 石が置かれていない場所をカウント
 
         return opening * self._W
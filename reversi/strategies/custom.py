@@ -1,8 +1,9 @@
 """Custom strategies
 """
 
-from reversi.strategies.common import Measure
+from reversi.strategies.common import Measure, ProbCut
 from reversi.strategies import Random, MonteCarlo, MinMax, NegaMax, AlphaBeta_, AlphaBeta, _NegaScout_, NegaScout, Switch, FullReading_, _FullReading, FullReading, IterativeDeepning_, IterativeDeepning, Usagi, Tora, _Ushi_, Ushi, Nezumi, Neko, Hitsuji, _EndGame_, _Blank_, Blank  # noqa: E501
+from reversi.strategies.blank import PROBCUT_JSON as BLANK_PROBCUT_JSON
 from reversi.strategies.coordinator import Selector, Orderer_B, Orderer_PCB, Evaluator_T, Evaluator_TP, Evaluator_TPO, Evaluator_TPW, Evaluator_TPWE, Evaluator_TPWEB, Evaluator_TPWE_Fast, Evaluator_TPWEC, Evaluator_TPOW, Evaluator_PWE  # noqa: E501
 
 
@@ -784,6 +785,22 @@ class Switch_Blank8_EndGame16(Switch):
         super().__init__(turns, strategies)
 
 
+class Switch_Blank8_WLD20_EndGame16(Switch):
+    def __init__(
+            self,
+            turns=[
+                39,  # 残り20まではBlank8手読み
+                43,  # 残り20から残り16までは勝敗読み
+                60   # 残り16から最後までEndGame
+            ],
+            strategies=[
+                _Blank_(depth=8),
+                _EndGame_(depth=20, role='wld'),
+                _EndGame_(depth=16),
+            ]):
+        super().__init__(turns, strategies)
+
+
 class Switch_BlankI_EndGame16(Switch):
     def __init__(
             self,
@@ -798,6 +815,20 @@ class Switch_BlankI_EndGame16(Switch):
         super().__init__(turns, strategies)
 
 
+class Switch_BlankI_MPC_EndGame16(Switch):
+    def __init__(
+            self,
+            turns=[
+                43,  # 残り16まではBlankI(Multi-ProbCut)
+                60   # 残り16から最後までEndGame
+            ],
+            strategies=[
+                IterativeDeepning(depth=4, selector=Selector(), orderer=Orderer_B(), search=Blank(probcut=ProbCut.load(BLANK_PROBCUT_JSON))),
+                _EndGame_(depth=16),
+            ]):
+        super().__init__(turns, strategies)
+
+
 class Switch_Negascout8_TPWEB_EndGame16(Switch):
     def __init__(
             self,
@@ -57,7 +57,7 @@ class SlowStarter(AbstractStrategy):
         """next_move
         """
         squares = board.size**2
-        blanks = sum([row.count(0) for row in board.get_board_info()])
+        blanks = board.get_board_view().tobytes().count(0)
 
         # stage is less than 15%
         if (squares-blanks)/squares < 0.15:
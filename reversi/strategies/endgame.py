@@ -3,18 +3,21 @@
 
 import sys
 
-from reversi.strategies.common import Timer, Measure, AbstractStrategy
+from reversi.strategies.common import Timer, Measure, SearchResult, AbstractStrategy
 from reversi.strategies.coordinator import Evaluator_N_Fast
 from reversi.strategies.alphabeta import _AlphaBeta_, _AlphaBeta, AlphaBeta_, AlphaBeta
 import reversi.strategies.EndGameMethods as EndGameMethods
 
 
 MAXSIZE64 = 2**63 - 1
+SIZE_64BIT = (4, 6, 8)  # Cython版(64bit)に対応したボードサイズ
 
 
 class _EndGame_(AbstractStrategy):
     """
     石差読みで次の手を決める
+    (role='wld'の場合は勝敗のみを読む。評価値は勝ち:1, 引き分け:0, 負け:-1で、勝ちが見つかれば打ち切る)
+    (Cython版(64bit)に対応していないボードでは、石差読みを窓(-1, 1)で行って勝敗を求める)
     """
     def __init__(self, depth=60, role='best_match'):
         self._MIN = -10000000
@@ -25,40 +28,80 @@ class _EndGame_(AbstractStrategy):
         self.timer = False
         self.measure = False
         self.role = role.lower()
+        self.result = None  # 直前の探索結果(SearchResult)
 
+    @SearchResult.record
     def next_move(self, color, board):
         """
         次の一手
         """
         pid = Timer.get_pid(self)  # タイムアウト監視用のプロセスID
-        if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not EndGameMethods.ENDGAME_SIZE8_64BIT_ERROR:
-            return EndGameMethods.next_move(color, board, self.depth, pid, self.timer, self.measure, self.role)
-        return self.alphabeta_n.next_move(color, board)
-
-    def get_best_move(self, color, board, moves, depth=60, pid=None):
+        if board.size in SIZE_64BIT and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not EndGameMethods.ENDGAME_SIZE8_64BIT_ERROR:
+            return EndGameMethods.next_move(color, board, self.depth, pid, self.timer, self.measure, self.role, self.result)
+        if self.role == 'wld':
+            best_move, _ = self._get_best_move_wld(color, board, board.get_legal_moves(color), self.depth, pid, self.result)
+            return best_move
+        move = self.alphabeta_n.next_move(color, board)
+        self.result = self.alphabeta_n.result  # 置き換えた探索クラスの探索結果
+        return move
+
+    def get_best_move(self, color, board, moves, depth=60, pid=None, result=None):
         """
-        最善手を選ぶ
+        最善手を選ぶ(resultを指定した場合は探索結果を記録する)
         """
         alpha, beta = self._MIN, self._MAX
-        if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not EndGameMethods.ENDGAME_SIZE8_64BIT_ERROR:
-            return EndGameMethods.get_best_move(color, board, moves, alpha, beta, depth, pid, self.timer, self.measure, self.role, False)
-        return self.alphabeta_n.get_best_move(color, board, moves, depth, pid)
+        if board.size in SIZE_64BIT and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not EndGameMethods.ENDGAME_SIZE8_64BIT_ERROR:
+            return EndGameMethods.get_best_move(color, board, moves, alpha, beta, depth, pid, self.timer, self.measure, self.role, False, result)
+        if self.role == 'wld':
+            return self._get_best_move_wld(color, board, moves, depth, pid, result)
+        return self.alphabeta_n.get_best_move(color, board, moves, depth, pid, result)
+
+    def _get_best_move_wld(self, color, board, moves, depth, pid=None, result=None):
+        """
+        勝敗のみを読んで最善手を選ぶ(Cython版(64bit)に対応していないボード)
+        """
+        best_move, alpha, scores = None, -1, {}
+        for move in moves:
+            _, move_scores = self.alphabeta_n._get_best_move(color, board, [move], alpha, 1, depth, pid, result)
+            score = max(-1, min(1, move_scores[move]))  # 石差を勝ち:1, 引き分け:0, 負け:-1に変換
+            scores[move] = score
+            if Timer.is_timeout(pid):
+                best_move = move if best_move is None else best_move
+                break
+            if best_move is None or score > alpha:  # 最善手を更新
+                alpha, best_move = max(alpha, score), move
+            if alpha >= 1:  # 勝ちが見つかれば打ち切る
+                break
+
+        if result is not None:
+            result.scores = scores
+            result.pv = [best_move] if best_move is not None else []
+
+        return best_move, scores
 
     def get_best_record(self, color, board, moves, depth=60, pid=None):
         """
         最善手+その時の棋譜
         """
         alpha, beta = self._MIN, self._MAX
-        if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not EndGameMethods.ENDGAME_SIZE8_64BIT_ERROR:
+        if board.size in SIZE_64BIT and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not EndGameMethods.ENDGAME_SIZE8_64BIT_ERROR:
             return EndGameMethods.get_best_move(color, board, moves, alpha, beta, depth, pid, self.timer, self.measure, self.role, True)
         return None, None, None  # unsupported
 
+    def analyze(self, color, board):
+        """
+        次の一手を探索し、探索結果(SearchResult)を返す
+        """
+        self.next_move(color, board)
+
+        return self.result
+
 
 class _EndGame(_EndGame_):
     """EndGame + Measure
     """
-    def __init__(self, depth=60):
-        super().__init__(depth)
+    def __init__(self, depth=60, role='best_match'):
+        super().__init__(depth, role)
         self.alphabeta_n = _AlphaBeta(depth=depth, evaluator=self.evaluator)
         self.timer = False
         self.measure = True
@@ -73,8 +116,8 @@ class _EndGame(_EndGame_):
 class EndGame_(_EndGame_):
     """EndGame + Timer
     """
-    def __init__(self, depth=60):
-        super().__init__(depth)
+    def __init__(self, depth=60, role='best_match'):
+        super().__init__(depth, role)
         self.alphabeta_n = AlphaBeta_(depth=depth, evaluator=self.evaluator)
         self.timer = True
         self.measure = False
@@ -89,8 +132,8 @@ class EndGame_(_EndGame_):
 class EndGame(_EndGame_):
     """EndGame + Measure + Timer
     """
-    def __init__(self, depth=60):
-        super().__init__(depth)
+    def __init__(self, depth=60, role='best_match'):
+        super().__init__(depth, role)
         self.alphabeta_n = AlphaBeta(depth=depth, evaluator=self.evaluator)
         self.timer = True
         self.measure = True
@@ -11,6 +11,7 @@ from reversi.error_message import ErrorMessage
 
 
 TIMEOUT_TIME = 60  # タイムアウト時間(s)
+BOARD_INFO_TABLE = {0x00: '0 ', 0x01: '1 ', 0xFF: '-1 '}  # ボードの情報(int8)の各マスを空白区切りの文字にする
 
 
 class External(AbstractStrategy):
@@ -28,7 +29,8 @@ class External(AbstractStrategy):
         """
         color_num = '1' if color == 'black' else '-1'
         board_size = board.size
-        board_info = "\n".join([" ".join(row) for row in [[str(col) for col in row] for row in board.get_board_info()]])
+        board_view = board.get_board_view().tobytes().decode('latin-1')
+        board_info = "\n".join([board_view[i:i+board_size].translate(BOARD_INFO_TABLE)[:-1] for i in range(0, board_size*board_size, board_size)])
 
         # {手番の色(黒:1、白:-1)}
         # {ボードのサイズ(4～26までの偶数)}
@@ -1,33 +1,64 @@
 """IterativeDeepning strategy
 """
 
-from reversi.strategies.common import Timer, Measure, AbstractStrategy
+from reversi.strategies.common import Timer, Measure, SearchResult, AbstractStrategy
 
 
 class IterativeDeepning_(AbstractStrategy):
     """IterativeDeepning + Timer
     """
-    def __init__(self, depth=None, selector=None, orderer=None, search=None, limit=None):
+    def __init__(self, depth=None, selector=None, orderer=None, search=None, limit=None, native=False, window=None, time_manager=None):
         self.depth = depth
         self.selector = selector
         self.orderer = orderer
         self.search = search
         self.max_depth = depth
         self.limit = limit
+        self.native = native  # Trueの場合、Cython版の探索の中で反復深化する(手の選択と並び替えは最初の1回のみ)
+        self.window = window  # 反復深化の窓の幅(Noneの場合は探索クラスの既定値)
+        self.time_manager = time_manager  # 持ち時間の管理(Noneの場合は1手毎に固定のTimer.time_limit)
+        self.result = None  # 直前の探索結果(SearchResult、ノード数は全ての反復の合計)
 
+        if hasattr(orderer, 'table') and getattr(search, 'orderer', False) is None:
+            search.orderer = orderer  # 探索中の手の並び替え(キラー手・ヒストリー)を探索クラスに渡す
+
+    @SearchResult.record
     def next_move(self, color, board):
         """next_move
         """
-        depth, moves, best_move, scores, = self.depth, None, None, {}
+        pid = Timer.get_pid(self.search)  # タイムアウト監視用のプロセスID
+
+        if self.time_manager is None:
+            Timer.set_deadline(pid, self.search._MIN)  # 探索クラスのタイムアウトを設定
+            return self._next_move(color, board, pid)
 
-        pid = Timer.get_pid(self.search)           # タイムアウト監視用のプロセスID
-        Timer.set_deadline(pid, self.search._MIN)  # 探索クラスのタイムアウトを設定
+        self.time_manager.start_move(pid, self.search._MIN, color, board)  # 持ち時間から探索クラスのタイムアウトを設定
+        try:
+            return self._next_move(color, board, pid)
+        finally:
+            self.time_manager.end_move(pid)
+
+    def _next_move(self, color, board, pid):
+        """_next_move
+        """
+        depth, moves, best_move, scores, = self.depth, None, None, {}
+        record = {'result': self.result} if hasattr(self.search, 'result') else {}  # 探索結果を記録できる探索クラスの場合
 
         moves = board.get_legal_moves(color)
+        if self.native and hasattr(self.search, 'get_best_move_iterative'):
+            moves = self.selector.select_moves(color, board, moves, scores, depth)
+            moves = self.orderer.move_ordering(color=color, board=board, moves=moves, best_move=best_move)
+            kwargs = {'pid': pid} if self.window is None else {'pid': pid, 'window': self.window}
+            result = self.search.get_best_move_iterative(color, board, moves, depth, self.limit, **kwargs, **record)
+            if result is not None:
+                best_move, scores, self.max_depth = result
+                self.result.depth = self.max_depth
+                return best_move
+
         while True:
             moves = self.selector.select_moves(color, board, moves, scores, depth)                          # 次の手の候補を選択
             moves = self.orderer.move_ordering(color=color, board=board, moves=moves, best_move=best_move)  # 次の手の候補を並び替え
-            best_move, scores = self.search.get_best_move(color, board, moves, depth, pid)                  # 最善手を取得
+            best_move, scores = self.search.get_best_move(color, board, moves, depth, pid, **record)        # 最善手を取得
 
             if Timer.is_timeout(pid):  # タイムアウト発生時、処理を抜ける
                 break
@@ -35,9 +66,13 @@ class IterativeDeepning_(AbstractStrategy):
             if self.limit and depth >= self.limit:  # 限界深さに到達時
                 break
 
+            if self.time_manager is not None and not self.time_manager.next_iteration(pid, best_move):  # 持ち時間の管理で打ち切る時
+                break
+
             depth += 1  # 読みの深さを増やす
 
         self.max_depth = depth  # 読んだ深さを記録
+        self.result.depth = depth
 
         return best_move
 
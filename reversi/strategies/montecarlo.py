@@ -2,7 +2,6 @@
 """
 
 import random
-import copy
 
 from reversi.game import Game
 from reversi.player import Player
@@ -55,7 +54,7 @@ class MonteCarlo(AbstractStrategy):
         remain = board.size * board.size - (board._black_score + board._white_score)
 
         if remain <= self.remain:
-            playout_board = copy.deepcopy(board)  # 現在の盤面をコピー
+            playout_board = board.clone()  # 現在の盤面をコピー(履歴は不要)
             playout_board.put_disc(color, *move)  # 調べたい手を打つ
 
             # 勝敗が決まるまでゲームを進める
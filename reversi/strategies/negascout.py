@@ -3,48 +3,90 @@
 
 import sys
 
-from reversi.strategies.common import Timer, Measure, AbstractStrategy
+from reversi.strategies.common import Timer, Measure, SearchResult, AbstractStrategy
+from reversi.strategies.common.parallel import is_parallel, get_best_move_parallel
 import reversi.strategies.NegaScoutMethods as NegaScoutMethods
 
 
 MAXSIZE64 = 2**63 - 1
+SIZE_64BIT = (4, 6, 8)  # Cython版(64bit)に対応したボードサイズ
+SIZE_256BIT = (10, 12, 14, 16)  # Cython版(64bit×4)に対応したボードサイズ
+ASPIRATION_WINDOW = 20  # 反復深化で前回の評価値の前後に設定する窓の幅
 
 
 class _NegaScout_(AbstractStrategy):
     """
     NegaScout法で次の手を決める
     """
-    def __init__(self, depth=3, evaluator=None):
+    def __init__(self, depth=3, evaluator=None, tt=None, workers=None, orderer=None, probcut=None):
         self._MIN = -10000000
         self._MAX = 10000000
 
         self.depth = depth
         self.evaluator = evaluator
+        self.tt = tt  # 置換表(Cython版の探索のみ使用)
+        self.workers = workers  # ルート分割で探索するプロセス数(None or 1の場合は分割しない)
+        self.orderer = orderer  # 探索中の手の並び替え(Orderer_KHなど、Cython版の64bitの探索のみ使用)
+        self.probcut = probcut  # Multi-ProbCutのパラメータ(ProbCut、Cython版の64bitの探索のみ使用)
         self.timer = False
         self.measure = False
+        self.result = None  # 直前の探索結果(SearchResult)
 
+    @SearchResult.record
     def next_move(self, color, board):
         """
         次の一手
         """
         pid = Timer.get_pid(self)  # タイムアウト監視用のプロセスID
 
-        if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not NegaScoutMethods.NEGASCOUT_SIZE8_64BIT_ERROR:
-            return NegaScoutMethods.next_move(color, board, self._MIN, self._MAX, self.depth, self.evaluator, pid, self.timer, self.measure)
+        if self.workers:
+            moves = board.get_legal_moves(color)
+            if is_parallel(self, moves):  # ルート分割で探索する
+                best_move, self.result.scores = get_best_move_parallel(self, color, board, moves, self.depth, pid)
+                return best_move
+
+        if board.size in SIZE_64BIT and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not NegaScoutMethods.NEGASCOUT_SIZE8_64BIT_ERROR:
+            if self.tt is not None:
+                self.tt.new_search(color, board)
+            return NegaScoutMethods.next_move(color, board, self._MIN, self._MAX, self.depth, self.evaluator, pid, self.timer, self.measure, self.tt, self.orderer, self.probcut, self.result)  # noqa: E501
+
+        if board.size in SIZE_256BIT and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not NegaScoutMethods.NEGASCOUT_SIZE16_256BIT_ERROR:
+            if self.tt is not None:
+                self.tt.new_search(color, board)
+            return NegaScoutMethods.next_move_size16_256bit(color, board, self._MIN, self._MAX, self.depth, self.evaluator, pid, self.timer, self.measure, self.tt, self.result)  # noqa: E501
 
         moves = board.get_legal_moves(color)  # 手の候補
-        best_move, _ = self.get_best_move(color, board, moves, self.depth, pid)
+        best_move, _ = self.get_best_move(color, board, moves, self.depth, pid, self.result)
 
         return best_move
 
-    def get_best_move(self, color, board, moves, depth, pid=None):
+    def get_best_move(self, color, board, moves, depth, pid=None, result=None):
         """
-        最善手を選ぶ
+        最善手を選ぶ(resultを指定した場合は探索結果を記録する)
         """
-        best_move, alpha, beta, scores = None, self._MIN, self._MAX, {}
+        if is_parallel(self, moves):  # ルート分割で探索する
+            best_move, scores = get_best_move_parallel(self, color, board, moves, depth, pid)
+            if result is not None:
+                result.scores = scores
+            return best_move, scores
+
+        return self._get_best_move(color, board, moves, self._MIN, self._MAX, depth, pid, result)
 
-        if board.size == 8 and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not NegaScoutMethods.NEGASCOUT_SIZE8_64BIT_ERROR:
-            return NegaScoutMethods.get_best_move(color, board, moves, alpha, beta, depth, self.evaluator, pid, self.timer, self.measure)
+    def _get_best_move(self, color, board, moves, alpha, beta, depth, pid=None, result=None):
+        """
+        窓(alpha, beta)の範囲で最善手を選ぶ(alphaを超える手がない場合はNone)
+        """
+        best_move, scores = None, {}
+
+        if board.size in SIZE_64BIT and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not NegaScoutMethods.NEGASCOUT_SIZE8_64BIT_ERROR:
+            if self.tt is not None:
+                self.tt.new_search(color, board)
+            return NegaScoutMethods.get_best_move(color, board, moves, alpha, beta, depth, self.evaluator, pid, self.timer, self.measure, self.tt, self.orderer, self.probcut, result)  # noqa: E501
+
+        if board.size in SIZE_256BIT and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not NegaScoutMethods.NEGASCOUT_SIZE16_256BIT_ERROR:
+            if self.tt is not None:
+                self.tt.new_search(color, board)
+            return NegaScoutMethods.get_best_move_size16_256bit(color, board, moves, alpha, beta, depth, self.evaluator, pid, self.timer, self.measure, self.tt, result)  # noqa: E501
 
         # 打てる手の中から評価値の最も高い手を選ぶ
         for move in moves:
@@ -58,8 +100,34 @@ class _NegaScout_(AbstractStrategy):
                     alpha = score
                     best_move = move
 
+        if result is not None:
+            result.scores = scores
+
         return best_move, scores
 
+    def get_best_move_iterative(self, color, board, moves, depth, limit=None, window=ASPIRATION_WINDOW, pid=None, result=None):
+        """
+        反復深化で最善手を選ぶ(Cython版の探索のみ、対応していない場合とルート分割する場合はNoneを返す)
+        (最善手, 各手の評価値, 読んだ深さ)を返す(resultを指定した場合は探索結果を記録する)
+        """
+        if is_parallel(self, moves):
+            return None
+
+        if board.size in SIZE_64BIT and sys.maxsize == MAXSIZE64 and hasattr(board, '_black_bitboard') and not NegaScoutMethods.NEGASCOUT_SIZE8_64BIT_ERROR:
+            if self.tt is not None:
+                self.tt.new_search(color, board)
+            return NegaScoutMethods.iterative_deepening(color, board, moves, depth, limit if limit else 0, window, self.evaluator, pid, self.timer, self.measure, self.tt, self.orderer, self.probcut, result)  # noqa: E501
+
+        return None
+
+    def analyze(self, color, board):
+        """
+        次の一手を探索し、探索結果(SearchResult)を返す
+        """
+        self.next_move(color, board)
+
+        return self.result
+
     def get_score(self, move, color, board, alpha, beta, depth, pid=None):
         """
         手を打った時の評価値を取得
@@ -81,8 +149,8 @@ class _NegaScout_(AbstractStrategy):
 class _NegaScout(_NegaScout_):
     """NegaScout + Measure
     """
-    def __init__(self, depth=3, evaluator=None):
-        super().__init__(depth, evaluator)
+    def __init__(self, depth=3, evaluator=None, tt=None, workers=None, orderer=None, probcut=None):
+        super().__init__(depth, evaluator, tt, workers, orderer, probcut)
         self.timer = False
         self.measure = True
 
@@ -101,8 +169,8 @@ class _NegaScout(_NegaScout_):
 class NegaScout_(_NegaScout_):
     """NegaScout + Timer
     """
-    def __init__(self, depth=3, evaluator=None):
-        super().__init__(depth, evaluator)
+    def __init__(self, depth=3, evaluator=None, tt=None, workers=None, orderer=None, probcut=None):
+        super().__init__(depth, evaluator, tt, workers, orderer, probcut)
         self.timer = True
         self.measure = False
 
@@ -121,8 +189,8 @@ class NegaScout_(_NegaScout_):
 class NegaScout(_NegaScout_):
     """NegaScout + Measure + Timer
     """
-    def __init__(self, depth=3, evaluator=None):
-        super().__init__(depth, evaluator)
+    def __init__(self, depth=3, evaluator=None, tt=None, workers=None, orderer=None, probcut=None):
+        super().__init__(depth, evaluator, tt, workers, orderer, probcut)
         self.timer = True
         self.measure = True
 
@@ -0,0 +1,106 @@
+"""Ponder strategy
+       相手の手番の間に、相手の応手後の局面を裏のスレッドで探索しておく(先読み)
+
+       ・mode='predicted'は予想した相手の応手の後の局面のみ、mode='all'は予想した応手から順に全ての応手の後の局面を探索する
+       ・実際の相手の応手の後の局面を探索済みの場合は、その結果を返す(探索しない)
+       ・探索済みでない場合は通常通り探索する(置換表をTranspositionTable(persist=True)で渡していれば先読みで登録した局面を使える)
+       ・先読みのスレッドはTimerのプロセスIDに接尾辞を付け、相手(同じクラスの戦略)のタイマーや計測と分ける
+       ・停止の要求はCython版の探索の中止要求(CancelToken)として伝わり、途中で打ち切った探索の結果は使わない
+"""
+
+import threading
+
+from reversi.strategies.common import Timer, Measure, AbstractStrategy
+
+
+class _Ponder_(AbstractStrategy):
+    """Ponder
+    """
+    def __init__(self, base=None, mode='all', predictor=None):
+        self.base = base
+        self.mode = mode
+        self.predictor = predictor if predictor is not None else base  # 相手の応手を予想する戦略
+        self.results = {}  # 先読みした局面(encode) : 最善手
+        self.hits = 0
+        self.misses = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def next_move(self, color, board):
+        """next_move
+        """
+        self.stop_ponder()
+        results, self.results = self.results, {}
+        key = board.encode(color)
+
+        if key in results:
+            self.hits += 1
+            return results[key]
+
+        if results:
+            self.misses += 1
+
+        return self.base.next_move(color, board)
+
+    def start_ponder(self, color, board):
+        """start_ponder
+
+               自分(color)が打った後の局面から先読みを始める
+        """
+        self.stop_ponder()
+        self.results = {}
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._ponder, args=(color, board.clone()), daemon=True)
+        self._thread.start()
+
+    def stop_ponder(self):
+        """stop_ponder
+
+               先読みを止めて、スレッドの終了を待つ
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _ponder(self, color, board):
+        """_ponder
+        """
+        Timer.set_pid_suffix('_ponder')
+        Timer.set_cancel_event(self._stop)  # 停止の要求で探索を打ち切る
+        opponent = 'white' if color == 'black' else 'black'
+        replies = board.get_legal_moves(opponent)
+
+        # 相手がパスの場合は次の局面が確定している
+        if not replies:
+            if board.get_legal_moves(color):
+                move = self.base.next_move(color, board)
+                if not self._stop.is_set():
+                    self.results[board.encode(color)] = move
+            return
+
+        predicted = self.predictor.next_move(opponent, board) if len(replies) > 1 else replies[0]
+        replies = [predicted] + [reply for reply in replies if reply != predicted] if self.mode == 'all' else [predicted]
+
+        for reply in replies:
+            if self._stop.is_set():
+                break
+
+            next_board = board.clone()
+            next_board.put_disc(opponent, *reply)
+
+            if next_board.get_legal_moves(color):
+                move = self.base.next_move(color, next_board)
+                if self._stop.is_set():  # 打ち切った探索の結果は使わない
+                    break
+                self.results[next_board.encode(color)] = move
+
+
+class Ponder(_Ponder_):
+    """Ponder + Measure
+    """
+    @Measure.time
+    def next_move(self, color, board):
+        """next_move
+        """
+        return super().next_move(color, board)
@@ -96,11 +96,11 @@ class MinMax_(AbstractStrategy):
             return ret
 
         # 4隅に重みを掛ける
-        board_info = board.get_board_info()
+        board_view = board.get_board_view()
         corner = 0
 
         for x, y in [(0, 0), (0, board.size-1), (board.size-1, 0), (board.size-1, board.size-1)]:
-            corner += board_info[y][x]
+            corner += board_view[y, x]
 
         ret += corner * self._W2
 
@@ -8,6 +8,9 @@ setup(
         'cython',
         'pyinstaller',
     ],
+    extras_require={
+        'batch': ['numpy'],
+    },
     description='A reversi library for Python',
     author='y-tetsu',
     url='',
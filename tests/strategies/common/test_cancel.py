@@ -0,0 +1,193 @@
+"""Tests of cancel.py
+"""
+
+import unittest
+import threading
+import time
+
+from reversi import Board, BitBoard
+from reversi import C as c
+from reversi.strategies import NegaMax_, AlphaBeta_, NegaScout_, Blank_, EndGame_
+from reversi.strategies.common import Timer, CancelToken
+from reversi.strategies.common.cancel import CHECK_INTERVAL
+import reversi.strategies.coordinator as coord
+
+
+class TestCancelToken(unittest.TestCase):
+    """cancel
+    """
+    def test_cancel_token(self):
+        token = CancelToken()
+        self.assertIsNone(token.event)
+        self.assertEqual(token.interval, CHECK_INTERVAL)
+        self.assertEqual(token.flag, bytearray(1))
+        self.assertFalse(token.is_cancelled())
+        token.cancel()
+        self.assertEqual(token.flag[0], 1)
+        self.assertTrue(token.is_cancelled())
+
+        event = threading.Event()
+        token = CancelToken(event, interval=16)
+        self.assertEqual(token.interval, 16)
+        self.assertFalse(token.is_cancelled())
+        event.set()
+        self.assertTrue(token.is_cancelled())
+
+    def test_cancel_token_poll(self):
+        token = CancelToken()
+        wall = time.time() + 100
+        self.assertFalse(token.poll(wall))
+        self.assertEqual(token.wall, wall)
+        self.assertAlmostEqual(token.deadline, time.monotonic() + 100, delta=1)
+        self.assertTrue(token.poll(0))  # 期限が変わった場合は換算し直す
+        token.cancel()
+        self.assertTrue(token.poll(wall))
+
+    def test_timer_poll(self):
+        pid = 'TIMER_POLL'
+        Timer.deadline[pid] = 0
+        self.assertTrue(Timer.poll(pid))  # 中止要求が無い場合は毎回確認する
+
+        Timer.set_deadline(pid, -1)
+        Timer.tokens[pid].interval = 4
+        self.assertFalse(Timer.poll(pid))  # 最初の呼び出しで確認する
+        Timer.cancel(pid)
+        for _ in range(3):
+            self.assertFalse(Timer.poll(pid))
+        self.assertTrue(Timer.poll(pid))  # interval回毎に確認する
+
+        Timer.set_deadline(pid, -1)
+        Timer.deadline[pid] = 0
+        self.assertTrue(Timer.poll(pid))
+
+    def test_timer_token(self):
+        pid = Timer.get_pid(self)
+        Timer.set_deadline(pid, -1)
+        token = Timer.tokens[pid]
+        self.assertIsNone(token.event)
+        Timer.cancel(pid)
+        self.assertTrue(token.is_cancelled())
+        Timer.set_deadline(pid, -1)
+        self.assertIsNot(Timer.tokens[pid], token)  # 探索毎に作る
+        self.assertFalse(Timer.tokens[pid].is_cancelled())
+
+        event = threading.Event()
+        Timer.set_cancel_event(event)
+        try:
+            Timer.set_deadline(pid, -1)
+            self.assertIs(Timer.tokens[pid].event, event)
+        finally:
+            Timer.set_cancel_event(None)
+        Timer.set_deadline(pid, -1)
+        self.assertIsNone(Timer.tokens[pid].event)
+
+    def test_cancel_search(self):
+        board = BitBoard()
+        board.put_disc(c.black, 5, 4)
+        pre_limit = Timer.time_limit
+        Timer.time_limit = 100
+        try:
+            for strategy in (NegaScout_(depth=20, evaluator=coord.Evaluator_TPW()), Blank_(depth=20)):
+                # 他のスレッドからの中止
+                pid = Timer.get_pid(strategy)
+                canceller = threading.Timer(0.2, Timer.cancel, args=(pid,))
+                canceller.start()
+                start = time.time()
+                self.assertIn(strategy.next_move(c.white, board), board.get_legal_moves(c.white))
+                self.assertLess(time.time() - start, 5)
+                self.assertTrue(Timer.is_timeout(pid))
+                canceller.join()
+
+                # イベントによる中止
+                event = threading.Event()
+                Timer.set_cancel_event(event)
+                try:
+                    setter = threading.Timer(0.2, event.set)
+                    setter.start()
+                    start = time.time()
+                    self.assertIn(strategy.next_move(c.white, board), board.get_legal_moves(c.white))
+                    self.assertLess(time.time() - start, 5)
+                    self.assertTrue(Timer.is_timeout(pid))
+                    setter.join()
+                finally:
+                    Timer.set_cancel_event(None)
+        finally:
+            Timer.time_limit = pre_limit
+
+    def test_cancel_python_search(self):
+        # Python版の探索も中止できる
+        board = Board()
+        board.put_disc(c.black, 5, 4)
+        pre_limit = Timer.time_limit
+        Timer.time_limit = 100
+        try:
+            for strategy in (NegaMax_(depth=20, evaluator=coord.Evaluator_TPW()), AlphaBeta_(depth=20, evaluator=coord.Evaluator_TPW())):
+                pid = Timer.get_pid(strategy)
+                canceller = threading.Timer(0.2, Timer.cancel, args=(pid,))
+                canceller.start()
+                start = time.time()
+                self.assertIn(strategy.next_move(c.white, board), board.get_legal_moves(c.white))
+                self.assertLess(time.time() - start, 5)
+                self.assertTrue(Timer.is_timeout(pid))
+                canceller.join()
+        finally:
+            Timer.time_limit = pre_limit
+
+    def test_cancel_concurrent_search(self):
+        # 同じクラスの戦略が同時に探索しても、期限と中止要求は探索毎に分かれる
+        board = BitBoard()
+        board.put_disc(c.black, 5, 4)
+        strategies = [NegaScout_(depth=20, evaluator=coord.Evaluator_TPW()), NegaScout_(depth=20, evaluator=coord.Evaluator_TPW())]
+        pre_limit = Timer.time_limit
+        Timer.time_limit = 1.5
+        try:
+            threads = [threading.Thread(target=strategy.next_move, args=(c.white, board.clone())) for strategy in strategies]
+            for thread in threads:
+                thread.start()
+            for _ in range(100):
+                if all(strategy.result is not None for strategy in strategies) and len(Timer.searches) >= 2:
+                    break
+                time.sleep(0.01)
+            pids = [Timer.get_pid(strategy) for strategy in strategies]
+            self.assertNotEqual(pids[0], pids[1])
+            tokens = [Timer.tokens[pid] for pid in pids]
+            self.assertIsNot(tokens[0], tokens[1])
+            Timer.cancel(pids[1])  # 2つ目の探索のみ中止
+            for thread in threads:
+                thread.join()
+        finally:
+            Timer.time_limit = pre_limit
+
+        self.assertFalse(tokens[0].is_cancelled())
+        self.assertTrue(tokens[1].is_cancelled())
+        self.assertNotIn(pids[0], Timer.tokens)  # 探索後は中止要求を削除する
+        self.assertNotIn(pids[1], Timer.tokens)
+        self.assertGreater(strategies[0].result.elapsed, 1.4)  # 期限まで探索する
+        self.assertLess(strategies[1].result.elapsed, 1.0)
+        self.assertTrue(all(strategy.result.timeout for strategy in strategies))
+        self.assertEqual(Timer.searches, {})
+        self.assertEqual(Timer.get_pid(strategies[1]), Timer.get_pid(strategies[0]))  # 探索後は元のプロセスID
+
+    def test_cancel_endgame(self):
+        # GILを解放して探索中でも中止できる
+        board = BitBoard()
+        for color, (x, y) in [(c.black, (5, 4)), (c.white, (5, 5)), (c.black, (4, 5)), (c.white, (5, 3)), (c.black, (4, 2)), (c.white, (2, 4))]:
+            board.put_disc(color, x, y)
+        endgame = EndGame_(depth=60)
+        pid = Timer.get_pid(endgame)
+        pre_limit = Timer.time_limit
+        Timer.time_limit = 100
+        try:
+            canceller = threading.Timer(0.2, Timer.cancel, args=(pid,))
+            canceller.start()
+            start = time.time()
+            self.assertIn(endgame.next_move(c.black, board), board.get_legal_moves(c.black))
+            self.assertLess(time.time() - start, 5)
+            self.assertTrue(Timer.is_timeout(pid))
+            canceller.join()
+        finally:
+            Timer.time_limit = pre_limit
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Tests of probcut.py
+"""
+
+import unittest
+import os
+import struct
+import tempfile
+
+from reversi import BitBoard
+from reversi import C as c
+from reversi.strategies import _NegaScout_
+from reversi.strategies.common import ProbCut
+from reversi.strategies.common.probcut import PROBCUT_TABLE_SIZE, PROBCUT_MAX_DEPTH, PROBCUT_CHECKS, ENTRY_FORMAT, ENTRY_SIZE, MIN_SAMPLES, get_stage
+import reversi.strategies.coordinator as coord
+
+
+def get_entry(probcut, stage, deep, check):
+    offset = ((stage * (PROBCUT_MAX_DEPTH + 1) + deep) * PROBCUT_CHECKS + check) * ENTRY_SIZE
+    return struct.unpack_from(ENTRY_FORMAT, probcut.table, offset)
+
+
+class TestProbCut(unittest.TestCase):
+    """probcut
+    """
+    def test_probcut_init(self):
+        probcut = ProbCut()
+        self.assertEqual(probcut.t, 1.5)
+        self.assertEqual(probcut.size, 8)
+        self.assertEqual(probcut.params, {})
+        self.assertEqual(len(probcut.table), PROBCUT_TABLE_SIZE)
+        self.assertEqual(probcut.cut_rate(), 0.0)
+        self.assertEqual(get_entry(probcut, 0, 4, 0), (0.0, 0.0, 0.0, -1, 0))
+
+        probcut = ProbCut(t=2.0, size=6, pairs={'4': [0, 2]})
+        self.assertEqual((probcut.t, probcut.size, probcut.pairs), (2.0, 6, {4: (0, 2)}))
+
+    def test_probcut_get_stage(self):
+        self.assertEqual(get_stage(4), 0)
+        self.assertEqual(get_stage(32), 3)
+        self.assertEqual(get_stage(64), 7)
+        self.assertEqual(get_stage(36, size=6), 7)
+
+    def test_probcut_set_param(self):
+        probcut = ProbCut(pairs={4: (2, 0, 4), 5: (1,)})
+        probcut.set_param(3, 4, 2, 1.1, 2.0, 30.0)
+        probcut.set_param(3, 4, 0, 1.5, -1.0, 80.0)
+        probcut.set_param(3, 4, 4, 1.0, 0.0, 1.0)   # 深い探索と同じ深さは使わない
+        probcut.set_param(3, 5, 1, -0.5, 0.0, 1.0)  # 負の傾きは使わない
+        self.assertEqual(get_entry(probcut, 3, 4, 0), (1.5, -1.0, 80.0, 0, 0))
+        self.assertEqual(get_entry(probcut, 3, 4, 1), (1.1, 2.0, 30.0, 2, 0))
+        self.assertEqual(get_entry(probcut, 3, 5, 0)[3], -1)
+        self.assertEqual(get_entry(probcut, 2, 4, 0)[3], -1)
+
+        probcut.probes, probcut.cuts = 4, 1
+        self.assertEqual(probcut.cut_rate(), 0.25)
+        probcut.clear()
+        self.assertEqual((probcut.params, probcut.probes, probcut.cuts), ({}, 0, 0))
+        self.assertEqual(get_entry(probcut, 3, 4, 0)[3], -1)
+
+    def test_probcut_fit(self):
+        probcut = ProbCut(pairs={6: (2,)})
+        samples = []
+        for i in range(40):
+            x = i * 10 - 200
+            samples.append((33, 2, x, 6, 1.2 * x + 5 + (3 if i % 2 else -3)))
+        samples.append((33, 2, 100, 6, 10000))        # 勝敗が確定した局面は使わない
+        samples += [(10, 2, i, 6, i) for i in range(MIN_SAMPLES - 1)]  # サンプル数が足りない段階は求めない
+        probcut.fit(samples)
+
+        self.assertEqual(list(probcut.params), [(4, 6, 2)])
+        a, b, sigma = probcut.params[(4, 6, 2)]
+        self.assertAlmostEqual(a, 1.2, places=2)
+        self.assertAlmostEqual(b, 5.0, places=0)
+        self.assertAlmostEqual(sigma, 3.0, places=1)
+        self.assertEqual(get_entry(probcut, 4, 6, 0)[:4], (a, b, sigma, 2))
+
+    def test_probcut_save_load(self):
+        probcut = ProbCut(t=1.2, pairs={4: (0, 2)})
+        probcut.set_param(2, 4, 0, 1.5, 3.0, 40.0)
+        probcut.set_param(2, 4, 2, 1.1, -2.0, 20.0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'probcut.json')
+            probcut.save(path)
+            loaded = ProbCut.load(path)
+            self.assertEqual(ProbCut.load(path, t=2.0).t, 2.0)
+
+        self.assertEqual((loaded.t, loaded.size, loaded.pairs), (1.2, 8, {4: (0, 2)}))
+        self.assertEqual(loaded.params, probcut.params)
+        self.assertEqual(loaded.table, probcut.table)
+
+    def test_probcut_collect(self):
+        board = BitBoard()
+        board.put_disc(c.black, 3, 2)
+        positions = [(board, c.white), (BitBoard(), c.black)]
+        probcut = ProbCut(pairs={3: (1,), 2: (0,)})
+        search = _NegaScout_(evaluator=coord.Evaluator_TPW(), probcut=probcut)
+        samples = probcut.collect(search, positions)
+
+        self.assertIs(search.probcut, probcut)
+        self.assertEqual(len(samples), 4)
+        for (position, color), offset in zip(positions, (0, 2)):
+            _, scores = search.get_best_move(color, position, position.get_legal_moves(color), 3)
+            discs, shallow, _, deep, deep_score = samples[offset]
+            self.assertEqual((discs, shallow, deep, deep_score), (position._black_score + position._white_score, 1, 3, max(scores.values())))
+        self.assertEqual(probcut.probes, 0)  # 収集中は枝刈りしない
+
+
+if __name__ == '__main__':
+    unittest.main()
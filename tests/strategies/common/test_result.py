@@ -0,0 +1,133 @@
+"""Tests of result.py
+"""
+
+import unittest
+
+from reversi import Board, BitBoard
+from reversi import C as c
+from reversi.strategies import IterativeDeepning, SearchResult
+from reversi.strategies.alphabeta import _AlphaBeta_
+from reversi.strategies.negascout import _NegaScout_, _NegaScout
+from reversi.strategies.blank import _Blank_
+from reversi.strategies.endgame import _EndGame_
+from reversi.strategies.common import Measure, Timer, TranspositionTable
+import reversi.strategies.coordinator as coord
+
+
+class TestSearchResult(unittest.TestCase):
+    """result
+    """
+    def setUp(self):
+        self.board = BitBoard()
+        for color, (x, y) in [(c.black, (5, 4)), (c.white, (5, 5)), (c.black, (4, 5)), (c.white, (5, 3))]:
+            self.board.put_disc(color, x, y)
+
+    def assertValidResult(self, result, color, board):
+        self.assertIn(result.move, board.get_legal_moves(color))
+        self.assertEqual(result.pv[0], result.move)
+        self.assertEqual(result.score, result.scores[result.move])
+        self.assertEqual(result.score, max(result.scores.values()))
+        self.assertGreater(result.nodes, 0)
+        self.assertGreater(result.elapsed, 0)
+        self.assertAlmostEqual(result.nps(), result.nodes / result.elapsed)
+        self.assertFalse(result.timeout)
+
+        # 最善手順は合法手の並び
+        board = board.clone()
+        for move in result.pv:
+            self.assertIn(move, board.get_legal_moves(color))
+            board.put_disc(color, *move)
+            color = c.white if color == c.black else c.black
+
+    def test_search_result_init(self):
+        result = SearchResult(depth=3)
+        self.assertEqual((result.move, result.score, result.scores, result.pv, result.depth), (None, None, {}, [], 3))
+        self.assertEqual((result.nodes, result.elapsed, result.timeout, result.tt_probes, result.tt_hits), (0, 0.0, False, 0, 0))
+        self.assertEqual(result.nps(), 0.0)
+        self.assertEqual(result.tt_hit_rate(), 0.0)
+
+        result.nodes, result.elapsed = 500, 0.25
+        result.tt_probes, result.tt_hits = 40, 10
+        self.assertEqual(result.nps(), 2000.0)
+        self.assertEqual(result.tt_hit_rate(), 0.25)
+        self.assertIn('nodes=500', repr(result))
+
+    def test_search_result_strategies(self):
+        for strategy, board in ((_AlphaBeta_(depth=4, evaluator=coord.Evaluator_TPW()), self.board), (_NegaScout_(depth=4, evaluator=coord.Evaluator_TPW()), self.board), (_Blank_(depth=4), self.board), (_EndGame_(depth=60), BitBoard(4))):  # noqa: E501
+            self.assertIsNone(strategy.result)
+            move = strategy.next_move(c.black, board)
+            self.assertIs(strategy.result.move, move)
+            result = strategy.analyze(c.black, board)
+            self.assertIs(result, strategy.result)
+            self.assertEqual(result.move, move)
+            self.assertEqual(result.depth, strategy.depth)
+            self.assertValidResult(result, c.black, board)
+
+        # 置換表を使う場合は置換表から最善手順を辿る
+        board = self.board
+        for strategy in (_AlphaBeta_(depth=5, evaluator=coord.Evaluator_TPW(), tt=TranspositionTable(size=1)), _NegaScout_(depth=5, evaluator=coord.Evaluator_TPW(), tt=TranspositionTable(size=1))):  # noqa: E501
+            result = strategy.analyze(c.black, board)
+            self.assertValidResult(result, c.black, board)
+            self.assertGreater(len(result.pv), 1)
+            self.assertLessEqual(len(result.pv), 5)
+            self.assertGreater(result.tt_probes, 0)
+            self.assertEqual(result.tt_hit_rate(), result.tt_hits / result.tt_probes)
+            self.assertEqual(strategy.tt.probes, result.tt_probes)
+
+    def test_search_result_nodes(self):
+        # Cython版の探索のノード数はMeasureと一致する
+        board = self.board
+        strategy = _NegaScout(depth=4, evaluator=coord.Evaluator_TPW())
+        pid = Timer.get_pid(strategy)
+        Measure.count[pid] = 0
+        result = strategy.analyze(c.black, board)
+        self.assertEqual(result.nodes, Measure.count[pid])
+
+        # Python版の探索(Measure版)
+        board = Board()
+        Measure.count[pid] = 0
+        result = strategy.analyze(c.black, board)
+        self.assertEqual(result.nodes, Measure.count[pid])
+        self.assertGreater(result.nodes, 0)
+        self.assertEqual(result.pv, [result.move])
+
+        # Python版の探索(ノード数は数えない)
+        result = _NegaScout_(depth=2, evaluator=coord.Evaluator_TPW()).analyze(c.black, board)
+        self.assertEqual(result.nodes, 0)
+        self.assertIn(result.move, board.get_legal_moves(c.black))
+
+        # 64bit×4版の探索
+        board = BitBoard(10)
+        for strategy in (_AlphaBeta_(depth=2, evaluator=coord.Evaluator_TPW()), _NegaScout_(depth=2, evaluator=coord.Evaluator_TPW())):
+            result = strategy.analyze(c.black, board)
+            self.assertValidResult(result, c.black, board)
+
+    def test_search_result_get_best_move(self):
+        board = self.board
+        strategy = _NegaScout_(depth=3, evaluator=coord.Evaluator_TPW())
+        moves = board.get_legal_moves(c.black)
+        result = SearchResult()
+        best_move, scores = strategy.get_best_move(c.black, board, moves, 3, result=result)
+        nodes = result.nodes
+        self.assertGreater(nodes, 0)
+        self.assertEqual(result.scores, scores)
+        self.assertEqual(result.pv, [best_move])
+        strategy.get_best_move(c.black, board, moves, 3, result=result)
+        self.assertEqual(result.nodes, nodes * 2)  # ノード数は加算する
+
+    def test_search_result_iterative(self):
+        board = self.board
+        for native in (False, True):
+            iterative = IterativeDeepning(depth=2, selector=coord.Selector(), orderer=coord.Orderer_B(), search=_NegaScout_(evaluator=coord.Evaluator_TPW(), tt=TranspositionTable(size=1)), limit=4, native=native)  # noqa: E501
+            move = iterative.next_move(c.black, board)
+            result = iterative.result
+            self.assertEqual(result.move, move)
+            self.assertEqual(result.depth, iterative.max_depth)
+            self.assertEqual(result.depth, 4)
+            self.assertValidResult(result, c.black, board)
+            self.assertGreater(result.tt_probes, 0)
+            self.assertIsNone(iterative.search.result)  # 探索クラスのnext_moveは呼ばない
+
+
+if __name__ == '__main__':
+    unittest.main()
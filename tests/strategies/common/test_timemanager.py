@@ -0,0 +1,131 @@
+"""Tests of timemanager.py
+"""
+
+import unittest
+import threading
+import time
+
+from reversi import Board, BitBoard
+from reversi import C as c
+from reversi.strategies.common import Timer, TimeManager
+
+
+class TestTimeManager(unittest.TestCase):
+    """timemanager
+    """
+    def test_timemanager_init(self):
+        tm = TimeManager()
+        self.assertEqual((tm.total, tm.increment, tm.reserve, tm.min_time), (60.0, 0.0, 1.0, 0.01))
+        self.assertEqual((tm.hard_ratio, tm.extension, tm.stable, tm.shrink), (4.0, 1.5, 3, 0.5))
+        self.assertEqual((tm.remaining, tm.discs, tm.moves), (60.0, None, {}))
+
+    def test_timemanager_allocate(self):
+        tm = TimeManager(total=61.0, increment=1.0)
+        board = BitBoard()
+        soft, hard = tm.allocate(c.black, board)  # 合法手4(倍率0.5)、残り30手
+        self.assertAlmostEqual(soft, (60.0 / 30 + 1.0) * 0.5)
+        self.assertAlmostEqual(hard, soft * 4.0)
+
+        # 穴は空きマスに数えない
+        for board in (BitBoard(hole=0x8100000000000081), Board(hole=0x8100000000000081)):
+            soft, hard = tm.allocate(c.black, board)  # 合法手4(倍率0.5)、残り28手
+            self.assertAlmostEqual(soft, (60.0 / 28 + 1.0) * 0.5)
+
+        # 1手しかない場合
+        board = BitBoard(4)
+        for color, (x, y) in [(c.black, (1, 0)), (c.white, (0, 0)), (c.black, (0, 1)), (c.white, (2, 0)), (c.black, (3, 3)), (c.white, (0, 3)), (c.black, (2, 3)), (c.white, (0, 2))]:  # noqa: E501
+            board.put_disc(color, x, y)
+        self.assertEqual(len(board.get_legal_moves(c.black)), 1)
+        self.assertEqual(tm.allocate(c.black, board), (0.01, 0.01))
+
+        # 持ち時間が少ない場合
+        tm.remaining = 1.5
+        soft, hard = tm.allocate(c.black, BitBoard())
+        self.assertLessEqual(hard, 0.5)
+
+    def test_timemanager_move(self):
+        tm = TimeManager(total=10.0, increment=0.5)
+        pid = Timer.get_pid(self)
+        board = BitBoard()
+        tm.start_move(pid, -100, c.black, board)
+        soft, hard = tm.allocate(c.black, board)
+        self.assertIs(Timer.managers[pid], tm)
+        self.assertLessEqual(Timer.deadline[pid], time.time() + hard)
+        self.assertEqual(Timer.timeout_value[pid], -100)
+        self.assertFalse(Timer.timeout_flag[pid])
+        self.assertEqual(tm.discs, 4)
+
+        tm.moves[pid]['start'] -= 1.0
+        tm.end_move(pid)
+        self.assertNotIn(pid, Timer.managers)
+        self.assertEqual(tm.moves, {})
+        self.assertAlmostEqual(tm.remaining, 9.5, places=1)
+
+        # 石数が減った場合は新しい対局
+        board.put_disc(c.black, 5, 4)
+        tm.start_move(pid, -100, c.black, board)
+        tm.end_move(pid)
+        self.assertEqual(tm.discs, 5)
+        tm.start_move(pid, -100, c.black, BitBoard())
+        self.assertEqual((tm.remaining, tm.discs), (10.0, 4))
+        tm.end_move(pid)
+
+    def test_timemanager_next_iteration(self):
+        tm = TimeManager(total=100.0, stable=2)
+        pid = Timer.get_pid(self)
+        self.assertTrue(tm.next_iteration(pid, (0, 0)))  # 管理していない探索は打ち切らない
+
+        tm.start_move(pid, -100, c.black, BitBoard())
+        move = tm.moves[pid]
+        move['soft'], move['hard'] = 1.0, 4.0
+        move['start'] = time.time() - 0.6
+        self.assertTrue(tm.next_iteration(pid, (5, 4)))
+        self.assertTrue(tm.next_iteration(pid, (5, 4)))
+        self.assertFalse(tm.next_iteration(pid, (5, 4)))  # 最善手が続けて変わらない場合は早めに打ち切る
+        self.assertEqual(move['count'], 2)
+
+        move['start'] = time.time() - 1.2
+        self.assertTrue(tm.next_iteration(pid, (4, 5)))   # 最善手が変わった場合は延ばす
+        self.assertEqual((move['soft'], move['count']), (1.5, 0))
+        move['soft'] = 3.0
+        self.assertTrue(tm.next_iteration(pid, (3, 2)))
+        self.assertEqual(move['soft'], 4.0)                # ハードな期限を超えない
+        tm.end_move(pid)
+
+    def test_timemanager_ponder(self):
+        tm = TimeManager(total=10.0)
+
+        def ponder():
+            Timer.set_pid_suffix('_ponder')
+            pid = Timer.get_pid(self)
+            tm.start_move(pid, -100, c.black, BitBoard())
+            tm.moves[pid]['start'] -= 1.0
+            tm.end_move(pid)
+
+        thread = threading.Thread(target=ponder)
+        thread.start()
+        thread.join()
+        self.assertEqual(tm.remaining, 10.0)  # 先読みの時間は持ち時間から引かない
+
+    def test_timer_start(self):
+        tm = TimeManager(total=10.0)
+
+        class Dummy:
+            def __init__(self):
+                self.time_manager = tm
+                self.managed = False
+
+            @Timer.start(-1)
+            def next_move(self, color, board):
+                self.managed = Timer.managers.get(Timer.get_pid(self)) is tm
+                return (5, 4)
+
+        dummy = Dummy()
+        self.assertEqual(dummy.next_move(c.black, BitBoard()), (5, 4))
+        self.assertTrue(dummy.managed)
+        self.assertNotIn(Timer.get_pid(dummy), Timer.managers)
+        self.assertLess(tm.remaining, 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
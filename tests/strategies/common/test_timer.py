@@ -4,6 +4,7 @@
 import unittest
 import os
 import time
+import threading
 
 from reversi.strategies.common import Timer, CPU_TIME
 
@@ -19,6 +20,49 @@ class TestTimer(unittest.TestCase):
         pid2 = Timer.get_pid(self)
         self.assertEqual(pid1, pid2)
 
+    def test_set_pid_suffix(self):
+        pids = []
+
+        def ponder():
+            Timer.set_pid_suffix('_ponder')
+            pids.append(Timer.get_pid(self))
+
+        thread = threading.Thread(target=ponder)
+        thread.start()
+        thread.join()
+        self.assertEqual(pids, [self.__class__.__name__ + str(os.getpid()) + '_ponder'])
+        self.assertEqual(Timer.get_pid(self), self.__class__.__name__ + str(os.getpid()))  # 他のスレッドには影響しない
+
+    def test_begin_search(self):
+        class Dummy:
+            pass
+
+        dummy1, dummy2 = Dummy(), Dummy()
+        pid = Timer.get_pid(dummy1)
+        self.assertEqual(Timer.begin_search(dummy1), pid)
+        self.assertEqual(Timer.begin_search(dummy1), pid)  # 入れ子の呼び出しは同じプロセスID
+        self.assertEqual(Timer.begin_search(dummy2), pid + '#2')  # 同じクラスの他の戦略が探索中
+        self.assertEqual(Timer.get_pid(dummy2), pid + '#2')
+        Timer.end_search(dummy1)
+        self.assertEqual(Timer.get_pid(dummy1), pid)
+        Timer.end_search(dummy1)
+        Timer.end_search(dummy2)
+        self.assertEqual(Timer.get_pid(dummy2), pid)
+        self.assertEqual(Timer.searches, {})
+
+    def test_end_search(self):
+        class Dummy:
+            pass
+
+        dummy = Dummy()
+        pid = Timer.begin_search(dummy)
+        Timer.set_deadline(pid, -100)
+        Timer.end_search(dummy)
+        self.assertNotIn(pid, Timer.tokens)  # 探索後は中止要求を削除する
+        self.assertFalse(Timer.timeout_flag[pid])
+        Timer.deadline[pid] = 0
+        self.assertTrue(Timer.poll(pid))  # 以降は呼び出し毎に期限を確認する
+
     def test_deadline(self):
         pid = Timer.get_pid(self)
         deadline = time.time() + Timer.time_limit
@@ -0,0 +1,49 @@
+"""Tests of transposition.py
+"""
+
+import unittest
+
+from reversi import BitBoard
+from reversi import C as c
+from reversi.strategies.common import TranspositionTable
+
+
+class TestTranspositionTable(unittest.TestCase):
+    """transposition
+    """
+    def test_transposition_table_init(self):
+        tt = TranspositionTable()
+        self.assertEqual(tt.size, 16)
+        self.assertFalse(tt.persist)
+        self.assertEqual(len(tt), 16 * 1024 * 1024)
+        self.assertEqual(tt.generation, 0)
+        self.assertEqual(tt.hit_rate(), 0.0)
+
+        tt = TranspositionTable(size=0.5, persist=True)
+        self.assertEqual(len(tt), 512 * 1024)
+        self.assertTrue(tt.persist)
+
+    def test_transposition_table_new_search(self):
+        tt = TranspositionTable(size=1)
+        board = BitBoard()
+        tt.new_search(c.black, board)
+        self.assertEqual(tt.generation, 1)
+        tt.new_search(c.black, board)  # same position (iterative deepening)
+        self.assertEqual(tt.generation, 1)
+        board.put_disc(c.black, 3, 2)
+        tt.new_search(c.white, board)
+        self.assertEqual(tt.generation, 2)
+
+    def test_transposition_table_persist_new_game(self):
+        tt = TranspositionTable(size=1, persist=True)
+        board = BitBoard()
+        board.put_disc(c.black, 3, 2)
+        tt.new_search(c.white, board)
+        tt.table[0] = 1
+        tt.probes, tt.hits = 10, 5
+        self.assertEqual(tt.hit_rate(), 0.5)
+
+        tt.new_search(c.black, BitBoard())  # fewer discs : new game
+        self.assertEqual(tt.table[0], 0)
+        self.assertEqual(tt.generation, 1)
+        self.assertEqual(tt.probes, 0)
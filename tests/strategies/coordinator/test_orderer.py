@@ -4,7 +4,8 @@
 import unittest
 
 from reversi.board import BitBoard
-from reversi.strategies.coordinator import Orderer, Orderer_B, Orderer_C, Orderer_P, Orderer_BC, Orderer_CB, Orderer_PCB
+from reversi.strategies.coordinator import Orderer, Orderer_B, Orderer_C, Orderer_P, Orderer_BC, Orderer_CB, Orderer_PCB, Orderer_KH, Orderer_K, Orderer_H, Orderer_BKH  # noqa: E501
+from reversi.strategies.coordinator.orderer import ORDERING_TABLE_SIZE
 
 
 class TestOrderer(unittest.TestCase):
@@ -104,3 +105,31 @@ class TestOrderer(unittest.TestCase):
         moves = orderer.move_ordering(color='black', board=board, moves=board.get_legal_moves('black'), best_move=best_move)
 
         self.assertEqual(moves, [(2, 3), (0, 7), (5, 4), (4, 5), (5, 5), (0, 3), (0, 4), (0, 5), (0, 6), (2, 7)])
+
+    def test_orderer_kh(self):
+        board = BitBoard(8)
+        board.put_disc('black', 3, 2)
+        for orderer, killer, history in [(Orderer_KH(), True, True), (Orderer_K(), True, False), (Orderer_H(), False, True)]:
+            self.assertEqual((orderer.killer, orderer.history), (killer, history))
+            self.assertEqual(len(orderer.table), ORDERING_TABLE_SIZE)
+            self.assertEqual(orderer.first_cutoff_rate(), 0.0)
+            # ルートの手は並び替えない
+            moves = orderer.move_ordering(color='white', board=board, moves=board.get_legal_moves('white'), best_move=(4, 2))
+            self.assertEqual(moves, [(2, 2), (4, 2), (2, 4)])
+
+        orderer = Orderer_KH()
+        orderer.table[0] = 1
+        orderer.cutoffs, orderer.first_cutoffs = 4, 3
+        self.assertEqual(orderer.first_cutoff_rate(), 0.75)
+        orderer.clear()
+        self.assertEqual(orderer.table, bytearray(ORDERING_TABLE_SIZE))
+        self.assertEqual((orderer.cutoffs, orderer.first_cutoffs), (0, 0))
+
+    def test_orderer_bkh(self):
+        board = BitBoard(8)
+        board.put_disc('black', 3, 2)
+        orderer = Orderer_BKH()
+        moves = orderer.move_ordering(color='white', board=board, moves=board.get_legal_moves('white'), best_move=(4, 2))
+
+        self.assertEqual(moves, [(4, 2), (2, 2), (2, 4)])
+        self.assertEqual((orderer.killer, orderer.history), (True, True))
@@ -104,6 +104,16 @@ class TestScorer(unittest.TestCase):
         scorer = coord.OpeningScorer()
         self.assertEqual(scorer.get_score(None, board, None, None), -8.25)
 
+    def test_opening_scorer_size10(self):
+        # 10x10以上のビットボード(64bit×4版)もBoardと同じ評価値になる
+        scorer = coord.OpeningScorer()
+        for board in (Board(10), BitBoard(10)):
+            board.put_disc('black', 5, 3)
+            board.put_disc('white', 6, 3)
+            board.put_disc('black', 7, 4)
+            board.put_disc('white', 4, 3)
+            self.assertEqual(scorer.get_score(None, board, None, None), -3.0)
+
     def test_winlose_scorer(self):
         board = Board()
         board.put_disc('black', 3, 2)
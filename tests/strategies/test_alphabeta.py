@@ -3,11 +3,14 @@
 
 import unittest
 import os
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from reversi.board import BitBoard
-from reversi.strategies.common import Timer, Measure, CPU_TIME
-from reversi.strategies import _AlphaBeta_, _AlphaBeta, AlphaBeta_, AlphaBeta
+from reversi.board import Board, BitBoard, PyBitBoard
+from reversi.BitBoardMethods import CythonBitBoard, CythonBitBoard256
+from reversi.strategies.common import Timer, Measure, CPU_TIME, TranspositionTable
+from reversi.strategies import _AlphaBeta_, _AlphaBeta, AlphaBeta_, AlphaBeta, _AlphaBetaN_, _AlphaBetaN, AlphaBetaN_, AlphaBetaN
 import reversi.strategies.coordinator as coord
 
 
@@ -28,6 +31,19 @@ class TestAlphaBeta(unittest.TestCase):
             self.assertEqual(alphabeta.depth, 4)
             self.assertTrue(isinstance(alphabeta.evaluator, coord.Evaluator_T))
 
+    def test_alphabeta_n_init(self):
+        for instance in [_AlphaBetaN_, _AlphaBetaN, AlphaBetaN_, AlphaBetaN]:
+            alphabeta = instance(depth=4)
+            self.assertEqual(alphabeta.depth, 4)
+            self.assertTrue(isinstance(alphabeta.evaluator, coord.Evaluator_N))
+            self.assertIsNone(alphabeta.workers)
+            self.assertIsNone(alphabeta.orderer)
+
+            orderer = coord.Orderer_KH()
+            alphabeta = instance(depth=4, workers=2, orderer=orderer)
+            self.assertEqual(alphabeta.workers, 2)
+            self.assertIs(alphabeta.orderer, orderer)
+
     def test_alphabeta_get_score(self):
         for instance in [_AlphaBeta_, _AlphaBeta, AlphaBeta_, AlphaBeta]:
             board = BitBoard()
@@ -164,6 +180,164 @@ class TestAlphaBeta(unittest.TestCase):
         print(' max :', Measure.elp_time[pid]['max'], '(s)')
         print(' ave :', Measure.elp_time[pid]['ave'], '(s)')
 
+    def test_alphabeta_transposition_table(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        board.put_disc('black', 5, 5)
+        board.put_disc('white', 4, 2)
+        board.put_disc('black', 5, 2)
+        board.put_disc('white', 5, 4)
+        moves = board.get_legal_moves('black')
+        bitboard_info = board.get_bitboard_info()
+
+        results, counts = [], []
+        for tt in [None, TranspositionTable(size=1)]:
+            alphabeta = _AlphaBeta(evaluator=coord.Evaluator_TPWE(), tt=tt)
+            pid = alphabeta.__class__.__name__ + str(os.getpid())
+            Measure.count[pid] = 0
+            time_s = time.perf_counter()
+            for depth in range(2, 7):
+                best_move, scores = alphabeta.get_best_move('black', board, moves, depth, pid)
+            elp = time.perf_counter() - time_s
+            results.append((best_move, scores[best_move]))
+            counts.append(Measure.count[pid])
+
+            print()
+            print(pid, 'depth = 2-6', 'tt' if tt else '--')
+            print(' nodes    :', Measure.count[pid])
+            print(' time     :', elp, '(s)')
+            print(' nodes/s  :', Measure.count[pid] / elp)
+            if tt:
+                print(' hit rate :', tt.hit_rate())
+
+        self.assertEqual(results[0], results[1])
+        self.assertLess(counts[1], counts[0])
+        self.assertEqual(board.get_bitboard_info(), bitboard_info)
+
+    def test_alphabeta_killer_history(self):
+        # キラー手とヒストリーで並び替えても最善手と評価値は変わらず、ノード数は減る
+        board = BitBoard()
+        for color, x, y in [('black', 3, 2), ('white', 2, 4), ('black', 5, 5), ('white', 4, 2), ('black', 5, 2), ('white', 5, 4), ('black', 3, 5), ('white', 2, 2)]:  # noqa: E501
+            board.put_disc(color, x, y)
+        moves = board.get_legal_moves('black')
+        bitboard_info = board.get_bitboard_info()
+
+        results, counts, orderers = [], [], [coord.Orderer_KH(killer=False, history=False), coord.Orderer_K(), coord.Orderer_H(), coord.Orderer_KH()]
+        for orderer in orderers:
+            alphabeta = _AlphaBeta(evaluator=coord.Evaluator_TPWE(), orderer=orderer)
+            pid = alphabeta.__class__.__name__ + orderer.__class__.__name__ + str(orderer.killer) + str(orderer.history)
+            Measure.count[pid] = 0
+            for depth in range(1, 6):
+                best_move, scores = alphabeta.get_best_move('black', board, moves, depth, pid)
+            results.append((best_move, scores[best_move]))
+            counts.append(Measure.count[pid])
+
+        self.assertEqual(len(set(results)), 1)
+        self.assertGreater(orderers[0].cutoffs, 0)
+        for count, orderer in zip(counts[1:], orderers[1:]):
+            self.assertLess(count, counts[0])
+            self.assertGreater(orderer.first_cutoff_rate(), orderers[0].first_cutoff_rate())
+        self.assertEqual(board.get_bitboard_info(), bitboard_info)
+
+    def test_alphabeta_concurrent_search(self):
+        # 探索毎に状態を持つため、評価関数の呼び出しでスレッドが切り替わっても結果とノード数が変わらない
+        openings = [[(3, 2), (2, 4), (5, 5)], [(2, 3), (2, 2), (2, 1)], [(5, 4), (5, 5), (4, 5)], [(4, 5), (5, 3), (3, 2)]]
+
+        def search(index, prefix, size):
+            board = BitBoard(size)
+            offset = (size - 8) // 2
+            color = 'black'
+            for x, y in openings[index]:
+                board.put_disc(color, x + offset, y + offset)
+                color = 'white' if color == 'black' else 'black'
+            alphabeta = _AlphaBeta(evaluator=coord.Evaluator_TPW(), tt=TranspositionTable(size=1))
+            pid = prefix + str(size) + '_' + str(index)
+            Measure.count[pid] = 0
+            best_move, scores = alphabeta.get_best_move(color, board, board.get_legal_moves(color), 4, pid)
+            return best_move, scores, Measure.count[pid]
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(0.000001)  # スレッドを頻繁に切り替える
+        try:
+            for size in (8, 10):
+                sequential = [search(index, 'sequential', size) for index in range(len(openings))]
+                with ThreadPoolExecutor(max_workers=len(openings)) as executor:
+                    concurrent = list(executor.map(search, range(len(openings)), ['concurrent'] * len(openings), [size] * len(openings)))
+                self.assertEqual(sequential, concurrent)
+        finally:
+            sys.setswitchinterval(interval)
+
+    def test_alphabeta_evaluator_error(self):
+        # GILを解放して探索中でも、評価関数の例外は呼び出し元に伝わる
+        class ErrorEvaluator:
+            def evaluate(self, *args):
+                raise ValueError('evaluate')
+
+        for size in (8, 10):
+            with self.assertRaises(ValueError):
+                _AlphaBeta(depth=2, evaluator=ErrorEvaluator()).next_move('black', BitBoard(size))
+
+    def test_alphabeta_parallel(self):
+        # ルート分割でも最善手と評価値は逐次探索と同じ
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        board.put_disc('black', 5, 5)
+        moves = board.get_legal_moves('white')
+        for instance in [_AlphaBeta_, _AlphaBeta, AlphaBeta_, AlphaBeta]:
+            sequential = instance(depth=4, evaluator=coord.Evaluator_TPW())
+            parallel = instance(depth=4, evaluator=coord.Evaluator_TPW(), workers=2)
+            best_move, scores = sequential.get_best_move('white', board, moves, 4)
+            parallel_best_move, parallel_scores = parallel.get_best_move('white', board, moves, 4)
+            self.assertEqual(parallel_best_move, best_move)
+            self.assertEqual(parallel_scores[best_move], scores[best_move])
+            self.assertEqual(parallel.next_move('white', board), sequential.next_move('white', board))
+
+    def test_alphabeta_small_board_size(self):
+        for size, turns in [(4, 2), (6, 6)]:
+            boards = [BitBoard(size), PyBitBoard(size)]
+            color = 'black'
+            for _ in range(turns):
+                move = boards[0].get_legal_moves(color)[0]
+                for board in boards:
+                    board.put_disc(color, *move)
+                color = 'white' if color == 'black' else 'black'
+
+            results = []
+            for board in boards:
+                alphabeta = _AlphaBeta(depth=4, evaluator=coord.Evaluator_TPW())
+                moves = board.get_legal_moves(color)
+                results.append((alphabeta.next_move(color, board), alphabeta.get_best_move(color, board, moves, 4)))
+            self.assertIsInstance(boards[0], CythonBitBoard)
+            self.assertEqual(results[0], results[1])
+            self.assertEqual(boards[0].get_bitboard_info(), boards[1].get_bitboard_info())
+
+    def test_alphabeta_size16_256bit(self):
+        for size in (10, 16):
+            boards = [BitBoard(size), Board(size)]
+            color = 'black'
+            for _ in range(6):
+                move = boards[1].get_legal_moves(color)[0]
+                for board in boards:
+                    board.put_disc(color, *move)
+                color = 'white' if color == 'black' else 'black'
+
+            results = []
+            for board in boards:
+                alphabeta = _AlphaBeta(depth=3, evaluator=coord.Evaluator_TPW())
+                moves = board.get_legal_moves(color)
+                best_move, scores = alphabeta.get_best_move(color, board, moves, 3)
+                results.append((alphabeta.next_move(color, board), best_move, scores[best_move]))
+            self.assertIsInstance(boards[0], CythonBitBoard256)
+            self.assertEqual(results[0], results[1])
+            self.assertEqual(boards[0].get_bitboard_info(), boards[1].get_bitboard_info())
+
+            tt = TranspositionTable(size=1)
+            alphabeta = _AlphaBeta(depth=3, evaluator=coord.Evaluator_TPW(), tt=tt)
+            self.assertEqual(alphabeta.next_move(color, boards[0]), results[0][0])
+            self.assertGreater(tt.stores, 0)
+
     def test_alphabeta_timer_timeout(self):
         board = BitBoard()
         board.put_disc('black', 3, 2)
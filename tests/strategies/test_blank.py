@@ -5,7 +5,8 @@ import unittest
 import os
 
 from reversi.board import BitBoard
-from reversi.strategies.common import Measure, Timer
+from reversi.strategies.common import Measure, Timer, ProbCut
+from reversi.strategies.blank import PROBCUT_JSON
 from reversi.strategies import _Blank_, _Blank, Blank_, Blank, _NegaScout_, _NegaScout, NegaScout_, NegaScout, IterativeDeepning
 import reversi.strategies.coordinator as coord
 
@@ -60,6 +61,49 @@ class TestBlank(unittest.TestCase):
             board.put_disc('black', 4, 5)
             self.assertEqual(blank.next_move('white', board), expected.next_move('white', board))
 
+    def test_blank_killer_history(self):
+        # キラー手とヒストリーで並び替えても最善手と評価値は変わらない
+        board = BitBoard()
+        for color, x, y in [('black', 3, 2), ('white', 2, 4), ('black', 5, 5), ('white', 4, 2), ('black', 5, 2), ('white', 5, 4), ('black', 3, 5), ('white', 2, 2)]:  # noqa: E501
+            board.put_disc(color, x, y)
+        moves = board.get_legal_moves('black')
+
+        results = []
+        for orderer in [None, coord.Orderer_KH()]:
+            blank = _Blank(orderer=orderer)
+            for depth in range(1, 5):
+                best_move, scores = blank.get_best_move('black', board, moves, depth)
+            results.append((best_move, scores[best_move]))
+
+        self.assertEqual(results[0], results[1])
+        self.assertGreater(orderer.cutoffs, 0)
+
+    def test_blank_probcut(self):
+        board = BitBoard()
+        for color, x, y in [('black', 3, 2), ('white', 2, 4), ('black', 5, 5), ('white', 4, 2),
+                            ('black', 5, 2), ('white', 5, 4), ('black', 3, 5), ('white', 2, 2)]:
+            board.put_disc(color, x, y)
+        moves = board.get_legal_moves('black')
+
+        def search(probcut):
+            blank = _Blank(probcut=probcut)
+            pid = 'blank_probcut' + str(id(probcut))
+            Measure.count[pid] = 0
+            best_move, scores = blank.get_best_move('black', board, moves, 6, pid)
+            return best_move, scores, Measure.count[pid]
+
+        best_move, scores, count = search(None)
+        self.assertEqual(search(ProbCut()), (best_move, scores, count))
+
+        # 同梱のパラメータで枝刈りしてもこの局面の最善手は変わらず、ノード数は減る
+        probcut = ProbCut.load(PROBCUT_JSON)
+        self.assertEqual(probcut.size, 8)
+        self.assertTrue(probcut.params)
+        result = search(probcut)
+        self.assertEqual(result[0], best_move)
+        self.assertLess(result[2], count)
+        self.assertGreater(probcut.cuts, 0)
+
     def test_blank_performance(self):
         board = BitBoard()
         board.put_disc('black', 3, 2)
@@ -63,6 +63,14 @@ class TestCustom(unittest.TestCase):
                 self.assertEqual(obj.depth, depth)
                 self.assertIsInstance(obj.evaluator, evaluator)
 
+    def test_custom_tpow_size10(self):
+        # 開放度を使う評価関数は10x10のビットボードでも動作する
+        board = BitBoard(10)
+        for color, x, y in [(c.black, 5, 3), (c.white, 6, 3), (c.black, 7, 4), (c.white, 4, 3)]:
+            board.put_disc(color, x, y)
+        for strategy in (MinMax2_TPO(), MinMax2_TPOW(), NegaMax2_TPOW(), NegaScout2_TPOW()):
+            self.assertEqual(strategy.next_move(c.black, board), (4, 2))
+
     def test_custom_negamax(self):
         patterns = [
             ((NegaMax1_TPW(), NegaMax2_TPW(), NegaMax3_TPW(), NegaMax4_TPW()), Evaluator_TPW),
@@ -3,8 +3,11 @@
 
 import unittest
 import os
+import random
+from concurrent.futures import ThreadPoolExecutor
 
-from reversi.board import BitBoard
+from reversi.board import Board, BitBoard, PyBitBoard
+from reversi.BitBoardMethods import CythonBitBoard
 from reversi.strategies.common import Timer, Measure, CPU_TIME
 from reversi.strategies import _EndGame_, _EndGame, EndGame_, EndGame, _AlphaBeta_, _AlphaBeta, AlphaBeta_, AlphaBeta
 import reversi.strategies.coordinator as coord
@@ -161,6 +164,126 @@ class TestEndGame(unittest.TestCase):
         self.assertLessEqual(Measure.elp_time[pid]['max'], CPU_TIME * 1.1)
         print('(1000000)', Measure.count[pid])
 
+    def test_endgame_small_board_size(self):
+        for size, turns in [(4, 4), (6, 22)]:
+            boards = [BitBoard(size), PyBitBoard(size)]
+            color = 'black'
+            for _ in range(turns):
+                moves = boards[0].get_legal_moves(color)
+                if not moves:
+                    color = 'white' if color == 'black' else 'black'
+                    moves = boards[0].get_legal_moves(color)
+                for board in boards:
+                    board.put_disc(color, *moves[0])
+                color = 'white' if color == 'black' else 'black'
+
+            results = []
+            for board in boards:
+                endgame = _EndGame(depth=size*size)
+                moves = board.get_legal_moves(color)
+                results.append((endgame.next_move(color, board), endgame.get_best_move(color, board, moves)))
+            self.assertIsInstance(boards[0], CythonBitBoard)
+            self.assertEqual(results[0], results[1])
+            self.assertEqual(boards[0].get_bitboard_info(), boards[1].get_bitboard_info())
+
+    def test_endgame_last_n_empties(self):
+        # 残り数マスの専用ソルバーと手の並び替えを使っても、Python版と同じ結果となる(パスや穴を含む)
+        for seed, hole in [(1, 0), (2, 0), (3, 0x8100000000000081), (4, 0x0018000000001800)]:
+            boards = [BitBoard(hole=hole), PyBitBoard(hole=hole)]
+            color = 'black'
+            random.seed(seed)
+            while boards[0]._black_score + boards[0]._white_score < 64 - bin(hole).count('1') - 9:
+                moves = boards[0].get_legal_moves(color)
+                if moves:
+                    move = random.choice(moves)
+                    for board in boards:
+                        board.put_disc(color, *move)
+                color = 'white' if color == 'black' else 'black'
+
+            results = []
+            for board in boards:
+                endgame = _EndGame(depth=9)
+                moves = board.get_legal_moves(color)
+                results.append(endgame.get_best_move(color, board, moves) if moves else None)
+            self.assertIsInstance(boards[0], CythonBitBoard)
+            self.assertEqual(results[0], results[1])
+
+    def test_endgame_wld(self):
+        # 勝敗読みは石差読みと勝敗が一致し、より少ないノード数で終わる
+        positions = [('black', 0xF07DBF650158381C, 0x2009A7EA6C4E0), ('black', 0xE07DBF650158381C, 0x0009A7EA6C4E0), ('black', 0xC07DBF650158381C, 0x0009A7CA6C4E0)]  # noqa: E501
+        for color, black, white in positions:
+            board = BitBoard()
+            board._black_bitboard, board._white_bitboard = black, white
+            board.update_score()
+            moves = board.get_legal_moves(color)
+            results = {}
+            for role in ('best_match', 'wld'):
+                endgame = _EndGame(depth=20, role=role)
+                pid = 'wld_' + role
+                Measure.count[pid] = 0
+                best_move, scores = endgame.get_best_move(color, board, moves, 20, pid)
+                results[role] = (best_move, scores[best_move], Measure.count[pid])
+            exact_move, exact_score, exact_count = results['best_match']
+            wld_move, wld_score, wld_count = results['wld']
+            _, scores = _EndGame_(depth=20).get_best_move(color, board, [wld_move], 20)
+            self.assertEqual(wld_score, (exact_score > 0) - (exact_score < 0))
+            self.assertEqual((scores[wld_move] > 0) - (scores[wld_move] < 0), wld_score)
+            self.assertLess(wld_count, exact_count)
+            self.assertEqual(EndGame(depth=20, role='wld').role, 'wld')
+
+    def test_endgame_wld_fallback(self):
+        # Cython版(64bit)に対応していないボードでも勝敗のみを読み、勝敗は石差読みと一致する
+        board = Board(4)
+        endgame = _EndGame_(depth=20, role='wld')
+        best_move, scores = endgame.get_best_move('black', board, board.get_legal_moves('black'), 20)
+        self.assertEqual(best_move, (1, 0))
+        self.assertEqual(scores, {(1, 0): -1, (0, 1): -1, (3, 2): -1, (2, 3): -1})
+
+        positions = [(0xF43A1F46B100495BA7F9FE3FC, 0x20580B94EFFB6A4580601000), (0x65CBA7740E51E9F8161, 0xFF3FCF9234588BF1A81607E0A)]
+        for black, white in positions:
+            board = BitBoard(10)
+            board._black_bitboard, board._white_bitboard = black, white
+            board.update_score()
+            moves = board.get_legal_moves('black')
+            results = {}
+            for role in ('best_match', 'wld'):
+                endgame = _EndGame(depth=20, role=role)
+                pid = 'wld_fallback_' + role
+                Measure.count[pid] = 0
+                best_move, scores = endgame.get_best_move('black', board, moves, 20, pid)
+                results[role] = (best_move, scores[best_move], Measure.count[pid])
+            exact_move, exact_score, exact_count = results['best_match']
+            wld_move, wld_score, wld_count = results['wld']
+            _, scores = _EndGame_(depth=20).get_best_move('black', board, [wld_move], 20)
+            self.assertEqual(wld_score, (exact_score > 0) - (exact_score < 0))
+            self.assertEqual((scores[wld_move] > 0) - (scores[wld_move] < 0), wld_score)
+            self.assertLess(wld_count, exact_count)
+
+            endgame = _EndGame_(depth=20, role='wld')
+            self.assertEqual(endgame.analyze('black', board).score, wld_score)
+
+    def test_endgame_concurrent_search(self):
+        # 探索毎に状態を持つため、複数スレッドで同時に探索しても結果とノード数が変わらない
+        positions = [(0xF07DBF650158381C, 0x2009A7EA6C4E0), (0xE07DBF650158381C, 0x0009A7EA6C4E0), (0xF07DBF650158381C, 0x0009A7EA6C4E0), (0xE07DBF650158381C, 0x2009A7EA6C4E0)]  # noqa: E501
+
+        def search(index, prefix):
+            board = BitBoard()
+            board._black_bitboard, board._white_bitboard = positions[index]
+            board.update_score()
+            endgame = _EndGame(depth=14)
+            pid = prefix + str(index)
+            Measure.count[pid] = 0
+            best_move = endgame.get_best_move('black', board, board.get_legal_moves('black'), 14, pid)
+            return best_move, Measure.count[pid], board.get_bitboard_info()
+
+        sequential = [search(index, 'sequential') for index in range(len(positions))]
+        with ThreadPoolExecutor(max_workers=len(positions)) as executor:
+            concurrent = list(executor.map(search, range(len(positions)), ['concurrent'] * len(positions)))
+        self.assertEqual(sequential, concurrent)
+        for (best_move, count, bitboard_info), position in zip(concurrent, positions):
+            self.assertGreater(count, 0)
+            self.assertEqual(bitboard_info[:2], position)
+
     def test_endgame_remain_12(self):
         # Windows10 Celeron 1.6GHz 4.00GB
         board = BitBoard()
@@ -5,10 +5,10 @@ import unittest
 import os
 
 from reversi.board import BitBoard
-from reversi.strategies.common import Measure
+from reversi.strategies.common import Measure, Timer, TimeManager
 from reversi.strategies import IterativeDeepning
 from reversi.strategies.alphabeta import _AlphaBeta, AlphaBeta
-from reversi.strategies.negascout import NegaScout
+from reversi.strategies.negascout import _NegaScout, NegaScout
 import reversi.strategies.coordinator as coord
 
 
@@ -31,6 +31,46 @@ class TestIterativeDeepning(unittest.TestCase):
         self.assertTrue(isinstance(iterative.search, AlphaBeta))
         self.assertTrue(isinstance(iterative.search.evaluator, coord.Evaluator_TPOW))
 
+    def test_iterative_init_orderer_kh(self):
+        # 探索の途中で並び替えるordererは探索クラスにも渡す
+        orderer = coord.Orderer_BKH()
+        iterative = IterativeDeepning(depth=2, selector=coord.Selector(), orderer=orderer, search=_NegaScout(evaluator=coord.Evaluator_TPOW()), limit=4)
+        self.assertIs(iterative.search.orderer, orderer)
+
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        iterative.next_move('white', board)
+        self.assertGreater(orderer.cutoffs, 0)
+
+        # 探索クラスに指定済みの場合はそのまま
+        search_orderer = coord.Orderer_K()
+        iterative = IterativeDeepning(depth=2, selector=coord.Selector(), orderer=orderer, search=_NegaScout(evaluator=coord.Evaluator_TPOW(), orderer=search_orderer))  # noqa: E501
+        self.assertIs(iterative.search.orderer, search_orderer)
+
+    def test_iterative_time_manager(self):
+        class StopAt(TimeManager):
+            def __init__(self, iterations):
+                super().__init__(total=100.0)
+                self.iterations = iterations
+                self.log = []
+
+            def next_iteration(self, pid, best_move):
+                self.log.append(best_move)
+                return len(self.log) < self.iterations
+
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        for search_class in (AlphaBeta, NegaScout):
+            for native in (False, True):
+                time_manager = StopAt(3)
+                iterative = IterativeDeepning(depth=2, selector=coord.Selector(), orderer=coord.Orderer_B(), search=search_class(evaluator=coord.Evaluator_TPWE()), native=native, time_manager=time_manager)  # noqa: E501
+                self.assertIs(iterative.time_manager, time_manager)
+                self.assertIn(iterative.next_move('white', board), board.get_legal_moves('white'))
+                self.assertEqual(iterative.max_depth, 4)  # 3回目の反復で打ち切る
+                self.assertEqual(len(time_manager.log), 3)
+                self.assertLess(time_manager.remaining, 100.0)
+                self.assertNotIn(Timer.get_pid(iterative.search), Timer.managers)
+
     def test_iterative_next_move_depth2(self):
         board = BitBoard()
 
@@ -188,3 +228,50 @@ class TestIterativeDeepning(unittest.TestCase):
         print('NegaScout-Evaluator_TPWEB : (26000)', Measure.count[key2])
         print('(max_depth=7)', iterative.max_depth)
         print(' max :', Measure.elp_time[key]['max'], '(s)')
+
+    def test_iterative_next_move_native(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        board.put_disc('black', 5, 5)
+        board.put_disc('white', 4, 2)
+        board.put_disc('black', 5, 2)
+        board.put_disc('white', 5, 4)
+        board_info = board.get_bitboard_info()
+
+        # Python版の反復深化と同じ手・深さになる
+        for search_class in (_AlphaBeta, _NegaScout):
+            for evaluator in (coord.Evaluator_TPOW(), coord.Evaluator_TPWE()):
+                results = []
+                for native in (False, True):
+                    iterative = IterativeDeepning(
+                        depth=2,
+                        selector=coord.Selector(),
+                        orderer=coord.Orderer_B(),
+                        search=search_class(evaluator=evaluator),
+                        limit=6,
+                        native=native,
+                    )
+                    key = iterative.search.__class__.__name__ + str(os.getpid())
+                    Measure.count[key] = 0
+                    results.append((iterative.next_move('black', board), iterative.max_depth))
+                    print(search_class.__name__, evaluator.__class__.__name__, 'native' if native else 'python', Measure.count[key])
+                self.assertEqual(results[0], results[1])
+                self.assertEqual(results[1][1], 6)
+                self.assertEqual(board.get_bitboard_info(), board_info)
+
+        # 窓の幅を指定
+        iterative = IterativeDeepning(depth=2, selector=coord.Selector(), orderer=coord.Orderer_B(), search=_NegaScout(evaluator=coord.Evaluator_TPW()), limit=5, native=True, window=1)  # noqa: E501
+        self.assertEqual(iterative.next_move('black', board), (5, 3))
+
+        # 読み切った時点で終了する
+        board = BitBoard(4)
+        board.put_disc('black', 0, 1)
+        iterative = IterativeDeepning(depth=2, selector=coord.Selector(), orderer=coord.Orderer_B(), search=_AlphaBeta(evaluator=coord.Evaluator_N()), native=True)  # noqa: E501
+        self.assertIn(iterative.next_move('white', board), board.get_legal_moves('white'))
+        self.assertEqual(iterative.max_depth, 11)
+
+        # タイマー
+        for search_class in (AlphaBeta, NegaScout):
+            iterative = IterativeDeepning(depth=2, selector=coord.Selector(), orderer=coord.Orderer_B(), search=search_class(evaluator=coord.Evaluator_TPWE()), native=True)  # noqa: E501
+            self.assertIn(iterative.next_move('black', board), board.get_legal_moves('black'))
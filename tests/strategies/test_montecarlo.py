@@ -63,3 +63,39 @@ class TestMonteCarlo(unittest.TestCase):
         print(' min        :', Measure.elp_time[key]['min'], '(s)')
         print(' max        :', Measure.elp_time[key]['max'], '(s)')
         print(' ave        :', Measure.elp_time[key]['ave'], '(s)')
+
+    def test_montecarlo_playout_benchmark(self):
+        import copy
+        import time
+        from reversi.game import Game
+        from reversi.display import NoneDisplay
+
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        board.put_disc('black', 1, 5)
+        bitboard_info, prev = board.get_bitboard_info(), list(board.prev)
+        montecarlo = MonteCarlo()
+        move = board.get_legal_moves('white')[0]
+        count = 300
+
+        # 従来の方法(deepcopy)
+        time_s = time.perf_counter()
+        for _ in range(count):
+            playout_board = copy.deepcopy(board)
+            playout_board.put_disc('white', *move)
+            Game(montecarlo._black_player, montecarlo._white_player, playout_board, NoneDisplay(), 'black').play()
+        before = count / (time.perf_counter() - time_s)
+
+        # clone
+        time_s = time.perf_counter()
+        for _ in range(count):
+            montecarlo._playout('white', board, move)
+        after = count / (time.perf_counter() - time_s)
+
+        print()
+        print('playouts/s')
+        print(' deepcopy :', before)
+        print(' clone    :', after)
+        self.assertEqual(board.get_bitboard_info(), bitboard_info)
+        self.assertEqual(board.prev, prev)
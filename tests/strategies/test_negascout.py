@@ -3,10 +3,13 @@
 
 import unittest
 import os
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from reversi.board import BitBoard
-from reversi.strategies.common import Timer, Measure, CPU_TIME
+from reversi.board import Board, BitBoard, PyBitBoard
+from reversi.BitBoardMethods import CythonBitBoard, CythonBitBoard256
+from reversi.strategies.common import Timer, Measure, CPU_TIME, TranspositionTable, ProbCut, get_time_to_depth
 from reversi.strategies import _NegaScout_, _NegaScout, NegaScout_, NegaScout
 import reversi.strategies.coordinator as coord
 
@@ -172,10 +175,218 @@ class TestNegaScout(unittest.TestCase):
         print(' max :', Measure.elp_time[pid]['max'], '(s)')
         print(' ave :', Measure.elp_time[pid]['ave'], '(s)')
 
+    def test_negascout_transposition_table(self):
+        board = BitBoard()
+        board.put_disc('black', 3, 2)
+        board.put_disc('white', 2, 4)
+        board.put_disc('black', 5, 5)
+        board.put_disc('white', 4, 2)
+        board.put_disc('black', 5, 2)
+        board.put_disc('white', 5, 4)
+        moves = board.get_legal_moves('black')
+        bitboard_info = board.get_bitboard_info()
+
+        results, counts = [], []
+        for tt in [None, TranspositionTable(size=1)]:
+            negascout = _NegaScout(evaluator=coord.Evaluator_TPWE(), tt=tt)
+            pid = negascout.__class__.__name__ + str(os.getpid())
+            Measure.count[pid] = 0
+            time_s = time.perf_counter()
+            for depth in range(2, 7):
+                best_move, scores = negascout.get_best_move('black', board, moves, depth, pid)
+            elp = time.perf_counter() - time_s
+            results.append((best_move, scores[best_move]))
+            counts.append(Measure.count[pid])
+
+            print()
+            print(pid, 'depth = 2-6', 'tt' if tt else '--')
+            print(' nodes    :', Measure.count[pid])
+            print(' time     :', elp, '(s)')
+            print(' nodes/s  :', Measure.count[pid] / elp)
+            if tt:
+                print(' hit rate :', tt.hit_rate())
+
+        self.assertEqual(results[0], results[1])
+        self.assertLess(counts[1], counts[0])
+        self.assertEqual(board.get_bitboard_info(), bitboard_info)
+
+    def test_negascout_killer_history(self):
+        # キラー手とヒストリーで並び替えても最善手と評価値は変わらない
+        board = BitBoard()
+        for color, x, y in [('black', 3, 2), ('white', 2, 4), ('black', 5, 5), ('white', 4, 2),
+                            ('black', 5, 2), ('white', 5, 4), ('black', 3, 5), ('white', 2, 2)]:
+            board.put_disc(color, x, y)
+        moves = board.get_legal_moves('black')
+
+        results = []
+        for orderer in [None, coord.Orderer_K(), coord.Orderer_H(), coord.Orderer_KH()]:
+            negascout = _NegaScout(evaluator=coord.Evaluator_TPWE(), orderer=orderer)
+            for depth in range(1, 6):
+                best_move, scores = negascout.get_best_move('black', board, moves, depth)
+            results.append((best_move, scores[best_move]))
+            if orderer is not None:
+                self.assertGreater(orderer.cutoffs, 0)
+
+        self.assertEqual(len(set(results)), 1)
+
+    def test_negascout_probcut(self):
+        board = BitBoard()
+        for color, x, y in [('black', 3, 2), ('white', 2, 4), ('black', 5, 5), ('white', 4, 2),
+                            ('black', 5, 2), ('white', 5, 4), ('black', 3, 5), ('white', 2, 2)]:
+            board.put_disc(color, x, y)
+        moves = board.get_legal_moves('black')
+        bitboard_info = board.get_bitboard_info()
+
+        def search(probcut):
+            negascout = _NegaScout(evaluator=coord.Evaluator_TPWE(), probcut=probcut)
+            pid = 'negascout_probcut' + str(id(probcut))
+            Measure.count[pid] = 0
+            best_move, scores = negascout.get_best_move('black', board, moves, 5, pid)
+            return best_move, scores, Measure.count[pid]
+
+        best_move, scores, count = search(None)
+
+        # パラメータが無い場合は探索しない
+        probcut = ProbCut()
+        self.assertEqual(search(probcut), (best_move, scores, count))
+        self.assertEqual(probcut.probes, 0)
+
+        # 枝刈りしない閾値の場合は浅い探索の分だけノード数が増える
+        probcut = ProbCut(t=100000, pairs={3: (1,), 4: (2,)})
+        for stage in range(8):
+            probcut.set_param(stage, 3, 1, 1.0, 0.0, 100.0)
+            probcut.set_param(stage, 4, 2, 1.0, 0.0, 100.0)
+        result = search(probcut)
+        self.assertEqual(result[:2], (best_move, scores))
+        self.assertGreater(result[2], count)
+        self.assertGreater(probcut.probes, 0)
+        self.assertEqual(probcut.cuts, 0)
+
+        # 枝刈りする閾値の場合はノード数が減る
+        probcut.t = 0.0
+        result = search(probcut)
+        self.assertLess(result[2], count)
+        self.assertGreater(probcut.cuts, 0)
+        self.assertEqual(board.get_bitboard_info(), bitboard_info)
+
+        # パラメータと異なるボードサイズでは枝刈りしない
+        probcut = ProbCut(t=0.0, size=6, pairs={3: (1,)})
+        probcut.set_param(3, 3, 1, 1.0, 0.0, 0.0)
+        self.assertEqual(search(probcut), (best_move, scores, count))
+
+    def test_negascout_parallel(self):
+        # ルート分割でも最善手と評価値は逐次探索と同じ(最善手以外の評価値は共有したalphaによる上限値)
+        for board in [BitBoard(), Board()]:
+            board.put_disc('black', 3, 2)
+            board.put_disc('white', 2, 4)
+            moves = board.get_legal_moves('black')
+            bitboard_info = board.get_bitboard_info()
+            sequential = _NegaScout(evaluator=coord.Evaluator_TPWE())
+            parallel = _NegaScout(evaluator=coord.Evaluator_TPWE(), tt=TranspositionTable(size=1), workers=2)
+            pid = parallel.__class__.__name__ + str(os.getpid())
+            Measure.count[pid] = 0
+            best_move, scores = sequential.get_best_move('black', board, moves, 4)
+            parallel_best_move, parallel_scores = parallel.get_best_move('black', board, moves, 4, pid)
+            self.assertEqual(parallel_best_move, best_move)
+            self.assertEqual(parallel_scores[best_move], scores[best_move])
+            self.assertEqual(list(parallel_scores.keys()), moves)
+            self.assertGreater(Measure.count[pid], 0)
+            self.assertEqual(_NegaScout(evaluator=coord.Evaluator_TPWE(), workers=2).next_move('black', board), sequential.next_move('black', board))
+            self.assertEqual(board.get_bitboard_info(), bitboard_info)
+            self.assertIsNone(parallel.get_best_move_iterative('black', board, moves, 4))
+
+        result = get_time_to_depth(parallel, 'black', BitBoard(), 4, workers=(1, 2))
+        self.assertEqual(list(result.keys()), [1, 2])
+        self.assertEqual(result[1]['speedup'], 1.0)
+        self.assertEqual(result[1]['score'], result[2]['score'])
+        self.assertEqual(parallel.workers, 2)
+
+    def test_negascout_small_board_size(self):
+        for size, turns in [(4, 2), (6, 6)]:
+            boards = [BitBoard(size), PyBitBoard(size)]
+            color = 'black'
+            for _ in range(turns):
+                move = boards[0].get_legal_moves(color)[0]
+                for board in boards:
+                    board.put_disc(color, *move)
+                color = 'white' if color == 'black' else 'black'
+
+            results = []
+            for board in boards:
+                negascout = _NegaScout(depth=4, evaluator=coord.Evaluator_TPW())
+                moves = board.get_legal_moves(color)
+                results.append((negascout.next_move(color, board), negascout.get_best_move(color, board, moves, 4)))
+            self.assertIsInstance(boards[0], CythonBitBoard)
+            self.assertEqual(results[0], results[1])
+            self.assertEqual(boards[0].get_bitboard_info(), boards[1].get_bitboard_info())
+
+    def test_negascout_size16_256bit(self):
+        for size in (10, 16):
+            boards = [BitBoard(size), Board(size)]
+            color = 'black'
+            for _ in range(6):
+                move = boards[1].get_legal_moves(color)[0]
+                for board in boards:
+                    board.put_disc(color, *move)
+                color = 'white' if color == 'black' else 'black'
+
+            results = []
+            for board in boards:
+                negascout = _NegaScout(depth=3, evaluator=coord.Evaluator_TPW())
+                moves = board.get_legal_moves(color)
+                best_move, scores = negascout.get_best_move(color, board, moves, 3)
+                results.append((negascout.next_move(color, board), best_move, scores[best_move]))
+            self.assertIsInstance(boards[0], CythonBitBoard256)
+            self.assertEqual(results[0], results[1])
+            self.assertEqual(boards[0].get_bitboard_info(), boards[1].get_bitboard_info())
+
+            tt = TranspositionTable(size=1)
+            negascout = _NegaScout(depth=3, evaluator=coord.Evaluator_TPW(), tt=tt)
+            self.assertEqual(negascout.next_move(color, boards[0]), results[0][0])
+            self.assertGreater(tt.stores, 0)
+
+    def test_negascout_concurrent_search(self):
+        # 探索毎に状態を持つため、評価関数の呼び出しでスレッドが切り替わっても結果とノード数が変わらない
+        openings = [[(3, 2), (2, 4), (5, 5)], [(2, 3), (2, 2), (2, 1)], [(5, 4), (5, 5), (4, 5)], [(4, 5), (5, 3), (3, 2)]]
+
+        def search(index, prefix, size):
+            board = BitBoard(size)
+            offset = (size - 8) // 2
+            color = 'black'
+            for x, y in openings[index]:
+                board.put_disc(color, x + offset, y + offset)
+                color = 'white' if color == 'black' else 'black'
+            negascout = _NegaScout(evaluator=coord.Evaluator_TPW(), tt=TranspositionTable(size=1))
+            pid = prefix + str(size) + '_' + str(index)
+            Measure.count[pid] = 0
+            best_move, scores = negascout.get_best_move(color, board, board.get_legal_moves(color), 4, pid)
+            return best_move, scores, Measure.count[pid]
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(0.000001)  # スレッドを頻繁に切り替える
+        try:
+            for size in (8, 10):
+                sequential = [search(index, 'ns_sequential', size) for index in range(len(openings))]
+                with ThreadPoolExecutor(max_workers=len(openings)) as executor:
+                    concurrent = list(executor.map(search, range(len(openings)), ['ns_concurrent'] * len(openings), [size] * len(openings)))
+                self.assertEqual(sequential, concurrent)
+        finally:
+            sys.setswitchinterval(interval)
+
+    def test_negascout_evaluator_error(self):
+        # GILを解放して探索中でも、評価関数の例外は呼び出し元に伝わる
+        class ErrorEvaluator:
+            def evaluate(self, *args):
+                raise ValueError('evaluate')
+
+        for size in (8, 10):
+            with self.assertRaises(ValueError):
+                _NegaScout(depth=2, evaluator=ErrorEvaluator()).next_move('black', BitBoard(size))
+
     def test_negascout_timer_timeout(self):
         board = BitBoard()
         board.put_disc('black', 3, 2)
-        negascout = NegaScout(depth=10, evaluator=coord.Evaluator_TPOW())
+        negascout = NegaScout(depth=12, evaluator=coord.Evaluator_TPOW())
         pid = negascout.__class__.__name__ + str(os.getpid())
         Measure.elp_time[pid] = {'min': 10000, 'max': 0, 'ave': 0, 'cnt': 0}
         Measure.count[pid] = 0
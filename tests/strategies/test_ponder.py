@@ -0,0 +1,125 @@
+"""Tests of ponder.py
+"""
+
+import unittest
+import threading
+
+from reversi import BitBoard, Game, Player
+from reversi import C as c
+from reversi.strategies import _NegaScout_, _Ponder_, Ponder
+from reversi.strategies.common import Timer, AbstractStrategy
+import reversi.strategies.coordinator as coord
+
+
+class Recorder(AbstractStrategy):
+    """探索したスレッドとプロセスIDを記録する"""
+    def __init__(self, base):
+        self.base = base
+        self.log = []
+
+    def next_move(self, color, board):
+        self.log.append((threading.current_thread() is threading.main_thread(), Timer.get_pid(self), color, board.encode(color)))
+        return self.base.next_move(color, board)
+
+
+class TestPonder(unittest.TestCase):
+    """ponder
+    """
+    def test_ponder_init(self):
+        base = _NegaScout_(depth=2, evaluator=coord.Evaluator_TPW())
+        ponder = _Ponder_(base)
+        self.assertIs(ponder.base, base)
+        self.assertEqual(ponder.mode, 'all')
+        self.assertIs(ponder.predictor, base)
+        self.assertEqual((ponder.results, ponder.hits, ponder.misses), ({}, 0, 0))
+
+        predictor = _NegaScout_(depth=1, evaluator=coord.Evaluator_TPW())
+        ponder = Ponder(base, mode='predicted', predictor=predictor)
+        self.assertEqual(ponder.mode, 'predicted')
+        self.assertIs(ponder.predictor, predictor)
+
+    def test_ponder_all(self):
+        base = Recorder(_NegaScout_(depth=2, evaluator=coord.Evaluator_TPW()))
+        ponder = Ponder(base)
+        board = BitBoard()
+        board.put_disc(c.black, 5, 4)
+        ponder.start_ponder(c.black, board)
+        ponder._thread.join()
+
+        replies = board.get_legal_moves(c.white)
+        self.assertEqual(len(ponder.results), len(replies))
+        self.assertFalse(any(main for main, _, _, _ in base.log))
+        self.assertTrue(all(pid.endswith('_ponder') for _, pid, _, _ in base.log))
+
+        # 先読みした局面は探索しない
+        for reply in replies:
+            next_board = board.clone()
+            next_board.put_disc(c.white, *reply)
+            expected = base.base.next_move(c.black, next_board)
+            results = dict(ponder.results)
+            count = len(base.log)
+            self.assertEqual(ponder.next_move(c.black, next_board), expected)
+            self.assertEqual(len(base.log), count)
+            ponder.results = results
+        self.assertEqual((ponder.hits, ponder.misses), (len(replies), 0))
+
+    def test_ponder_predicted(self):
+        base = Recorder(_NegaScout_(depth=2, evaluator=coord.Evaluator_TPW()))
+        ponder = _Ponder_(base, mode='predicted')
+        board = BitBoard()
+        board.put_disc(c.black, 5, 4)
+        ponder.start_ponder(c.black, board)
+        ponder._thread.join()
+        ponder.stop_ponder()
+        self.assertIsNone(ponder._thread)
+
+        # 予想した応手の後の局面のみ探索する
+        predicted = base.base.next_move(c.white, board)
+        self.assertEqual(base.log[0][2:], (c.white, board.encode(c.white)))
+        self.assertEqual(len(ponder.results), 1)
+
+        next_board = board.clone()
+        next_board.put_disc(c.white, *predicted)
+        self.assertIn(next_board.encode(c.black), ponder.results)
+
+        # 予想が外れた場合は通常通り探索する
+        other = [move for move in board.get_legal_moves(c.white) if move != predicted][0]
+        next_board = board.clone()
+        next_board.put_disc(c.white, *other)
+        count = len(base.log)
+        self.assertEqual(ponder.next_move(c.black, next_board), base.base.next_move(c.black, next_board))
+        self.assertEqual(len(base.log), count + 1)
+        self.assertTrue(base.log[-1][0])
+        self.assertEqual((ponder.hits, ponder.misses, ponder.results), (0, 1, {}))
+
+    def test_ponder_pass(self):
+        board = BitBoard(4)
+        for color, (x, y) in [(c.black, (1, 0)), (c.white, (0, 0)), (c.black, (0, 1)), (c.white, (2, 0)), (c.black, (3, 3)), (c.white, (0, 3)), (c.black, (2, 3)), (c.white, (0, 2)), (c.black, (3, 0)), (c.white, (3, 2)), (c.black, (3, 1))]:  # noqa: E501
+            board.put_disc(color, x, y)
+        self.assertEqual(board.get_legal_moves(c.white), [])
+        self.assertNotEqual(board.get_legal_moves(c.black), [])
+
+        # 相手がパスの場合は次の局面が確定している
+        base = _NegaScout_(depth=2, evaluator=coord.Evaluator_TPW())
+        ponder = _Ponder_(base)
+        ponder.start_ponder(c.black, board)
+        ponder._thread.join()
+        self.assertEqual(list(ponder.results), [board.encode(c.black)])
+        self.assertEqual(ponder.next_move(c.black, board), base.next_move(c.black, board))
+        self.assertEqual(ponder.hits, 1)
+
+    def test_ponder_game(self):
+        # 先読みしても対局結果は変わらない
+        results = []
+        for ponder in (False, True):
+            black = Player(c.black, 'Black', _Ponder_(_NegaScout_(depth=2, evaluator=coord.Evaluator_TPW())))
+            white = Player(c.white, 'White', _NegaScout_(depth=1, evaluator=coord.Evaluator_TPW()))
+            game = Game(black, white, BitBoard(6), ponder=ponder)
+            game.play()
+            results.append(game.result.position)
+            self.assertIsNone(black.strategy._thread)
+        self.assertEqual(results[0], results[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -49,14 +49,16 @@ class TestApp(unittest.TestCase):
         self.assertEqual(app.sleep_time_end, 0.01)
         self.assertEqual(app.sleep_time_turn, 0.3)
         self.assertEqual(app.sleep_time_move, 0.3)
+        self.assertFalse(app.ponder)
 
     def test_reversi_keyword_arg(self):
-        app = Reversi(turn_disc_wait=0.001, sleep_time_play=0.002, sleep_time_end=0.003, sleep_time_turn=0.004, sleep_time_move=0.005)
+        app = Reversi(turn_disc_wait=0.001, sleep_time_play=0.002, sleep_time_end=0.003, sleep_time_turn=0.004, sleep_time_move=0.005, ponder=True)
         self.assertEqual(app.turn_disc_wait, 0.001)
         self.assertEqual(app.sleep_time_play, 0.002)
         self.assertEqual(app.sleep_time_end, 0.003)
         self.assertEqual(app.sleep_time_turn, 0.004)
         self.assertEqual(app.sleep_time_move, 0.005)
+        self.assertTrue(app.ponder)
 
     def test_reversi_state(self):
         app = Reversi()
@@ -725,12 +727,14 @@ class TestApp(unittest.TestCase):
         self.assertEqual(app.sleep_time_play, 2)
         self.assertEqual(app.sleep_time_turn, 1)
         self.assertEqual(app.sleep_time_move, 1)
+        self.assertFalse(app.ponder)
 
     def test_reversic_keyword_arg(self):
-        app = Reversic(sleep_time_play=0.001, sleep_time_turn=0.002, sleep_time_move=0.003)
+        app = Reversic(sleep_time_play=0.001, sleep_time_turn=0.002, sleep_time_move=0.003, ponder=True)
         self.assertEqual(app.sleep_time_play, 0.001)
         self.assertEqual(app.sleep_time_turn, 0.002)
         self.assertEqual(app.sleep_time_move, 0.003)
+        self.assertTrue(app.ponder)
 
     def test_reversic_state(self):
         app = Reversic()
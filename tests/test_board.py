@@ -4,6 +4,7 @@
 import unittest
 
 from reversi.board import AbstractBoard, BoardSizeError, Board, BitBoard, PyBitBoard
+import reversi.BitBoardMethods as BitBoardMethods
 from reversi.color import C as c
 from reversi.disc import D as d
 from reversi.game import Game
@@ -98,6 +99,19 @@ class TestBoard(unittest.TestCase):
             self.assertEqual(board._mask.bl, 0x00FEFEFEFEFEFEFE)
             self.assertEqual(board._mask.l, 0xFEFEFEFEFEFEFEFE)
             self.assertEqual(board._mask.ul, 0xFEFEFEFEFEFEFE00)
+            self.assertEqual(
+                board._mask.fill,
+                (
+                    (0x7E7E7E7E7E7E7E7E, (1, 2, 4)),
+                    (0x00FFFFFFFFFFFF00, (8, 16, 32)),
+                    (0x007E7E7E7E7E7E00, (9, 18, 36)),
+                    (0x007E7E7E7E7E7E00, (7, 14, 28)),
+                )
+            )
+
+            # マスクはサイズ毎に1度だけ生成する
+            self.assertIs(board._mask, board_class(8)._mask)
+            self.assertEqual(len(board_class(26)._mask.fill[0][1]), 5)
 
     def test_board_is_invalid_size(self):
         any_invalid_value = 100
@@ -1001,6 +1015,80 @@ class TestBoard(unittest.TestCase):
             board.put_disc(c.black, 5, 4)
             self.assertEqual(board.get_board_line_info(c.white), '---------------------------O*------***--------------------------O')
 
+    def test_board_get_board_view(self):
+        from reversi.BitBoardMethods import CythonBitBoard256, export_boards
+
+        for size in (4, 6, 8, 10, 12, 16, 26):
+            boards = [board_class(size) for board_class in self.board_classes]
+            if size in (10, 12, 16):
+                boards += [CythonBitBoard256(size)]
+            for board in boards:
+                x, y = board.get_legal_moves(c.black)[0]
+                board.put_disc(c.black, x, y)
+                view = board.get_board_view()
+                self.assertEqual((view.format, view.shape), ('b', (size, size)))
+                self.assertEqual(view.tolist(), board.get_board_info())
+                self.assertEqual(view[y, x], 1)
+        self.assertEqual(Board(4).get_board_line_info('green', empty='.'), '.....O*..*O......')
+
+        # まとめて書き込む
+        boards = [BitBoard(), PyBitBoard(), Board(hole=0x8100000000000081)]
+        boards[1].put_disc(c.black, 5, 4)
+        out = bytearray(3 * 64)
+        views = export_boards(boards, out)
+        self.assertEqual(views.shape, (3, 8, 8))
+        for i, board in enumerate(boards):
+            self.assertEqual(views[i, 4, 5], 0 if i != 1 else 1)
+            self.assertEqual(out[i*64:(i+1)*64], board.get_board_view().tobytes())
+        self.assertEqual(export_boards(boards).tolist(), views.tolist())
+        with self.assertRaises(ValueError):
+            export_boards([])
+        with self.assertRaises(ValueError):
+            export_boards([BitBoard(), BitBoard(6)])
+        with self.assertRaises(ValueError):
+            export_boards(boards, bytearray(64))
+
+    def test_board_encode_decode(self):
+        from reversi.BitBoardMethods import CythonBitBoard256, get_record_size
+        from reversi.BitBoardMethods import encode_position, decode_position, pack_positions, iter_positions, unpack_positions
+
+        hole = 0x8100000000000081
+        self.assertEqual(len(BitBoard(hole=hole).encode()), 17)
+        self.assertEqual(BitBoard(4).encode('white'), bytes([0x84, 0x00, 0x24, 0x18, 0x00]))
+        for size in (4, 6, 8, 10, 12, 16, 26):
+            board_classes = self.board_classes + ([CythonBitBoard256] if size in (10, 12, 16) else [])
+            for board_class in board_classes:
+                board = board_class(size, hole=hole if size == 8 else 0)
+                board.put_disc(c.black, *board.get_legal_moves(c.black)[0])
+                data = board.encode(c.white)
+                self.assertEqual(len(data), get_record_size(size))
+                decoded, color = type(board).decode(data)
+                self.assertIs(type(decoded), type(board))
+                self.assertEqual(color, c.white)
+                self.assertEqual(decoded.get_bitboard_info(), board.get_bitboard_info())
+                self.assertEqual(decoded.get_board_info(), board.get_board_info())
+                self.assertEqual((decoded._black_score, decoded._white_score), (board._black_score, board._white_score))
+                self.assertEqual(decoded.hash, board.hash)
+
+        # 任意サイズの穴
+        data = encode_position(26, c.black, 1 << 675, 1, 0b110)
+        self.assertEqual(decode_position(data), (26, c.black, 1 << 675, 1, 0b110))
+
+        # まとめて変換
+        positions = [(BitBoard(), c.black), (PyBitBoard(4), c.white), (Board(hole=hole), c.black)]
+        packed = pack_positions(positions)
+        self.assertEqual(len(packed), 17 + 5 + 17)
+        self.assertEqual([info[:2] for info in iter_positions(packed)], [(8, c.black), (4, c.white), (8, c.black)])
+        for (board, color), (unpacked, unpacked_color) in zip(positions, unpack_positions(bytearray(packed), PyBitBoard)):
+            self.assertEqual((unpacked.get_bitboard_info(), unpacked_color), (board.get_bitboard_info(), color))
+
+        with self.assertRaises(ValueError):
+            encode_position(5, c.black, 0, 0)
+        with self.assertRaises(ValueError):
+            decode_position(bytes([0x03]) + bytes(4))
+        with self.assertRaises(ValueError):
+            decode_position(packed)
+
     def test_board_size_4_get_bit_count(self):
         board = Board(4)
         blank, black, white = d.blank, d.black, d.white
@@ -1127,6 +1215,356 @@ class TestBoard(unittest.TestCase):
             self.assertEqual(board._black_score, 6)
             self.assertEqual(board._white_score, 7)
 
+    def test_board_hash(self):
+        import random
+        from reversi.BitBoardMethods import get_hash
+
+        random.seed(0)
+        for board_class in self.board_classes:
+            for size in range(4, 28, 2):
+                hole = 0x8000000000000001 if size == 8 else 0x0
+                board = board_class(size, hole=hole)
+                hashes = [board.hash]
+                self.assertEqual(board.hash, get_hash(*board.get_bitboard_info()))
+
+                # 着手毎のハッシュ値が盤面全体から求めた値と一致すること
+                color = c.black
+                for _ in range(20):
+                    legal_moves = board.get_legal_moves(color)
+                    if not legal_moves:
+                        color = c.next_color(color)
+                        legal_moves = board.get_legal_moves(color)
+                        if not legal_moves:
+                            break
+                    board.put_disc(color, *random.choice(legal_moves))
+                    self.assertEqual(board.hash, get_hash(*board.get_bitboard_info()))
+                    hashes.append(board.hash)
+                    color = c.next_color(color)
+
+                # undoで元のハッシュ値に戻ること
+                while board.prev:
+                    hashes.pop()
+                    board.undo()
+                    self.assertEqual(board.hash, hashes[-1])
+                self.assertEqual(board.hash, get_hash(*board.get_bitboard_info()))
+
+    def test_board_hash_cross_backend(self):
+        board, bitboard, pybitboard = Board(), BitBoard(), PyBitBoard()
+        for color, x, y in [(c.black, 5, 4), (c.white, 5, 5), (c.black, 4, 5), (c.white, 5, 3)]:
+            for b in (board, bitboard, pybitboard):
+                b.put_disc(color, x, y)
+            self.assertEqual(board.hash, bitboard.hash)
+            self.assertEqual(board.hash, pybitboard.hash)
+
+        # 異なる局面ではハッシュ値が異なること
+        other = BitBoard()
+        other.put_disc(c.black, 3, 2)
+        self.assertNotEqual(BitBoard().hash, other.hash)
+
+    def test_bitboard_methods_bits(self):
+        from reversi.BitBoardMethods import popcount, iter_bits, bits_to_coords, iter_indices, iter_coords, coord_to_bit
+
+        self.assertEqual(popcount(0), 0)
+        self.assertEqual(popcount(0x8000000000000001), 2)
+        self.assertEqual(popcount((1 << 676) - 1), 676)
+        self.assertEqual(list(iter_bits(0)), [])
+        self.assertEqual(list(iter_bits(0b101100)), [0b100, 0b1000, 0b100000])
+        self.assertEqual(bits_to_coords(8, 0), [])
+        self.assertEqual(bits_to_coords(8, 0x8000000000000001), [(0, 0), (7, 7)])
+        self.assertEqual(bits_to_coords(4, 0x0660), [(1, 1), (2, 1), (1, 2), (2, 2)])
+        self.assertEqual(bits_to_coords(26, 1 << (26*26-1-(26*3+5))), [(5, 3)])
+        self.assertEqual(list(iter_indices(8, 0x8000000000000001)), [0, 63])
+        self.assertEqual(list(iter_coords(4, 0x0660)), [(1, 1), (2, 1), (1, 2), (2, 2)])
+        self.assertEqual(coord_to_bit(8, 0, 0), 0x8000000000000000)
+        self.assertEqual(coord_to_bit(26, 5, 3), 1 << (26*26-1-(26*3+5)))
+
+        for size in range(4, 28, 2):
+            board = PyBitBoard(size)
+            bits = (1 << size*size) - 1
+            self.assertEqual(board.get_bit_count(bits), size*size)
+            self.assertEqual(Board(size).get_bit_count(bits), size*size)
+            coords = bits_to_coords(size, bits)
+            self.assertEqual(coords, [(x, y) for y in range(size) for x in range(size)])
+
+    def test_bitboard_methods_bits_benchmark(self):
+        import time
+        from reversi.BitBoardMethods import popcount, bits_to_coords
+
+        def popcount_scan(size, bits):
+            count = 0
+            mask = 1 << ((size**2)-1)
+            for _ in range(size**2):
+                if bits & mask:
+                    count += 1
+                mask >>= 1
+            return count
+
+        def bits_to_coords_scan(size, bits):
+            ret = []
+            mask = 1 << (size*size-1)
+            for y in range(size):
+                for x in range(size):
+                    if bits & mask:
+                        ret += [(x, y)]
+                    mask >>= 1
+            return ret
+
+        loop = 200
+        for size in (8, 26):
+            board = PyBitBoard(size)
+            black, white, _ = board.get_bitboard_info()
+            captures = black | white
+            self.assertEqual(popcount(black), popcount_scan(size, black))
+            self.assertEqual(bits_to_coords(size, captures), bits_to_coords_scan(size, captures))
+
+            # 1手あたりのスコア更新と取得座標変換の時間
+            start = time.perf_counter()
+            for _ in range(loop):
+                popcount_scan(size, black), popcount_scan(size, white), bits_to_coords_scan(size, captures)
+            before = (time.perf_counter() - start) / loop
+            start = time.perf_counter()
+            for _ in range(loop):
+                popcount(black), popcount(white), bits_to_coords(size, captures)
+            after = (time.perf_counter() - start) / loop
+            print('size', size, 'per move(us) : before', round(before * 1e6, 2), 'after', round(after * 1e6, 2))
+
+    def test_bitboard_random_play_all_sizes(self):
+        import random
+
+        random.seed(1)
+        for size in range(4, 28, 2):
+            for board_class in (PyBitBoard, BitBoard):
+                board, bitboard = Board(size), board_class(size)
+                color = c.black
+                while True:
+                    legal_moves = board.get_legal_moves(color)
+                    self.assertEqual(legal_moves, bitboard.get_legal_moves(color))
+                    if not legal_moves:
+                        color = c.next_color(color)
+                        legal_moves = board.get_legal_moves(color)
+                        if not legal_moves:
+                            break
+                        continue
+                    move = random.choice(legal_moves)
+                    self.assertEqual(sorted(board.get_flippable_discs(color, *move)), sorted(bitboard.get_flippable_discs(color, *move)))
+                    board.put_disc(color, *move)
+                    bitboard.put_disc(color, *move)
+                    self.assertEqual(board.get_bitboard_info(), bitboard.get_bitboard_info())
+                    self.assertEqual((board._black_score, board._white_score), (bitboard._black_score, bitboard._white_score))
+                    color = c.next_color(color)
+                    if size > 8 and len(bitboard.prev) > 40:
+                        break
+
+    def test_cyboard256_random_play(self):
+        import random
+
+        random.seed(2)
+        for size in (10, 12, 14, 16):
+            pybitboard, cybitboard = PyBitBoard(size), BitBoard(size)
+            self.assertIsInstance(cybitboard, BitBoardMethods.CythonBitBoard256)
+            color = c.black
+            while True:
+                legal_moves = pybitboard.get_legal_moves(color)
+                self.assertEqual(legal_moves, cybitboard.get_legal_moves(color))
+                self.assertEqual(pybitboard.get_legal_moves_bits(color), cybitboard.get_legal_moves_bits(color))
+                if not legal_moves:
+                    color = c.next_color(color)
+                    if not pybitboard.get_legal_moves(color):
+                        break
+                    continue
+                move = random.choice(legal_moves)
+                self.assertEqual(pybitboard.get_flippable_discs(color, *move), cybitboard.get_flippable_discs(color, *move))
+                self.assertEqual(pybitboard.put_disc(color, *move), cybitboard.put_disc(color, *move))
+                self.assertEqual(pybitboard.get_bitboard_info(), cybitboard.get_bitboard_info())
+                self.assertEqual((pybitboard._black_score, pybitboard._white_score), (cybitboard._black_score, cybitboard._white_score))
+                self.assertEqual(pybitboard.hash, cybitboard.hash)
+                if random.random() < 0.1:
+                    pybitboard.undo()
+                    cybitboard.undo()
+                    self.assertEqual(pybitboard.get_bitboard_info(), cybitboard.get_bitboard_info())
+                    self.assertEqual(pybitboard.hash, cybitboard.hash)
+                color = c.next_color(color)
+            self.assertEqual(pybitboard.get_board_info(), cybitboard.get_board_info())
+            self.assertEqual(pybitboard.get_board_line_info('black'), cybitboard.get_board_line_info('black'))
+            self.assertEqual(pybitboard.get_bit_count(pybitboard._black_bitboard), cybitboard.get_bit_count(cybitboard._black_bitboard))
+
+        with self.assertRaises(ValueError):
+            BitBoardMethods.CythonBitBoard256(8)
+
+    def test_board_clone_snapshot_restore(self):
+        for board in [Board(), PyBitBoard(), BitBoard(), Board(10), PyBitBoard(10), BitBoard(10)]:
+            offset = (board.size - 8) // 2
+            board.put_disc('black', 3 + offset, 2 + offset)
+            board.put_disc('white', 2 + offset, 4 + offset)
+            bitboard_info = board.get_bitboard_info()
+            scores = (board._black_score, board._white_score)
+
+            # clone
+            clone = board.clone()
+            self.assertIs(type(clone), type(board))
+            self.assertEqual(clone.size, board.size)
+            self.assertEqual(clone.get_bitboard_info(), bitboard_info)
+            self.assertEqual((clone._black_score, clone._white_score), scores)
+            self.assertEqual(clone.hash, board.hash)
+            self.assertEqual(clone.prev, [])
+            clone.put_disc('black', 1 + offset, 5 + offset)
+            self.assertEqual(board.get_bitboard_info(), bitboard_info)
+            self.assertEqual((board._black_score, board._white_score), scores)
+            self.assertEqual(len(board.prev), 2)
+
+            clone = board.clone(with_history=True)
+            self.assertEqual(clone.prev, board.prev)
+            self.assertIsNot(clone.prev, board.prev)
+            clone.undo()
+            clone.undo()
+            self.assertEqual(clone.get_bitboard_info(), Board(board.size).get_bitboard_info())
+            self.assertEqual(len(board.prev), 2)
+
+            # snapshot/restore
+            snap = board.snapshot()
+            board_hash = board.hash
+            board.put_disc('black', 1 + offset, 5 + offset)
+            board.put_disc('white', *board.get_legal_moves('white')[0])
+            board.restore(snap)
+            self.assertEqual(board.get_bitboard_info(), bitboard_info)
+            self.assertEqual((board._black_score, board._white_score), scores)
+            self.assertEqual(board.hash, board_hash)
+            self.assertEqual(len(board.prev), 2)
+            board.put_disc('black', 1 + offset, 5 + offset)
+            board.restore(snap)
+            self.assertEqual(board.get_bitboard_info(), bitboard_info)
+
+    def test_cyboard_history(self):
+        import copy
+        import random
+        from reversi.recorder import Recorder
+        for size in (4, 6, 8):
+            random.seed(size)
+            bitboard, pybitboard = BitBoard(size), PyBitBoard(size)
+            self.assertIsInstance(bitboard, BitBoardMethods.CythonBitBoard)
+            color = 'black'
+            while True:
+                moves = bitboard.get_legal_moves(color)
+                if not moves:
+                    color = 'white' if color == 'black' else 'black'
+                    moves = bitboard.get_legal_moves(color)
+                    if not moves:
+                        break
+                move = random.choice(moves)
+                bitboard.put_disc(color, *move)
+                pybitboard.put_disc(color, *move)
+                color = 'white' if color == 'black' else 'black'
+
+            # 履歴の内容はPyBitBoardと一致し、読み取り専用
+            self.assertEqual(bitboard.prev, pybitboard.prev)
+            self.assertEqual(Recorder(bitboard).record, Recorder(pybitboard).record)
+            with self.assertRaises(AttributeError):
+                bitboard.prev = []
+            self.assertEqual(copy.deepcopy(bitboard).prev, bitboard.prev)
+
+            while pybitboard.prev:
+                bitboard.undo()
+                pybitboard.undo()
+                self.assertEqual(bitboard.get_bitboard_info(), pybitboard.get_bitboard_info())
+                self.assertEqual(bitboard.hash, pybitboard.hash)
+            self.assertEqual(bitboard.prev, [])
+            with self.assertRaises(IndexError):
+                bitboard.undo()
+
+    def test_bitboard_symmetry(self):
+        import random
+        random.seed(0)
+        for size in (4, 8, 10):
+            board = PyBitBoard(size)
+            color = 'black'
+            for _ in range(size * 2):
+                moves = board.get_legal_moves(color)
+                if moves:
+                    board.put_disc(color, *random.choice(moves))
+                color = 'white' if color == 'black' else 'black'
+            black, white, hole = board.get_bitboard_info()
+            board_info = board.get_board_info()
+
+            # 変換後の盤面の石は、座標を変換した位置と一致する
+            for t in range(8):
+                tb, tw = BitBoardMethods.transform(black, t, size), BitBoardMethods.transform(white, t, size)
+                transformed = PyBitBoard(size, ini_black=tb, ini_white=tw)
+                for y in range(size):
+                    for x in range(size):
+                        tx, ty = BitBoardMethods.transform_move(x, y, t, size)
+                        self.assertEqual(transformed.get_board_info()[ty][tx], board_info[y][x])
+                        self.assertEqual(BitBoardMethods.restore_move(tx, ty, t, size), (x, y))
+            rotated = black
+            for _ in range(4):
+                rotated = BitBoardMethods.rotate90(rotated, size)
+            self.assertEqual(rotated, black)
+            self.assertEqual(BitBoardMethods.flip_vertical(BitBoardMethods.flip_vertical(black, size), size), black)
+
+            # 正規形はどの対称形からも同じになり、手は元の座標に戻せる
+            canonical, t = BitBoardMethods.get_canonical(size, black, white, hole)
+            for i in range(8):
+                ib, iw = BitBoardMethods.transform(black, i, size), BitBoardMethods.transform(white, i, size)
+                self.assertEqual(BitBoardMethods.get_canonical(size, ib, iw)[0], canonical)
+            canonical_board = PyBitBoard(size, ini_black=canonical[0], ini_white=canonical[1])
+            moves = sorted(BitBoardMethods.restore_move(x, y, t, size) for x, y in canonical_board.get_legal_moves(color))
+            self.assertEqual(moves, sorted(board.get_legal_moves(color)))
+
+    @unittest.skipIf(BitBoardMethods.BATCHBOARD_ERROR, 'numpy is not installed')
+    def test_batchboard_random_play(self):
+        import random
+        BatchBoard = BitBoardMethods.BatchBoard
+        random.seed(0)
+        hole = 0x8100000000000081
+        boards = [BitBoard(), BitBoard(), BitBoard(hole=hole), BitBoard(ini_black=0x0000001818000000, ini_white=0x0000000000000000)]
+        black, white, holes = BatchBoard.to_arrays(boards)
+        for i, board in enumerate(boards):
+            self.assertEqual((int(black[i]), int(white[i]), int(holes[i])), board.get_bitboard_info())
+
+        colors = [True, False, True, False]
+        for _ in range(70):
+            is_black = list(colors)
+            legal_moves = BatchBoard.get_legal_moves_bits(is_black, black, white, holes)
+            moves = []
+            for i, board in enumerate(boards):
+                color = 'black' if colors[i] else 'white'
+                self.assertEqual(int(legal_moves[i]), board.get_legal_moves_bits(color))
+                candidates = board.get_legal_moves(color)
+                move_bit = 0
+                if candidates:
+                    x, y = random.choice(candidates)
+                    move_bit = 1 << (63 - (y * 8 + x))
+                    board.put_disc(color, x, y)
+                moves.append(move_bit)
+            black, white = BatchBoard.put_disc(is_black, black, white, moves)
+            scores_b, scores_w = BatchBoard.popcount(black), BatchBoard.popcount(white)
+            for i, board in enumerate(boards):
+                self.assertEqual((int(black[i]), int(white[i])), board.get_bitboard_info()[:2])
+                self.assertEqual((int(scores_b[i]), int(scores_w[i])), (board._black_score, board._white_score))
+                colors[i] = not colors[i]
+
+        # 配列からCythonBitBoardに戻す
+        for i, board in enumerate(BatchBoard.to_boards(black, white, holes)):
+            self.assertIsInstance(board, BitBoardMethods.CythonBitBoard)
+            self.assertEqual(board.get_bitboard_info(), boards[i].get_bitboard_info())
+            self.assertEqual(board.hash, boards[i].hash)
+
+        # 単一の手番指定
+        black, white, holes = BatchBoard.to_arrays([BitBoard(), BitBoard()])
+        self.assertEqual(list(BatchBoard.get_legal_moves_bits('white', black, white)), [BitBoard().get_legal_moves_bits('white')] * 2)
+        with self.assertRaises(ValueError):
+            BatchBoard.to_arrays([BitBoard(6)])
+
+        # int8の盤面配列
+        boards[0].put_disc('black', 5, 4)
+        black, white, _ = BatchBoard.to_arrays(boards)
+        out = BatchBoard.np.zeros((4, 8, 8), dtype=BatchBoard.np.int8)
+        self.assertIs(BatchBoard.to_board_arrays(black, white, out), out)
+        self.assertEqual(out.tolist(), [board.get_board_info() for board in boards])
+        self.assertEqual(BitBoardMethods.export_boards(boards, BatchBoard.np.zeros_like(out)).tolist(), out.tolist())
+        array = BatchBoard.get_board_array(boards[0])
+        self.assertEqual((array.dtype, array.shape), (BatchBoard.np.int8, (8, 8)))
+        self.assertEqual(array.tolist(), boards[0].get_board_info())
+
     def test_board_random_play(self):
         class TestPlayer(Player):
             def put_disc(self, board, bitboard):
@@ -1661,9 +2099,11 @@ class TestBoard(unittest.TestCase):
         os.environ['FORCE_CYBOARD_IMPORT_ERROR'] = 'RAISE'
         importlib.reload(reversi.BitBoardMethods)
         self.assertTrue(reversi.BitBoardMethods.CYBOARD_ERROR)
+        self.assertTrue(reversi.BitBoardMethods.CYBOARD256_ERROR)
         # -------------------------------
         self.assertIsInstance(BitBoard(4), PyBitBoard)
         self.assertIsInstance(BitBoard(), PyBitBoard)
+        self.assertIsInstance(BitBoard(16), PyBitBoard)
         self.assertIsInstance(BitBoard(26), PyBitBoard)
 
         # -------------------------------
@@ -1671,7 +2111,12 @@ class TestBoard(unittest.TestCase):
         del os.environ['FORCE_CYBOARD_IMPORT_ERROR']
         importlib.reload(reversi.BitBoardMethods)
         self.assertFalse(reversi.BitBoardMethods.CYBOARD_ERROR)
+        self.assertFalse(reversi.BitBoardMethods.CYBOARD256_ERROR)
         # -------------------------------
-        self.assertIsInstance(BitBoard(4), PyBitBoard)
+        self.assertIsInstance(BitBoard(4), reversi.board.BitBoardMethods.CyBoard8_64bit.CythonBitBoard)
+        self.assertIsInstance(BitBoard(6), reversi.board.BitBoardMethods.CyBoard8_64bit.CythonBitBoard)
         self.assertIsInstance(BitBoard(), reversi.board.BitBoardMethods.CyBoard8_64bit.CythonBitBoard)
+        for size in (10, 12, 14, 16):
+            self.assertIsInstance(BitBoard(size), reversi.board.BitBoardMethods.CyBoard16_256bit.CythonBitBoard256)
+        self.assertIsInstance(BitBoard(18), PyBitBoard)
         self.assertIsInstance(BitBoard(26), PyBitBoard)
@@ -34,6 +34,7 @@ class TestGame(unittest.TestCase):
         self.assertEqual(game.white_player, game.players[1])
         self.assertIsInstance(game.display, NoneDisplay)
         self.assertEqual(game.cancel, None)
+        self.assertFalse(game.ponder)
         self.assertEqual(game.result, [])
 
     def test_game(self):
@@ -482,3 +483,38 @@ class TestGame(unittest.TestCase):
             self.assertEqual(game5.result.white_name, 'Foul')
             self.assertEqual(game5.result.black_num, 4)
             self.assertEqual(game5.result.white_num, 1)
+
+    def test_game_ponder(self):
+        class Pondering(AbstractStrategy):
+            def __init__(self):
+                self.log = []
+
+            def next_move(self, color, board):
+                self.log.append(('next_move', color))
+                return board.get_legal_moves(color)[0]
+
+            def start_ponder(self, color, board):
+                self.log.append(('start_ponder', color, board._black_score + board._white_score))
+
+            def stop_ponder(self):
+                self.log.append(('stop_ponder',))
+
+        class TopLeft(AbstractStrategy):
+            def next_move(self, color, board):
+                return board.get_legal_moves(color)[0]
+
+        # 先読みしない
+        strategy = Pondering()
+        Game(Player('black', 'Pondering', strategy), Player('white', 'TopLeft', TopLeft()), Board(4)).play()
+        self.assertNotIn(('start_ponder', 'black', 5), strategy.log)
+        self.assertEqual(strategy.log[-1], ('stop_ponder',))
+
+        # 自分が打つ毎に先読みを始め、終局で止める
+        strategy = Pondering()
+        game = Game(Player('black', 'Pondering', strategy), Player('white', 'TopLeft', TopLeft()), Board(4), ponder=True)
+        game.play()
+        self.assertTrue(game.ponder)
+        self.assertEqual(strategy.log[:3], [('next_move', 'black'), ('start_ponder', 'black', 5), ('next_move', 'black')])
+        self.assertEqual(strategy.log.count(('next_move', 'black')), len([log for log in strategy.log if log[0] == 'start_ponder']))
+        self.assertEqual(strategy.log[-1], ('stop_ponder',))
+        self.assertEqual(game.result.winlose, Game.WHITE_WIN)
@@ -0,0 +1,58 @@
+"""Tests of perft.py
+"""
+
+import unittest
+from test.support import captured_stdout
+
+from reversi import Perft, PerftError
+from reversi import C as c
+from reversi.perft import load_board_conf
+
+
+class TestPerft(unittest.TestCase):
+    """perft
+    """
+    def test_perft_start_position(self):
+        perft = Perft()
+        self.assertEqual(
+            list(perft.get_backends().keys()),
+            ['Board', 'PyBitBoard', 'BitBoard', 'AlphaBetaMethods', 'NegaScoutMethods', 'EndGameMethods', 'BlankMethods'],
+        )
+        for depth, nodes in enumerate([1, 4, 12, 56, 244, 1396]):
+            result = perft.run(depth)
+            for backend in result:
+                self.assertEqual(result[backend]['nodes'], nodes)
+        self.assertEqual(perft.count(7), 55092)
+
+        with captured_stdout() as stdout:
+            result = perft.run(6, backends=['BitBoard', 'AlphaBetaMethods'], verbose=True)
+        self.assertEqual(list(result.keys()), ['BitBoard', 'AlphaBetaMethods'])
+        self.assertEqual(result['AlphaBetaMethods']['nodes'], 8200)
+        self.assertGreater(result['AlphaBetaMethods']['nps'], 0)
+        self.assertEqual(len(stdout.getvalue().splitlines()), 2)
+
+    def test_perft_board_size(self):
+        # 4x4は最後まで数える(パス・ゲーム終了を含む)
+        self.assertEqual(Perft(4).run(20, backends=['BitBoard', 'AlphaBetaMethods', 'NegaScoutMethods', 'EndGameMethods'])['BitBoard']['nodes'], 60060)
+        for size in (6, 10, 12):
+            result = Perft(size).run(4)
+            self.assertIn('AlphaBetaMethods', result)
+            self.assertEqual(result['BitBoard']['nodes'], 244)
+        self.assertEqual(list(Perft(18).get_backends().keys()), ['Board', 'PyBitBoard'])
+
+    def test_perft_board_conf(self):
+        perfts = load_board_conf()
+        self.assertEqual(perfts['T'].run(4)['Board']['nodes'], 13423)
+        self.assertEqual(perfts['X'].run(6)['Board']['nodes'], perfts['X'].count(6, 'EndGameMethods'))
+        self.assertEqual(perfts['W'].first, c.white)
+        self.assertEqual(perfts['W'].run(4)['BitBoard']['nodes'], 127)
+
+    def test_perft_mismatch(self):
+        class BrokenPerft(Perft):
+            def get_backends(self):
+                backends = super().get_backends()
+                backends['Broken'] = lambda depth: 0
+                return backends
+
+        with self.assertRaises(PerftError):
+            BrokenPerft().run(3)
@@ -7,6 +7,7 @@ import os
 import json
 
 from reversi import Simulator
+from reversi.BitBoardMethods import iter_positions
 from reversi.strategies import AbstractStrategy, Unselfish, Random, Greedy, SlowStarter, Table, RandomOpening, _AlphaBeta
 from reversi.strategies.coordinator import Evaluator_TPW
 
@@ -282,6 +283,17 @@ class TestSimulator(unittest.TestCase):
         self.assertEqual(lines[12], "AlphaBeta2                |  50.0% |     5     5     0    10")
         self.assertEqual(lines[13], "------------------------------------------------------------")
 
+        # 終局面の保存
+        positions_file = './simulator_positions.bin'
+        simulator.save_positions(positions_file)
+        with open(positions_file, 'rb') as f:
+            positions = list(iter_positions(f.read()))
+        os.remove(positions_file)
+        self.assertEqual(len(positions), 10)
+        for result, (size, _, black, white, _) in zip(simulator.game_results, positions):
+            self.assertEqual(size, 4)
+            self.assertEqual((bin(black).count('1'), bin(white).count('1')), (result.black_num, result.white_num))
+
     def test_simulator_multi_process_parallel_by_game(self):
         json_file = './simulator_setting2.json'
         simulator_setting = {